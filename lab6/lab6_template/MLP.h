@@ -44,6 +44,23 @@ using namespace ML;
 #define MLP_MAC3_BIAS                   (MLP_CONV_BASEADDR + 0x44)
 #define MLP_Q_SCALE                     (MLP_CONV_BASEADDR + 0x48)
 #define MLP_Q_ZERO                      (MLP_CONV_BASEADDR + 0x4C)
+// Read-only performance counters of the last convolution, cleared when the next one starts
+#define MLP_PERF_BUSY_CYCLES            (MLP_CONV_BASEADDR + 0x50)
+#define MLP_PERF_MAC_STALL_CYCLES       (MLP_CONV_BASEADDR + 0x54)
+#define MLP_PERF_BRAM_READ_CYCLES       (MLP_CONV_BASEADDR + 0x58)
+#define MLP_PERF_OUTPUT_WRITES          (MLP_CONV_BASEADDR + 0x5C)
+// Descriptors: each is MLP_CTRLB's value then MLP_FILTER_W..MLP_Q_ZERO in address order. A batch programs and
+// starts the first MLP_DESC_COUNT descriptors of MLP_DESCRIPTORS back to back, MLP_CTRLA only reads idle once the
+// last one completes, and bus writes to the other registers are dropped while it runs
+#define MLP_DESC_COUNT                  (MLP_CONV_BASEADDR + 0x60) // Descriptors the next batch runs, at most MLP_DESCRIPTOR_DEPTH
+#define MLP_DESC_CTRL                   (MLP_CONV_BASEADDR + 0x64)
+#define MLP_DESC_CTRL_RUN               (1 << 0) // Start a batch from the first descriptor
+#define MLP_DESC_CTRL_ABORT             (1 << 1) // Stop the running batch once its current pass completes
+#define MLP_DESC_CTRL_BUSY              (1 << 0) // Read, a batch is running
+#define MLP_DESC_DONE                   (MLP_CONV_BASEADDR + 0x68) // Passes of the current batch completed
+#define MLP_DESCRIPTORS                 ((ui32*)(MLP_CONV_BASEADDR + 0x2000)) // Write-only descriptor RAM, reachable by the CDMA
+#define MLP_DESCRIPTOR_WORDS            18
+#define MLP_DESCRIPTOR_DEPTH            64 // conv_config's DESCRIPTOR_DEPTH
 
 static inline void memcpy_dma_start(void* dest, const void* src, ui32 len) {
     // std::cout << "MEMCPY FROM " << src << " TO " << dest << " OF LENGTH " << len << '\n';
@@ -66,6 +83,38 @@ static inline void memcpy_dma(void* dest, const void* src, ui32 len) {
     while (!memcpy_dma_idle());
 }
 
+static inline void filters_load(const ui8* pass_image, ui32 filter_bytes) {
+    // One pass of bram_packer.py's .bin: the lanes sit at the MLP_FILTER0..3 stride, so one burst loads all four
+    memcpy_dma(MLP_FILTER0, pass_image, (ui32)(MLP_FILTER3 - MLP_FILTER0) + filter_bytes);
+}
+
+static inline void descriptors_queue(const ui32* blob, ui32 count) {
+    // count descriptors of descriptor_compiler.py's blob in one CDMA burst, the CPU writes none of them
+    memcpy_dma(MLP_DESCRIPTORS, blob, count*MLP_DESCRIPTOR_WORDS*sizeof(ui32));
+}
+
+static inline void descriptors_start(ui32 count) {
+    // Returns at once: the host can refill the idle filter bank while the batch runs, watching descriptors_done()
+    Xil_Out32(MLP_DESC_COUNT, count);
+    Xil_Out32(MLP_DESC_CTRL, MLP_DESC_CTRL_RUN);
+}
+
+static inline ui32 descriptors_done() {
+    return Xil_In32(MLP_DESC_DONE);
+}
+
+static inline bool descriptors_busy() {
+    return !!(Xil_In32(MLP_DESC_CTRL) & MLP_DESC_CTRL_BUSY);
+}
+
+static inline void descriptors_abort() {
+    Xil_Out32(MLP_DESC_CTRL, MLP_DESC_CTRL_ABORT);
+}
+
+static inline void descriptors_wait() {
+    while (descriptors_busy());
+}
+
 static inline void memcheck_write(void* baseaddr, ui32 length, ui32 seed) {
     ui32* data = (ui32*)malloc(length);
     ui32 word = seed;
@@ -59,9 +59,8 @@ begin
         end loop;
     end process;
 
-    BRAM_addr(32-1 downto ADDR_WIDTH) <= (others => '0');
-    BRAM_addr(ADDR_WIDTH-BRAM_ADDR_WIDTH-1 downto 0) <= (others => '0');
-    BRAM_addr(ADDR_WIDTH-1 downto ADDR_WIDTH-BRAM_ADDR_WIDTH) <= addr(ADDR_WIDTH-1 downto ADDR_WIDTH-BRAM_ADDR_WIDTH);
+    -- Byte address of the word, addr counts OUT_DATA_WIDTH elements so the word index sits above the sub-word bits
+    BRAM_addr <= std_logic_vector(shift_left(resize(unsigned(addr(ADDR_WIDTH-1 downto ADDR_WIDTH-BRAM_ADDR_WIDTH)), 32), integer(log2(real(BRAM_DATA_WIDTH/8)))));
     BRAM_din <= (others => '0');
     BRAM_en <= en;
     BRAM_we <= (others => '0');
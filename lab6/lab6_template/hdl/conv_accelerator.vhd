@@ -12,6 +12,8 @@ use IEEE.MATH_REAL.ALL;
 
 entity conv_accelerator is
     generic(
+        NUM_MACS : integer := 4; -- Filters processed in parallel, each with its own MAC unit and filter BRAM
+        MAC_TID_WIDTH : integer := 2; -- Width of the MAC index carried with each result, must be kept in sync with NUM_MACS (ceil(log2(NUM_MACS)))!!!
         DIM_WIDTH : integer := 12; -- Max dim size is 2048 in a dense layer
         INPUT_ADDR_WIDTH : integer := 17; -- Max input size is 60*60*32 < 2^17
         FILTER_ADDR_WIDTH : integer := 11; -- Max filter size is 2048 = 2^11
@@ -21,7 +23,8 @@ entity conv_accelerator is
         OUTPUT_BRAM_ADDR_WIDTH : integer := 12; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
         BRAM_DATA_WIDTH : integer := 32; -- Data width of raw BRAM interface
         MAC_DATA_WIDTH : integer := 8; -- Data width of each MAC input operand, defaults to int8. Supports sub-byte indexing, must be power of 2 and less than BRAM_DATA_WIDTH
-        MAC_OUTPUT_DATA_WIDTH : integer := 32 -- Data width of the raw output of the MAC unit
+        MAC_OUTPUT_DATA_WIDTH : integer := 32; -- Data width of the raw output of the MAC unit
+        PACK_OUTPUT_WRITES : boolean := false -- One output BRAM write per word of a channel rather than one per element
     );
     port(
         -- Configuration values from conv_config unit
@@ -38,10 +41,7 @@ entity conv_accelerator is
         input_end_diff_ow : in std_logic_vector(INPUT_ADDR_WIDTH-1 downto 0);
         output_elements_per_channel : in std_logic_vector(OUTPUT_ADDR_WIDTH-1 downto 0);
         output_initial_offset : in std_logic_vector(OUTPUT_ADDR_WIDTH-1 downto 0);
-        mac0_bias : in std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-        mac2_bias : in std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-        mac1_bias : in std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-        mac3_bias : in std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+        mac_bias : in std_logic_vector(NUM_MACS*MAC_OUTPUT_DATA_WIDTH-1 downto 0); -- MAC i's bias is the i-th slice
         q_scale : in std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
         q_zero : in std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
         
@@ -54,37 +54,14 @@ entity conv_accelerator is
         BRAM_INPUT_rst : out std_logic;
         BRAM_INPUT_clk : out std_logic;
 
-        BRAM_FILTER0_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER0_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER0_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER0_en : out std_logic;
-        BRAM_FILTER0_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER0_rst : out std_logic;
-        BRAM_FILTER0_clk : out std_logic;
-
-        BRAM_FILTER1_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER1_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER1_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER1_en : out std_logic;
-        BRAM_FILTER1_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER1_rst : out std_logic;
-        BRAM_FILTER1_clk : out std_logic;
-
-        BRAM_FILTER2_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER2_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER2_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER2_en : out std_logic;
-        BRAM_FILTER2_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER2_rst : out std_logic;
-        BRAM_FILTER2_clk : out std_logic;
-
-        BRAM_FILTER3_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER3_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER3_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER3_en : out std_logic;
-        BRAM_FILTER3_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER3_rst : out std_logic;
-        BRAM_FILTER3_clk : out std_logic;
+        -- One filter BRAM per MAC, filter i is the i-th slice of each vector
+        BRAM_FILTER_addr : out std_logic_vector(NUM_MACS*32-1 downto 0); -- BRAM is word-addressed
+        BRAM_FILTER_din : out std_logic_vector(NUM_MACS*BRAM_DATA_WIDTH-1 downto 0);
+        BRAM_FILTER_dout : in std_logic_vector(NUM_MACS*BRAM_DATA_WIDTH-1 downto 0);
+        BRAM_FILTER_en : out std_logic_vector(NUM_MACS-1 downto 0);
+        BRAM_FILTER_we : out std_logic_vector(NUM_MACS*(BRAM_DATA_WIDTH/8)-1 downto 0);
+        BRAM_FILTER_rst : out std_logic_vector(NUM_MACS-1 downto 0);
+        BRAM_FILTER_clk : out std_logic_vector(NUM_MACS-1 downto 0);
 
         BRAM_OUTPUT_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
         BRAM_OUTPUT_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
@@ -100,52 +77,34 @@ entity conv_accelerator is
         TEST_s_index_gen_m_axis_tlast : out std_logic;
         TEST_s_index_gen_m_axis_tvalid : out std_logic;    
 
-        TEST_s_mac0_s_axis_tready : out std_logic;
-        TEST_s_mac0_s_axis_tdata : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        TEST_s_mac0_s_axis_tlast : out std_logic;
-        TEST_s_mac0_s_axis_tvalid : out std_logic;
-        TEST_s_mac1_s_axis_tready : out std_logic;
-        TEST_s_mac1_s_axis_tdata : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        TEST_s_mac1_s_axis_tlast : out std_logic;
-        TEST_s_mac1_s_axis_tvalid : out std_logic;
-        TEST_s_mac2_s_axis_tready : out std_logic;
-        TEST_s_mac2_s_axis_tdata : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        TEST_s_mac2_s_axis_tlast : out std_logic;
-        TEST_s_mac2_s_axis_tvalid : out std_logic;
-        TEST_s_mac3_s_axis_tready : out std_logic;
-        TEST_s_mac3_s_axis_tdata : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        TEST_s_mac3_s_axis_tlast : out std_logic;
-        TEST_s_mac3_s_axis_tvalid : out std_logic;
-
-        TEST_s_mac0_m_axis_tready : out std_logic;
-        TEST_s_mac0_m_axis_tdata : out std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-        TEST_s_mac0_m_axis_tlast : out std_logic;
-        TEST_s_mac0_m_axis_tvalid : out std_logic;
-        TEST_s_mac1_m_axis_tready : out std_logic;
-        TEST_s_mac1_m_axis_tdata : out std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-        TEST_s_mac1_m_axis_tlast : out std_logic;
-        TEST_s_mac1_m_axis_tvalid : out std_logic;
-        TEST_s_mac2_m_axis_tready : out std_logic;
-        TEST_s_mac2_m_axis_tdata : out std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-        TEST_s_mac2_m_axis_tlast : out std_logic;
-        TEST_s_mac2_m_axis_tvalid : out std_logic;
-        TEST_s_mac3_m_axis_tready : out std_logic;
-        TEST_s_mac3_m_axis_tdata : out std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-        TEST_s_mac3_m_axis_tlast : out std_logic;
-        TEST_s_mac3_m_axis_tvalid : out std_logic;
+        TEST_s_mac_s_axis_tready : out std_logic_vector(NUM_MACS-1 downto 0);
+        TEST_s_mac_s_axis_tdata : out std_logic_vector(NUM_MACS*MAC_DATA_WIDTH*2-1 downto 0);
+        TEST_s_mac_s_axis_tlast : out std_logic_vector(NUM_MACS-1 downto 0);
+        TEST_s_mac_s_axis_tvalid : out std_logic_vector(NUM_MACS-1 downto 0);
+
+        TEST_s_mac_m_axis_tready : out std_logic_vector(NUM_MACS-1 downto 0);
+        TEST_s_mac_m_axis_tdata : out std_logic_vector(NUM_MACS*MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+        TEST_s_mac_m_axis_tlast : out std_logic_vector(NUM_MACS-1 downto 0);
+        TEST_s_mac_m_axis_tvalid : out std_logic_vector(NUM_MACS-1 downto 0);
 
         TEST_s_out_combiner_m_axis_tready : out std_logic;
         TEST_s_out_combiner_m_axis_tdata : out std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
         TEST_s_out_combiner_m_axis_tlast : out std_logic;
-        TEST_s_out_combiner_m_axis_tid : out std_logic_vector(1 downto 0);
+        TEST_s_out_combiner_m_axis_tid : out std_logic_vector(MAC_TID_WIDTH-1 downto 0);
         TEST_s_out_combiner_m_axis_tvalid : out std_logic;
 
         TEST_s_dequantization_m_axis_tready : out std_logic;
         TEST_s_dequantization_m_axis_tdata : out std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
         TEST_s_dequantization_m_axis_tlast : out std_logic;
-        TEST_s_dequantization_m_axis_tid : out std_logic_vector(1 downto 0);
+        TEST_s_dequantization_m_axis_tid : out std_logic_vector(MAC_TID_WIDTH-1 downto 0);
         TEST_s_dequantization_m_axis_tvalid : out std_logic;
 
+        -- Performance counters, cleared on the first cycle of each convolution and held once it completes
+        perf_busy_cycles : out std_logic_vector(31 downto 0);
+        perf_mac_stall_cycles : out std_logic_vector(31 downto 0);
+        perf_bram_read_cycles : out std_logic_vector(31 downto 0);
+        perf_output_writes : out std_logic_vector(31 downto 0);
+
         conv_complete : out std_logic;
         conv_idle : in std_logic;
         rst : in std_logic; -- Reset everything, including BRAM contents
@@ -156,6 +115,17 @@ end conv_accelerator;
 architecture Behavioral of conv_accelerator is
 
     signal s_bram_en : std_logic;
+
+    signal s_conv_complete : std_logic;
+    signal s_conv_idle_delay1 : std_logic;
+    signal s_mac_stall : std_logic;
+    signal s_bram_input_en : std_logic;
+    signal s_bram_output_en : std_logic;
+    signal s_bram_output_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
+    signal s_perf_busy_cycles : unsigned(31 downto 0);
+    signal s_perf_mac_stall_cycles : unsigned(31 downto 0);
+    signal s_perf_bram_read_cycles : unsigned(31 downto 0);
+    signal s_perf_output_writes : unsigned(31 downto 0);
     
     signal s_index_gen_m_axis_tready : std_logic;
     signal s_index_gen_m_axis_tdata_input_addr : std_logic_vector(INPUT_ADDR_WIDTH-1 downto 0);
@@ -163,50 +133,26 @@ architecture Behavioral of conv_accelerator is
     signal s_index_gen_m_axis_tlast : std_logic;
     signal s_index_gen_m_axis_tvalid : std_logic;    
 
-    signal s_mac0_s_axis_tready : std_logic;
-    signal s_mac0_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal s_mac0_s_axis_tlast : std_logic;
-    signal s_mac0_s_axis_tvalid : std_logic;
-    signal s_mac1_s_axis_tready : std_logic;
-    signal s_mac1_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal s_mac1_s_axis_tlast : std_logic;
-    signal s_mac1_s_axis_tvalid : std_logic;
-    signal s_mac2_s_axis_tready : std_logic;
-    signal s_mac2_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal s_mac2_s_axis_tlast : std_logic;
-    signal s_mac2_s_axis_tvalid : std_logic;
-    signal s_mac3_s_axis_tready : std_logic;
-    signal s_mac3_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal s_mac3_s_axis_tlast : std_logic;
-    signal s_mac3_s_axis_tvalid : std_logic;
-
-    signal s_mac0_m_axis_tready : std_logic;
-    signal s_mac0_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal s_mac0_m_axis_tlast : std_logic;
-    signal s_mac0_m_axis_tvalid : std_logic;
-    signal s_mac1_m_axis_tready : std_logic;
-    signal s_mac1_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal s_mac1_m_axis_tlast : std_logic;
-    signal s_mac1_m_axis_tvalid : std_logic;
-    signal s_mac2_m_axis_tready : std_logic;
-    signal s_mac2_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal s_mac2_m_axis_tlast : std_logic;
-    signal s_mac2_m_axis_tvalid : std_logic;
-    signal s_mac3_m_axis_tready : std_logic;
-    signal s_mac3_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal s_mac3_m_axis_tlast : std_logic;
-    signal s_mac3_m_axis_tvalid : std_logic;
+    signal s_mac_s_axis_tready : std_logic_vector(NUM_MACS-1 downto 0);
+    signal s_mac_s_axis_tdata : std_logic_vector(NUM_MACS*MAC_DATA_WIDTH*2-1 downto 0);
+    signal s_mac_s_axis_tlast : std_logic_vector(NUM_MACS-1 downto 0);
+    signal s_mac_s_axis_tvalid : std_logic_vector(NUM_MACS-1 downto 0);
+
+    signal s_mac_m_axis_tready : std_logic_vector(NUM_MACS-1 downto 0);
+    signal s_mac_m_axis_tdata : std_logic_vector(NUM_MACS*MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+    signal s_mac_m_axis_tlast : std_logic_vector(NUM_MACS-1 downto 0);
+    signal s_mac_m_axis_tvalid : std_logic_vector(NUM_MACS-1 downto 0);
 
     signal s_out_combiner_m_axis_tready : std_logic;
     signal s_out_combiner_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
     signal s_out_combiner_m_axis_tlast : std_logic;
-    signal s_out_combiner_m_axis_tid : std_logic_vector(1 downto 0);
+    signal s_out_combiner_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
     signal s_out_combiner_m_axis_tvalid : std_logic;
 
     signal s_dequantization_m_axis_tready : std_logic;
     signal s_dequantization_m_axis_tdata : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
     signal s_dequantization_m_axis_tlast : std_logic;
-    signal s_dequantization_m_axis_tid : std_logic_vector(1 downto 0);
+    signal s_dequantization_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
     signal s_dequantization_m_axis_tvalid : std_logic;
 
 begin
@@ -217,38 +163,14 @@ begin
     TEST_s_index_gen_m_axis_tlast <= s_index_gen_m_axis_tlast;
     TEST_s_index_gen_m_axis_tvalid <= s_index_gen_m_axis_tvalid;
 
-    TEST_s_mac0_s_axis_tready <= s_mac0_s_axis_tready;
-    TEST_s_mac0_s_axis_tdata <= s_mac0_s_axis_tdata;
-    TEST_s_mac0_s_axis_tlast <= s_mac0_s_axis_tlast;
-    TEST_s_mac0_s_axis_tvalid <= s_mac0_s_axis_tvalid;
-    TEST_s_mac1_s_axis_tready <= s_mac1_s_axis_tready;
-    TEST_s_mac1_s_axis_tdata <= s_mac1_s_axis_tdata;
-    TEST_s_mac1_s_axis_tlast <= s_mac1_s_axis_tlast;
-    TEST_s_mac1_s_axis_tvalid <= s_mac1_s_axis_tvalid;
-    TEST_s_mac2_s_axis_tready <= s_mac2_s_axis_tready;
-    TEST_s_mac2_s_axis_tdata <= s_mac2_s_axis_tdata;
-    TEST_s_mac2_s_axis_tlast <= s_mac2_s_axis_tlast;
-    TEST_s_mac2_s_axis_tvalid <= s_mac2_s_axis_tvalid;
-    TEST_s_mac3_s_axis_tready <= s_mac3_s_axis_tready;
-    TEST_s_mac3_s_axis_tdata <= s_mac3_s_axis_tdata;
-    TEST_s_mac3_s_axis_tlast <= s_mac3_s_axis_tlast;
-    TEST_s_mac3_s_axis_tvalid <= s_mac3_s_axis_tvalid;
-    TEST_s_mac0_m_axis_tready <= s_mac0_m_axis_tready;
-    TEST_s_mac0_m_axis_tdata <= s_mac0_m_axis_tdata;
-    TEST_s_mac0_m_axis_tlast <= s_mac0_m_axis_tlast;
-    TEST_s_mac0_m_axis_tvalid <= s_mac0_m_axis_tvalid;
-    TEST_s_mac1_m_axis_tready <= s_mac1_m_axis_tready;
-    TEST_s_mac1_m_axis_tdata <= s_mac1_m_axis_tdata;
-    TEST_s_mac1_m_axis_tlast <= s_mac1_m_axis_tlast;
-    TEST_s_mac1_m_axis_tvalid <= s_mac1_m_axis_tvalid;
-    TEST_s_mac2_m_axis_tready <= s_mac2_m_axis_tready;
-    TEST_s_mac2_m_axis_tdata <= s_mac2_m_axis_tdata;
-    TEST_s_mac2_m_axis_tlast <= s_mac2_m_axis_tlast;
-    TEST_s_mac2_m_axis_tvalid <= s_mac2_m_axis_tvalid;
-    TEST_s_mac3_m_axis_tready <= s_mac3_m_axis_tready;
-    TEST_s_mac3_m_axis_tdata <= s_mac3_m_axis_tdata;
-    TEST_s_mac3_m_axis_tlast <= s_mac3_m_axis_tlast;
-    TEST_s_mac3_m_axis_tvalid <= s_mac3_m_axis_tvalid;
+    TEST_s_mac_s_axis_tready <= s_mac_s_axis_tready;
+    TEST_s_mac_s_axis_tdata <= s_mac_s_axis_tdata;
+    TEST_s_mac_s_axis_tlast <= s_mac_s_axis_tlast;
+    TEST_s_mac_s_axis_tvalid <= s_mac_s_axis_tvalid;
+    TEST_s_mac_m_axis_tready <= s_mac_m_axis_tready;
+    TEST_s_mac_m_axis_tdata <= s_mac_m_axis_tdata;
+    TEST_s_mac_m_axis_tlast <= s_mac_m_axis_tlast;
+    TEST_s_mac_m_axis_tvalid <= s_mac_m_axis_tvalid;
 
     TEST_s_out_combiner_m_axis_tready <= s_out_combiner_m_axis_tready;
     TEST_s_out_combiner_m_axis_tdata <= s_out_combiner_m_axis_tdata;
@@ -262,6 +184,61 @@ begin
     TEST_s_dequantization_m_axis_tid <= s_dequantization_m_axis_tid;
     TEST_s_dequantization_m_axis_tvalid <= s_dequantization_m_axis_tvalid;
 
+    conv_complete <= s_conv_complete;
+    BRAM_INPUT_en <= s_bram_input_en;
+    BRAM_OUTPUT_en <= s_bram_output_en;
+    BRAM_OUTPUT_we <= s_bram_output_we;
+
+    -- Performance Counters
+    -- Count every cycle from conv_idle falling until conv_complete rises. The first of those cycles drops the previous
+    -- convolution's counts, so they stay readable after conv_config returns to idle
+    process(clk)
+        variable busy_cycles : unsigned(31 downto 0);
+        variable mac_stall_cycles : unsigned(31 downto 0);
+        variable bram_read_cycles : unsigned(31 downto 0);
+        variable output_writes : unsigned(31 downto 0);
+    begin
+        if rising_edge(clk) then
+            s_conv_idle_delay1 <= conv_idle;
+            if (rst = '1') then
+                s_conv_idle_delay1 <= '1';
+                s_perf_busy_cycles <= (others => '0');
+                s_perf_mac_stall_cycles <= (others => '0');
+                s_perf_bram_read_cycles <= (others => '0');
+                s_perf_output_writes <= (others => '0');
+            elsif (conv_idle = '0' and s_conv_complete = '0') then
+                busy_cycles := s_perf_busy_cycles;
+                mac_stall_cycles := s_perf_mac_stall_cycles;
+                bram_read_cycles := s_perf_bram_read_cycles;
+                output_writes := s_perf_output_writes;
+                if (s_conv_idle_delay1 = '1') then
+                    busy_cycles := (others => '0');
+                    mac_stall_cycles := (others => '0');
+                    bram_read_cycles := (others => '0');
+                    output_writes := (others => '0');
+                end if;
+                if (s_mac_stall = '1') then
+                    mac_stall_cycles := mac_stall_cycles + 1;
+                end if;
+                if (s_bram_input_en = '1') then
+                    bram_read_cycles := bram_read_cycles + 1;
+                end if;
+                if (s_bram_output_en = '1' and s_bram_output_we /= (s_bram_output_we'range => '0')) then
+                    output_writes := output_writes + 1;
+                end if;
+                s_perf_busy_cycles <= busy_cycles + 1;
+                s_perf_mac_stall_cycles <= mac_stall_cycles;
+                s_perf_bram_read_cycles <= bram_read_cycles;
+                s_perf_output_writes <= output_writes;
+            end if;
+        end if;
+    end process;
+
+    perf_busy_cycles <= std_logic_vector(s_perf_busy_cycles);
+    perf_mac_stall_cycles <= std_logic_vector(s_perf_mac_stall_cycles);
+    perf_bram_read_cycles <= std_logic_vector(s_perf_bram_read_cycles);
+    perf_output_writes <= std_logic_vector(s_perf_output_writes);
+
     -- BRAM Index Generation
 
     g_index_gen: entity work.index_gen
@@ -297,6 +274,7 @@ begin
 
     g_mac_stream_provider: entity work.mac_stream_provider
         generic map(
+            NUM_MACS => NUM_MACS,
             INPUT_ADDR_WIDTH => INPUT_ADDR_WIDTH,
             FILTER_ADDR_WIDTH => FILTER_ADDR_WIDTH,
             INPUT_BRAM_ADDR_WIDTH => INPUT_BRAM_ADDR_WIDTH,
@@ -314,191 +292,71 @@ begin
             BRAM_INPUT_addr => BRAM_INPUT_addr,
             BRAM_INPUT_din => BRAM_INPUT_din,
             BRAM_INPUT_dout => BRAM_INPUT_dout,
-            BRAM_INPUT_en => BRAM_INPUT_en,
+            BRAM_INPUT_en => s_bram_input_en,
             BRAM_INPUT_we => BRAM_INPUT_we,
             BRAM_INPUT_rst => BRAM_INPUT_rst,
             BRAM_INPUT_clk => BRAM_INPUT_clk,
 
-            BRAM_FILTER0_addr => BRAM_FILTER0_addr,
-            BRAM_FILTER0_din => BRAM_FILTER0_din,
-            BRAM_FILTER0_dout => BRAM_FILTER0_dout,
-            BRAM_FILTER0_en => BRAM_FILTER0_en,
-            BRAM_FILTER0_we => BRAM_FILTER0_we,
-            BRAM_FILTER0_rst => BRAM_FILTER0_rst,
-            BRAM_FILTER0_clk => BRAM_FILTER0_clk,
-
-            BRAM_FILTER1_addr => BRAM_FILTER1_addr,
-            BRAM_FILTER1_din => BRAM_FILTER1_din,
-            BRAM_FILTER1_dout => BRAM_FILTER1_dout,
-            BRAM_FILTER1_en => BRAM_FILTER1_en,
-            BRAM_FILTER1_we => BRAM_FILTER1_we,
-            BRAM_FILTER1_rst => BRAM_FILTER1_rst,
-            BRAM_FILTER1_clk => BRAM_FILTER1_clk,
-
-            BRAM_FILTER2_addr => BRAM_FILTER2_addr,
-            BRAM_FILTER2_din => BRAM_FILTER2_din,
-            BRAM_FILTER2_dout => BRAM_FILTER2_dout,
-            BRAM_FILTER2_en => BRAM_FILTER2_en,
-            BRAM_FILTER2_we => BRAM_FILTER2_we,
-            BRAM_FILTER2_rst => BRAM_FILTER2_rst,
-            BRAM_FILTER2_clk => BRAM_FILTER2_clk,
-
-            BRAM_FILTER3_addr => BRAM_FILTER3_addr,
-            BRAM_FILTER3_din => BRAM_FILTER3_din,
-            BRAM_FILTER3_dout => BRAM_FILTER3_dout,
-            BRAM_FILTER3_en => BRAM_FILTER3_en,
-            BRAM_FILTER3_we => BRAM_FILTER3_we,
-            BRAM_FILTER3_rst => BRAM_FILTER3_rst,
-            BRAM_FILTER3_clk => BRAM_FILTER3_clk,
-
-            M_AXIS_MAC0_TREADY => s_mac0_s_axis_tready,
-            M_AXIS_MAC0_TDATA => s_mac0_s_axis_tdata,
-            M_AXIS_MAC0_TLAST => s_mac0_s_axis_tlast,
-            M_AXIS_MAC0_TVALID => s_mac0_s_axis_tvalid,
-
-            M_AXIS_MAC1_TREADY => s_mac1_s_axis_tready,
-            M_AXIS_MAC1_TDATA => s_mac1_s_axis_tdata,
-            M_AXIS_MAC1_TLAST => s_mac1_s_axis_tlast,
-            M_AXIS_MAC1_TVALID => s_mac1_s_axis_tvalid,
-
-            M_AXIS_MAC2_TREADY => s_mac2_s_axis_tready,
-            M_AXIS_MAC2_TDATA => s_mac2_s_axis_tdata,
-            M_AXIS_MAC2_TLAST => s_mac2_s_axis_tlast,
-            M_AXIS_MAC2_TVALID => s_mac2_s_axis_tvalid,
-
-            M_AXIS_MAC3_TREADY => s_mac3_s_axis_tready,
-            M_AXIS_MAC3_TDATA => s_mac3_s_axis_tdata,
-            M_AXIS_MAC3_TLAST => s_mac3_s_axis_tlast,
-            M_AXIS_MAC3_TVALID => s_mac3_s_axis_tvalid,
+            BRAM_FILTER_addr => BRAM_FILTER_addr,
+            BRAM_FILTER_din => BRAM_FILTER_din,
+            BRAM_FILTER_dout => BRAM_FILTER_dout,
+            BRAM_FILTER_en => BRAM_FILTER_en,
+            BRAM_FILTER_we => BRAM_FILTER_we,
+            BRAM_FILTER_rst => BRAM_FILTER_rst,
+            BRAM_FILTER_clk => BRAM_FILTER_clk,
 
-            rst => rst,
-            clk => clk
-        );
-    
-    g_mac0: entity work.conv_mac
-        generic map(
-            C_DATA_WIDTH => MAC_DATA_WIDTH,
-            C_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
-        )
-        port map(
-            -- AXIS slave data interface
-            S_AXIS_TREADY => s_mac0_s_axis_tready,
-            S_AXIS_TDATA => s_mac0_s_axis_tdata,
-            S_AXIS_TLAST => s_mac0_s_axis_tlast,
-            S_AXIS_TVALID => s_mac0_s_axis_tvalid,
+            M_AXIS_MAC_TREADY => s_mac_s_axis_tready,
+            M_AXIS_MAC_TDATA => s_mac_s_axis_tdata,
+            M_AXIS_MAC_TLAST => s_mac_s_axis_tlast,
+            M_AXIS_MAC_TVALID => s_mac_s_axis_tvalid,
 
-            bias => mac0_bias,
-    
-            -- AXIS master accumulate result out interface
-            M_AXIS_TVALID => s_mac0_m_axis_tvalid,
-            M_AXIS_TDATA => s_mac0_m_axis_tdata,
-            M_AXIS_TLAST => s_mac0_m_axis_tlast,
-            M_AXIS_TREADY => s_mac0_m_axis_tready,
+            mac_stall => s_mac_stall,
 
             rst => rst,
             clk => clk
         );
-
-    g_mac1: entity work.conv_mac
-        generic map(
-            C_DATA_WIDTH => MAC_DATA_WIDTH,
-            C_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
-        )
-        port map(
-            -- AXIS slave data interface
-            S_AXIS_TREADY => s_mac1_s_axis_tready,
-            S_AXIS_TDATA => s_mac1_s_axis_tdata,
-            S_AXIS_TLAST => s_mac1_s_axis_tlast,
-            S_AXIS_TVALID => s_mac1_s_axis_tvalid,
-
-            bias => mac1_bias,
     
-            -- AXIS master accumulate result out interface
-            M_AXIS_TREADY => s_mac1_m_axis_tready,
-            M_AXIS_TDATA => s_mac1_m_axis_tdata,
-            M_AXIS_TLAST => s_mac1_m_axis_tlast,
-            M_AXIS_TVALID => s_mac1_m_axis_tvalid,
-
-            rst => rst,
-            clk => clk
-        );
-
-    g_mac2: entity work.conv_mac
-        generic map(
-            C_DATA_WIDTH => MAC_DATA_WIDTH,
-            C_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
-        )
-        port map(
-            -- AXIS slave data interface
-            S_AXIS_TREADY => s_mac2_s_axis_tready,
-            S_AXIS_TDATA => s_mac2_s_axis_tdata,
-            S_AXIS_TLAST => s_mac2_s_axis_tlast,
-            S_AXIS_TVALID => s_mac2_s_axis_tvalid,
-
-            bias => mac2_bias,
-    
-            -- AXIS master accumulate result out interface
-            M_AXIS_TREADY => s_mac2_m_axis_tready,
-            M_AXIS_TDATA => s_mac2_m_axis_tdata,
-            M_AXIS_TLAST => s_mac2_m_axis_tlast,
-            M_AXIS_TVALID => s_mac2_m_axis_tvalid,
-
-            rst => rst,
-            clk => clk
-        );
-
-    g_mac3: entity work.conv_mac
-        generic map(
-            C_DATA_WIDTH => MAC_DATA_WIDTH,
-            C_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
-        )
-        port map(
-            -- AXIS slave data interface
-            S_AXIS_TREADY => s_mac3_s_axis_tready,
-            S_AXIS_TDATA => s_mac3_s_axis_tdata,
-            S_AXIS_TLAST => s_mac3_s_axis_tlast,
-            S_AXIS_TVALID => s_mac3_s_axis_tvalid,
-
-            bias => mac3_bias,
-    
-            -- AXIS master accumulate result out interface
-            M_AXIS_TREADY => s_mac3_m_axis_tready,
-            M_AXIS_TDATA => s_mac3_m_axis_tdata,
-            M_AXIS_TLAST => s_mac3_m_axis_tlast,
-            M_AXIS_TVALID => s_mac3_m_axis_tvalid,
+    g_macs: for i in 0 to NUM_MACS-1 generate
+        g_mac: entity work.conv_mac
+            generic map(
+                C_DATA_WIDTH => MAC_DATA_WIDTH,
+                C_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
+            )
+            port map(
+                -- AXIS slave data interface
+                S_AXIS_TREADY => s_mac_s_axis_tready(i),
+                S_AXIS_TDATA => s_mac_s_axis_tdata(MAC_DATA_WIDTH*2*(i+1)-1 downto MAC_DATA_WIDTH*2*i),
+                S_AXIS_TLAST => s_mac_s_axis_tlast(i),
+                S_AXIS_TVALID => s_mac_s_axis_tvalid(i),
+
+                bias => mac_bias(MAC_OUTPUT_DATA_WIDTH*(i+1)-1 downto MAC_OUTPUT_DATA_WIDTH*i),
+        
+                -- AXIS master accumulate result out interface
+                M_AXIS_TREADY => s_mac_m_axis_tready(i),
+                M_AXIS_TDATA => s_mac_m_axis_tdata(MAC_OUTPUT_DATA_WIDTH*(i+1)-1 downto MAC_OUTPUT_DATA_WIDTH*i),
+                M_AXIS_TLAST => s_mac_m_axis_tlast(i),
+                M_AXIS_TVALID => s_mac_m_axis_tvalid(i),
 
-            rst => rst,
-            clk => clk
-        );
+                rst => rst,
+                clk => clk
+            );
+    end generate;
 
     -- Output to BRAM and mark convolution complete when done
 
     -- Combine the AXI streams from the MAC units into one stream to pass through the dequantization and output storage logic
     -- Note that this buffers the data in a register first so the MAC units are not held up by the dequantization stage.
-    g_out_combiner: entity work.axis_buffered_4_to_1_round_robin_combiner
+    g_out_combiner: entity work.axis_buffered_n_to_1_round_robin_combiner
         generic map(
-            C_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
+            C_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH,
+            C_NUM_STREAMS => NUM_MACS,
+            C_TID_WIDTH => MAC_TID_WIDTH
         )
         port map(
-            S_AXIS0_TREADY => s_mac0_m_axis_tready,
-            S_AXIS0_TDATA => s_mac0_m_axis_tdata,
-            S_AXIS0_TLAST => s_mac0_m_axis_tlast,
-            S_AXIS0_TVALID => s_mac0_m_axis_tvalid,
-
-            S_AXIS1_TREADY => s_mac1_m_axis_tready,
-            S_AXIS1_TDATA => s_mac1_m_axis_tdata,
-            S_AXIS1_TLAST => s_mac1_m_axis_tlast,
-            S_AXIS1_TVALID => s_mac1_m_axis_tvalid,
-
-            S_AXIS2_TREADY => s_mac2_m_axis_tready,
-            S_AXIS2_TDATA => s_mac2_m_axis_tdata,
-            S_AXIS2_TLAST => s_mac2_m_axis_tlast,
-            S_AXIS2_TVALID => s_mac2_m_axis_tvalid,
-
-            S_AXIS3_TREADY => s_mac3_m_axis_tready,
-            S_AXIS3_TDATA => s_mac3_m_axis_tdata,
-            S_AXIS3_TLAST => s_mac3_m_axis_tlast,
-            S_AXIS3_TVALID => s_mac3_m_axis_tvalid,
+            S_AXIS_TREADY => s_mac_m_axis_tready,
+            S_AXIS_TDATA => s_mac_m_axis_tdata,
+            S_AXIS_TLAST => s_mac_m_axis_tlast,
+            S_AXIS_TVALID => s_mac_m_axis_tvalid,
 
             M_AXIS_TREADY => s_out_combiner_m_axis_tready,
             M_AXIS_TDATA => s_out_combiner_m_axis_tdata,
@@ -513,7 +371,7 @@ begin
    g_dequantization: entity work.dequantization
         generic map(
             C_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH,
-            C_TID_WIDTH => 2,
+            C_TID_WIDTH => MAC_TID_WIDTH,
             C_OUT_WIDTH => MAC_DATA_WIDTH
         )
         port map(
@@ -544,7 +402,9 @@ begin
             ADDR_WIDTH => OUTPUT_ADDR_WIDTH,
             BRAM_ADDR_WIDTH => OUTPUT_BRAM_ADDR_WIDTH,
             DIM_WIDTH => DIM_WIDTH,
-            C_TID_WIDTH => 2
+            C_TID_WIDTH => MAC_TID_WIDTH,
+            NUM_MACS => NUM_MACS,
+            PACK_OUTPUT_WRITES => PACK_OUTPUT_WRITES
         )
         port map(
             S_AXIS_TREADY => s_dequantization_m_axis_tready,
@@ -556,8 +416,8 @@ begin
             BRAM_addr => BRAM_OUTPUT_addr,
             BRAM_din => BRAM_OUTPUT_din,
             BRAM_dout => BRAM_OUTPUT_dout,
-            BRAM_en => BRAM_OUTPUT_en,
-            BRAM_we => BRAM_OUTPUT_we,
+            BRAM_en => s_bram_output_en,
+            BRAM_we => s_bram_output_we,
             BRAM_rst => BRAM_OUTPUT_rst,
             BRAM_clk => BRAM_OUTPUT_clk,
 
@@ -567,7 +427,7 @@ begin
             output_h => output_h,
             initial_offset => output_initial_offset,
             
-            conv_complete => conv_complete,
+            conv_complete => s_conv_complete,
             conv_idle => conv_idle,
             clk => clk,
             rst => rst
@@ -12,7 +12,7 @@ use IEEE.MATH_REAL.ALL;
 
 entity conv_accelerator_wrapper is
     generic(
-        C_AXI_ADDR_WIDTH : integer := 8; -- 2^(C_AXI_ADDR_WIDTH-2) registers
+        C_AXI_ADDR_WIDTH : integer := 14; -- conv_config registers, then its descriptor RAM window from 0x2000
         C_AXI_DATA_WIDTH : integer := 32; -- Fixed by AXI-lite spec
         DIM_WIDTH : integer := 12; -- Max dim size is 2048 in a dense layer
         INPUT_ADDR_WIDTH : integer := 17; -- Max input size is 60*60*32 < 2^17
@@ -23,7 +23,8 @@ entity conv_accelerator_wrapper is
         OUTPUT_BRAM_ADDR_WIDTH : integer := 15; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
         BRAM_DATA_WIDTH : integer := 32; -- Data width of raw BRAM interface
         MAC_DATA_WIDTH : integer := 8; -- Data width of each MAC input operand, defaults to int8. Supports sub-byte indexing, must be power of 2 and less than BRAM_DATA_WIDTH
-        MAC_OUTPUT_DATA_WIDTH : integer := 32 -- Data width of the raw output of the MAC unit
+        MAC_OUTPUT_DATA_WIDTH : integer := 32; -- Data width of the raw output of the MAC unit
+        PACK_OUTPUT_WRITES : boolean := false -- One output BRAM write per word of a channel rather than one per element, needed for MAC_DATA_WIDTH below 8 and for layers chained through the activation banks
     );
     port(
         -- AXI4LITE interface for configuration
@@ -187,6 +188,10 @@ architecture Behavioral of conv_accelerator_wrapper is
     signal s_mac3_bias : std_logic_vector(31 downto 0);
     signal s_q_scale : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
     signal s_q_zero : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
+    signal s_perf_busy_cycles : std_logic_vector(31 downto 0);
+    signal s_perf_mac_stall_cycles : std_logic_vector(31 downto 0);
+    signal s_perf_bram_read_cycles : std_logic_vector(31 downto 0);
+    signal s_perf_output_writes : std_logic_vector(31 downto 0);
 begin
 
     s_reset <= not S_AXI_LITE_ARESETN;
@@ -252,12 +257,19 @@ begin
             mac3_bias => s_mac3_bias,
             q_scale => s_q_scale,
             q_zero => s_q_zero,
+
+            perf_busy_cycles => s_perf_busy_cycles,
+            perf_mac_stall_cycles => s_perf_mac_stall_cycles,
+            perf_bram_read_cycles => s_perf_bram_read_cycles,
+            perf_output_writes => s_perf_output_writes,
             
             conv_complete => s_conv_complete
         );
 
     g_conv_accel: entity work.conv_accelerator
         generic map(
+            NUM_MACS => 4, -- One lane per BRAM_FILTER port and mac bias register
+            MAC_TID_WIDTH => 2,
             DIM_WIDTH => DIM_WIDTH,
             INPUT_ADDR_WIDTH => INPUT_ADDR_WIDTH,
             FILTER_ADDR_WIDTH => FILTER_ADDR_WIDTH,
@@ -267,7 +279,8 @@ begin
             OUTPUT_BRAM_ADDR_WIDTH => OUTPUT_BRAM_ADDR_WIDTH,
             BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
             MAC_DATA_WIDTH => MAC_DATA_WIDTH,
-            MAC_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
+            MAC_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH,
+            PACK_OUTPUT_WRITES => PACK_OUTPUT_WRITES
         )
         port map(
             -- Configuration values from conv_config unit
@@ -284,10 +297,10 @@ begin
             input_end_diff_ow => s_input_end_diff_ow,
             output_elements_per_channel => s_output_elements_per_channel,
             output_initial_offset => s_output_initial_offset,
-            mac0_bias => s_mac0_bias,
-            mac1_bias => s_mac1_bias,
-            mac2_bias => s_mac2_bias,
-            mac3_bias => s_mac3_bias,
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*1-1 downto MAC_OUTPUT_DATA_WIDTH*0) => s_mac0_bias,
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*2-1 downto MAC_OUTPUT_DATA_WIDTH*1) => s_mac1_bias,
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*3-1 downto MAC_OUTPUT_DATA_WIDTH*2) => s_mac2_bias,
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*4-1 downto MAC_OUTPUT_DATA_WIDTH*3) => s_mac3_bias,
             q_scale => s_q_scale,
             q_zero => s_q_zero,
 
@@ -299,37 +312,34 @@ begin
             BRAM_INPUT_rst => BRAM_INPUT_rst,
             BRAM_INPUT_clk => BRAM_INPUT_clk,
 
-            BRAM_FILTER0_addr => BRAM_FILTER0_addr,
-            BRAM_FILTER0_din => BRAM_FILTER0_din,
-            BRAM_FILTER0_dout => BRAM_FILTER0_dout,
-            BRAM_FILTER0_en => BRAM_FILTER0_en,
-            BRAM_FILTER0_we => BRAM_FILTER0_we,
-            BRAM_FILTER0_rst => BRAM_FILTER0_rst,
-            BRAM_FILTER0_clk => BRAM_FILTER0_clk,
-
-            BRAM_FILTER1_addr => BRAM_FILTER1_addr,
-            BRAM_FILTER1_din => BRAM_FILTER1_din,
-            BRAM_FILTER1_dout => BRAM_FILTER1_dout,
-            BRAM_FILTER1_en => BRAM_FILTER1_en,
-            BRAM_FILTER1_we => BRAM_FILTER1_we,
-            BRAM_FILTER1_rst => BRAM_FILTER1_rst,
-            BRAM_FILTER1_clk => BRAM_FILTER1_clk,
-
-            BRAM_FILTER2_addr => BRAM_FILTER2_addr,
-            BRAM_FILTER2_din => BRAM_FILTER2_din,
-            BRAM_FILTER2_dout => BRAM_FILTER2_dout,
-            BRAM_FILTER2_en => BRAM_FILTER2_en,
-            BRAM_FILTER2_we => BRAM_FILTER2_we,
-            BRAM_FILTER2_rst => BRAM_FILTER2_rst,
-            BRAM_FILTER2_clk => BRAM_FILTER2_clk,
-
-            BRAM_FILTER3_addr => BRAM_FILTER3_addr,
-            BRAM_FILTER3_din => BRAM_FILTER3_din,
-            BRAM_FILTER3_dout => BRAM_FILTER3_dout,
-            BRAM_FILTER3_en => BRAM_FILTER3_en,
-            BRAM_FILTER3_we => BRAM_FILTER3_we,
-            BRAM_FILTER3_rst => BRAM_FILTER3_rst,
-            BRAM_FILTER3_clk => BRAM_FILTER3_clk,
+            BRAM_FILTER_addr(32*1-1 downto 32*0) => BRAM_FILTER0_addr,
+            BRAM_FILTER_addr(32*2-1 downto 32*1) => BRAM_FILTER1_addr,
+            BRAM_FILTER_addr(32*3-1 downto 32*2) => BRAM_FILTER2_addr,
+            BRAM_FILTER_addr(32*4-1 downto 32*3) => BRAM_FILTER3_addr,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*1-1 downto BRAM_DATA_WIDTH*0) => BRAM_FILTER0_din,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*2-1 downto BRAM_DATA_WIDTH*1) => BRAM_FILTER1_din,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*3-1 downto BRAM_DATA_WIDTH*2) => BRAM_FILTER2_din,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*4-1 downto BRAM_DATA_WIDTH*3) => BRAM_FILTER3_din,
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*1-1 downto BRAM_DATA_WIDTH*0) => BRAM_FILTER0_dout,
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*2-1 downto BRAM_DATA_WIDTH*1) => BRAM_FILTER1_dout,
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*3-1 downto BRAM_DATA_WIDTH*2) => BRAM_FILTER2_dout,
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*4-1 downto BRAM_DATA_WIDTH*3) => BRAM_FILTER3_dout,
+            BRAM_FILTER_en(0) => BRAM_FILTER0_en,
+            BRAM_FILTER_en(1) => BRAM_FILTER1_en,
+            BRAM_FILTER_en(2) => BRAM_FILTER2_en,
+            BRAM_FILTER_en(3) => BRAM_FILTER3_en,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*1-1 downto (BRAM_DATA_WIDTH/8)*0) => BRAM_FILTER0_we,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*2-1 downto (BRAM_DATA_WIDTH/8)*1) => BRAM_FILTER1_we,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*3-1 downto (BRAM_DATA_WIDTH/8)*2) => BRAM_FILTER2_we,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*4-1 downto (BRAM_DATA_WIDTH/8)*3) => BRAM_FILTER3_we,
+            BRAM_FILTER_rst(0) => BRAM_FILTER0_rst,
+            BRAM_FILTER_rst(1) => BRAM_FILTER1_rst,
+            BRAM_FILTER_rst(2) => BRAM_FILTER2_rst,
+            BRAM_FILTER_rst(3) => BRAM_FILTER3_rst,
+            BRAM_FILTER_clk(0) => BRAM_FILTER0_clk,
+            BRAM_FILTER_clk(1) => BRAM_FILTER1_clk,
+            BRAM_FILTER_clk(2) => BRAM_FILTER2_clk,
+            BRAM_FILTER_clk(3) => BRAM_FILTER3_clk,
 
             BRAM_OUTPUT_addr => BRAM_OUTPUT_addr,
             BRAM_OUTPUT_din => BRAM_OUTPUT_din,
@@ -345,39 +355,15 @@ begin
             TEST_s_index_gen_m_axis_tlast => open,
             TEST_s_index_gen_m_axis_tvalid => open,
 
-            TEST_s_mac0_s_axis_tready => open,
-            TEST_s_mac0_s_axis_tdata => open,
-            TEST_s_mac0_s_axis_tlast => open,
-            TEST_s_mac0_s_axis_tvalid => open,
-            TEST_s_mac1_s_axis_tready => open,
-            TEST_s_mac1_s_axis_tdata => open,
-            TEST_s_mac1_s_axis_tlast => open,
-            TEST_s_mac1_s_axis_tvalid => open,
-            TEST_s_mac2_s_axis_tready => open,
-            TEST_s_mac2_s_axis_tdata => open,
-            TEST_s_mac2_s_axis_tlast => open,
-            TEST_s_mac2_s_axis_tvalid => open,
-            TEST_s_mac3_s_axis_tready => open,
-            TEST_s_mac3_s_axis_tdata => open,
-            TEST_s_mac3_s_axis_tlast => open,
-            TEST_s_mac3_s_axis_tvalid => open,
-
-            TEST_s_mac0_m_axis_tready => open,
-            TEST_s_mac0_m_axis_tdata => open,
-            TEST_s_mac0_m_axis_tlast => open,
-            TEST_s_mac0_m_axis_tvalid => open,
-            TEST_s_mac1_m_axis_tready => open,
-            TEST_s_mac1_m_axis_tdata => open,
-            TEST_s_mac1_m_axis_tlast => open,
-            TEST_s_mac1_m_axis_tvalid => open,
-            TEST_s_mac2_m_axis_tready => open,
-            TEST_s_mac2_m_axis_tdata => open,
-            TEST_s_mac2_m_axis_tlast => open,
-            TEST_s_mac2_m_axis_tvalid => open,
-            TEST_s_mac3_m_axis_tready => open,
-            TEST_s_mac3_m_axis_tdata => open,
-            TEST_s_mac3_m_axis_tlast => open,
-            TEST_s_mac3_m_axis_tvalid => open,
+            TEST_s_mac_s_axis_tready => open,
+            TEST_s_mac_s_axis_tdata => open,
+            TEST_s_mac_s_axis_tlast => open,
+            TEST_s_mac_s_axis_tvalid => open,
+
+            TEST_s_mac_m_axis_tready => open,
+            TEST_s_mac_m_axis_tdata => open,
+            TEST_s_mac_m_axis_tlast => open,
+            TEST_s_mac_m_axis_tvalid => open,
 
             TEST_s_out_combiner_m_axis_tready => open,
             TEST_s_out_combiner_m_axis_tdata => open,
@@ -391,6 +377,11 @@ begin
             TEST_s_dequantization_m_axis_tid => open,
             TEST_s_dequantization_m_axis_tvalid => open,
 
+            perf_busy_cycles => s_perf_busy_cycles,
+            perf_mac_stall_cycles => s_perf_mac_stall_cycles,
+            perf_bram_read_cycles => s_perf_bram_read_cycles,
+            perf_output_writes => s_perf_output_writes,
+
             conv_complete => s_conv_complete,
             conv_idle => s_conv_idle,
             rst => s_reset,
@@ -8,18 +8,20 @@
 library work;
 library IEEE;
 use IEEE.STD_LOGIC_1164.ALL;
+use IEEE.NUMERIC_STD.ALL;
 use IEEE.math_real.all;
 
 entity conv_config is
     generic(
-        C_AXI_ADDR_WIDTH : integer := 8; -- 2^(C_AXI_ADDR_WIDTH-2) registers
+        C_AXI_ADDR_WIDTH : integer := 14; -- Registers in the lower half, the descriptor RAM window in the upper half
         C_AXI_DATA_WIDTH : integer := 32; -- Fixed by AXI-lite spec
         DIM_WIDTH : integer := 12;
         INPUT_ADDR_WIDTH : integer := 17;
         FILTER_ADDR_WIDTH : integer := 10;
         OUTPUT_ADDR_WIDTH : integer := 17;
         MAC_OUTPUT_DATA_WIDTH : integer := 32;
-        MAC_DATA_WIDTH : integer := 8
+        MAC_DATA_WIDTH : integer := 8;
+        DESCRIPTOR_DEPTH : integer := 64 -- Descriptors the descriptor RAM holds
     );
     port(
         S_AXI_LITE_ACLK : in std_logic;
@@ -68,6 +70,12 @@ entity conv_config is
         mac3_bias : out std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
         q_scale : out std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
         q_zero : out std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
+
+        -- Read-only performance counters from the accelerator
+        perf_busy_cycles : in std_logic_vector(31 downto 0);
+        perf_mac_stall_cycles : in std_logic_vector(31 downto 0);
+        perf_bram_read_cycles : in std_logic_vector(31 downto 0);
+        perf_output_writes : in std_logic_vector(31 downto 0);
         
         conv_complete : in std_logic;
         conv_idle : out std_logic
@@ -84,8 +92,34 @@ architecture Behavioral of conv_config is
     signal axil_read_ready : std_logic;
     signal axil_read_valid : std_logic;
     signal axil_read_data : std_logic_vector(C_AXI_DATA_WIDTH-1 downto 0);
-    signal axil_read_reg_index : std_logic_vector(C_AXI_ADDR_WIDTH-ADDRLSB-1 downto 0);
-    signal axil_write_reg_index : std_logic_vector(C_AXI_ADDR_WIDTH-ADDRLSB-1 downto 0);
+    signal axil_read_reg_index : std_logic_vector(5 downto 0);
+    signal axil_write_reg_index : std_logic_vector(5 downto 0);
+    signal axil_read_register : std_logic; -- Address is one of the 64 registers rather than in the descriptor window
+    signal axil_write_register : std_logic;
+    signal axil_write_window : std_logic;
+
+    -- Register writes come from the AXI-lite bus or, while a batch runs, from the descriptor RAM
+    signal reg_write : std_logic;
+    signal reg_index : std_logic_vector(5 downto 0);
+    signal reg_data : std_logic_vector(C_AXI_DATA_WIDTH-1 downto 0);
+
+    -- Descriptor RAM, written through the upper half of the address space (one CDMA burst of the compiled blob).
+    -- A descriptor is the CTRLB word then registers 3 to 19 (FILTER_W to Q_ZERO) in address order
+    constant DESCRIPTOR_WORDS : integer := 18;
+    constant QUEUE_WORDS : integer := DESCRIPTOR_DEPTH*DESCRIPTOR_WORDS; -- At most 2^(C_AXI_ADDR_WIDTH-3) words
+    type descriptor_ram_t is array(0 to QUEUE_WORDS-1) of std_logic_vector(C_AXI_DATA_WIDTH-1 downto 0);
+    type descriptor_state_t is (DESC_IDLE, DESC_READ, DESC_LOAD, DESC_RUN);
+    signal descriptor_ram : descriptor_ram_t;
+    signal desc_state : descriptor_state_t;
+    signal desc_write : std_logic;
+    signal desc_write_addr : integer range 0 to 2**(C_AXI_ADDR_WIDTH-1-ADDRLSB)-1;
+    signal desc_read_addr : integer range 0 to QUEUE_WORDS; -- Next word the sequencer reads
+    signal desc_data : std_logic_vector(C_AXI_DATA_WIDTH-1 downto 0);
+    signal desc_word : integer range 0 to DESCRIPTOR_WORDS-1; -- Word of the current descriptor in desc_data
+    signal desc_count : integer range 0 to DESCRIPTOR_DEPTH; -- Descriptors the next batch runs
+    signal desc_done : unsigned(C_AXI_DATA_WIDTH-1 downto 0); -- Passes completed since the batch started
+    signal desc_abort : std_logic; -- Stop the batch once the current pass completes
+    signal desc_busy : std_logic;
 
     -- Custom Peripheral Signals
 
@@ -135,7 +169,9 @@ begin
     S_AXI_LITE_WREADY <= axil_write_ready;
     S_AXI_LITE_BVALID <= axil_write_response_valid;
     S_AXI_LITE_BRESP <= "00";
-    axil_write_reg_index <= S_AXI_LITE_AWADDR(C_AXI_ADDR_WIDTH-1 downto ADDRLSB);
+    axil_write_reg_index <= S_AXI_LITE_AWADDR(ADDRLSB+5 downto ADDRLSB);
+    axil_write_register <= '1' when unsigned(S_AXI_LITE_AWADDR(C_AXI_ADDR_WIDTH-1 downto ADDRLSB+6)) = 0 else '0';
+    axil_write_window <= S_AXI_LITE_AWADDR(C_AXI_ADDR_WIDTH-1);
 
     -- Read signaling
 
@@ -154,7 +190,33 @@ begin
     S_AXI_LITE_RVALID <= axil_read_valid;
     S_AXI_LITE_RDATA <= axil_read_data;
     S_AXI_LITE_RRESP <= "00";
-    axil_read_reg_index <= S_AXI_LITE_ARADDR(C_AXI_ADDR_WIDTH-1 downto ADDRLSB);
+    axil_read_reg_index <= S_AXI_LITE_ARADDR(ADDRLSB+5 downto ADDRLSB);
+    axil_read_register <= '1' when unsigned(S_AXI_LITE_ARADDR(C_AXI_ADDR_WIDTH-1 downto ADDRLSB+6)) = 0 else '0';
+
+    -- Descriptor RAM, write-only from the bus and read one word per cycle by the sequencer. Descriptors a running
+    -- batch has not reached yet may be rewritten
+
+    desc_write_addr <= to_integer(unsigned(S_AXI_LITE_AWADDR(C_AXI_ADDR_WIDTH-2 downto ADDRLSB)));
+    desc_write <= '1' when axil_write_ready = '1' and axil_write_window = '1' and desc_write_addr < QUEUE_WORDS else '0';
+    process(S_AXI_LITE_ACLK) is
+    begin
+        if rising_edge(S_AXI_LITE_ACLK) then
+            if (desc_write = '1') then
+                descriptor_ram(desc_write_addr) <= S_AXI_LITE_WDATA;
+            end if;
+            if (desc_read_addr < QUEUE_WORDS) then
+                desc_data <= descriptor_ram(desc_read_addr);
+            end if;
+        end if;
+    end process;
+
+    -- Bus writes to the configuration registers are dropped while a batch owns them
+    desc_busy <= '0' when desc_state = DESC_IDLE else '1';
+    reg_write <= '1' when desc_state = DESC_LOAD or (axil_write_ready = '1' and axil_write_register = '1' and desc_busy = '0') else '0';
+    reg_index <= axil_write_reg_index when desc_state /= DESC_LOAD else
+                 std_logic_vector(to_unsigned(1, reg_index'length)) when desc_word = 0 else
+                 std_logic_vector(to_unsigned(desc_word + 2, reg_index'length));
+    reg_data <= desc_data when desc_state = DESC_LOAD else S_AXI_LITE_WDATA;
 
     -- Register Write
 
@@ -183,58 +245,111 @@ begin
                 s_mac3_bias <= (others => '0');
                 s_q_scale <= (others => '0');
                 s_q_zero <= (others => '0');
+                desc_state <= DESC_IDLE;
+                desc_read_addr <= 0;
+                desc_word <= 0;
+                desc_count <= 0;
+                desc_done <= (others => '0');
+                desc_abort <= '0';
 
-            elsif (axil_write_ready = '1') then
-                case axil_write_reg_index is
+            else
+                if (reg_write = '1') then
+                    case reg_index is
 
-                    -- EDIT REGISTER WRITE BEHAVIOR HERE
-                    when "000000" =>
-                        s_conv_idle <= S_AXI_LITE_WDATA(0);
-                    when "000001" =>
-                        s_relu <= S_AXI_LITE_WDATA(3);
-                        s_max_pooling <= S_AXI_LITE_WDATA(2);
-                        s_swap_activations <= S_AXI_LITE_WDATA(1);
-                        s_swap_filters <= S_AXI_LITE_WDATA(0);
-                    -- when "000010" =>
-                    when "000011" =>
-                        s_filter_w <= S_AXI_LITE_WDATA(DIM_WIDTH-1 downto 0);
-                    when "000100" =>
-                        s_filter_h <= S_AXI_LITE_WDATA(DIM_WIDTH-1 downto 0);
-                    when "000101" =>
-                        s_filter_c <= S_AXI_LITE_WDATA(DIM_WIDTH-1 downto 0);
-                    when "000110" =>
-                        s_output_w <= S_AXI_LITE_WDATA(DIM_WIDTH-1 downto 0);
-                    when "000111" =>
-                        s_output_h <= S_AXI_LITE_WDATA(DIM_WIDTH-1 downto 0);
-                    when "001000" =>
-                        s_input_end_diff_fw <= S_AXI_LITE_WDATA(INPUT_ADDR_WIDTH-1 downto 0);
-                    when "001001" =>
-                        s_input_end_diff_fh <= S_AXI_LITE_WDATA(INPUT_ADDR_WIDTH-1 downto 0);
-                    when "001010" =>
-                        s_input_end_diff_fc <= S_AXI_LITE_WDATA(INPUT_ADDR_WIDTH-1 downto 0);
-                    when "001011" =>
-                        s_input_end_diff_ow <= S_AXI_LITE_WDATA(INPUT_ADDR_WIDTH-1 downto 0);
-                    when "001100" =>
-                        s_output_elements_per_channel <= S_AXI_LITE_WDATA(OUTPUT_ADDR_WIDTH-1 downto 0);
-                    when "001101" =>
-                        s_output_initial_offset <= S_AXI_LITE_WDATA(OUTPUT_ADDR_WIDTH-1 downto 0);
-                    when "001110" =>
-                        s_mac0_bias <= S_AXI_LITE_WDATA(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-                    when "001111" =>
-                        s_mac1_bias <= S_AXI_LITE_WDATA(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-                    when "010000" =>
-                        s_mac2_bias <= S_AXI_LITE_WDATA(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-                    when "010001" =>
-                        s_mac3_bias <= S_AXI_LITE_WDATA(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-                    when "010010" =>
-                        s_q_scale <= S_AXI_LITE_WDATA(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-                    when "010011" =>
-                        s_q_zero <= S_AXI_LITE_WDATA(MAC_DATA_WIDTH-1 downto 0);
-                    when others =>
+                        -- EDIT REGISTER WRITE BEHAVIOR HERE
+                        when "000000" =>
+                            s_conv_idle <= reg_data(0);
+                        when "000001" =>
+                            s_relu <= reg_data(3);
+                            s_max_pooling <= reg_data(2);
+                            s_swap_activations <= reg_data(1);
+                            s_swap_filters <= reg_data(0);
+                        -- when "000010" =>
+                        when "000011" =>
+                            s_filter_w <= reg_data(DIM_WIDTH-1 downto 0);
+                        when "000100" =>
+                            s_filter_h <= reg_data(DIM_WIDTH-1 downto 0);
+                        when "000101" =>
+                            s_filter_c <= reg_data(DIM_WIDTH-1 downto 0);
+                        when "000110" =>
+                            s_output_w <= reg_data(DIM_WIDTH-1 downto 0);
+                        when "000111" =>
+                            s_output_h <= reg_data(DIM_WIDTH-1 downto 0);
+                        when "001000" =>
+                            s_input_end_diff_fw <= reg_data(INPUT_ADDR_WIDTH-1 downto 0);
+                        when "001001" =>
+                            s_input_end_diff_fh <= reg_data(INPUT_ADDR_WIDTH-1 downto 0);
+                        when "001010" =>
+                            s_input_end_diff_fc <= reg_data(INPUT_ADDR_WIDTH-1 downto 0);
+                        when "001011" =>
+                            s_input_end_diff_ow <= reg_data(INPUT_ADDR_WIDTH-1 downto 0);
+                        when "001100" =>
+                            s_output_elements_per_channel <= reg_data(OUTPUT_ADDR_WIDTH-1 downto 0);
+                        when "001101" =>
+                            s_output_initial_offset <= reg_data(OUTPUT_ADDR_WIDTH-1 downto 0);
+                        when "001110" =>
+                            s_mac0_bias <= reg_data(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+                        when "001111" =>
+                            s_mac1_bias <= reg_data(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+                        when "010000" =>
+                            s_mac2_bias <= reg_data(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+                        when "010001" =>
+                            s_mac3_bias <= reg_data(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+                        when "010010" =>
+                            s_q_scale <= reg_data(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
+                        when "010011" =>
+                            s_q_zero <= reg_data(MAC_DATA_WIDTH-1 downto 0);
+                        when others =>
                 
+                    end case;
+                elsif (conv_complete = '1' and s_conv_idle = '0') then
+                    s_conv_idle <= '1';
+                end if;
+
+                -- DESC_COUNT takes at most DESCRIPTOR_DEPTH while no batch runs. DESC_CTRL bit 1 aborts a running batch
+                if (axil_write_ready = '1' and axil_write_register = '1' and desc_busy = '0' and axil_write_reg_index = "011000"
+                    and unsigned(S_AXI_LITE_WDATA) <= DESCRIPTOR_DEPTH) then
+                    desc_count <= to_integer(unsigned(S_AXI_LITE_WDATA));
+                end if;
+                if (axil_write_ready = '1' and axil_write_register = '1' and desc_busy = '1' and axil_write_reg_index = "011001"
+                    and S_AXI_LITE_WDATA(1) = '1') then
+                    desc_abort <= '1';
+                end if;
+
+                -- Sequencer: read a descriptor a word per cycle into the registers, start the pass, wait for
+                -- conv_complete and carry on until DESC_COUNT passes completed or an abort. conv_idle only reads
+                -- back as set once the last pass of the batch completes
+                case desc_state is
+                    when DESC_IDLE =>
+                        if (axil_write_ready = '1' and axil_write_register = '1' and axil_write_reg_index = "011001"
+                            and S_AXI_LITE_WDATA(0) = '1' and desc_count /= 0) then
+                            desc_state <= DESC_READ;
+                            desc_read_addr <= 0;
+                            desc_done <= (others => '0');
+                            desc_abort <= '0';
+                        end if;
+                    when DESC_READ =>
+                        desc_read_addr <= desc_read_addr + 1;
+                        desc_word <= 0;
+                        desc_state <= DESC_LOAD;
+                    when DESC_LOAD =>
+                        if (desc_word = DESCRIPTOR_WORDS-1) then
+                            s_conv_idle <= '0';
+                            desc_state <= DESC_RUN;
+                        else
+                            desc_read_addr <= desc_read_addr + 1;
+                            desc_word <= desc_word + 1;
+                        end if;
+                    when DESC_RUN =>
+                        if (conv_complete = '1' and s_conv_idle = '0') then
+                            desc_done <= desc_done + 1;
+                            if (desc_abort = '1' or desc_done + 1 = desc_count) then
+                                desc_state <= DESC_IDLE;
+                            else
+                                desc_state <= DESC_READ;
+                            end if;
+                        end if;
                 end case;
-            elsif (conv_complete = '1' and s_conv_idle = '0') then
-                s_conv_idle <= '1';
             end if;
         end if;
     end process;
@@ -245,12 +360,12 @@ begin
     begin
         if rising_edge(S_AXI_LITE_ACLK) then
             axil_read_data <= (others => '0');
-            if (axil_read_ready = '1') then
+            if (axil_read_ready = '1' and axil_read_register = '1') then
                 case axil_read_reg_index is
 
                     -- EDIT REGISTER READ BEHAVIOR HERE
                     when "000000" =>
-                        axil_read_data(0) <= s_conv_idle;
+                        axil_read_data(0) <= s_conv_idle and not desc_busy;
                     when "000001" =>
                         axil_read_data(3) <= s_relu;
                         axil_read_data(2) <= s_max_pooling;
@@ -291,6 +406,21 @@ begin
                         axil_read_data(MAC_OUTPUT_DATA_WIDTH-1 downto 0) <= s_q_scale;
                     when "010011" =>
                         axil_read_data(MAC_DATA_WIDTH-1 downto 0) <= s_q_zero;
+                    when "010100" =>
+                        axil_read_data <= perf_busy_cycles;
+                    when "010101" =>
+                        axil_read_data <= perf_mac_stall_cycles;
+                    when "010110" =>
+                        axil_read_data <= perf_bram_read_cycles;
+                    when "010111" =>
+                        axil_read_data <= perf_output_writes;
+                    when "011000" =>
+                        axil_read_data <= std_logic_vector(to_unsigned(desc_count, C_AXI_DATA_WIDTH));
+                    when "011001" =>
+                        axil_read_data(1) <= desc_abort;
+                        axil_read_data(0) <= desc_busy;
+                    when "011010" =>
+                        axil_read_data <= std_logic_vector(desc_done);
                     when others =>
 
                 end case;
@@ -304,7 +434,7 @@ begin
 
     relu <= s_relu;
     max_pooling <= s_max_pooling;
-    accelerator_controls_activation_bram <= not s_conv_idle;
+    accelerator_controls_activation_bram <= not s_conv_idle or desc_busy;
     swap_activations <= s_swap_activations;
     swap_filters <= s_swap_filters;
     filter_w <= s_filter_w;
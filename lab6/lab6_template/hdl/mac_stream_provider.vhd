@@ -11,6 +11,7 @@ use IEEE.numeric_std.all;
 
 entity mac_stream_provider is
     generic(
+        NUM_MACS : integer := 4;
         INPUT_ADDR_WIDTH : integer := 32;
         FILTER_ADDR_WIDTH : integer := 32;
         INPUT_BRAM_ADDR_WIDTH : integer := 32;
@@ -33,57 +34,22 @@ entity mac_stream_provider is
         BRAM_INPUT_rst : out std_logic;
         BRAM_INPUT_clk : out std_logic;
 
-        BRAM_FILTER0_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER0_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER0_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER0_en : out std_logic;
-        BRAM_FILTER0_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER0_rst : out std_logic;
-        BRAM_FILTER0_clk : out std_logic;
-
-        BRAM_FILTER1_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER1_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER1_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER1_en : out std_logic;
-        BRAM_FILTER1_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER1_rst : out std_logic;
-        BRAM_FILTER1_clk : out std_logic;
-
-        BRAM_FILTER2_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER2_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER2_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER2_en : out std_logic;
-        BRAM_FILTER2_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER2_rst : out std_logic;
-        BRAM_FILTER2_clk : out std_logic;
-
-        BRAM_FILTER3_addr : out std_logic_vector(32-1 downto 0); -- BRAM is word-addressed
-        BRAM_FILTER3_din : out std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER3_dout : in std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-        BRAM_FILTER3_en : out std_logic;
-        BRAM_FILTER3_we : out std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-        BRAM_FILTER3_rst : out std_logic;
-        BRAM_FILTER3_clk : out std_logic;
-
-        M_AXIS_MAC0_TREADY : in  std_logic;
-        M_AXIS_MAC0_TDATA  : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        M_AXIS_MAC0_TLAST  : out std_logic;
-        M_AXIS_MAC0_TVALID : out std_logic;
-
-        M_AXIS_MAC1_TREADY : in  std_logic;
-        M_AXIS_MAC1_TDATA  : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        M_AXIS_MAC1_TLAST  : out std_logic;
-        M_AXIS_MAC1_TVALID : out std_logic;
-
-        M_AXIS_MAC2_TREADY : in  std_logic;
-        M_AXIS_MAC2_TDATA  : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        M_AXIS_MAC2_TLAST  : out std_logic;
-        M_AXIS_MAC2_TVALID : out std_logic;
-
-        M_AXIS_MAC3_TREADY : in  std_logic;
-        M_AXIS_MAC3_TDATA  : out std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-        M_AXIS_MAC3_TLAST  : out std_logic;
-        M_AXIS_MAC3_TVALID : out std_logic;
+        -- One filter BRAM per MAC, filter i is the i-th slice of each vector
+        BRAM_FILTER_addr : out std_logic_vector(NUM_MACS*32-1 downto 0); -- BRAM is word-addressed
+        BRAM_FILTER_din : out std_logic_vector(NUM_MACS*BRAM_DATA_WIDTH-1 downto 0);
+        BRAM_FILTER_dout : in std_logic_vector(NUM_MACS*BRAM_DATA_WIDTH-1 downto 0);
+        BRAM_FILTER_en : out std_logic_vector(NUM_MACS-1 downto 0);
+        BRAM_FILTER_we : out std_logic_vector(NUM_MACS*(BRAM_DATA_WIDTH/8)-1 downto 0);
+        BRAM_FILTER_rst : out std_logic_vector(NUM_MACS-1 downto 0);
+        BRAM_FILTER_clk : out std_logic_vector(NUM_MACS-1 downto 0);
+
+        -- One stream per MAC, MAC i is the i-th slice of each vector
+        M_AXIS_MAC_TREADY : in  std_logic_vector(NUM_MACS-1 downto 0);
+        M_AXIS_MAC_TDATA  : out std_logic_vector(NUM_MACS*MAC_DATA_WIDTH*2-1 downto 0);
+        M_AXIS_MAC_TLAST  : out std_logic_vector(NUM_MACS-1 downto 0);
+        M_AXIS_MAC_TVALID : out std_logic_vector(NUM_MACS-1 downto 0);
+
+        mac_stall : out std_logic; -- Data is waiting but some MAC is not ready, for the performance counters
 
         clk : in std_logic;
         rst : in std_logic
@@ -101,23 +67,15 @@ architecture behavioral of mac_stream_provider is
     signal s_reg0_m_axis_tready : std_logic;
     signal s_reg0_m_axis_tvalid : std_logic;
 
+    -- Input operand in the top slice, filter i's operand in the i-th slice below it
     signal s_reg1_s_axis_tready : std_logic;
-    signal s_reg1_s_axis_input_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_s_axis_filter0_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_s_axis_filter1_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_s_axis_filter2_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_s_axis_filter3_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*5-1 downto 0);
+    signal s_reg1_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*(NUM_MACS+1)-1 downto 0);
     signal s_reg1_s_axis_tlast : std_logic;
     signal s_reg1_s_axis_tvalid : std_logic;
 
     signal s_reg1_m_axis_tready : std_logic;
     signal s_reg1_m_axis_input_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_m_axis_filter0_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_m_axis_filter1_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_m_axis_filter2_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_m_axis_filter3_data : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
-    signal s_reg1_m_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*5-1 downto 0);
+    signal s_reg1_m_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*(NUM_MACS+1)-1 downto 0);
 
     signal s_reg1_m_axis_tlast : std_logic;
     signal s_reg1_m_axis_tvalid : std_logic;
@@ -193,118 +151,44 @@ begin
             BRAM_clk => BRAM_INPUT_clk,
 
             addr => s_bram_input_addr,
-            data => s_reg1_s_axis_input_data,
-
-            en => s_bram_en,
-            rst => rst,
-            clk => clk
-        );
-
-    g_filter0_fetcher: entity work.bram_slice_fetcher
-        generic map(
-            ADDR_WIDTH => FILTER_ADDR_WIDTH,
-            BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
-            BRAM_ADDR_WIDTH => FILTER_BRAM_ADDR_WIDTH,
-            OUT_DATA_WIDTH => MAC_DATA_WIDTH
-        )
-        port map(
-            BRAM_addr => BRAM_FILTER0_addr,
-            BRAM_din => BRAM_FILTER0_din,
-            BRAM_dout => BRAM_FILTER0_dout,
-            BRAM_en => BRAM_FILTER0_en,
-            BRAM_we => BRAM_FILTER0_we,
-            BRAM_rst => BRAM_FILTER0_rst,
-            BRAM_clk => BRAM_FILTER0_clk,
-
-            addr => s_bram_filter_addr,
-            data => s_reg1_s_axis_filter0_data,
+            data => s_reg1_s_axis_tdata(MAC_DATA_WIDTH*(NUM_MACS+1)-1 downto MAC_DATA_WIDTH*NUM_MACS),
 
             en => s_bram_en,
             rst => rst,
             clk => clk
         );
 
-    g_filter1_fetcher: entity work.bram_slice_fetcher
-        generic map(
-            ADDR_WIDTH => FILTER_ADDR_WIDTH,
-            BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
-            BRAM_ADDR_WIDTH => FILTER_BRAM_ADDR_WIDTH,
-            OUT_DATA_WIDTH => MAC_DATA_WIDTH
-        )
-        port map(
-            BRAM_addr => BRAM_FILTER1_addr,
-            BRAM_din => BRAM_FILTER1_din,
-            BRAM_dout => BRAM_FILTER1_dout,
-            BRAM_en => BRAM_FILTER1_en,
-            BRAM_we => BRAM_FILTER1_we,
-            BRAM_rst => BRAM_FILTER1_rst,
-            BRAM_clk => BRAM_FILTER1_clk,
-
-            addr => s_bram_filter_addr,
-            data => s_reg1_s_axis_filter1_data,
-
-            en => s_bram_en,
-            rst => rst,
-            clk => clk
-        );
-
-    g_filter2_fetcher: entity work.bram_slice_fetcher
-        generic map(
-            ADDR_WIDTH => FILTER_ADDR_WIDTH,
-            BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
-            BRAM_ADDR_WIDTH => FILTER_BRAM_ADDR_WIDTH,
-            OUT_DATA_WIDTH => MAC_DATA_WIDTH
-        )
-        port map(
-            BRAM_addr => BRAM_FILTER2_addr,
-            BRAM_din => BRAM_FILTER2_din,
-            BRAM_dout => BRAM_FILTER2_dout,
-            BRAM_en => BRAM_FILTER2_en,
-            BRAM_we => BRAM_FILTER2_we,
-            BRAM_rst => BRAM_FILTER2_rst,
-            BRAM_clk => BRAM_FILTER2_clk,
-
-            addr => s_bram_filter_addr,
-            data => s_reg1_s_axis_filter2_data,
-
-            en => s_bram_en,
-            rst => rst,
-            clk => clk
-        );
-
-    g_filter3_fetcher: entity work.bram_slice_fetcher
-        generic map(
-            ADDR_WIDTH => FILTER_ADDR_WIDTH,
-            BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
-            BRAM_ADDR_WIDTH => FILTER_BRAM_ADDR_WIDTH,
-            OUT_DATA_WIDTH => MAC_DATA_WIDTH
-        )
-        port map(
-            BRAM_addr => BRAM_FILTER3_addr,
-            BRAM_din => BRAM_FILTER3_din,
-            BRAM_dout => BRAM_FILTER3_dout,
-            BRAM_en => BRAM_FILTER3_en,
-            BRAM_we => BRAM_FILTER3_we,
-            BRAM_rst => BRAM_FILTER3_rst,
-            BRAM_clk => BRAM_FILTER3_clk,
-
-            addr => s_bram_filter_addr,
-            data => s_reg1_s_axis_filter3_data,
-
-            en => s_bram_en,
-            rst => rst,
-            clk => clk
-        );
+    -- Every filter BRAM is read at the same address, each holds a different filter
+    g_filter_fetchers: for i in 0 to NUM_MACS-1 generate
+        g_filter_fetcher: entity work.bram_slice_fetcher
+            generic map(
+                ADDR_WIDTH => FILTER_ADDR_WIDTH,
+                BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
+                BRAM_ADDR_WIDTH => FILTER_BRAM_ADDR_WIDTH,
+                OUT_DATA_WIDTH => MAC_DATA_WIDTH
+            )
+            port map(
+                BRAM_addr => BRAM_FILTER_addr(32*(i+1)-1 downto 32*i),
+                BRAM_din => BRAM_FILTER_din(BRAM_DATA_WIDTH*(i+1)-1 downto BRAM_DATA_WIDTH*i),
+                BRAM_dout => BRAM_FILTER_dout(BRAM_DATA_WIDTH*(i+1)-1 downto BRAM_DATA_WIDTH*i),
+                BRAM_en => BRAM_FILTER_en(i),
+                BRAM_we => BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*(i+1)-1 downto (BRAM_DATA_WIDTH/8)*i),
+                BRAM_rst => BRAM_FILTER_rst(i),
+                BRAM_clk => BRAM_FILTER_clk(i),
+
+                addr => s_bram_filter_addr,
+                data => s_reg1_s_axis_tdata(MAC_DATA_WIDTH*(i+1)-1 downto MAC_DATA_WIDTH*i),
+
+                en => s_bram_en,
+                rst => rst,
+                clk => clk
+            );
+    end generate;
 
     -- And buffer the data once coming out of the BRAM blocks to help with the critical timing path
-    s_reg1_s_axis_tdata(MAC_DATA_WIDTH*5-1 downto MAC_DATA_WIDTH*4) <= s_reg1_s_axis_input_data;
-    s_reg1_s_axis_tdata(MAC_DATA_WIDTH*4-1 downto MAC_DATA_WIDTH*3) <= s_reg1_s_axis_filter0_data;
-    s_reg1_s_axis_tdata(MAC_DATA_WIDTH*3-1 downto MAC_DATA_WIDTH*2) <= s_reg1_s_axis_filter1_data;
-    s_reg1_s_axis_tdata(MAC_DATA_WIDTH*2-1 downto MAC_DATA_WIDTH*1) <= s_reg1_s_axis_filter2_data;
-    s_reg1_s_axis_tdata(MAC_DATA_WIDTH*1-1 downto MAC_DATA_WIDTH*0) <= s_reg1_s_axis_filter3_data;
     g_register1: entity work.axis_register_slice
         generic map(
-            C_DATA_WIDTH => MAC_DATA_WIDTH*5,
+            C_DATA_WIDTH => MAC_DATA_WIDTH*(NUM_MACS+1),
             C_TID_WIDTH => 1
         )
         port map(
@@ -323,28 +207,17 @@ begin
             rst => rst,
             clk => clk
         );
-    s_reg1_m_axis_input_data <= s_reg1_m_axis_tdata(MAC_DATA_WIDTH*5-1 downto MAC_DATA_WIDTH*4);
-    s_reg1_m_axis_filter0_data <= s_reg1_m_axis_tdata(MAC_DATA_WIDTH*4-1 downto MAC_DATA_WIDTH*3);
-    s_reg1_m_axis_filter1_data <= s_reg1_m_axis_tdata(MAC_DATA_WIDTH*3-1 downto MAC_DATA_WIDTH*2);
-    s_reg1_m_axis_filter2_data <= s_reg1_m_axis_tdata(MAC_DATA_WIDTH*2-1 downto MAC_DATA_WIDTH*1);
-    s_reg1_m_axis_filter3_data <= s_reg1_m_axis_tdata(MAC_DATA_WIDTH*1-1 downto MAC_DATA_WIDTH*0);
+    s_reg1_m_axis_input_data <= s_reg1_m_axis_tdata(MAC_DATA_WIDTH*(NUM_MACS+1)-1 downto MAC_DATA_WIDTH*NUM_MACS);
   
-    s_reg1_m_axis_tready <= M_AXIS_MAC0_TREADY and M_AXIS_MAC1_TREADY and M_AXIS_MAC2_TREADY and M_AXIS_MAC3_TREADY;
-
-    -- Only transfer when all macs are ready at the same time
-    M_AXIS_MAC0_TVALID <= s_reg1_m_axis_tvalid and s_reg1_m_axis_tready;
-    M_AXIS_MAC1_TVALID <= s_reg1_m_axis_tvalid and s_reg1_m_axis_tready;
-    M_AXIS_MAC2_TVALID <= s_reg1_m_axis_tvalid and s_reg1_m_axis_tready;
-    M_AXIS_MAC3_TVALID <= s_reg1_m_axis_tvalid and s_reg1_m_axis_tready;
-
-    M_AXIS_MAC0_TDATA <= s_reg1_m_axis_input_data & s_reg1_m_axis_filter0_data;
-    M_AXIS_MAC1_TDATA <= s_reg1_m_axis_input_data & s_reg1_m_axis_filter1_data;
-    M_AXIS_MAC2_TDATA <= s_reg1_m_axis_input_data & s_reg1_m_axis_filter2_data;
-    M_AXIS_MAC3_TDATA <= s_reg1_m_axis_input_data & s_reg1_m_axis_filter3_data;
-
-    M_AXIS_MAC0_TLAST <= s_reg1_m_axis_tlast;
-    M_AXIS_MAC1_TLAST <= s_reg1_m_axis_tlast;
-    M_AXIS_MAC2_TLAST <= s_reg1_m_axis_tlast;
-    M_AXIS_MAC3_TLAST <= s_reg1_m_axis_tlast;
+    s_reg1_m_axis_tready <= '1' when M_AXIS_MAC_TREADY = (M_AXIS_MAC_TREADY'range => '1') else '0';
+
+    mac_stall <= s_reg1_m_axis_tvalid and not s_reg1_m_axis_tready;
+
+    g_mac_streams: for i in 0 to NUM_MACS-1 generate
+        -- Only transfer when all macs are ready at the same time
+        M_AXIS_MAC_TVALID(i) <= s_reg1_m_axis_tvalid and s_reg1_m_axis_tready;
+        M_AXIS_MAC_TDATA(MAC_DATA_WIDTH*2*(i+1)-1 downto MAC_DATA_WIDTH*2*i) <= s_reg1_m_axis_input_data & s_reg1_m_axis_tdata(MAC_DATA_WIDTH*(i+1)-1 downto MAC_DATA_WIDTH*i);
+        M_AXIS_MAC_TLAST(i) <= s_reg1_m_axis_tlast;
+    end generate;
 
 end architecture behavioral;
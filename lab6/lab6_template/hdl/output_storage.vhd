@@ -16,7 +16,9 @@ entity output_storage is
         ADDR_WIDTH : integer := 32;
         DIM_WIDTH : integer := 8;
         C_TID_WIDTH : integer := 1;
-        BRAM_ADDR_WIDTH : integer := 32
+        BRAM_ADDR_WIDTH : integer := 32;
+        NUM_MACS : integer := 4; -- Lanes arriving round robin, TID is the lane
+        PACK_OUTPUT_WRITES : boolean := false -- Gather each lane's results into whole words, one BRAM write per word instead of per element
     );
     port(
         S_AXIS_TREADY : out std_logic;
@@ -47,68 +49,254 @@ entity output_storage is
 end output_storage;
 
 architecture Behavioral of output_storage is
-    signal current_addr : unsigned(32-1 downto 0) := (others => '0');
-    signal write_data : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0) := (others => '0');
-    signal write_enable : std_logic := '0';
-    signal pooling_max : unsigned(DATA_WIDTH-1 downto 0) := (others => '0');
-    signal data_ready : std_logic := '0';
-    signal last_received : std_logic := '0';
-    signal s_temp_axis_tready: std_logic := '0';
+    constant BYTES_PER_WORD : integer := BRAM_DATA_WIDTH/8;
 
 begin
-    process(clk, rst)
+
+    g_unpacked: if not PACK_OUTPUT_WRITES generate
+        signal current_addr : unsigned(32-1 downto 0) := (others => '0');
+        signal write_data : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0) := (others => '0');
+        signal write_enable : std_logic := '0';
+        signal pooling_max : unsigned(DATA_WIDTH-1 downto 0) := (others => '0');
+        signal data_ready : std_logic := '0';
+        signal last_received : std_logic := '0';
+        signal s_temp_axis_tready: std_logic := '0';
     begin
-        if rst = '1' then
-            current_addr <= (others => '0');
-            write_data <= (others => '0');
-            write_enable <= '0';
-            pooling_max <= (others => '0');
-            data_ready <= '0';
-            last_received <= '0';
-        elsif rising_edge(clk) then
-            if conv_idle = '1' then
-                current_addr <= resize(unsigned(initial_offset), 32);
+        process(clk, rst)
+        begin
+            if rst = '1' then
+                current_addr <= (others => '0');
+                write_data <= (others => '0');
                 write_enable <= '0';
+                pooling_max <= (others => '0');
                 data_ready <= '0';
                 last_received <= '0';
-            elsif S_AXIS_TVALID = '1' and s_temp_axis_tready = '1' then
-                -- Handle max pooling if enabled
-                if max_pooling = '1' then
-                    if unsigned(S_AXIS_TDATA) > pooling_max then
-                        pooling_max <= unsigned(S_AXIS_TDATA);
+            elsif rising_edge(clk) then
+                if conv_idle = '1' then
+                    current_addr <= resize(unsigned(initial_offset), 32);
+                    write_enable <= '0';
+                    data_ready <= '0';
+                    last_received <= '0';
+                elsif S_AXIS_TVALID = '1' and s_temp_axis_tready = '1' then
+                    -- Handle max pooling if enabled
+                    if max_pooling = '1' then
+                        if unsigned(S_AXIS_TDATA) > pooling_max then
+                            pooling_max <= unsigned(S_AXIS_TDATA);
+                        end if;
+                        if S_AXIS_TLAST = '1' then
+                            write_data <= std_logic_vector(resize(pooling_max, BRAM_DATA_WIDTH));
+                            write_enable <= '1';
+                            pooling_max <= (others => '0');
+                        else
+                            write_enable <= '0';
+                        end if;
+                    else
+                        write_data <= std_logic_vector(resize(unsigned(S_AXIS_TDATA), BRAM_DATA_WIDTH));
+                        write_enable <= '1';
                     end if;
+
+                    -- Update address
                     if S_AXIS_TLAST = '1' then
-                        write_data <= std_logic_vector(resize(pooling_max, BRAM_DATA_WIDTH));
-                        write_enable <= '1';
-                        pooling_max <= (others => '0');
-                    else
-                        write_enable <= '0';
+                        last_received <= '1';
                     end if;
+                    current_addr <= current_addr + 1;
                 else
-                    write_data <= std_logic_vector(resize(unsigned(S_AXIS_TDATA), BRAM_DATA_WIDTH));
-                    write_enable <= '1';
+                    write_enable <= '0';
                 end if;
+            end if;
+        end process;
+
+        -- Assign output signals
+        S_AXIS_TREADY <= not last_received;
+        s_temp_axis_tready <= not last_received;
+        BRAM_addr <= std_logic_vector(current_addr); -- 32-bit wide address
+        BRAM_din <= write_data;
+        BRAM_en <= '1';
+        BRAM_we <= (others => write_enable);
+        BRAM_rst <= rst;
+        BRAM_clk <= clk;
+        conv_complete <= last_received;
+    end generate;
+
+    -- Packed writes: every lane's results are consecutive elements of its channel, so each lane fills a word register
+    -- and writes it once, with a byte enable per byte it holds, when its last element is filled or the lane's row ends.
+    -- Max pooling keeps the larger of each horizontal pair in a register. The first row of a pooling window writes
+    -- the packed pair maxima directly, the second reads each word back and writes the larger of each element. A word
+    -- holding part of a sub-byte element's byte is read back too, keeping the rest of that byte
+    g_packed: if PACK_OUTPUT_WRITES generate
+        constant VALUES_PER_WORD : integer := BRAM_DATA_WIDTH/DATA_WIDTH;
+        constant VALUES_PER_BYTE : integer := 8/DATA_WIDTH;
 
-                -- Update address
-                if S_AXIS_TLAST = '1' then
-                    last_received <= '1';
+        type state_t is (ACCEPT, READ_WAIT, MERGE, FINISHED);
+        type word_array_t is array(0 to NUM_MACS-1) of std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
+        type mask_array_t is array(0 to NUM_MACS-1) of std_logic_vector(VALUES_PER_WORD-1 downto 0);
+        type value_array_t is array(0 to NUM_MACS-1) of signed(DATA_WIDTH-1 downto 0);
+
+        signal state : state_t := ACCEPT;
+        signal word_data : word_array_t := (others => (others => '0'));
+        signal word_mask : mask_array_t := (others => (others => '0'));
+        signal pair_max : value_array_t := (others => (others => '0'));
+        signal oh : unsigned(DIM_WIDTH-1 downto 0) := (others => '0');
+        signal ow : unsigned(DIM_WIDTH-1 downto 0) := (others => '0');
+        signal pixel_addr : unsigned(ADDR_WIDTH-1 downto 0) := (others => '0'); -- Element of the current pixel within its channel
+        signal channel_addr : unsigned(ADDR_WIDTH-1 downto 0) := (others => '0'); -- initial_offset + lane*elements_per_channel
+        signal write_addr : unsigned(ADDR_WIDTH-1 downto 0) := (others => '0'); -- Byte address of the word
+        signal write_data : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0) := (others => '0');
+        signal write_mask : std_logic_vector(BYTES_PER_WORD-1 downto 0) := (others => '0');
+        signal merge_mask : std_logic_vector(VALUES_PER_WORD-1 downto 0) := (others => '0'); -- Elements held, the rest come from BRAM_dout
+        signal merge_enable : std_logic_vector(BYTES_PER_WORD-1 downto 0) := (others => '0');
+        signal merge_max : std_logic := '0'; -- Second row of a pooling window, keep the larger element
+        signal merge_last : std_logic := '0';
+        signal last_written : std_logic := '0';
+        signal complete : std_logic := '0';
+    begin
+        process(clk, rst)
+            variable lane : integer range 0 to NUM_MACS-1;
+            variable value : signed(DATA_WIDTH-1 downto 0);
+            variable addr : unsigned(ADDR_WIDTH-1 downto 0);
+            variable slot : integer range 0 to VALUES_PER_WORD-1;
+            variable data : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
+            variable mask : std_logic_vector(VALUES_PER_WORD-1 downto 0);
+            variable enable : std_logic_vector(BYTES_PER_WORD-1 downto 0);
+            variable partial : boolean;
+            variable row_end : boolean;
+            variable image_end : boolean;
+            variable merging : boolean;
+        begin
+            if rst = '1' then
+                state <= ACCEPT;
+                write_mask <= (others => '0');
+                merge_last <= '0';
+                last_written <= '0';
+                complete <= '0';
+            elsif rising_edge(clk) then
+                write_mask <= (others => '0');
+                complete <= last_written; -- One cycle after the last write, so it lands before conv_complete rises
+                if conv_idle = '1' then
+                    state <= ACCEPT;
+                    word_data <= (others => (others => '0'));
+                    word_mask <= (others => (others => '0'));
+                    oh <= (others => '0');
+                    ow <= (others => '0');
+                    pixel_addr <= (others => '0');
+                    channel_addr <= unsigned(initial_offset);
+                    merge_last <= '0';
+                    last_written <= '0';
+                    complete <= '0';
+                elsif state = READ_WAIT then
+                    state <= MERGE;
+                elsif state = MERGE then
+                    -- BRAM_dout holds the word as earlier writes left it
+                    for v in 0 to VALUES_PER_WORD-1 loop
+                        if merge_mask(v) = '0' or (merge_max = '1' and signed(BRAM_dout((v+1)*DATA_WIDTH-1 downto v*DATA_WIDTH)) > signed(write_data((v+1)*DATA_WIDTH-1 downto v*DATA_WIDTH))) then
+                            write_data((v+1)*DATA_WIDTH-1 downto v*DATA_WIDTH) <= BRAM_dout((v+1)*DATA_WIDTH-1 downto v*DATA_WIDTH);
+                        end if;
+                    end loop;
+                    write_mask <= merge_enable;
+                    if merge_last = '1' then
+                        last_written <= '1';
+                        state <= FINISHED;
+                    else
+                        state <= ACCEPT;
+                    end if;
+                elsif state = ACCEPT and S_AXIS_TVALID = '1' then
+                    lane := to_integer(unsigned(S_AXIS_TID));
+                    value := signed(S_AXIS_TDATA);
+                    addr := channel_addr + pixel_addr;
+                    slot := to_integer(addr mod VALUES_PER_WORD);
+                    row_end := ow = unsigned(output_w) - 1;
+                    image_end := row_end and oh = unsigned(output_h) - 1;
+                    merging := false;
+
+                    if max_pooling = '1' and ow(0) = '0' then
+                        pair_max(lane) <= value;
+                    else
+                        if max_pooling = '1' and pair_max(lane) > value then
+                            value := pair_max(lane);
+                        end if;
+                        data := word_data(lane);
+                        data((slot+1)*DATA_WIDTH-1 downto slot*DATA_WIDTH) := std_logic_vector(value);
+                        mask := word_mask(lane);
+                        mask(slot) := '1';
+                        if slot = VALUES_PER_WORD-1 or image_end or (max_pooling = '1' and row_end) then
+                            -- Enable every byte holding an element, a byte only partly held needs the rest read back
+                            partial := false;
+                            for b in 0 to BYTES_PER_WORD-1 loop
+                                if mask((b+1)*VALUES_PER_BYTE-1 downto b*VALUES_PER_BYTE) = (VALUES_PER_BYTE-1 downto 0 => '0') then
+                                    enable(b) := '0';
+                                else
+                                    enable(b) := '1';
+                                    if mask((b+1)*VALUES_PER_BYTE-1 downto b*VALUES_PER_BYTE) /= (VALUES_PER_BYTE-1 downto 0 => '1') then
+                                        partial := true;
+                                    end if;
+                                end if;
+                            end loop;
+                            word_data(lane) <= (others => '0');
+                            word_mask(lane) <= (others => '0');
+                            write_addr <= resize((addr / VALUES_PER_WORD) * BYTES_PER_WORD, ADDR_WIDTH);
+                            write_data <= data;
+                            if (max_pooling = '1' and oh(0) = '1') or partial then
+                                -- Read the word back first, write_mask stays low for the read
+                                merge_mask <= mask;
+                                merge_enable <= enable;
+                                if max_pooling = '1' and oh(0) = '1' then
+                                    merge_max <= '1';
+                                else
+                                    merge_max <= '0';
+                                end if;
+                                merging := true;
+                            else
+                                write_mask <= enable;
+                            end if;
+                        else
+                            word_data(lane) <= data;
+                            word_mask(lane) <= mask;
+                        end if;
+                    end if;
+
+                    -- The next lane's channel, or the first lane of the next pixel
+                    if lane = NUM_MACS-1 then
+                        channel_addr <= unsigned(initial_offset);
+                        if row_end then
+                            ow <= (others => '0');
+                            oh <= oh + 1;
+                            if max_pooling = '1' and oh(0) = '0' then
+                                -- Back to the start of the pooled row for the second row of the window
+                                pixel_addr <= pixel_addr + 1 - resize(shift_right(unsigned(output_w), 1), ADDR_WIDTH);
+                            else
+                                pixel_addr <= pixel_addr + 1;
+                            end if;
+                        else
+                            ow <= ow + 1;
+                            if max_pooling = '0' or ow(0) = '1' then
+                                pixel_addr <= pixel_addr + 1;
+                            end if;
+                        end if;
+                    else
+                        channel_addr <= channel_addr + unsigned(elements_per_channel);
+                    end if;
+
+                    if merging then
+                        state <= READ_WAIT;
+                        if image_end and lane = NUM_MACS-1 then
+                            merge_last <= '1';
+                        end if;
+                    elsif image_end and lane = NUM_MACS-1 then
+                        last_written <= '1';
+                        state <= FINISHED;
+                    end if;
                 end if;
-                current_addr <= current_addr + 1;
-            else
-                write_enable <= '0';
             end if;
-        end if;
-    end process;
-
-    -- Assign output signals
-    S_AXIS_TREADY <= not last_received;
-    s_temp_axis_tready <= not last_received;
-    BRAM_addr <= std_logic_vector(current_addr); -- 32-bit wide address
-    BRAM_din <= write_data;
-    BRAM_en <= '1';
-    BRAM_we <= (others => write_enable);
-    BRAM_rst <= rst;
-    BRAM_clk <= clk;
-    conv_complete <= last_received;
+        end process;
+
+        S_AXIS_TREADY <= '1' when state = ACCEPT and conv_idle = '0' else '0';
+        BRAM_addr <= std_logic_vector(resize(write_addr, 32));
+        BRAM_din <= write_data;
+        BRAM_en <= '1';
+        BRAM_we <= write_mask;
+        BRAM_rst <= rst;
+        BRAM_clk <= clk;
+        conv_complete <= complete;
+    end generate;
 
 end Behavioral;
@@ -0,0 +1,115 @@
+################################################################
+# BRAM Image Packer
+# Packs a model's quantized weights into the bytes the filter BRAMs hold, with the generator's flattening and
+# operand packing, so they load in bulk rather than one memcpy_dma() per filter:
+#  - <prefix>.bin, every pass's four filter BRAMs at their MLP_FILTER0..3 offsets, one CDMA burst per pass
+#  - <prefix>_biases.bin, every pass's MLP_MAC0..3_BIAS values as little-endian int32
+#  - <prefix>_filter<k>_bank<b>.mem and .coe, lane k's bank b holding pass b, to preload the first two passes
+#    at bitstream time. The .mem files are one hex word per line, which $readmemh reads as well
+################################################################
+
+import argparse
+import sys
+import numpy as np
+
+from gen_conv_accelerator_tb import OPERAND_WIDTHS, convolve, pack_operands, unpack_operands
+from network_golden import FILTERS_PER_PASS, fuse_layers, random_network, run_network
+from tile_planner import FILTER_BANK_BYTES
+
+# Block memory generator feeding lane k's bank b: the accelerator is on bram_switch's PORT1, so it reads
+# blk_mem_gen_1 with swap_filters low and blk_mem_gen_0 with it high
+BANK_CELL = 'bram/bram_filter_{k}/blk_mem_gen_{cell}'
+
+
+class PackedModel:
+    # Filter BRAM contents and biases of every pass of a model, passes in the order network_golden runs them
+    __slots__ = ('filter_images', 'biases', 'filter_bytes', 'passes', 'operand_width')
+
+    def __init__(self, filter_images, biases, filter_bytes, passes, operand_width):
+        self.filter_images = filter_images # (passes, FILTERS_PER_PASS*FILTER_BANK_BYTES) uint8, lane k at MLP_FILTER<k>
+        self.biases = biases # (passes, FILTERS_PER_PASS) int32
+        self.filter_bytes = filter_bytes # Packed bytes of one filter of each pass
+        self.passes = passes # (layer, pass within the layer) of every row
+        self.operand_width = operand_width
+
+    def lane_words(self, index, lane):
+        # One lane's BRAM of one pass as 32 bit words, byte 0 in the least significant bits of word 0
+        image = self.filter_images[index, lane*FILTER_BANK_BYTES:(lane + 1)*FILTER_BANK_BYTES]
+        return image.view('<u4')
+
+
+def pack_model(layers, bits=8):
+    # Every fused layer split into FILTERS_PER_PASS filter passes, padded with zero filters as network_golden pads them.
+    # Filter f of a pass is flattened (C, FH, FW) and packed bits wide, as convolve() lays it out in its lane's BRAM
+    filter_images = []
+    biases = []
+    filter_bytes = []
+    passes = []
+    for layer_index, layer in enumerate(fuse_layers(layers)):
+        K, C, FH, FW = np.shape(layer.filters)
+        assert C*FH*FW*bits <= 8*FILTER_BANK_BYTES, f"Layer {layer_index} filters do not fit the filter BRAMs"
+        for p in range(-(-K // FILTERS_PER_PASS)):
+            image = np.zeros(FILTERS_PER_PASS*FILTER_BANK_BYTES, dtype=np.uint8)
+            for lane, k in enumerate(range(FILTERS_PER_PASS*p, FILTERS_PER_PASS*(p + 1))):
+                if k < K:
+                    packed = pack_operands(np.int8(layer.filters[k]).flatten(), bits)
+                    image[lane*FILTER_BANK_BYTES:lane*FILTER_BANK_BYTES + len(packed)] = packed
+            filter_images.append(image)
+            biases.append([int(layer.biases[k]) if k < K else 0 for k in range(FILTERS_PER_PASS*p, FILTERS_PER_PASS*(p + 1))])
+            filter_bytes.append(-(-C*FH*FW*bits // 8))
+            passes.append((layer_index, p))
+    return PackedModel(np.array(filter_images), np.array(biases, dtype=np.int64).astype(np.int32), filter_bytes, passes, bits)
+
+def pass_transfer_bytes(model, index):
+    # One CDMA burst from the .bin loads all four lanes, only the last lane's unused tail can be left out
+    return (FILTERS_PER_PASS - 1)*FILTER_BANK_BYTES + model.filter_bytes[index]
+
+def write_mem(f, words):
+    f.write(''.join(f'{int(word):08X}\n' for word in words))
+
+def write_coe(f, words):
+    f.write('memory_initialization_radix=16;\nmemory_initialization_vector=\n')
+    f.write(',\n'.join(f'{int(word):08X}' for word in words) + ';\n')
+
+def check_model(model, passes):
+    # Every lane image must hold exactly the bytes convolve() expects in that lane's BRAM, and unpack to its filter.
+    # The filter images do not depend on the output write mode, the packed one is the one taking sub-byte operands
+    for index, network_pass in enumerate(passes):
+        trace = convolve(*network_pass.case, pack_output=True, operand_width=model.operand_width)
+        for lane, expected in enumerate(trace.filter_images):
+            packed = pack_operands(expected, model.operand_width)
+            image = model.filter_images[index, lane*FILTER_BANK_BYTES:(lane + 1)*FILTER_BANK_BYTES]
+            assert np.array_equal(image[:len(packed)], packed), f"Pass {index} lane {lane} disagrees with convolve()"
+            assert np.array_equal(unpack_operands(image, model.operand_width)[:len(expected)], expected), f"Pass {index} lane {lane} does not unpack"
+        assert np.array_equal(model.biases[index], np.int64(network_pass.case[2]).astype(np.int32)), f"Pass {index} biases disagree"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pack network_golden\'s seeded CNN into filter BRAM images')
+    parser.add_argument('prefix', help='Path prefix of every file written')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the weights')
+    parser.add_argument('--operand-width', type=int, default=8, choices=OPERAND_WIDTHS, help='Bits of every weight')
+    parser.add_argument('--check', action='store_true', help='Compare every pass\'s images with the BRAM contents convolve() expects')
+    args = parser.parse_args()
+
+    input, layers = random_network(np.random.default_rng(args.seed), args.operand_width)
+    model = pack_model(layers, args.operand_width)
+
+    model.filter_images.tofile(f'{args.prefix}.bin')
+    model.biases.astype('<i4').tofile(f'{args.prefix}_biases.bin')
+    for bank in range(min(2, len(model.passes))):
+        for lane in range(FILTERS_PER_PASS):
+            words = model.lane_words(bank, lane)
+            with open(f'{args.prefix}_filter{lane}_bank{bank}.mem', 'w') as f:
+                write_mem(f, words)
+            with open(f'{args.prefix}_filter{lane}_bank{bank}.coe', 'w') as f:
+                write_coe(f, words)
+        print(f'bank {bank} (swap_filters = {bank}) preloads pass {bank}, into {BANK_CELL.format(k="0..3", cell=1 - bank)}')
+
+    transfer_bytes = sum(pass_transfer_bytes(model, index) for index in range(len(model.passes)))
+    print(f'{len(model.passes)} passes, {model.filter_images.nbytes} image bytes, one CDMA burst per pass moving {transfer_bytes} bytes in all '
+          f'instead of {FILTERS_PER_PASS*len(model.passes)} memcpy_dma() calls')
+
+    if args.check:
+        passes, _ = run_network(input, layers, FILTERS_PER_PASS, args.operand_width)
+        check_model(model, passes)
+        print('every pass matches convolve()', file=sys.stderr)
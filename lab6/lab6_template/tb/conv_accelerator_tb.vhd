@@ -15,15 +15,18 @@ end conv_accelerator_tb;
 architecture Behavioral of conv_accelerator_tb is
 
     constant DIM_WIDTH : integer := 12; -- Max dim size is 2048 in a dense layer
-    constant INPUT_ADDR_WIDTH : integer := 7; -- Max input size is 60*60*32 < 2^17
-    constant FILTER_ADDR_WIDTH : integer := 7; -- Max filter size is 5*5*32 < 2^10
-    constant OUTPUT_ADDR_WIDTH : integer := 7; -- Max size of output channel is 60x60, 4 channels < 2^14
-    constant INPUT_BRAM_ADDR_WIDTH : integer := 5; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
-    constant FILTER_BRAM_ADDR_WIDTH : integer := 5; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
-    constant OUTPUT_BRAM_ADDR_WIDTH : integer := 5; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
+    constant INPUT_ADDR_WIDTH : integer := 6; -- Sized to the largest input in this testbench
+    constant FILTER_ADDR_WIDTH : integer := 4; -- Sized to the largest filter in this testbench
+    constant OUTPUT_ADDR_WIDTH : integer := 5; -- Sized to the largest output (plus initial offset) in this testbench
+    constant INPUT_BRAM_ADDR_WIDTH : integer := 4; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
+    constant FILTER_BRAM_ADDR_WIDTH : integer := 2; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
+    constant OUTPUT_BRAM_ADDR_WIDTH : integer := 3; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
     constant BRAM_DATA_WIDTH : integer := 32; -- Data width of raw BRAM interface
     constant MAC_DATA_WIDTH : integer := 8; -- Data width of each MAC input operand, defaults to int8. Supports sub-byte indexing, must be power of 2 and less than BRAM_DATA_WIDTH
     constant MAC_OUTPUT_DATA_WIDTH : integer := 32; -- Data width of the raw output of the MAC unit
+    constant NUM_MACS : integer := 4; -- Filters processed in parallel, each with its own MAC unit and filter BRAM
+    constant MAC_TID_WIDTH : integer := 2; -- Width of the MAC index carried with each result
+    constant PACK_OUTPUT_WRITES : boolean := false; -- One output BRAM write per word of a channel rather than one per element
 
     -- Configuration values from conv_config unit
     signal max_pooling : std_logic;
@@ -100,17 +103,24 @@ architecture Behavioral of conv_accelerator_tb is
     signal BRAM_OUTPUT_dout_delay1 : std_logic_vector(31 downto 0);
     signal BRAM_OUTPUT_en : std_logic;
     signal BRAM_OUTPUT_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
+    signal EXPECTED_BRAM_OUTPUT_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
     signal BRAM_OUTPUT_rst : std_logic;
     signal BRAM_OUTPUT_clk : std_logic;
     signal BRAM_OUTPUT_fail : std_logic := '0';
 
-    signal BRAM_INPUT_data : std_logic_vector(8*128-1 downto 0);
-    signal BRAM_FILTER0_data : std_logic_vector(8*128-1 downto 0);
-    signal BRAM_FILTER1_data : std_logic_vector(8*128-1 downto 0);
-    signal BRAM_FILTER2_data : std_logic_vector(8*128-1 downto 0);
-    signal BRAM_FILTER3_data : std_logic_vector(8*128-1 downto 0);
-    signal BRAM_OUTPUT_data : std_logic_vector(8*128-1 downto 0);
+    -- BRAM contents as arrays of 32 bit words, so every access indexes one word whatever the BRAM size
+    type bram_t is array(natural range <>) of std_logic_vector(31 downto 0);
+    signal BRAM_INPUT_data : bram_t(0 to 2**INPUT_BRAM_ADDR_WIDTH-1);
+    signal BRAM_FILTER0_data : bram_t(0 to 2**FILTER_BRAM_ADDR_WIDTH-1);
+    signal BRAM_FILTER1_data : bram_t(0 to 2**FILTER_BRAM_ADDR_WIDTH-1);
+    signal BRAM_FILTER2_data : bram_t(0 to 2**FILTER_BRAM_ADDR_WIDTH-1);
+    signal BRAM_FILTER3_data : bram_t(0 to 2**FILTER_BRAM_ADDR_WIDTH-1);
+    signal BRAM_OUTPUT_data : bram_t(0 to 2**OUTPUT_BRAM_ADDR_WIDTH-1);
     
+    signal perf_busy_cycles : std_logic_vector(31 downto 0);
+    signal perf_mac_stall_cycles : std_logic_vector(31 downto 0);
+    signal perf_bram_read_cycles : std_logic_vector(31 downto 0);
+    signal perf_output_writes : std_logic_vector(31 downto 0);
     signal conv_complete : std_logic; -- Reset the convolutional logic, must be set between each convolutional operation
     signal conv_idle : std_logic; -- Reset the convolutional logic, must be set between each convolutional operation
     signal rst : std_logic; -- Reset everything, including BRAM contents
@@ -189,8 +199,8 @@ architecture Behavioral of conv_accelerator_tb is
     signal EXPECTED_s_out_combiner_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
     signal TEST_s_out_combiner_m_axis_tlast : std_logic;
     signal EXPECTED_s_out_combiner_m_axis_tlast : std_logic;
-    signal TEST_s_out_combiner_m_axis_tid : std_logic_vector(1 downto 0);
-    signal EXPECTED_s_out_combiner_m_axis_tid : std_logic_vector(1 downto 0);
+    signal TEST_s_out_combiner_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
+    signal EXPECTED_s_out_combiner_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
     signal TEST_s_out_combiner_m_axis_tvalid : std_logic;
     signal TEST_s_out_combiner_m_axis_fail : std_logic := '0';
 
@@ -199,10 +209,38 @@ architecture Behavioral of conv_accelerator_tb is
     signal EXPECTED_s_dequantization_m_axis_tdata : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
     signal TEST_s_dequantization_m_axis_tlast : std_logic;
     signal EXPECTED_s_dequantization_m_axis_tlast : std_logic;
-    signal TEST_s_dequantization_m_axis_tid : std_logic_vector(1 downto 0);
-    signal EXPECTED_s_dequantization_m_axis_tid : std_logic_vector(1 downto 0);
+    signal TEST_s_dequantization_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
+    signal EXPECTED_s_dequantization_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
     signal TEST_s_dequantization_m_axis_tvalid : std_logic;
     signal TEST_s_dequantization_m_axis_fail : std_logic := '0';
+
+    -- Performance counters, cleared while conv_idle and frozen once conv_complete rises
+    signal PERF_cycles : natural := 0;
+    signal PERF_fail : std_logic := '0';
+    signal PERF_s_index_gen_m_axis_transfers : natural := 0;
+    signal PERF_s_index_gen_m_axis_stalls : natural := 0;
+    signal PERF_s_mac0_s_axis_transfers : natural := 0;
+    signal PERF_s_mac0_s_axis_stalls : natural := 0;
+    signal PERF_s_mac1_s_axis_transfers : natural := 0;
+    signal PERF_s_mac1_s_axis_stalls : natural := 0;
+    signal PERF_s_mac2_s_axis_transfers : natural := 0;
+    signal PERF_s_mac2_s_axis_stalls : natural := 0;
+    signal PERF_s_mac3_s_axis_transfers : natural := 0;
+    signal PERF_s_mac3_s_axis_stalls : natural := 0;
+    signal PERF_s_mac0_m_axis_transfers : natural := 0;
+    signal PERF_s_mac0_m_axis_stalls : natural := 0;
+    signal PERF_s_mac1_m_axis_transfers : natural := 0;
+    signal PERF_s_mac1_m_axis_stalls : natural := 0;
+    signal PERF_s_mac2_m_axis_transfers : natural := 0;
+    signal PERF_s_mac2_m_axis_stalls : natural := 0;
+    signal PERF_s_mac3_m_axis_transfers : natural := 0;
+    signal PERF_s_mac3_m_axis_stalls : natural := 0;
+    signal PERF_s_out_combiner_m_axis_transfers : natural := 0;
+    signal PERF_s_out_combiner_m_axis_stalls : natural := 0;
+    signal PERF_s_dequantization_m_axis_transfers : natural := 0;
+    signal PERF_s_dequantization_m_axis_stalls : natural := 0;
+    signal PERF_BRAM_OUTPUT_transfers : natural := 0;
+    signal PERF_BRAM_OUTPUT_stalls : natural := 0;
 begin
         
     BRAM_INPUT_dout <= BRAM_INPUT_dout_delay1; -- BRAM read latency = 2
@@ -212,7 +250,7 @@ begin
             if (BRAM_INPUT_rst = '1') then
                 BRAM_INPUT_dout_delay1 <= (others => '0');
             elsif (BRAM_INPUT_en = '1') then
-                BRAM_INPUT_dout_delay1 <= BRAM_INPUT_data((32*(to_integer(unsigned(BRAM_INPUT_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_INPUT_addr(32-1 downto 2))))));
+                BRAM_INPUT_dout_delay1 <= BRAM_INPUT_data(to_integer(unsigned(BRAM_INPUT_addr(INPUT_BRAM_ADDR_WIDTH+2-1 downto 2))));
             end if;
         end if;
     end process;
@@ -224,7 +262,7 @@ begin
             if (BRAM_FILTER0_rst = '1') then
                 BRAM_FILTER0_dout_delay1 <= (others => '0');
             elsif (BRAM_FILTER0_en = '1') then
-                BRAM_FILTER0_dout_delay1 <= BRAM_FILTER0_data((32*(to_integer(unsigned(BRAM_FILTER0_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER0_addr(32-1 downto 2))))));
+                BRAM_FILTER0_dout_delay1 <= BRAM_FILTER0_data(to_integer(unsigned(BRAM_FILTER0_addr(FILTER_BRAM_ADDR_WIDTH+2-1 downto 2))));
             end if;
         end if;
     end process;
@@ -236,7 +274,7 @@ begin
             if (BRAM_FILTER1_rst = '1') then
                 BRAM_FILTER1_dout_delay1 <= (others => '0');
             elsif (BRAM_FILTER1_en = '1') then
-                BRAM_FILTER1_dout_delay1 <= BRAM_FILTER1_data((32*(to_integer(unsigned(BRAM_FILTER1_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER1_addr(32-1 downto 2))))));
+                BRAM_FILTER1_dout_delay1 <= BRAM_FILTER1_data(to_integer(unsigned(BRAM_FILTER1_addr(FILTER_BRAM_ADDR_WIDTH+2-1 downto 2))));
             end if;
         end if;
     end process;
@@ -248,7 +286,7 @@ begin
             if (BRAM_FILTER2_rst = '1') then
                 BRAM_FILTER2_dout_delay1 <= (others => '0');
             elsif (BRAM_FILTER2_en = '1') then
-                BRAM_FILTER2_dout_delay1 <= BRAM_FILTER2_data((32*(to_integer(unsigned(BRAM_FILTER2_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER2_addr(32-1 downto 2))))));
+                BRAM_FILTER2_dout_delay1 <= BRAM_FILTER2_data(to_integer(unsigned(BRAM_FILTER2_addr(FILTER_BRAM_ADDR_WIDTH+2-1 downto 2))));
             end if;
         end if;
     end process;
@@ -260,24 +298,28 @@ begin
             if (BRAM_FILTER3_rst = '1') then
                 BRAM_FILTER3_dout_delay1 <= (others => '0');
             elsif (BRAM_FILTER3_en = '1') then
-                BRAM_FILTER3_dout_delay1 <= BRAM_FILTER3_data((32*(to_integer(unsigned(BRAM_FILTER3_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER3_addr(32-1 downto 2))))));
+                BRAM_FILTER3_dout_delay1 <= BRAM_FILTER3_data(to_integer(unsigned(BRAM_FILTER3_addr(FILTER_BRAM_ADDR_WIDTH+2-1 downto 2))));
             end if;
         end if;
     end process;
-       
+
     BRAM_OUTPUT_dout <= BRAM_OUTPUT_dout_delay1; -- BRAM read latency = 2
     process(BRAM_OUTPUT_clk)
     begin
         if rising_edge(BRAM_OUTPUT_clk) then
             if (BRAM_OUTPUT_rst = '1' or conv_idle = '1') then
                 BRAM_OUTPUT_dout_delay1 <= (others => '0');
-                BRAM_OUTPUT_data <= (others => '0');
+                BRAM_OUTPUT_data <= (others => (others => '0'));
             elsif (BRAM_OUTPUT_en = '1') then
-                if (BRAM_OUTPUT_we = "1111") then
-                    BRAM_OUTPUT_data((32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2)))))) <= BRAM_OUTPUT_din;
-                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_din;
+                if (BRAM_OUTPUT_we = "0000") then
+                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_data(to_integer(unsigned(BRAM_OUTPUT_addr(OUTPUT_BRAM_ADDR_WIDTH+2-1 downto 2))));
                 else
-                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_data((32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2))))));
+                    for b in 0 to 3 loop -- Byte write enables
+                        if (BRAM_OUTPUT_we(b) = '1') then
+                            BRAM_OUTPUT_data(to_integer(unsigned(BRAM_OUTPUT_addr(OUTPUT_BRAM_ADDR_WIDTH+2-1 downto 2))))(8*(b+1)-1 downto 8*b) <= BRAM_OUTPUT_din(8*(b+1)-1 downto 8*b);
+                        end if;
+                    end loop;
+                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_din;
                 end if;
             end if;
         end if;
@@ -288,6 +330,8 @@ begin
 
     dut: entity work.conv_accelerator
         generic map(
+            NUM_MACS => NUM_MACS,
+            MAC_TID_WIDTH => MAC_TID_WIDTH,
             DIM_WIDTH => DIM_WIDTH,
             INPUT_ADDR_WIDTH => INPUT_ADDR_WIDTH,
             FILTER_ADDR_WIDTH => FILTER_ADDR_WIDTH,
@@ -297,7 +341,8 @@ begin
             OUTPUT_BRAM_ADDR_WIDTH => OUTPUT_BRAM_ADDR_WIDTH,
             BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
             MAC_DATA_WIDTH => MAC_DATA_WIDTH,
-            MAC_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
+            MAC_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH,
+            PACK_OUTPUT_WRITES => PACK_OUTPUT_WRITES
         )
         port map(
             -- Configuration values from conv_config unit
@@ -314,10 +359,10 @@ begin
             input_end_diff_ow => input_end_diff_ow(INPUT_ADDR_WIDTH-1 downto 0),
             output_elements_per_channel => output_elements_per_channel(OUTPUT_ADDR_WIDTH-1 downto 0),
             output_initial_offset => output_initial_offset(OUTPUT_ADDR_WIDTH-1 downto 0),
-            mac0_bias => mac0_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
-            mac1_bias => mac1_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
-            mac2_bias => mac2_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
-            mac3_bias => mac3_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*1-1 downto MAC_OUTPUT_DATA_WIDTH*0) => mac0_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*2-1 downto MAC_OUTPUT_DATA_WIDTH*1) => mac1_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*3-1 downto MAC_OUTPUT_DATA_WIDTH*2) => mac2_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            mac_bias(MAC_OUTPUT_DATA_WIDTH*4-1 downto MAC_OUTPUT_DATA_WIDTH*3) => mac3_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
             q_scale => q_scale(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
             q_zero => q_zero(MAC_DATA_WIDTH-1 downto 0),
 
@@ -330,37 +375,34 @@ begin
             BRAM_INPUT_rst => BRAM_INPUT_rst,
             BRAM_INPUT_clk => BRAM_INPUT_clk,
 
-            BRAM_FILTER0_addr => BRAM_FILTER0_addr,
-            BRAM_FILTER0_din => BRAM_FILTER0_din,
-            BRAM_FILTER0_dout => BRAM_FILTER0_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER0_en => BRAM_FILTER0_en,
-            BRAM_FILTER0_we => BRAM_FILTER0_we,
-            BRAM_FILTER0_rst => BRAM_FILTER0_rst,
-            BRAM_FILTER0_clk => BRAM_FILTER0_clk,
-
-            BRAM_FILTER1_addr => BRAM_FILTER1_addr,
-            BRAM_FILTER1_din => BRAM_FILTER1_din,
-            BRAM_FILTER1_dout => BRAM_FILTER1_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER1_en => BRAM_FILTER1_en,
-            BRAM_FILTER1_we => BRAM_FILTER1_we,
-            BRAM_FILTER1_rst => BRAM_FILTER1_rst,
-            BRAM_FILTER1_clk => BRAM_FILTER1_clk,
-
-            BRAM_FILTER2_addr => BRAM_FILTER2_addr,
-            BRAM_FILTER2_din => BRAM_FILTER2_din,
-            BRAM_FILTER2_dout => BRAM_FILTER2_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER2_en => BRAM_FILTER2_en,
-            BRAM_FILTER2_we => BRAM_FILTER2_we,
-            BRAM_FILTER2_rst => BRAM_FILTER2_rst,
-            BRAM_FILTER2_clk => BRAM_FILTER2_clk,
-
-            BRAM_FILTER3_addr => BRAM_FILTER3_addr,
-            BRAM_FILTER3_din => BRAM_FILTER3_din,
-            BRAM_FILTER3_dout => BRAM_FILTER3_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER3_en => BRAM_FILTER3_en,
-            BRAM_FILTER3_we => BRAM_FILTER3_we,
-            BRAM_FILTER3_rst => BRAM_FILTER3_rst,
-            BRAM_FILTER3_clk => BRAM_FILTER3_clk,
+            BRAM_FILTER_addr(32*1-1 downto 32*0) => BRAM_FILTER0_addr,
+            BRAM_FILTER_addr(32*2-1 downto 32*1) => BRAM_FILTER1_addr,
+            BRAM_FILTER_addr(32*3-1 downto 32*2) => BRAM_FILTER2_addr,
+            BRAM_FILTER_addr(32*4-1 downto 32*3) => BRAM_FILTER3_addr,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*1-1 downto BRAM_DATA_WIDTH*0) => BRAM_FILTER0_din,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*2-1 downto BRAM_DATA_WIDTH*1) => BRAM_FILTER1_din,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*3-1 downto BRAM_DATA_WIDTH*2) => BRAM_FILTER2_din,
+            BRAM_FILTER_din(BRAM_DATA_WIDTH*4-1 downto BRAM_DATA_WIDTH*3) => BRAM_FILTER3_din,
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*1-1 downto BRAM_DATA_WIDTH*0) => BRAM_FILTER0_dout(BRAM_DATA_WIDTH-1 downto 0),
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*2-1 downto BRAM_DATA_WIDTH*1) => BRAM_FILTER1_dout(BRAM_DATA_WIDTH-1 downto 0),
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*3-1 downto BRAM_DATA_WIDTH*2) => BRAM_FILTER2_dout(BRAM_DATA_WIDTH-1 downto 0),
+            BRAM_FILTER_dout(BRAM_DATA_WIDTH*4-1 downto BRAM_DATA_WIDTH*3) => BRAM_FILTER3_dout(BRAM_DATA_WIDTH-1 downto 0),
+            BRAM_FILTER_en(0) => BRAM_FILTER0_en,
+            BRAM_FILTER_en(1) => BRAM_FILTER1_en,
+            BRAM_FILTER_en(2) => BRAM_FILTER2_en,
+            BRAM_FILTER_en(3) => BRAM_FILTER3_en,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*1-1 downto (BRAM_DATA_WIDTH/8)*0) => BRAM_FILTER0_we,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*2-1 downto (BRAM_DATA_WIDTH/8)*1) => BRAM_FILTER1_we,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*3-1 downto (BRAM_DATA_WIDTH/8)*2) => BRAM_FILTER2_we,
+            BRAM_FILTER_we((BRAM_DATA_WIDTH/8)*4-1 downto (BRAM_DATA_WIDTH/8)*3) => BRAM_FILTER3_we,
+            BRAM_FILTER_rst(0) => BRAM_FILTER0_rst,
+            BRAM_FILTER_rst(1) => BRAM_FILTER1_rst,
+            BRAM_FILTER_rst(2) => BRAM_FILTER2_rst,
+            BRAM_FILTER_rst(3) => BRAM_FILTER3_rst,
+            BRAM_FILTER_clk(0) => BRAM_FILTER0_clk,
+            BRAM_FILTER_clk(1) => BRAM_FILTER1_clk,
+            BRAM_FILTER_clk(2) => BRAM_FILTER2_clk,
+            BRAM_FILTER_clk(3) => BRAM_FILTER3_clk,
 
             BRAM_OUTPUT_addr => BRAM_OUTPUT_addr,
             BRAM_OUTPUT_din => BRAM_OUTPUT_din,
@@ -376,39 +418,39 @@ begin
             TEST_s_index_gen_m_axis_tlast => TEST_s_index_gen_m_axis_tlast,
             TEST_s_index_gen_m_axis_tvalid => TEST_s_index_gen_m_axis_tvalid,
 
-            TEST_s_mac0_s_axis_tready => TEST_s_mac0_s_axis_tready,
-            TEST_s_mac0_s_axis_tdata => TEST_s_mac0_s_axis_tdata,
-            TEST_s_mac0_s_axis_tlast => TEST_s_mac0_s_axis_tlast,
-            TEST_s_mac0_s_axis_tvalid => TEST_s_mac0_s_axis_tvalid,
-            TEST_s_mac1_s_axis_tready => TEST_s_mac1_s_axis_tready,
-            TEST_s_mac1_s_axis_tdata => TEST_s_mac1_s_axis_tdata,
-            TEST_s_mac1_s_axis_tlast => TEST_s_mac1_s_axis_tlast,
-            TEST_s_mac1_s_axis_tvalid => TEST_s_mac1_s_axis_tvalid,
-            TEST_s_mac2_s_axis_tready => TEST_s_mac2_s_axis_tready,
-            TEST_s_mac2_s_axis_tdata => TEST_s_mac2_s_axis_tdata,
-            TEST_s_mac2_s_axis_tlast => TEST_s_mac2_s_axis_tlast,
-            TEST_s_mac2_s_axis_tvalid => TEST_s_mac2_s_axis_tvalid,
-            TEST_s_mac3_s_axis_tready => TEST_s_mac3_s_axis_tready,
-            TEST_s_mac3_s_axis_tdata => TEST_s_mac3_s_axis_tdata,
-            TEST_s_mac3_s_axis_tlast => TEST_s_mac3_s_axis_tlast,
-            TEST_s_mac3_s_axis_tvalid => TEST_s_mac3_s_axis_tvalid,
-
-            TEST_s_mac0_m_axis_tready => TEST_s_mac0_m_axis_tready,
-            TEST_s_mac0_m_axis_tdata => TEST_s_mac0_m_axis_tdata,
-            TEST_s_mac0_m_axis_tlast => TEST_s_mac0_m_axis_tlast,
-            TEST_s_mac0_m_axis_tvalid => TEST_s_mac0_m_axis_tvalid,
-            TEST_s_mac1_m_axis_tready => TEST_s_mac1_m_axis_tready,
-            TEST_s_mac1_m_axis_tdata => TEST_s_mac1_m_axis_tdata,
-            TEST_s_mac1_m_axis_tlast => TEST_s_mac1_m_axis_tlast,
-            TEST_s_mac1_m_axis_tvalid => TEST_s_mac1_m_axis_tvalid,
-            TEST_s_mac2_m_axis_tready => TEST_s_mac2_m_axis_tready,
-            TEST_s_mac2_m_axis_tdata => TEST_s_mac2_m_axis_tdata,
-            TEST_s_mac2_m_axis_tlast => TEST_s_mac2_m_axis_tlast,
-            TEST_s_mac2_m_axis_tvalid => TEST_s_mac2_m_axis_tvalid,
-            TEST_s_mac3_m_axis_tready => TEST_s_mac3_m_axis_tready,
-            TEST_s_mac3_m_axis_tdata => TEST_s_mac3_m_axis_tdata,
-            TEST_s_mac3_m_axis_tlast => TEST_s_mac3_m_axis_tlast,
-            TEST_s_mac3_m_axis_tvalid => TEST_s_mac3_m_axis_tvalid,
+            TEST_s_mac_s_axis_tready(0) => TEST_s_mac0_s_axis_tready,
+            TEST_s_mac_s_axis_tready(1) => TEST_s_mac1_s_axis_tready,
+            TEST_s_mac_s_axis_tready(2) => TEST_s_mac2_s_axis_tready,
+            TEST_s_mac_s_axis_tready(3) => TEST_s_mac3_s_axis_tready,
+            TEST_s_mac_s_axis_tdata(MAC_DATA_WIDTH*2*1-1 downto MAC_DATA_WIDTH*2*0) => TEST_s_mac0_s_axis_tdata,
+            TEST_s_mac_s_axis_tdata(MAC_DATA_WIDTH*2*2-1 downto MAC_DATA_WIDTH*2*1) => TEST_s_mac1_s_axis_tdata,
+            TEST_s_mac_s_axis_tdata(MAC_DATA_WIDTH*2*3-1 downto MAC_DATA_WIDTH*2*2) => TEST_s_mac2_s_axis_tdata,
+            TEST_s_mac_s_axis_tdata(MAC_DATA_WIDTH*2*4-1 downto MAC_DATA_WIDTH*2*3) => TEST_s_mac3_s_axis_tdata,
+            TEST_s_mac_s_axis_tlast(0) => TEST_s_mac0_s_axis_tlast,
+            TEST_s_mac_s_axis_tlast(1) => TEST_s_mac1_s_axis_tlast,
+            TEST_s_mac_s_axis_tlast(2) => TEST_s_mac2_s_axis_tlast,
+            TEST_s_mac_s_axis_tlast(3) => TEST_s_mac3_s_axis_tlast,
+            TEST_s_mac_s_axis_tvalid(0) => TEST_s_mac0_s_axis_tvalid,
+            TEST_s_mac_s_axis_tvalid(1) => TEST_s_mac1_s_axis_tvalid,
+            TEST_s_mac_s_axis_tvalid(2) => TEST_s_mac2_s_axis_tvalid,
+            TEST_s_mac_s_axis_tvalid(3) => TEST_s_mac3_s_axis_tvalid,
+
+            TEST_s_mac_m_axis_tready(0) => TEST_s_mac0_m_axis_tready,
+            TEST_s_mac_m_axis_tready(1) => TEST_s_mac1_m_axis_tready,
+            TEST_s_mac_m_axis_tready(2) => TEST_s_mac2_m_axis_tready,
+            TEST_s_mac_m_axis_tready(3) => TEST_s_mac3_m_axis_tready,
+            TEST_s_mac_m_axis_tdata(MAC_OUTPUT_DATA_WIDTH*1-1 downto MAC_OUTPUT_DATA_WIDTH*0) => TEST_s_mac0_m_axis_tdata,
+            TEST_s_mac_m_axis_tdata(MAC_OUTPUT_DATA_WIDTH*2-1 downto MAC_OUTPUT_DATA_WIDTH*1) => TEST_s_mac1_m_axis_tdata,
+            TEST_s_mac_m_axis_tdata(MAC_OUTPUT_DATA_WIDTH*3-1 downto MAC_OUTPUT_DATA_WIDTH*2) => TEST_s_mac2_m_axis_tdata,
+            TEST_s_mac_m_axis_tdata(MAC_OUTPUT_DATA_WIDTH*4-1 downto MAC_OUTPUT_DATA_WIDTH*3) => TEST_s_mac3_m_axis_tdata,
+            TEST_s_mac_m_axis_tlast(0) => TEST_s_mac0_m_axis_tlast,
+            TEST_s_mac_m_axis_tlast(1) => TEST_s_mac1_m_axis_tlast,
+            TEST_s_mac_m_axis_tlast(2) => TEST_s_mac2_m_axis_tlast,
+            TEST_s_mac_m_axis_tlast(3) => TEST_s_mac3_m_axis_tlast,
+            TEST_s_mac_m_axis_tvalid(0) => TEST_s_mac0_m_axis_tvalid,
+            TEST_s_mac_m_axis_tvalid(1) => TEST_s_mac1_m_axis_tvalid,
+            TEST_s_mac_m_axis_tvalid(2) => TEST_s_mac2_m_axis_tvalid,
+            TEST_s_mac_m_axis_tvalid(3) => TEST_s_mac3_m_axis_tvalid,
 
             TEST_s_out_combiner_m_axis_tready => TEST_s_out_combiner_m_axis_tready,
             TEST_s_out_combiner_m_axis_tdata => TEST_s_out_combiner_m_axis_tdata,
@@ -422,24 +464,58 @@ begin
             TEST_s_dequantization_m_axis_tid => TEST_s_dequantization_m_axis_tid,
             TEST_s_dequantization_m_axis_tvalid => TEST_s_dequantization_m_axis_tvalid,
 
+            perf_busy_cycles => perf_busy_cycles,
+            perf_mac_stall_cycles => perf_mac_stall_cycles,
+            perf_bram_read_cycles => perf_bram_read_cycles,
+            perf_output_writes => perf_output_writes,
+
             conv_complete => conv_complete,
             conv_idle => conv_idle,
             rst => rst,
             clk => clk
         );
 
-    process begin
+    process
+        -- Performance reports after each convolution, a negative budget only reports
+        procedure check_cycles(name : string; predicted, budget : integer) is
+        begin
+            report name & ": " & integer'image(PERF_cycles) & " cycles, model " & integer'image(predicted) severity note;
+            if budget >= 0 and PERF_cycles > budget then
+                PERF_fail <= 'X';
+                assert FALSE report name & " EXCEEDED ITS BUDGET OF " & integer'image(budget) & " CYCLES!!!";
+            end if;
+        end procedure;
+        procedure check_stream(name : string; transfers, stalls, expected, max_stalls : integer) is
+        begin
+            report "    " & name & ": " & integer'image(transfers) & " transfers, " & integer'image(stalls) & " stall cycles, "
+                & integer'image(100 * transfers / maximum(PERF_cycles, 1)) & "% utilisation" severity note;
+            if max_stalls >= 0 and not (transfers = expected and stalls <= max_stalls) then
+                PERF_fail <= 'X';
+                assert FALSE report name & " EXPECTED " & integer'image(expected) & " TRANSFERS AND AT MOST " & integer'image(max_stalls) & " STALL CYCLES!!!";
+            end if;
+        end procedure;
+        procedure check_counter(name : string; counter : std_logic_vector; expected, max_value : integer) is
+            variable value : integer;
+        begin
+            value := to_integer(unsigned(counter));
+            report "    " & name & ": " & integer'image(value) severity note;
+            if (expected >= 0 and value /= expected) or (max_value >= 0 and value > max_value) then
+                PERF_fail <= 'X';
+                assert FALSE report name & " EXPECTED " & integer'image(expected) & " AND AT MOST " & integer'image(max_value) & "!!!";
+            end if;
+        end procedure;
+    begin
         rst <= '1';
         wait for 2ps;
         conv_idle <= '1';
         rst <= '0';
         conv_idle <= '1';
         wait for 10ps;
-        BRAM_INPUT_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A50102031500131211100F0E0D0C0B0A09080706050480FF7F";
-        BRAM_FILTER0_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A50C0B0A09080706050480FF7F";
-        BRAM_FILTER1_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5E8E9EAEBECEDEEEFF0F1F2F3";
-        BRAM_FILTER2_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A524232221201F1E1D1C1B1A19";
-        BRAM_FILTER3_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5302F2E2D2C2B2A2928272625";
+        BRAM_INPUT_data <= (x"0480FF7F", x"08070605", x"0C0B0A09", x"100F0E0D", x"00131211", x"01020315", others => x"A5A5A5A5");
+        BRAM_FILTER0_data <= (x"0480FF7F", x"08070605", x"0C0B0A09", others => x"A5A5A5A5");
+        BRAM_FILTER1_data <= (x"F0F1F2F3", x"ECEDEEEF", x"E8E9EAEB", others => x"A5A5A5A5");
+        BRAM_FILTER2_data <= (x"1C1B1A19", x"201F1E1D", x"24232221", others => x"A5A5A5A5");
+        BRAM_FILTER3_data <= (x"28272625", x"2C2B2A29", x"302F2E2D", others => x"A5A5A5A5");
         max_pooling <= '0';
         relu <= '0';
         filter_w <= x"00000003";
@@ -463,13 +539,30 @@ begin
         conv_idle <= '0';
         wait until rising_edge(conv_complete);
         wait for 10ps;
+        check_cycles("CONV 0", 109, 218);
+        check_stream("s_index_gen_m_axis", PERF_s_index_gen_m_axis_transfers, PERF_s_index_gen_m_axis_stalls, 48, 170);
+        check_stream("s_mac0_s_axis", PERF_s_mac0_s_axis_transfers, PERF_s_mac0_s_axis_stalls, 48, 170);
+        check_stream("s_mac1_s_axis", PERF_s_mac1_s_axis_transfers, PERF_s_mac1_s_axis_stalls, 48, 170);
+        check_stream("s_mac2_s_axis", PERF_s_mac2_s_axis_transfers, PERF_s_mac2_s_axis_stalls, 48, 170);
+        check_stream("s_mac3_s_axis", PERF_s_mac3_s_axis_transfers, PERF_s_mac3_s_axis_stalls, 48, 170);
+        check_stream("s_mac0_m_axis", PERF_s_mac0_m_axis_transfers, PERF_s_mac0_m_axis_stalls, 4, 214);
+        check_stream("s_mac1_m_axis", PERF_s_mac1_m_axis_transfers, PERF_s_mac1_m_axis_stalls, 4, 214);
+        check_stream("s_mac2_m_axis", PERF_s_mac2_m_axis_transfers, PERF_s_mac2_m_axis_stalls, 4, 214);
+        check_stream("s_mac3_m_axis", PERF_s_mac3_m_axis_transfers, PERF_s_mac3_m_axis_stalls, 4, 214);
+        check_stream("s_out_combiner_m_axis", PERF_s_out_combiner_m_axis_transfers, PERF_s_out_combiner_m_axis_stalls, 16, 202);
+        check_stream("s_dequantization_m_axis", PERF_s_dequantization_m_axis_transfers, PERF_s_dequantization_m_axis_stalls, 16, 202);
+        check_stream("BRAM_OUTPUT", PERF_BRAM_OUTPUT_transfers, PERF_BRAM_OUTPUT_stalls, 16, 202);
+        check_counter("perf_busy_cycles", perf_busy_cycles, PERF_cycles, -1);
+        check_counter("perf_mac_stall_cycles (model 48)", perf_mac_stall_cycles, -1, 170);
+        check_counter("perf_bram_read_cycles", perf_bram_read_cycles, 48, -1);
+        check_counter("perf_output_writes", perf_output_writes, 16, -1);
         conv_idle <= '1';
         wait for 10ps;
-        BRAM_INPUT_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A50102031500131211100F0E0D0C0B0A09080706050480FF7F";
-        BRAM_FILTER0_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A50C0B0A09080706050480FF7F";
-        BRAM_FILTER1_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5E8E9EAEBECEDEEEFF0F1F2F3";
-        BRAM_FILTER2_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A524232221201F1E1D1C1B1A19";
-        BRAM_FILTER3_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5302F2E2D2C2B2A2928272625";
+        BRAM_INPUT_data <= (x"0480FF7F", x"08070605", x"0C0B0A09", x"100F0E0D", x"00131211", x"01020315", others => x"A5A5A5A5");
+        BRAM_FILTER0_data <= (x"0480FF7F", x"08070605", x"0C0B0A09", others => x"A5A5A5A5");
+        BRAM_FILTER1_data <= (x"F0F1F2F3", x"ECEDEEEF", x"E8E9EAEB", others => x"A5A5A5A5");
+        BRAM_FILTER2_data <= (x"1C1B1A19", x"201F1E1D", x"24232221", others => x"A5A5A5A5");
+        BRAM_FILTER3_data <= (x"28272625", x"2C2B2A29", x"302F2E2D", others => x"A5A5A5A5");
         max_pooling <= '0';
         relu <= '0';
         filter_w <= x"00000003";
@@ -493,13 +586,30 @@ begin
         conv_idle <= '0';
         wait until rising_edge(conv_complete);
         wait for 10ps;
+        check_cycles("CONV 1", 109, 218);
+        check_stream("s_index_gen_m_axis", PERF_s_index_gen_m_axis_transfers, PERF_s_index_gen_m_axis_stalls, 48, 170);
+        check_stream("s_mac0_s_axis", PERF_s_mac0_s_axis_transfers, PERF_s_mac0_s_axis_stalls, 48, 170);
+        check_stream("s_mac1_s_axis", PERF_s_mac1_s_axis_transfers, PERF_s_mac1_s_axis_stalls, 48, 170);
+        check_stream("s_mac2_s_axis", PERF_s_mac2_s_axis_transfers, PERF_s_mac2_s_axis_stalls, 48, 170);
+        check_stream("s_mac3_s_axis", PERF_s_mac3_s_axis_transfers, PERF_s_mac3_s_axis_stalls, 48, 170);
+        check_stream("s_mac0_m_axis", PERF_s_mac0_m_axis_transfers, PERF_s_mac0_m_axis_stalls, 4, 214);
+        check_stream("s_mac1_m_axis", PERF_s_mac1_m_axis_transfers, PERF_s_mac1_m_axis_stalls, 4, 214);
+        check_stream("s_mac2_m_axis", PERF_s_mac2_m_axis_transfers, PERF_s_mac2_m_axis_stalls, 4, 214);
+        check_stream("s_mac3_m_axis", PERF_s_mac3_m_axis_transfers, PERF_s_mac3_m_axis_stalls, 4, 214);
+        check_stream("s_out_combiner_m_axis", PERF_s_out_combiner_m_axis_transfers, PERF_s_out_combiner_m_axis_stalls, 16, 202);
+        check_stream("s_dequantization_m_axis", PERF_s_dequantization_m_axis_transfers, PERF_s_dequantization_m_axis_stalls, 16, 202);
+        check_stream("BRAM_OUTPUT", PERF_BRAM_OUTPUT_transfers, PERF_BRAM_OUTPUT_stalls, 16, 202);
+        check_counter("perf_busy_cycles", perf_busy_cycles, PERF_cycles, -1);
+        check_counter("perf_mac_stall_cycles (model 48)", perf_mac_stall_cycles, -1, 170);
+        check_counter("perf_bram_read_cycles", perf_bram_read_cycles, 48, -1);
+        check_counter("perf_output_writes", perf_output_writes, 16, -1);
         conv_idle <= '1';
         wait for 10ps;
-        BRAM_INPUT_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5131211100F0E0D0C0B0A09080706050403020100FFFEFDFCFBFAF9F8F7F6F5F4F3F2F1F0EFEEEDEC";
-        BRAM_FILTER0_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A50C0B0A09080706050480FF7F";
-        BRAM_FILTER1_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5E8E9EAEBECEDEEEFF0F1F2F3";
-        BRAM_FILTER2_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A524232221201F1E1D1C1B1A19";
-        BRAM_FILTER3_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5302F2E2D2C2B2A2928272625";
+        BRAM_INPUT_data <= (x"EFEEEDEC", x"F3F2F1F0", x"F7F6F5F4", x"FBFAF9F8", x"FFFEFDFC", x"03020100", x"07060504", x"0B0A0908", x"0F0E0D0C", x"13121110", others => x"A5A5A5A5");
+        BRAM_FILTER0_data <= (x"0480FF7F", x"08070605", x"0C0B0A09", others => x"A5A5A5A5");
+        BRAM_FILTER1_data <= (x"F0F1F2F3", x"ECEDEEEF", x"E8E9EAEB", others => x"A5A5A5A5");
+        BRAM_FILTER2_data <= (x"1C1B1A19", x"201F1E1D", x"24232221", others => x"A5A5A5A5");
+        BRAM_FILTER3_data <= (x"28272625", x"2C2B2A29", x"302F2E2D", others => x"A5A5A5A5");
         max_pooling <= '1';
         relu <= '1';
         filter_w <= x"00000003";
@@ -523,13 +633,30 @@ begin
         conv_idle <= '0';
         wait until rising_edge(conv_complete);
         wait for 10ps;
+        check_cycles("CONV 2", 205, 410);
+        check_stream("s_index_gen_m_axis", PERF_s_index_gen_m_axis_transfers, PERF_s_index_gen_m_axis_stalls, 96, 314);
+        check_stream("s_mac0_s_axis", PERF_s_mac0_s_axis_transfers, PERF_s_mac0_s_axis_stalls, 96, 314);
+        check_stream("s_mac1_s_axis", PERF_s_mac1_s_axis_transfers, PERF_s_mac1_s_axis_stalls, 96, 314);
+        check_stream("s_mac2_s_axis", PERF_s_mac2_s_axis_transfers, PERF_s_mac2_s_axis_stalls, 96, 314);
+        check_stream("s_mac3_s_axis", PERF_s_mac3_s_axis_transfers, PERF_s_mac3_s_axis_stalls, 96, 314);
+        check_stream("s_mac0_m_axis", PERF_s_mac0_m_axis_transfers, PERF_s_mac0_m_axis_stalls, 8, 402);
+        check_stream("s_mac1_m_axis", PERF_s_mac1_m_axis_transfers, PERF_s_mac1_m_axis_stalls, 8, 402);
+        check_stream("s_mac2_m_axis", PERF_s_mac2_m_axis_transfers, PERF_s_mac2_m_axis_stalls, 8, 402);
+        check_stream("s_mac3_m_axis", PERF_s_mac3_m_axis_transfers, PERF_s_mac3_m_axis_stalls, 8, 402);
+        check_stream("s_out_combiner_m_axis", PERF_s_out_combiner_m_axis_transfers, PERF_s_out_combiner_m_axis_stalls, 32, 378);
+        check_stream("s_dequantization_m_axis", PERF_s_dequantization_m_axis_transfers, PERF_s_dequantization_m_axis_stalls, 32, 378);
+        check_stream("BRAM_OUTPUT", PERF_BRAM_OUTPUT_transfers, PERF_BRAM_OUTPUT_stalls, 32, 378);
+        check_counter("perf_busy_cycles", perf_busy_cycles, PERF_cycles, -1);
+        check_counter("perf_mac_stall_cycles (model 96)", perf_mac_stall_cycles, -1, 314);
+        check_counter("perf_bram_read_cycles", perf_bram_read_cycles, 96, -1);
+        check_counter("perf_output_writes", perf_output_writes, 32, -1);
         conv_idle <= '1';
         wait for 10ps;
-        BRAM_INPUT_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A51D1C1B1A191817161514131211100F0E0D0C0B0A09080706050403020100FFFEFDFCFBFAF9F8F7F6F5F4F3F2F1F0EFEEEDECEBEAE9E8E7E6E5E4E3E2";
-        BRAM_FILTER0_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A50C0B0A09080706050480FF7F";
-        BRAM_FILTER1_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5E8E9EAEBECEDEEEFF0F1F2F3";
-        BRAM_FILTER2_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A524232221201F1E1D1C1B1A19";
-        BRAM_FILTER3_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5302F2E2D2C2B2A2928272625";
+        BRAM_INPUT_data <= (x"E5E4E3E2", x"E9E8E7E6", x"EDECEBEA", x"F1F0EFEE", x"F5F4F3F2", x"F9F8F7F6", x"FDFCFBFA", x"0100FFFE", x"05040302", x"09080706", x"0D0C0B0A", x"11100F0E", x"15141312", x"19181716", x"1D1C1B1A", others => x"A5A5A5A5");
+        BRAM_FILTER0_data <= (x"0480FF7F", x"08070605", x"0C0B0A09", others => x"A5A5A5A5");
+        BRAM_FILTER1_data <= (x"F0F1F2F3", x"ECEDEEEF", x"E8E9EAEB", others => x"A5A5A5A5");
+        BRAM_FILTER2_data <= (x"1C1B1A19", x"201F1E1D", x"24232221", others => x"A5A5A5A5");
+        BRAM_FILTER3_data <= (x"28272625", x"2C2B2A29", x"302F2E2D", others => x"A5A5A5A5");
         max_pooling <= '1';
         relu <= '1';
         filter_w <= x"00000003";
@@ -553,13 +680,30 @@ begin
         conv_idle <= '0';
         wait until rising_edge(conv_complete);
         wait for 10ps;
+        check_cycles("CONV 3", 397, 794);
+        check_stream("s_index_gen_m_axis", PERF_s_index_gen_m_axis_transfers, PERF_s_index_gen_m_axis_stalls, 192, 602);
+        check_stream("s_mac0_s_axis", PERF_s_mac0_s_axis_transfers, PERF_s_mac0_s_axis_stalls, 192, 602);
+        check_stream("s_mac1_s_axis", PERF_s_mac1_s_axis_transfers, PERF_s_mac1_s_axis_stalls, 192, 602);
+        check_stream("s_mac2_s_axis", PERF_s_mac2_s_axis_transfers, PERF_s_mac2_s_axis_stalls, 192, 602);
+        check_stream("s_mac3_s_axis", PERF_s_mac3_s_axis_transfers, PERF_s_mac3_s_axis_stalls, 192, 602);
+        check_stream("s_mac0_m_axis", PERF_s_mac0_m_axis_transfers, PERF_s_mac0_m_axis_stalls, 16, 778);
+        check_stream("s_mac1_m_axis", PERF_s_mac1_m_axis_transfers, PERF_s_mac1_m_axis_stalls, 16, 778);
+        check_stream("s_mac2_m_axis", PERF_s_mac2_m_axis_transfers, PERF_s_mac2_m_axis_stalls, 16, 778);
+        check_stream("s_mac3_m_axis", PERF_s_mac3_m_axis_transfers, PERF_s_mac3_m_axis_stalls, 16, 778);
+        check_stream("s_out_combiner_m_axis", PERF_s_out_combiner_m_axis_transfers, PERF_s_out_combiner_m_axis_stalls, 64, 730);
+        check_stream("s_dequantization_m_axis", PERF_s_dequantization_m_axis_transfers, PERF_s_dequantization_m_axis_stalls, 64, 730);
+        check_stream("BRAM_OUTPUT", PERF_BRAM_OUTPUT_transfers, PERF_BRAM_OUTPUT_stalls, 64, 730);
+        check_counter("perf_busy_cycles", perf_busy_cycles, PERF_cycles, -1);
+        check_counter("perf_mac_stall_cycles (model 192)", perf_mac_stall_cycles, -1, 602);
+        check_counter("perf_bram_read_cycles", perf_bram_read_cycles, 192, -1);
+        check_counter("perf_output_writes", perf_output_writes, 64, -1);
         conv_idle <= '1';
         wait for 10ps;
-        BRAM_INPUT_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A500000040";
-        BRAM_FILTER0_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A500000001";
-        BRAM_FILTER1_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A500000001";
-        BRAM_FILTER2_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A500000001";
-        BRAM_FILTER3_data <= x"A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A5A500000001";
+        BRAM_INPUT_data <= (x"00000040", others => x"A5A5A5A5");
+        BRAM_FILTER0_data <= (x"00000001", others => x"A5A5A5A5");
+        BRAM_FILTER1_data <= (x"00000001", others => x"A5A5A5A5");
+        BRAM_FILTER2_data <= (x"00000001", others => x"A5A5A5A5");
+        BRAM_FILTER3_data <= (x"00000001", others => x"A5A5A5A5");
         max_pooling <= '0';
         relu <= '1';
         filter_w <= x"00000002";
@@ -583,19 +727,95 @@ begin
         conv_idle <= '0';
         wait until rising_edge(conv_complete);
         wait for 10ps;
+        check_cycles("CONV 4", 29, 58);
+        check_stream("s_index_gen_m_axis", PERF_s_index_gen_m_axis_transfers, PERF_s_index_gen_m_axis_stalls, 4, 54);
+        check_stream("s_mac0_s_axis", PERF_s_mac0_s_axis_transfers, PERF_s_mac0_s_axis_stalls, 4, 54);
+        check_stream("s_mac1_s_axis", PERF_s_mac1_s_axis_transfers, PERF_s_mac1_s_axis_stalls, 4, 54);
+        check_stream("s_mac2_s_axis", PERF_s_mac2_s_axis_transfers, PERF_s_mac2_s_axis_stalls, 4, 54);
+        check_stream("s_mac3_s_axis", PERF_s_mac3_s_axis_transfers, PERF_s_mac3_s_axis_stalls, 4, 54);
+        check_stream("s_mac0_m_axis", PERF_s_mac0_m_axis_transfers, PERF_s_mac0_m_axis_stalls, 1, 57);
+        check_stream("s_mac1_m_axis", PERF_s_mac1_m_axis_transfers, PERF_s_mac1_m_axis_stalls, 1, 57);
+        check_stream("s_mac2_m_axis", PERF_s_mac2_m_axis_transfers, PERF_s_mac2_m_axis_stalls, 1, 57);
+        check_stream("s_mac3_m_axis", PERF_s_mac3_m_axis_transfers, PERF_s_mac3_m_axis_stalls, 1, 57);
+        check_stream("s_out_combiner_m_axis", PERF_s_out_combiner_m_axis_transfers, PERF_s_out_combiner_m_axis_stalls, 4, 54);
+        check_stream("s_dequantization_m_axis", PERF_s_dequantization_m_axis_transfers, PERF_s_dequantization_m_axis_stalls, 4, 54);
+        check_stream("BRAM_OUTPUT", PERF_BRAM_OUTPUT_transfers, PERF_BRAM_OUTPUT_stalls, 4, 54);
+        check_counter("perf_busy_cycles", perf_busy_cycles, PERF_cycles, -1);
+        check_counter("perf_mac_stall_cycles (model 12)", perf_mac_stall_cycles, -1, 54);
+        check_counter("perf_bram_read_cycles", perf_bram_read_cycles, 4, -1);
+        check_counter("perf_output_writes", perf_output_writes, 4, -1);
         
 
         assert FALSE Report "Simulation Complete!" severity FAILURE;
     end process;
 
+    process(clk)
+    begin
+        if rising_edge(clk) then
+            if conv_idle = '1' then
+                PERF_cycles <= 0;
+                PERF_s_index_gen_m_axis_transfers <= 0;
+                PERF_s_index_gen_m_axis_stalls <= 0;
+                PERF_s_mac0_s_axis_transfers <= 0;
+                PERF_s_mac0_s_axis_stalls <= 0;
+                PERF_s_mac1_s_axis_transfers <= 0;
+                PERF_s_mac1_s_axis_stalls <= 0;
+                PERF_s_mac2_s_axis_transfers <= 0;
+                PERF_s_mac2_s_axis_stalls <= 0;
+                PERF_s_mac3_s_axis_transfers <= 0;
+                PERF_s_mac3_s_axis_stalls <= 0;
+                PERF_s_mac0_m_axis_transfers <= 0;
+                PERF_s_mac0_m_axis_stalls <= 0;
+                PERF_s_mac1_m_axis_transfers <= 0;
+                PERF_s_mac1_m_axis_stalls <= 0;
+                PERF_s_mac2_m_axis_transfers <= 0;
+                PERF_s_mac2_m_axis_stalls <= 0;
+                PERF_s_mac3_m_axis_transfers <= 0;
+                PERF_s_mac3_m_axis_stalls <= 0;
+                PERF_s_out_combiner_m_axis_transfers <= 0;
+                PERF_s_out_combiner_m_axis_stalls <= 0;
+                PERF_s_dequantization_m_axis_transfers <= 0;
+                PERF_s_dequantization_m_axis_stalls <= 0;
+                PERF_BRAM_OUTPUT_transfers <= 0;
+                PERF_BRAM_OUTPUT_stalls <= 0;
+            elsif conv_complete /= '1' then
+                PERF_cycles <= PERF_cycles + 1;
+                if TEST_s_index_gen_m_axis_tvalid = '1' and TEST_s_index_gen_m_axis_tready = '1' then PERF_s_index_gen_m_axis_transfers <= PERF_s_index_gen_m_axis_transfers + 1; end if;
+                if TEST_s_index_gen_m_axis_tvalid = '1' and TEST_s_index_gen_m_axis_tready = '0' then PERF_s_index_gen_m_axis_stalls <= PERF_s_index_gen_m_axis_stalls + 1; end if;
+                if TEST_s_mac0_s_axis_tvalid = '1' and TEST_s_mac0_s_axis_tready = '1' then PERF_s_mac0_s_axis_transfers <= PERF_s_mac0_s_axis_transfers + 1; end if;
+                if TEST_s_mac0_s_axis_tvalid = '1' and TEST_s_mac0_s_axis_tready = '0' then PERF_s_mac0_s_axis_stalls <= PERF_s_mac0_s_axis_stalls + 1; end if;
+                if TEST_s_mac1_s_axis_tvalid = '1' and TEST_s_mac1_s_axis_tready = '1' then PERF_s_mac1_s_axis_transfers <= PERF_s_mac1_s_axis_transfers + 1; end if;
+                if TEST_s_mac1_s_axis_tvalid = '1' and TEST_s_mac1_s_axis_tready = '0' then PERF_s_mac1_s_axis_stalls <= PERF_s_mac1_s_axis_stalls + 1; end if;
+                if TEST_s_mac2_s_axis_tvalid = '1' and TEST_s_mac2_s_axis_tready = '1' then PERF_s_mac2_s_axis_transfers <= PERF_s_mac2_s_axis_transfers + 1; end if;
+                if TEST_s_mac2_s_axis_tvalid = '1' and TEST_s_mac2_s_axis_tready = '0' then PERF_s_mac2_s_axis_stalls <= PERF_s_mac2_s_axis_stalls + 1; end if;
+                if TEST_s_mac3_s_axis_tvalid = '1' and TEST_s_mac3_s_axis_tready = '1' then PERF_s_mac3_s_axis_transfers <= PERF_s_mac3_s_axis_transfers + 1; end if;
+                if TEST_s_mac3_s_axis_tvalid = '1' and TEST_s_mac3_s_axis_tready = '0' then PERF_s_mac3_s_axis_stalls <= PERF_s_mac3_s_axis_stalls + 1; end if;
+                if TEST_s_mac0_m_axis_tvalid = '1' and TEST_s_mac0_m_axis_tready = '1' then PERF_s_mac0_m_axis_transfers <= PERF_s_mac0_m_axis_transfers + 1; end if;
+                if TEST_s_mac0_m_axis_tvalid = '1' and TEST_s_mac0_m_axis_tready = '0' then PERF_s_mac0_m_axis_stalls <= PERF_s_mac0_m_axis_stalls + 1; end if;
+                if TEST_s_mac1_m_axis_tvalid = '1' and TEST_s_mac1_m_axis_tready = '1' then PERF_s_mac1_m_axis_transfers <= PERF_s_mac1_m_axis_transfers + 1; end if;
+                if TEST_s_mac1_m_axis_tvalid = '1' and TEST_s_mac1_m_axis_tready = '0' then PERF_s_mac1_m_axis_stalls <= PERF_s_mac1_m_axis_stalls + 1; end if;
+                if TEST_s_mac2_m_axis_tvalid = '1' and TEST_s_mac2_m_axis_tready = '1' then PERF_s_mac2_m_axis_transfers <= PERF_s_mac2_m_axis_transfers + 1; end if;
+                if TEST_s_mac2_m_axis_tvalid = '1' and TEST_s_mac2_m_axis_tready = '0' then PERF_s_mac2_m_axis_stalls <= PERF_s_mac2_m_axis_stalls + 1; end if;
+                if TEST_s_mac3_m_axis_tvalid = '1' and TEST_s_mac3_m_axis_tready = '1' then PERF_s_mac3_m_axis_transfers <= PERF_s_mac3_m_axis_transfers + 1; end if;
+                if TEST_s_mac3_m_axis_tvalid = '1' and TEST_s_mac3_m_axis_tready = '0' then PERF_s_mac3_m_axis_stalls <= PERF_s_mac3_m_axis_stalls + 1; end if;
+                if TEST_s_out_combiner_m_axis_tvalid = '1' and TEST_s_out_combiner_m_axis_tready = '1' then PERF_s_out_combiner_m_axis_transfers <= PERF_s_out_combiner_m_axis_transfers + 1; end if;
+                if TEST_s_out_combiner_m_axis_tvalid = '1' and TEST_s_out_combiner_m_axis_tready = '0' then PERF_s_out_combiner_m_axis_stalls <= PERF_s_out_combiner_m_axis_stalls + 1; end if;
+                if TEST_s_dequantization_m_axis_tvalid = '1' and TEST_s_dequantization_m_axis_tready = '1' then PERF_s_dequantization_m_axis_transfers <= PERF_s_dequantization_m_axis_transfers + 1; end if;
+                if TEST_s_dequantization_m_axis_tvalid = '1' and TEST_s_dequantization_m_axis_tready = '0' then PERF_s_dequantization_m_axis_stalls <= PERF_s_dequantization_m_axis_stalls + 1; end if;
+                if BRAM_OUTPUT_en = '1' and BRAM_OUTPUT_we /= "0000" then PERF_BRAM_OUTPUT_transfers <= PERF_BRAM_OUTPUT_transfers + 1; end if;
+            end if;
+        end if;
+    end process;
+    
+
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_index_gen_m_axis_tdata_input_addr : std_logic_vector(2716-1 downto 0) := "0000011000001000000010000000011101101110100111001011010101101000110011001110100111000011011001011100101100010101011101001110010111000011010001100110110010001110000110110011010001011000101010010100011100101110000110111011001101100100110001001101100110100011001001010100101000010011011100001101110110110011001001100010110000001101000110010011000001010000100110010010011010101101000110011010111101011100101101001011100101100010101001000100100000001111011010001100110110010010111001011010101100001011000101010010100001000000011110001110011001101100100110001010110101011000101011001010100101000010011000111100011100001101011001001100010110000010110001010110101010001010000100110010010000111000011010001100010111101011100101101010100101010000100111001000100100000001111000101100010100001001010111001011010101100010100001001110100110001000000011110001110000101000010010001000010110101011000101011010011101001100100101000111100011100001101000100100010000000111010110001010110101010010011001001010100100000111000011010001100000100000001110000110010100101010000100111010001101000100100001000101100010100001001000010100001000000011010100001001110100110010001001000010100000000101000010010001000000010000000110000010010011101001100100101010000101000000011111000100100010000000111000001100000100000001010011001001010100100010000000111110011110000100000001110000110000001000000010000000010011101001100100101010001101000100100001001001100100100010001000111100011100001101010011001001010100100010001001000010100000001001000100010010000000111000011010001100010001101000100100001001111100111100011101000111100011100001101000101100010100001001010001001000010100000001111000111010011100000111000011010001100000101000010010001000001111100111100011101001101100110100011001000101100010100001001000011100001100000101001111000111010011100001101000110010011000000101000010010001000000011000001010000100001101100110100011001001011100101100010101000011100001100000101000001100000100000001001101000110010011000001011000101010010100000011000001010000100000001000000010000000001011100101100010101001001100100100010001000101100010100001001000011100001100000101001011000101010010100001001000100010010000000101000010010001000000011000001010000100001001100100100010001000111100011100001101000011100001100000101000001100000100000001001001000100010010000000111000011010001100000011000001010000100000001000000010000000001011100101100010101001001100100100010001000101100010100001001000011100001100000101001011000101010010100001001000100010010000000101000010010001000000011000001010000100001001100100100010001000111100011100001101000011100001100000101000001100000100000001001001000100010010000000111000011010001100000011000001010000100000001000000010000000";
-        constant EXPECTED_VALUES_s_index_gen_m_axis_tdata_filter_addr : std_logic_vector(2716-1 downto 0) := "0000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000000101100010100001001000100000001110000110000010100001000000011000001000000010000000";
-        constant EXPECTED_VALUES_s_index_gen_m_axis_tlast : std_logic_vector(388-1 downto 0) := "1000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000";
+        constant EXPECTED_VALUES_s_index_gen_m_axis_tdata_input_addr : std_logic_vector(2328-1 downto 0) := x"0C2040EFAE75D3375C6D7595EB9E34CF271B696554E78DF3CB16DA655513E37DB2C706996144D2D74CEFBAD5D655140FD33CAEB6C5955103CECF2C6DB2B5544CF38DCB1C2CAEA51348E34CBEEB69A274503CB289BADB289E640F38A248B6CAE79A53CE349207B2BAA696438D3081C6A689E38A12CA245103A279A28602892040C29E696181F2481C30819A59207DE2071820409E69638A14D244F38D9A592286049140E34C8E285F79D3CE34B2898A181E75C38D30A2487DE75B6992CA24718579D71A6582892061446DA6575951C61430816996165541851020405D65534912CA2471855955124502892061444D244F38D1C614308149140E34C1851020405D65534912CA2471855955124502892061444D244F38D1C614308149140E34C185102040";
+        constant EXPECTED_VALUES_s_index_gen_m_axis_tdata_filter_addr : std_logic_vector(1552-1 downto 0) := x"3210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210BA9876543210";
+        constant EXPECTED_VALUES_s_index_gen_m_axis_tlast : std_logic_vector(388-1 downto 0) := x"8800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800";
     begin
-        EXPECTED_s_index_gen_m_axis_tdata_input_addr <= EXPECTED_VALUES_s_index_gen_m_axis_tdata_input_addr((i+1)*7-1 downto i*7);
-        EXPECTED_s_index_gen_m_axis_tdata_filter_addr <= EXPECTED_VALUES_s_index_gen_m_axis_tdata_filter_addr((i+1)*7-1 downto i*7);
+        EXPECTED_s_index_gen_m_axis_tdata_input_addr <= EXPECTED_VALUES_s_index_gen_m_axis_tdata_input_addr((i+1)*6-1 downto i*6);
+        EXPECTED_s_index_gen_m_axis_tdata_filter_addr <= EXPECTED_VALUES_s_index_gen_m_axis_tdata_filter_addr((i+1)*4-1 downto i*4);
         EXPECTED_s_index_gen_m_axis_tlast <= EXPECTED_VALUES_s_index_gen_m_axis_tlast(i*1);
         wait until rising_edge(clk) and TEST_s_index_gen_m_axis_tready = '1' and TEST_s_index_gen_m_axis_tvalid = '1';
         assert TEST_s_index_gen_m_axis_tdata_input_addr = EXPECTED_s_index_gen_m_axis_tdata_input_addr report "ASSERTION FAILURE";
@@ -615,8 +835,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac0_s_axis_tdata : std_logic_vector(6208-1 downto 0) := "0000000000000000000000000000000000000000000000000100000000000001000111010000110000011100000010110001101100001010000101110000100100010110000010000001010100000111111111110000011011111110000001011111110100000100111110011000000011111000111111111111011101111111000111000000110000011011000010110001101000001010000101100000100100010101000010000001010000000111111111100000011011111101000001011111110000000100111110001000000011110111111111111111011001111111000110110000110000011010000010110001100100001010000101010000100100010100000010000001001100000111111111010000011011111100000001011111101100000100111101111000000011110110111111111111010101111111000110100000110000011001000010110001100000001010000101000000100100010011000010000001001000000111111111000000011011111011000001011111101000000100111101101000000011110101111111111111010001111111000101110000110000010110000010110001010100001010000100010000100100010000000010000000111100000111111110010000011011111000000001011111011100000100111100111000000011110010111111111111000101111111000101100000110000010101000010110001010000001010000100000000100100001111000010000000111000000111111110000000011011110111000001011111011000000100111100101000000011110001111111111111000001111111000101010000110000010100000010110001001100001010000011110000100100001110000010000000110100000111111101110000011011110110000001011111010100000100111100011000000011110000111111111110111101111111000101000000110000010011000010110001001000001010000011100000100100001101000010000000110000000111111101100000011011110101000001011111010000000100111100001000000011101111111111111110111001111111000100010000110000010000000010110000111100001010000010110000100100001010000010000000100100000111111100110000011011110010000001011111000100000100111011011000000011101100111111111110101101111111000100000000110000001111000010110000111000001010000010100000100100001001000010000000100000000111111100100000011011110001000001011111000000000100111011001000000011101011111111111110101001111111000011110000110000001110000010110000110100001010000010010000100100001000000010000000011100000111111100010000011011110000000001011110111100000100111010111000000011101010111111111110100101111111000011100000110000001101000010110000110000001010000010000000100100000111000010000000011000000111111100000000011011101111000001011110111000000100111010101000000011101001111111111110100001111111000010110000110000001010000010110000100100001010000001010000100100000100000010000000001100000111111011010000011011101100000001011110101100000100111001111000000011100110111111111110010101111111000010100000110000001001000010110000100000001010000001000000100100000011000010000000001000000111111011000000011011101011000001011110101000000100111001101000000011100101111111111110010001111111000010010000110000001000000010110000011100001010000000110000100100000010000010000000000100000111111010110000011011101010000001011110100100000100111001011000000011100100111111111110001101111111000010000000110000000111000010110000011000001010000000100000100100000001000010000000000000000111111010100000011011101001000001011110100000000100111001001000000011100011111111111110001001111111000100110000110000010010000010110001000100001010000011110000100100001110000010000000110100000111111111110000011011111110000001011111110100000100111110111000000011111010111111111111100101111111000100100000110000010001000010110001000000001010000011100000100100001101000010000000110000000111111111100000011011111101000001011111110000000100111110101000000011111001111111111111100001111111000011110000110000001110000010110000110100001010000010110000100100001010000010000000100100000111111110110000011011111010000001011111100100000100111101111000000011110110111111111111010101111111000011100000110000001101000010110000110000001010000010100000100100001001000010000000100000000111111110100000011011111001000001011111100000000100111101101000000011110101111111111111010001111111000010110000110000001010000010110000100100001010000001110000100100000110000010000000010100000111111101110000011011110110000001011111010100000100111100111000000011110010111111111111000101111111000010100000110000001001000010110000100000001010000001100000100100000101000010000000010000000111111101100000011011110101000001011111010000000100111100101000000011110001111111111111000001111111000001110000110000000110000010110000010100001010000000110000100100000010000010000000000100000111111100110000011011110010000001011111000100000100111011111000000011101110111111111110110101111111000001100000110000000101000010110000010000001010000000100000100100000001000010000000000000000111111100100000011011110001000001011111000000000100111011101000000011101101111111111110110001111111000000010000110000000010000010110000001100001010000000000000100100010011000010000001001000000111000011000000011000001011000001010000101000000100000010001000000000000111111111110000011001111111000000100000110000000011000010110001010100001010000100110000100100010010000010000001000100000111000010110000011000001010000001010000100100000100000001111000000000000110111111110000010101111111000000000000110000010011000010110001001000001010000100000000100100001111000010000000111000000111000010000000011000000111000001010000011000000100000001001000000010000000111111111111111101111111000100110000110000010010000010110001000100001010000011110000100100001110000010000000110100000111000001110000011000000110000001010000010100000100100000001000000011111111111111110111111101111111000000010000110000000010000010110000001100001010000000000000100100010011000010000001001000000111000011000000011000001011000001010000101000000100000010001000000000000111111111110000011001111111000000100000110000000011000010110001010100001010000100110000100100010010000010000001000100000111000010110000011000001010000001010000100100000100000001111000000000000110111111110000010101111111000000000000110000010011000010110001001000001010000100000000100100001111000010000000111000000111000010000000011000000111000001010000011000000100000001001000000010000000111111111111111101111111000100110000110000010010000010110001000100001010000011110000100100001110000010000000110100000111000001110000011000000110000001010000010100000100100000001000000011111111111111110111111101111111";
-        constant EXPECTED_VALUES_s_mac0_s_axis_tlast : std_logic_vector(388-1 downto 0) := "1000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000";
+        constant EXPECTED_VALUES_s_mac0_s_axis_tdata : std_logic_vector(6208-1 downto 0) := x"00000000000040011D0C1C0B1B0A170916081507FF06FE05FD04F980F8FFF77F1C0C1B0B1A0A160915081407FE06FD05FC04F880F7FFF67F1B0C1A0B190A150914081307FD06FC05FB04F780F6FFF57F1A0C190B180A140913081207FC06FB05FA04F680F5FFF47F170C160B150A110910080F07F906F805F704F380F2FFF17F160C150B140A10090F080E07F806F705F604F280F1FFF07F150C140B130A0F090E080D07F706F605F504F180F0FFEF7F140C130B120A0E090D080C07F606F505F404F080EFFFEE7F110C100B0F0A0B090A080907F306F205F104ED80ECFFEB7F100C0F0B0E0A0A0909080807F206F105F004EC80EBFFEA7F0F0C0E0B0D0A090908080707F106F005EF04EB80EAFFE97F0E0C0D0B0C0A080907080607F006EF05EE04EA80E9FFE87F0B0C0A0B090A050904080307ED06EC05EB04E780E6FFE57F0A0C090B080A040903080207EC06EB05EA04E680E5FFE47F090C080B070A030902080107EB06EA05E904E580E4FFE37F080C070B060A020901080007EA06E905E804E480E3FFE27F130C120B110A0F090E080D07FF06FE05FD04FB80FAFFF97F120C110B100A0E090D080C07FE06FD05FC04FA80F9FFF87F0F0C0E0B0D0A0B090A080907FB06FA05F904F780F6FFF57F0E0C0D0B0C0A0A0909080807FA06F905F804F680F5FFF47F0B0C0A0B090A070906080507F706F605F504F380F2FFF17F0A0C090B080A060905080407F606F505F404F280F1FFF07F070C060B050A030902080107F306F205F104EF80EEFFED7F060C050B040A020901080007F206F105F004EE80EDFFEC7F010C020B030A0009130812070C060B050A04088007FF067F020C030B150A1309120811070B060A050904078006FF057F000C130B120A10090F080E07080607050604048080FFFF7F130C120B110A0F090E080D070706060505048080FFFF7F7F010C020B030A0009130812070C060B050A04088007FF067F020C030B150A1309120811070B060A050904078006FF057F000C130B120A10090F080E07080607050604048080FFFF7F130C120B110A0F090E080D070706060505048080FFFF7F7F";
+        constant EXPECTED_VALUES_s_mac0_s_axis_tlast : std_logic_vector(388-1 downto 0) := x"8800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800";
     begin
         EXPECTED_s_mac0_s_axis_tdata <= EXPECTED_VALUES_s_mac0_s_axis_tdata((i+1)*16-1 downto i*16);
         EXPECTED_s_mac0_s_axis_tlast <= EXPECTED_VALUES_s_mac0_s_axis_tlast(i*1);
@@ -636,8 +856,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac1_s_axis_tdata : std_logic_vector(6208-1 downto 0) := "0000000000000000000000000000000000000000000000000100000000000001000111011110100000011100111010010001101111101010000101111110101100010110111011000001010111101101111111111110111011111110111011111111110111110000111110011111000111111000111100101111011111110011000111001110100000011011111010010001101011101010000101101110101100010101111011000001010011101101111111101110111011111101111011111111110011110000111110001111000111110111111100101111011011110011000110111110100000011010111010010001100111101010000101011110101100010100111011000001001111101101111111011110111011111100111011111111101111110000111101111111000111110110111100101111010111110011000110101110100000011001111010010001100011101010000101001110101100010011111011000001001011101101111111001110111011111011111011111111101011110000111101101111000111110101111100101111010011110011000101111110100000010110111010010001010111101010000100011110101100010000111011000000111111101101111110011110111011111000111011111111011111110000111100111111000111110010111100101111000111110011000101101110100000010101111010010001010011101010000100001110101100001111111011000000111011101101111110001110111011110111111011111111011011110000111100101111000111110001111100101111000011110011000101011110100000010100111010010001001111101010000011111110101100001110111011000000110111101101111101111110111011110110111011111111010111110000111100011111000111110000111100101110111111110011000101001110100000010011111010010001001011101010000011101110101100001101111011000000110011101101111101101110111011110101111011111111010011110000111100001111000111101111111100101110111011110011000100011110100000010000111010010000111111101010000010111110101100001010111011000000100111101101111100111110111011110010111011111111000111110000111011011111000111101100111100101110101111110011000100001110100000001111111010010000111011101010000010101110101100001001111011000000100011101101111100101110111011110001111011111111000011110000111011001111000111101011111100101110101011110011000011111110100000001110111010010000110111101010000010011110101100001000111011000000011111101101111100011110111011110000111011111110111111110000111010111111000111101010111100101110100111110011000011101110100000001101111010010000110011101010000010001110101100000111111011000000011011101101111100001110111011101111111011111110111011110000111010101111000111101001111100101110100011110011000010111110100000001010111010010000100111101010000001011110101100000100111011000000001111101101111011011110111011101100111011111110101111110000111001111111000111100110111100101110010111110011000010101110100000001001111010010000100011101010000001001110101100000011111011000000001011101101111011001110111011101011111011111110101011110000111001101111000111100101111100101110010011110011000010011110100000001000111010010000011111101010000000111110101100000010111011000000000111101101111010111110111011101010111011111110100111110000111001011111000111100100111100101110001111110011000010001110100000000111111010010000011011101010000000101110101100000001111011000000000011101101111010101110111011101001111011111110100011110000111001001111000111100011111100101110001011110011000100111110100000010010111010010001000111101010000011111110101100001110111011000000110111101101111111111110111011111110111011111111110111110000111110111111000111111010111100101111100111110011000100101110100000010001111010010001000011101010000011101110101100001101111011000000110011101101111111101110111011111101111011111111110011110000111110101111000111111001111100101111100011110011000011111110100000001110111010010000110111101010000010111110101100001010111011000000100111101101111110111110111011111010111011111111100111110000111101111111000111110110111100101111010111110011000011101110100000001101111010010000110011101010000010101110101100001001111011000000100011101101111110101110111011111001111011111111100011110000111101101111000111110101111100101111010011110011000010111110100000001010111010010000100111101010000001111110101100000110111011000000010111101101111101111110111011110110111011111111010111110000111100111111000111110010111100101111000111110011000010101110100000001001111010010000100011101010000001101110101100000101111011000000010011101101111101101110111011110101111011111111010011110000111100101111000111110001111100101111000011110011000001111110100000000110111010010000010111101010000000111110101100000010111011000000000111101101111100111110111011110010111011111111000111110000111011111111000111101110111100101110110111110011000001101110100000000101111010010000010011101010000000101110101100000001111011000000000011101101111100101110111011110001111011111111000011110000111011101111000111101101111100101110110011110011000000011110100000000010111010010000001111101010000000001110101100010011111011000001001011101101000011001110111000001011111011110000101011110000000010001111000100000111111100100000011011110011000000101110100000000011111010010001010111101010000100111110101100010010111011000001000111101101000010111110111000001010111011110000100111110000000001111111000100000110111100100000010111110011000000001110100000010011111010010001001011101010000100001110101100001111111011000000111011101101000010001110111000000111111011110000011011110000000001001111000110000000111100101111111111110011000100111110100000010010111010010001000111101010000011111110101100001110111011000000110111101101000001111110111000000110111011110000010111110000100000001111000111111111111100100111111111110011000000011110100000000010111010010000001111101010000000001110101100010011111011000001001011101101000011001110111000001011111011110000101011110000000010001111000100000111111100100000011011110011000000101110100000000011111010010001010111101010000100111110101100010010111011000001000111101101000010111110111000001010111011110000100111110000000001111111000100000110111100100000010111110011000000001110100000010011111010010001001011101010000100001110101100001111111011000000111011101101000010001110111000000111111011110000011011110000000001001111000110000000111100101111111111110011000100111110100000010010111010010001000111101010000011111110101100001110111011000000110111101101000001111110111000000110111011110000010111110000100000001111000111111111111100100111111111110011";
-        constant EXPECTED_VALUES_s_mac1_s_axis_tlast : std_logic_vector(388-1 downto 0) := "1000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000";
+        constant EXPECTED_VALUES_s_mac1_s_axis_tdata : std_logic_vector(6208-1 downto 0) := x"00000000000040011DE81CE91BEA17EB16EC15EDFFEEFEEFFDF0F9F1F8F2F7F31CE81BE91AEA16EB15EC14EDFEEEFDEFFCF0F8F1F7F2F6F31BE81AE919EA15EB14EC13EDFDEEFCEFFBF0F7F1F6F2F5F31AE819E918EA14EB13EC12EDFCEEFBEFFAF0F6F1F5F2F4F317E816E915EA11EB10EC0FEDF9EEF8EFF7F0F3F1F2F2F1F316E815E914EA10EB0FEC0EEDF8EEF7EFF6F0F2F1F1F2F0F315E814E913EA0FEB0EEC0DEDF7EEF6EFF5F0F1F1F0F2EFF314E813E912EA0EEB0DEC0CEDF6EEF5EFF4F0F0F1EFF2EEF311E810E90FEA0BEB0AEC09EDF3EEF2EFF1F0EDF1ECF2EBF310E80FE90EEA0AEB09EC08EDF2EEF1EFF0F0ECF1EBF2EAF30FE80EE90DEA09EB08EC07EDF1EEF0EFEFF0EBF1EAF2E9F30EE80DE90CEA08EB07EC06EDF0EEEFEFEEF0EAF1E9F2E8F30BE80AE909EA05EB04EC03EDEDEEECEFEBF0E7F1E6F2E5F30AE809E908EA04EB03EC02EDECEEEBEFEAF0E6F1E5F2E4F309E808E907EA03EB02EC01EDEBEEEAEFE9F0E5F1E4F2E3F308E807E906EA02EB01EC00EDEAEEE9EFE8F0E4F1E3F2E2F313E812E911EA0FEB0EEC0DEDFFEEFEEFFDF0FBF1FAF2F9F312E811E910EA0EEB0DEC0CEDFEEEFDEFFCF0FAF1F9F2F8F30FE80EE90DEA0BEB0AEC09EDFBEEFAEFF9F0F7F1F6F2F5F30EE80DE90CEA0AEB09EC08EDFAEEF9EFF8F0F6F1F5F2F4F30BE80AE909EA07EB06EC05EDF7EEF6EFF5F0F3F1F2F2F1F30AE809E908EA06EB05EC04EDF6EEF5EFF4F0F2F1F1F2F0F307E806E905EA03EB02EC01EDF3EEF2EFF1F0EFF1EEF2EDF306E805E904EA02EB01EC00EDF2EEF1EFF0F0EEF1EDF2ECF301E802E903EA00EB13EC12ED0CEE0BEF0AF008F107F206F302E803E915EA13EB12EC11ED0BEE0AEF09F007F106F205F300E813E912EA10EB0FEC0EED08EE07EF06F004F180F2FFF313E812E911EA0FEB0EEC0DED07EE06EF05F080F1FFF27FF301E802E903EA00EB13EC12ED0CEE0BEF0AF008F107F206F302E803E915EA13EB12EC11ED0BEE0AEF09F007F106F205F300E813E912EA10EB0FEC0EED08EE07EF06F004F180F2FFF313E812E911EA0FEB0EEC0DED07EE06EF05F080F1FFF27FF3";
+        constant EXPECTED_VALUES_s_mac1_s_axis_tlast : std_logic_vector(388-1 downto 0) := x"8800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800";
     begin
         EXPECTED_s_mac1_s_axis_tdata <= EXPECTED_VALUES_s_mac1_s_axis_tdata((i+1)*16-1 downto i*16);
         EXPECTED_s_mac1_s_axis_tlast <= EXPECTED_VALUES_s_mac1_s_axis_tlast(i*1);
@@ -657,8 +877,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac2_s_axis_tdata : std_logic_vector(6208-1 downto 0) := "0000000000000000000000000000000000000000000000000100000000000001000111010010010000011100001000110001101100100010000101110010000100010110001000000001010100011111111111110001111011111110000111011111110100011100111110010001101111111000000110101111011100011001000111000010010000011011001000110001101000100010000101100010000100010101001000000001010000011111111111100001111011111101000111011111110000011100111110000001101111110111000110101111011000011001000110110010010000011010001000110001100100100010000101010010000100010100001000000001001100011111111111010001111011111100000111011111101100011100111101110001101111110110000110101111010100011001000110100010010000011001001000110001100000100010000101000010000100010011001000000001001000011111111111000001111011111011000111011111101000011100111101100001101111110101000110101111010000011001000101110010010000010110001000110001010100100010000100010010000100010000001000000000111100011111111110010001111011111000000111011111011100011100111100110001101111110010000110101111000100011001000101100010010000010101001000110001010000100010000100000010000100001111001000000000111000011111111110000001111011110111000111011111011000011100111100100001101111110001000110101111000000011001000101010010010000010100001000110001001100100010000011110010000100001110001000000000110100011111111101110001111011110110000111011111010100011100111100010001101111110000000110101110111100011001000101000010010000010011001000110001001000100010000011100010000100001101001000000000110000011111111101100001111011110101000111011111010000011100111100000001101111101111000110101110111000011001000100010010010000010000001000110000111100100010000010110010000100001010001000000000100100011111111100110001111011110010000111011111000100011100111011010001101111101100000110101110101100011001000100000010010000001111001000110000111000100010000010100010000100001001001000000000100000011111111100100001111011110001000111011111000000011100111011000001101111101011000110101110101000011001000011110010010000001110001000110000110100100010000010010010000100001000001000000000011100011111111100010001111011110000000111011110111100011100111010110001101111101010000110101110100100011001000011100010010000001101001000110000110000100010000010000010000100000111001000000000011000011111111100000001111011101111000111011110111000011100111010100001101111101001000110101110100000011001000010110010010000001010001000110000100100100010000001010010000100000100001000000000001100011111111011010001111011101100000111011110101100011100111001110001101111100110000110101110010100011001000010100010010000001001001000110000100000100010000001000010000100000011001000000000001000011111111011000001111011101011000111011110101000011100111001100001101111100101000110101110010000011001000010010010010000001000001000110000011100100010000000110010000100000010001000000000000100011111111010110001111011101010000111011110100100011100111001010001101111100100000110101110001100011001000010000010010000000111001000110000011000100010000000100010000100000001001000000000000000011111111010100001111011101001000111011110100000011100111001000001101111100011000110101110001000011001000100110010010000010010001000110001000100100010000011110010000100001110001000000000110100011111111111110001111011111110000111011111110100011100111110110001101111111010000110101111100100011001000100100010010000010001001000110001000000100010000011100010000100001101001000000000110000011111111111100001111011111101000111011111110000011100111110100001101111111001000110101111100000011001000011110010010000001110001000110000110100100010000010110010000100001010001000000000100100011111111110110001111011111010000111011111100100011100111101110001101111110110000110101111010100011001000011100010010000001101001000110000110000100010000010100010000100001001001000000000100000011111111110100001111011111001000111011111100000011100111101100001101111110101000110101111010000011001000010110010010000001010001000110000100100100010000001110010000100000110001000000000010100011111111101110001111011110110000111011111010100011100111100110001101111110010000110101111000100011001000010100010010000001001001000110000100000100010000001100010000100000101001000000000010000011111111101100001111011110101000111011111010000011100111100100001101111110001000110101111000000011001000001110010010000000110001000110000010100100010000000110010000100000010001000000000000100011111111100110001111011110010000111011111000100011100111011110001101111101110000110101110110100011001000001100010010000000101001000110000010000100010000000100010000100000001001000000000000000011111111100100001111011110001000111011111000000011100111011100001101111101101000110101110110000011001000000010010010000000010001000110000001100100010000000000010000100010011001000000001001000011111000011000001111000001011000111010000101000011100000010000001101100000111000110100000011000011001000000100010010000000011001000110001010100100010000100110010000100010010001000000001000100011111000010110001111000001010000111010000100100011100000001110001101100000110000110100000010100011001000000000010010000010011001000110001001000100010000100000010000100001111001000000000111000011111000010000001111000000111000111010000011000011100000001000001101110000000000110101111111100011001000100110010010000010010001000110001000100100010000011110010000100001110001000000000110100011111000001110001111000000110000111010000010100011100100000000001101111111111000110100111111100011001000000010010010000000010001000110000001100100010000000000010000100010011001000000001001000011111000011000001111000001011000111010000101000011100000010000001101100000111000110100000011000011001000000100010010000000011001000110001010100100010000100110010000100010010001000000001000100011111000010110001111000001010000111010000100100011100000001110001101100000110000110100000010100011001000000000010010000010011001000110001001000100010000100000010000100001111001000000000111000011111000010000001111000000111000111010000011000011100000001000001101110000000000110101111111100011001000100110010010000010010001000110001000100100010000011110010000100001110001000000000110100011111000001110001111000000110000111010000010100011100100000000001101111111111000110100111111100011001";
-        constant EXPECTED_VALUES_s_mac2_s_axis_tlast : std_logic_vector(388-1 downto 0) := "1000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000";
+        constant EXPECTED_VALUES_s_mac2_s_axis_tdata : std_logic_vector(6208-1 downto 0) := x"00000000000040011D241C231B2217211620151FFF1EFE1DFD1CF91BF81AF7191C241B231A2216211520141FFE1EFD1DFC1CF81BF71AF6191B241A23192215211420131FFD1EFC1DFB1CF71BF61AF5191A241923182214211320121FFC1EFB1DFA1CF61BF51AF419172416231522112110200F1FF91EF81DF71CF31BF21AF11916241523142210210F200E1FF81EF71DF61CF21BF11AF0191524142313220F210E200D1FF71EF61DF51CF11BF01AEF191424132312220E210D200C1FF61EF51DF41CF01BEF1AEE19112410230F220B210A20091FF31EF21DF11CED1BEC1AEB1910240F230E220A210920081FF21EF11DF01CEC1BEB1AEA190F240E230D2209210820071FF11EF01DEF1CEB1BEA1AE9190E240D230C2208210720061FF01EEF1DEE1CEA1BE91AE8190B240A23092205210420031FED1EEC1DEB1CE71BE61AE5190A240923082204210320021FEC1EEB1DEA1CE61BE51AE41909240823072203210220011FEB1EEA1DE91CE51BE41AE31908240723062202210120001FEA1EE91DE81CE41BE31AE2191324122311220F210E200D1FFF1EFE1DFD1CFB1BFA1AF9191224112310220E210D200C1FFE1EFD1DFC1CFA1BF91AF8190F240E230D220B210A20091FFB1EFA1DF91CF71BF61AF5190E240D230C220A210920081FFA1EF91DF81CF61BF51AF4190B240A23092207210620051FF71EF61DF51CF31BF21AF1190A240923082206210520041FF61EF51DF41CF21BF11AF01907240623052203210220011FF31EF21DF11CEF1BEE1AED1906240523042202210120001FF21EF11DF01CEE1BED1AEC1901240223032200211320121F0C1E0B1D0A1C081B071A061902240323152213211220111F0B1E0A1D091C071B061A051900241323122210210F200E1F081E071D061C041B801AFF191324122311220F210E200D1F071E061D051C801BFF1A7F1901240223032200211320121F0C1E0B1D0A1C081B071A061902240323152213211220111F0B1E0A1D091C071B061A051900241323122210210F200E1F081E071D061C041B801AFF191324122311220F210E200D1F071E061D051C801BFF1A7F19";
+        constant EXPECTED_VALUES_s_mac2_s_axis_tlast : std_logic_vector(388-1 downto 0) := x"8800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800";
     begin
         EXPECTED_s_mac2_s_axis_tdata <= EXPECTED_VALUES_s_mac2_s_axis_tdata((i+1)*16-1 downto i*16);
         EXPECTED_s_mac2_s_axis_tlast <= EXPECTED_VALUES_s_mac2_s_axis_tlast(i*1);
@@ -678,8 +898,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac3_s_axis_tdata : std_logic_vector(6208-1 downto 0) := "0000000000000000000000000000000000000000000000000100000000000001000111010011000000011100001011110001101100101110000101110010110100010110001011000001010100101011111111110010101011111110001010011111110100101000111110010010011111111000001001101111011100100101000111000011000000011011001011110001101000101110000101100010110100010101001011000001010000101011111111100010101011111101001010011111110000101000111110000010011111110111001001101111011000100101000110110011000000011010001011110001100100101110000101010010110100010100001011000001001100101011111111010010101011111100001010011111101100101000111101110010011111110110001001101111010100100101000110100011000000011001001011110001100000101110000101000010110100010011001011000001001000101011111111000010101011111011001010011111101000101000111101100010011111110101001001101111010000100101000101110011000000010110001011110001010100101110000100010010110100010000001011000000111100101011111110010010101011111000001010011111011100101000111100110010011111110010001001101111000100100101000101100011000000010101001011110001010000101110000100000010110100001111001011000000111000101011111110000010101011110111001010011111011000101000111100100010011111110001001001101111000000100101000101010011000000010100001011110001001100101110000011110010110100001110001011000000110100101011111101110010101011110110001010011111010100101000111100010010011111110000001001101110111100100101000101000011000000010011001011110001001000101110000011100010110100001101001011000000110000101011111101100010101011110101001010011111010000101000111100000010011111101111001001101110111000100101000100010011000000010000001011110000111100101110000010110010110100001010001011000000100100101011111100110010101011110010001010011111000100101000111011010010011111101100001001101110101100100101000100000011000000001111001011110000111000101110000010100010110100001001001011000000100000101011111100100010101011110001001010011111000000101000111011000010011111101011001001101110101000100101000011110011000000001110001011110000110100101110000010010010110100001000001011000000011100101011111100010010101011110000001010011110111100101000111010110010011111101010001001101110100100100101000011100011000000001101001011110000110000101110000010000010110100000111001011000000011000101011111100000010101011101111001010011110111000101000111010100010011111101001001001101110100000100101000010110011000000001010001011110000100100101110000001010010110100000100001011000000001100101011111011010010101011101100001010011110101100101000111001110010011111100110001001101110010100100101000010100011000000001001001011110000100000101110000001000010110100000011001011000000001000101011111011000010101011101011001010011110101000101000111001100010011111100101001001101110010000100101000010010011000000001000001011110000011100101110000000110010110100000010001011000000000100101011111010110010101011101010001010011110100100101000111001010010011111100100001001101110001100100101000010000011000000000111001011110000011000101110000000100010110100000001001011000000000000101011111010100010101011101001001010011110100000101000111001000010011111100011001001101110001000100101000100110011000000010010001011110001000100101110000011110010110100001110001011000000110100101011111111110010101011111110001010011111110100101000111110110010011111111010001001101111100100100101000100100011000000010001001011110001000000101110000011100010110100001101001011000000110000101011111111100010101011111101001010011111110000101000111110100010011111111001001001101111100000100101000011110011000000001110001011110000110100101110000010110010110100001010001011000000100100101011111110110010101011111010001010011111100100101000111101110010011111110110001001101111010100100101000011100011000000001101001011110000110000101110000010100010110100001001001011000000100000101011111110100010101011111001001010011111100000101000111101100010011111110101001001101111010000100101000010110011000000001010001011110000100100101110000001110010110100000110001011000000010100101011111101110010101011110110001010011111010100101000111100110010011111110010001001101111000100100101000010100011000000001001001011110000100000101110000001100010110100000101001011000000010000101011111101100010101011110101001010011111010000101000111100100010011111110001001001101111000000100101000001110011000000000110001011110000010100101110000000110010110100000010001011000000000100101011111100110010101011110010001010011111000100101000111011110010011111101110001001101110110100100101000001100011000000000101001011110000010000101110000000100010110100000001001011000000000000101011111100100010101011110001001010011111000000101000111011100010011111101101001001101110110000100101000000010011000000000010001011110000001100101110000000000010110100010011001011000001001000101011000011000010101000001011001010010000101000101000000010000010011100000111001001100000011000100101000000100011000000000011001011110001010100101110000100110010110100010010001011000001000100101011000010110010101000001010001010010000100100101000000001110010011100000110001001100000010100100101000000000011000000010011001011110001001000101110000100000010110100001111001011000000111000101011000010000010101000000111001010010000011000101000000001000010011110000000001001101111111100100101000100110011000000010010001011110001000100101110000011110010110100001110001011000000110100101011000001110010101000000110001010010000010100101000100000000010011111111111001001100111111100100101000000010011000000000010001011110000001100101110000000000010110100010011001011000001001000101011000011000010101000001011001010010000101000101000000010000010011100000111001001100000011000100101000000100011000000000011001011110001010100101110000100110010110100010010001011000001000100101011000010110010101000001010001010010000100100101000000001110010011100000110001001100000010100100101000000000011000000010011001011110001001000101110000100000010110100001111001011000000111000101011000010000010101000000111001010010000011000101000000001000010011110000000001001101111111100100101000100110011000000010010001011110001000100101110000011110010110100001110001011000000110100101011000001110010101000000110001010010000010100101000100000000010011111111111001001100111111100100101";
-        constant EXPECTED_VALUES_s_mac3_s_axis_tlast : std_logic_vector(388-1 downto 0) := "1000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000100000000000";
+        constant EXPECTED_VALUES_s_mac3_s_axis_tdata : std_logic_vector(6208-1 downto 0) := x"00000000000040011D301C2F1B2E172D162C152BFF2AFE29FD28F927F826F7251C301B2F1A2E162D152C142BFE2AFD29FC28F827F726F6251B301A2F192E152D142C132BFD2AFC29FB28F727F626F5251A30192F182E142D132C122BFC2AFB29FA28F627F526F4251730162F152E112D102C0F2BF92AF829F728F327F226F1251630152F142E102D0F2C0E2BF82AF729F628F227F126F0251530142F132E0F2D0E2C0D2BF72AF629F528F127F026EF251430132F122E0E2D0D2C0C2BF62AF529F428F027EF26EE251130102F0F2E0B2D0A2C092BF32AF229F128ED27EC26EB2510300F2F0E2E0A2D092C082BF22AF129F028EC27EB26EA250F300E2F0D2E092D082C072BF12AF029EF28EB27EA26E9250E300D2F0C2E082D072C062BF02AEF29EE28EA27E926E8250B300A2F092E052D042C032BED2AEC29EB28E727E626E5250A30092F082E042D032C022BEC2AEB29EA28E627E526E4250930082F072E032D022C012BEB2AEA29E928E527E426E3250830072F062E022D012C002BEA2AE929E828E427E326E2251330122F112E0F2D0E2C0D2BFF2AFE29FD28FB27FA26F9251230112F102E0E2D0D2C0C2BFE2AFD29FC28FA27F926F8250F300E2F0D2E0B2D0A2C092BFB2AFA29F928F727F626F5250E300D2F0C2E0A2D092C082BFA2AF929F828F627F526F4250B300A2F092E072D062C052BF72AF629F528F327F226F1250A30092F082E062D052C042BF62AF529F428F227F126F0250730062F052E032D022C012BF32AF229F128EF27EE26ED250630052F042E022D012C002BF22AF129F028EE27ED26EC250130022F032E002D132C122B0C2A0B290A280827072606250230032F152E132D122C112B0B2A0A2909280727062605250030132F122E102D0F2C0E2B082A0729062804278026FF251330122F112E0F2D0E2C0D2B072A062905288027FF267F250130022F032E002D132C122B0C2A0B290A280827072606250230032F152E132D122C112B0B2A0A2909280727062605250030132F122E102D0F2C0E2B082A0729062804278026FF251330122F112E0F2D0E2C0D2B072A062905288027FF267F25";
+        constant EXPECTED_VALUES_s_mac3_s_axis_tlast : std_logic_vector(388-1 downto 0) := x"8800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800800";
     begin
         EXPECTED_s_mac3_s_axis_tdata <= EXPECTED_VALUES_s_mac3_s_axis_tdata((i+1)*16-1 downto i*16);
         EXPECTED_s_mac3_s_axis_tlast <= EXPECTED_VALUES_s_mac3_s_axis_tlast(i*1);
@@ -699,8 +919,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac0_m_axis_tdata : std_logic_vector(1056-1 downto 0) := "000000000000000000000001010000000000000000000000000001001010100100000000000000000000010001100011000000000000000000000100000111010000000000000000000000111101011100000000000000000000001100000101000000000000000000000010101111110000000000000000000000100111100100000000000000000000001000110011000000000000000000000001011000010000000000000000000000010001101100000000000000000000000011010101000000000000000000000000100011111111111111111111111111111011110111111111111111111111111101110111111111111111111111111111001100011111111111111111111111101110101100000000000000000000001010010111000000000000000000000010010100010000000000000000000000010111111100000000000000000000000100111001000000000000000000000000011001110000000000000000000000000010000111111111111111111111111101001111111111111111111111111111000010010000000000000000000000001111000000000000000000000000001001001010000000000000000000000001010110110000000000000000100000110000010000000000000000000000000011110000000000000000000000000010010010100000000000000000000000010101101100000000000000001000001100000100";
-        constant EXPECTED_VALUES_s_mac0_m_axis_tlast : std_logic_vector(33-1 downto 0) := "111111111111111111111111111111111";
+        constant EXPECTED_VALUES_s_mac0_m_axis_tdata : std_logic_vector(1056-1 downto 0) := x"00000140000004A9000004630000041D000003D700000305000002BF0000027900000233000001610000011B000000D50000008FFFFFFFBDFFFFFF77FFFFFF31FFFFFEEB00000297000002510000017F000001390000006700000021FFFFFF4FFFFFFF09000000F00000024A0000015B00008304000000F00000024A0000015B00008304";
+        constant EXPECTED_VALUES_s_mac0_m_axis_tlast : std_logic_vector(33-1 downto 0) := "1" & x"FFFFFFFF";
     begin
         EXPECTED_s_mac0_m_axis_tdata <= EXPECTED_VALUES_s_mac0_m_axis_tdata((i+1)*32-1 downto i*32);
         EXPECTED_s_mac0_m_axis_tlast <= EXPECTED_VALUES_s_mac0_m_axis_tlast(i*1);
@@ -720,8 +940,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac1_m_axis_tdata : std_logic_vector(1056-1 downto 0) := "000000000000000000000001010000001111111111111111111101001111111111111111111111111111010111011101111111111111111111110110101110111111111111111111111101111001100111111111111111111111101000110011111111111111111111111011000100011111111111111111111110111110111111111111111111111111110011001101111111111111111111111111011001110000000000000000000000000100010100000000000000000000000100100011000000000000000000000010000000010000000000000000000001001001101100000000000000000000010101111001000000000000000000000110010101110000000000000000000001110011010111111111111111111111100100111001111111111111111111111010000101111111111111111111111111001011000111111111111111111111110110001111000000000000000000000000001010010000000000000000000000010000011100000000000000000000001110100001000000000000000000000100011111111111111111111111111110010100110011111111111111111111011010000110111111111111111111111110101001001111111111111111111101111100001011111111111111111111100101001100111111111111111111110110100001101111111111111111111111101010010011111111111111111111011111000010";
-        constant EXPECTED_VALUES_s_mac1_m_axis_tlast : std_logic_vector(33-1 downto 0) := "111111111111111111111111111111111";
+        constant EXPECTED_VALUES_s_mac1_m_axis_tdata : std_logic_vector(1056-1 downto 0) := x"00000140FFFFF4FFFFFFF5DDFFFFF6BBFFFFF799FFFFFA33FFFFFB11FFFFFBEFFFFFFCCDFFFFFF670000004500000123000002010000049B000005790000065700000735FFFFF939FFFFFA17FFFFFCB1FFFFFD8F0000002900000107000003A10000047FFFFFF94CFFFFF686FFFFFEA4FFFFF7C2FFFFF94CFFFFF686FFFFFEA4FFFFF7C2";
+        constant EXPECTED_VALUES_s_mac1_m_axis_tlast : std_logic_vector(33-1 downto 0) := "1" & x"FFFFFFFF";
     begin
         EXPECTED_s_mac1_m_axis_tdata <= EXPECTED_VALUES_s_mac1_m_axis_tdata((i+1)*32-1 downto i*32);
         EXPECTED_s_mac1_m_axis_tlast <= EXPECTED_VALUES_s_mac1_m_axis_tlast(i*1);
@@ -741,8 +961,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac2_m_axis_tdata : std_logic_vector(1056-1 downto 0) := "000000000000000000000001010000000000000000000000000100001010110000000000000000000000111100111110000000000000000000001101110100000000000000000000000011000110001000000000000000000000100000011000000000000000000000000110101010100000000000000000000001010011110000000000000000000000001111001110111111111111111111111111100001001111111111111111111111100001011011111111111111111111110010101000111111111111111111111011001110101111111111111111111101101111000011111111111111111111010110000010111111111111111111110100000101001111111111111111111100101010011000000000000000000000101000101010000000000000000000001000101111000000000000000000000001000111001000000000000000000000001100000100111111111111111111111110101110101111111111111111111111010100110011111111111111111111100100000010111111111111111111110111100101000000000000000000000010110011111100000000000000000000111101111001000000000000000000000000010100110000000000000000000011010111110100000000000000000000101101000011000000000000000000001111011111010000000000000000000000000101011100000000000000000000110110000001";
-        constant EXPECTED_VALUES_s_mac2_m_axis_tlast : std_logic_vector(33-1 downto 0) := "111111111111111111111111111111111";
+        constant EXPECTED_VALUES_s_mac2_m_axis_tdata : std_logic_vector(1056-1 downto 0) := x"00000140000010AC00000F3E00000DD000000C6200000818000006AA0000053C000003CEFFFFFF84FFFFFE16FFFFFCA8FFFFFB3AFFFFF6F0FFFFF582FFFFF414FFFFF2A600000A2A000008BC0000047200000304FFFFFEBAFFFFFD4CFFFFF902FFFFF79400000B3F00000F790000005300000D7D00000B4300000F7D0000005700000D81";
+        constant EXPECTED_VALUES_s_mac2_m_axis_tlast : std_logic_vector(33-1 downto 0) := "1" & x"FFFFFFFF";
     begin
         EXPECTED_s_mac2_m_axis_tdata <= EXPECTED_VALUES_s_mac2_m_axis_tdata((i+1)*32-1 downto i*32);
         EXPECTED_s_mac2_m_axis_tlast <= EXPECTED_VALUES_s_mac2_m_axis_tlast(i*1);
@@ -762,8 +982,8 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_mac3_m_axis_tdata : std_logic_vector(1056-1 downto 0) := "000000000000000000000001010000000000000000000000000101100100110100000000000000000001010001001111000000000000000000010010010100010000000000000000000100000101001100000000000000000000101001011001000000000000000000001000010110110000000000000000000001100101110100000000000000000000010001011111111111111111111111111110011001011111111111111111111111000110011111111111111111111111101001101001111111111111111111111000011010111111111111111111111100100111000111111111111111111111000001110011111111111111111111101110011101011111111111111111111011000111011100000000000000000000110110001011000000000000000000001011100011010000000000000000000001011001001100000000000000000000001110010101111111111111111111111101100110111111111111111111111110111001110111111111111111111111010110100011111111111111111111110011101001011000101000110010110011000100111010001010001100101101000111111100100010100011001010111011110011101000101000110010110011110100000000000000000000000000111111010000000000000000000000010101011111101111111111111111111111110101000000000000000000000001001011000010";
-        constant EXPECTED_VALUES_s_mac3_m_axis_tlast : std_logic_vector(33-1 downto 0) := "111111111111111111111111111111111";
+        constant EXPECTED_VALUES_s_mac3_m_axis_tdata : std_logic_vector(1056-1 downto 0) := x"000001400000164D0000144F000012510000105300000A590000085B0000065D0000045FFFFFFE65FFFFFC67FFFFFA69FFFFF86BFFFFF271FFFFF073FFFFEE75FFFFEC7700000D8B00000B8D0000059300000395FFFFFD9BFFFFFB9DFFFFF5A3FFFFF3A58A32CC4E8A32D1FC8A32BBCE8A32CF4000000FD00000157EFFFFFF50000012C2";
+        constant EXPECTED_VALUES_s_mac3_m_axis_tlast : std_logic_vector(33-1 downto 0) := "1" & x"FFFFFFFF";
     begin
         EXPECTED_s_mac3_m_axis_tdata <= EXPECTED_VALUES_s_mac3_m_axis_tdata((i+1)*32-1 downto i*32);
         EXPECTED_s_mac3_m_axis_tlast <= EXPECTED_VALUES_s_mac3_m_axis_tlast(i*1);
@@ -783,9 +1003,9 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_out_combiner_m_axis_tdata : std_logic_vector(4224-1 downto 0) := "000000000000000000000001010000000000000000000000000000010100000000000000000000000000000101000000000000000000000000000001010000000000000000000000000101100100110100000000000000000001000010101100111111111111111111110100111111110000000000000000000001001010100100000000000000000001010001001111000000000000000000001111001111101111111111111111111101011101110100000000000000000000010001100011000000000000000000010010010100010000000000000000000011011101000011111111111111111111011010111011000000000000000000000100000111010000000000000000000100000101001100000000000000000000110001100010111111111111111111110111100110010000000000000000000000111101011100000000000000000000101001011001000000000000000000001000000110001111111111111111111110100011001100000000000000000000001100000101000000000000000000001000010110110000000000000000000001101010101011111111111111111111101100010001000000000000000000000010101111110000000000000000000001100101110100000000000000000000010100111100111111111111111111111011111011110000000000000000000000100111100100000000000000000000010001011111000000000000000000000011110011101111111111111111111111001100110100000000000000000000001000110011111111111111111111111110011001011111111111111111111111111000010011111111111111111111111101100111000000000000000000000001011000011111111111111111111111000110011111111111111111111111111000010110000000000000000000000000010001010000000000000000000000010001101111111111111111111111101001101001111111111111111111111100101010000000000000000000000000010010001100000000000000000000000011010101111111111111111111111000011010111111111111111111111110110011101000000000000000000000001000000001000000000000000000000000100011111111111111111111111100100111000111111111111111111111011011110000000000000000000000000100100110111111111111111111111111111011110111111111111111111111000001110011111111111111111111110101100000100000000000000000000001010111100111111111111111111111111101110111111111111111111111101110011101011111111111111111111101000001010000000000000000000000011001010111111111111111111111111111001100011111111111111111111011000111011111111111111111111111001010100110000000000000000000000111001101011111111111111111111111101110101100000000000000000000110110001011000000000000000000001010001010101111111111111111111110010011100100000000000000000000001010010111000000000000000000001011100011010000000000000000000010001011110011111111111111111111101000010111000000000000000000000010010100010000000000000000000001011001001100000000000000000000010001110010111111111111111111111100101100010000000000000000000000010111111100000000000000000000001110010101000000000000000000000011000001001111111111111111111111011000111100000000000000000000000100111001111111111111111111111101100110111111111111111111111111101011101000000000000000000000000000101001000000000000000000000000011001111111111111111111111110111001110111111111111111111111110101001100000000000000000000000001000001110000000000000000000000000010000111111111111111111111010110100011111111111111111111111001000000100000000000000000000000111010000111111111111111111111111101001111111111111111111111110011101001011111111111111111111101111001010000000000000000000000010001111111111111111111111111111111000010011000101000110010110011000100111000000000000000000000101100111111111111111111111111111001010011000000000000000000000000001111000010001010001100101101000111111100000000000000000000001111011110011111111111111111111101101000011000000000000000000000001001001010100010100011001010111011110011100000000000000000000000000101001111111111111111111111111010100100000000000000000000000001010110111000101000110010110011110100000000000000000000000000110101111101111111111111111111110111110000100000000000000000100000110000010000000000000000000000111111010000000000000000000000001011010000111111111111111111111110010100110000000000000000000000000011110000000000000000000000010101011111100000000000000000000011110111110111111111111111111111011010000110000000000000000000000010010010101111111111111111111111110101000000000000000000000000000001010111111111111111111111111110101001000000000000000000000000010101101100000000000000000001001011000010000000000000000000001101100000011111111111111111111101111100001000000000000000001000001100000100";
-        constant EXPECTED_VALUES_s_out_combiner_m_axis_tlast : std_logic_vector(132-1 downto 0) := "111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111";
-        constant EXPECTED_VALUES_s_out_combiner_m_axis_tid : std_logic_vector(264-1 downto 0) := "111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100";
+        constant EXPECTED_VALUES_s_out_combiner_m_axis_tdata : std_logic_vector(4224-1 downto 0) := x"000001400000014000000140000001400000164D000010ACFFFFF4FF000004A90000144F00000F3EFFFFF5DD000004630000125100000DD0FFFFF6BB0000041D0000105300000C62FFFFF799000003D700000A5900000818FFFFFA33000003050000085B000006AAFFFFFB11000002BF0000065D0000053CFFFFFBEF000002790000045F000003CEFFFFFCCD00000233FFFFFE65FFFFFF84FFFFFF6700000161FFFFFC67FFFFFE16000000450000011BFFFFFA69FFFFFCA800000123000000D5FFFFF86BFFFFFB3A000002010000008FFFFFF271FFFFF6F00000049BFFFFFFBDFFFFF073FFFFF58200000579FFFFFF77FFFFEE75FFFFF41400000657FFFFFF31FFFFEC77FFFFF2A600000735FFFFFEEB00000D8B00000A2AFFFFF9390000029700000B8D000008BCFFFFFA17000002510000059300000472FFFFFCB10000017F0000039500000304FFFFFD8F00000139FFFFFD9BFFFFFEBA0000002900000067FFFFFB9DFFFFFD4C0000010700000021FFFFF5A3FFFFF902000003A1FFFFFF4FFFFFF3A5FFFFF7940000047FFFFFFF098A32CC4E00000B3FFFFFF94C000000F08A32D1FC00000F79FFFFF6860000024A8A32BBCE00000053FFFFFEA40000015B8A32CF4000000D7DFFFFF7C20000830400000FD000000B43FFFFF94C000000F00000157E00000F7DFFFFF6860000024AFFFFFF5000000057FFFFFEA40000015B000012C200000D81FFFFF7C200008304";
+        constant EXPECTED_VALUES_s_out_combiner_m_axis_tlast : std_logic_vector(132-1 downto 0) := x"FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF";
+        constant EXPECTED_VALUES_s_out_combiner_m_axis_tid : std_logic_vector(264-1 downto 0) := x"E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4";
     begin
         EXPECTED_s_out_combiner_m_axis_tdata <= EXPECTED_VALUES_s_out_combiner_m_axis_tdata((i+1)*32-1 downto i*32);
         EXPECTED_s_out_combiner_m_axis_tlast <= EXPECTED_VALUES_s_out_combiner_m_axis_tlast(i*1);
@@ -808,9 +1028,9 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_s_dequantization_m_axis_tdata : std_logic_vector(1056-1 downto 0) := "010100110101001101010011010100110111111101111111100111000111111101111111011111111001110001111111011111110111111110011100011111110111111101111111100111000111111101111111011111111001110001111111011111110111111110011100011111110111111101111111100111000111111101111111011111111001110001111111100111001001110010011100010001001001110010011100101111000010001110011100100111000010011000000001100111001001110001111111111000001001110010011100011111111001110010011100100111000111111110011100100111001001110001111111100111001001110010011100011111111001110001111111011111111000000101111111011111110111111110000001011111110111111101111111100000010011011101111111011111111000000100010110100000011000000110010100101100101000000110000001111111101001000010000001100000010111111110000001100000011000000101111111100000011000000001111111100000001111001110000000011111111000000001111111100000001010100010000000001001101000000001111111100000000111111100111111001011011110010100000011010101010011110111011010000010011111110100000001111110100000010101001011001101101101111101111111";
-        constant EXPECTED_VALUES_s_dequantization_m_axis_tlast : std_logic_vector(132-1 downto 0) := "111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111111";
-        constant EXPECTED_VALUES_s_dequantization_m_axis_tid : std_logic_vector(264-1 downto 0) := "111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100111001001110010011100100";
+        constant EXPECTED_VALUES_s_dequantization_m_axis_tdata : std_logic_vector(1056-1 downto 0) := x"535353537F7F9C7F7F7F9C7F7F7F9C7F7F7F9C7F7F7F9C7F7F7F9C7F7F7F9C7F7F7F9C7F9C9C9C449C9CBC239C9C26019C9C7FE09C9C7F9C9C9C7F9C9C9C7F9C9C9C7F9C7F7F817F7F7F817F7F7F81377F7F8116818194B28181FE9081817F8181817F81807F80F3807F807F80A88026807F807F3F2DE503553DDA09FD01FA054B36DF7F";
+        constant EXPECTED_VALUES_s_dequantization_m_axis_tlast : std_logic_vector(132-1 downto 0) := x"FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF";
+        constant EXPECTED_VALUES_s_dequantization_m_axis_tid : std_logic_vector(264-1 downto 0) := x"E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4E4";
     begin
         EXPECTED_s_dequantization_m_axis_tdata <= EXPECTED_VALUES_s_dequantization_m_axis_tdata((i+1)*8-1 downto i*8);
         EXPECTED_s_dequantization_m_axis_tlast <= EXPECTED_VALUES_s_dequantization_m_axis_tlast(i*1);
@@ -833,19 +1053,23 @@ begin
 
     process
         variable i : integer := 0;
-        constant EXPECTED_VALUES_BRAM_OUTPUT_addr : std_logic_vector(4224-1 downto 0) := "000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000010000000000000000000000000000000011000000000000000000000000000000100000000000000000000000000000000100000000000000000000000000000100000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000001000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000010000000000000000000000000000000011000000000000000000000000000000100000000000000000000000000000000100000000000000000000000000000100000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000001000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000010000000000000000000000000000000011000000000000000000000000000000100000000000000000000000000000000100000000000000000000000000000100000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000001000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000010000000000000000000000000000000011000000000000000000000000000000100000000000000000000000000000000100000000000000000000000000000100000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000001000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000010000000000000000000000000000000011000000000000000000000000000000100000000000000000000000000000000100000000000000000000000000000100000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000001000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000000100000000000000000000000000000001000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000000000000000000000000000010000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000010000000000000000000000000000000100000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000100000000000000000000000000000001000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000000000000000000000000000010000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000010000000000000000000000000000000100000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000100000000000000000000000000000001000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000001000000000000000000000000000000010000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000000000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000000000000000000000000000000000000011000000000000000000000000000000100000000000000000000000000000000100000000000000000000000000000000000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000000000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000000000000000000000000000000000000011000000000000000000000000000000100000000000000000000000000000000100000000000000000000000000000000000000000000000000000000000000110000000000000000000000000000001000000000000000000000000000000001000000000000000000000000000000000000000000000000000000000000001100000000000000000000000000000010000000000000000000000000000000010000000000000000000000000000000000";
-        constant EXPECTED_VALUES_BRAM_OUTPUT_din : std_logic_vector(4224-1 downto 0) := "010100110101001101010011010100110000000001010011010100110101001100000000000000000101001101010011000000000000000000000000010100110111111101111111100111001001110001111111011111111001110010011100100111001001110001111111011111110111111101111111010001000000000101111111011111111001110010011100011111110111111110011100100111001001110010011100011111110111111101111111011111110100010000000001011111110111111110011100100111000111111101111111100111001001110010011100100111000111111101111111011111110111111101000100000000010111111101111111100111001001110001111111011111111001110010011100100111001001110001111111011111110111111101111111010001000000000101111111011111111001110010011100011111110111111110011100100111001001110010011100011111110111111101111111011111110100010000000001011111110111111110011100100111000111111101111111100111001001110010011100100111000111111101111111011111110111111101000100000000010000000001111111100111001001110000000000011111111001110010011100000000001001110001111111011111110000000001111111010001000000000100000000011111111001110010011100000000000111111110011100100111000000000010011100011111110111111100000000011111110100010000000001000000000000000010011100100111000000000000000000100111001001110000000000000000000111111101111111000000000000000001000100000000010000000000000000100111001001110000000000000000001001110010011100000000000000000001111111011111110000000000000000001000110000000100000000000000001001110010011100000000000000000010011100100111000000000000000000011111110111111100000000000000001001110000000001000000000000000010011100100111000000000000000000100111001001110000000000000000000111111101111111000000000000000010011100111000000000000000000000100111001001110000000000000000001001110010011100000000000000000001111111011111110000000000000000100111001001110000000000000000001001110010011100000000000000000010011100100111000000000000000000011111110111111100000000000000001001110010011100000000000000000000000000100111000000000000000000000000001001110000000000000000000000000001111111000000000000000000000000100111000000000000000000000000001001110000000000000000000000000010011100000000000000000000000000011111110000000000000000000000001001110001111111100000010111111110000001011111111000000101111111100000011000000101111111011111111011001010000001011111110111111110110010011111111000000101111111100000010111111110000001011111111000000110000001011111110111111110110010100000010111111101111111101100100111111110000001011111111000000101111111100000010111111110000001100000010111111100110111101100101000000101111111001101111011001001111111100000010111111110000001000000001000000101111111100000011000000101111111000101101011001000000000011111110001011010110010000000001000000100000000100000010000000010000001000000001000000100000000011111110000000010110010000000000111111100000000101100100000000010000001000000001000000100000000100000010000000010000001000000000111111100000000100100000000000001111111000000001001000000000000100000010000000010000001000000001000000100000000100000010000000001111111000000001000000100000000011111110000000010000001000000001000000100000000100000010000000000000000000000001000000100000000011111110000000010000001000000000000000000000000100000011000000010000000100000001000000001111111011111111010100001111111100000001000000010000000100000001111001101111111001001100111111100000000100000001000000010000000000000000111111110101000011111110000000010000000100000001000000000000000011111110010011001111111000000000000000010000000100000000000000000000000101010000111111100000000000000001000000010000000000000000000000000100110011111110000000000000000000000001000000000000000000000000000000001111111000000000000000000000000100000000000000000000000000000000111111100111111010101011111110101001011001011010011110100000001001101101110010111011010111110101101111100000011000010010000010101111111000000000101010111111101010010110000000000111101000000010011011000000000110110101111101011011111000000000000100100000101011111110000000000000000111111010100101100000000000000000000000100110110000000000000000011111010110111110000000000000000000001010111111100000000000000000000000001001011000000000000000000000000001101100000000000000000000000001101111100000000000000000000000001111111";
+        constant EXPECTED_VALUES_BRAM_OUTPUT_addr : std_logic_vector(4224-1 downto 0) := x"00000000000000000000000000000000000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C0000000800000004000000100000000C000000080000000400000004000000040000000000000000000000040000000400000000000000000000000400000004000000000000000000000004000000040000000000000000000000040000000400000000000000000000000400000004000000000000000000000004000000040000000000000000000000040000000400000000000000000000000C0000000800000004000000000000000C0000000800000004000000000000000C0000000800000004000000000000000C0000000800000004000000000000000C0000000800000004000000000000000C0000000800000004000000000000000C0000000800000004000000000000000C000000080000000400000000";
+        constant EXPECTED_VALUES_BRAM_OUTPUT_din : std_logic_vector(4224-1 downto 0) := x"535353530053535300005353000000537F7F9C9C7F7F9C9C9C9C7F7F7F7F44017F7F9C9C7F7F9C9C9C9C7F7F7F7F44017F7F9C9C7F7F9C9C9C9C7F7F7F7F44017F7F9C9C7F7F9C9C9C9C7F7F7F7F44017F7F9C9C7F7F9C9C9C9C7F7F7F7F44017F7F9C9C7F7F9C9C9C9C7F7F7F7F4401007F9C9C007F9C9C009C7F7F007F4401007F9C9C007F9C9C009C7F7F007F440100009C9C00009C9C00007F7F0000440100009C9C00009C9C00007F7F0000230100009C9C00009C9C00007F7F00009C0100009C9C00009C9C00007F7F00009CE000009C9C00009C9C00007F7F00009C9C00009C9C00009C9C00007F7F00009C9C0000009C0000009C0000007F0000009C0000009C0000009C0000007F0000009C7F817F817F817F81817F7FB2817F7FB27F817F817F817F81817F7FB2817F7FB27F817F817F817F81817F37B2817F37B27F817F8100817F81817F16B2007F16B20081008100810081007F00B2007F00B20081008100810081007F0090007F00900081008100810081007F0081007F00810081008100000081007F008100000081808080807F7FA87F80808080F37F267F00808080007FA87F00808080007F267F000080800000A87F000080800000267F000000800000007F000000800000007F3F55FD4B2D3D0136E5DAFADF0309057F0055FD4B003D013600DAFADF0009057F0000FD4B000001360000FADF0000057F0000004B00000036000000DF0000007F";
+        constant EXPECTED_VALUES_BRAM_OUTPUT_we : std_logic_vector(528-1 downto 0) := x"FFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFF";
     begin
         EXPECTED_BRAM_OUTPUT_addr <= EXPECTED_VALUES_BRAM_OUTPUT_addr((i+1)*32-1 downto i*32);
         EXPECTED_BRAM_OUTPUT_din <= EXPECTED_VALUES_BRAM_OUTPUT_din((i+1)*32-1 downto i*32);
-        wait until rising_edge(clk) and BRAM_OUTPUT_en = '1' and BRAM_OUTPUT_we = "1111";
+        EXPECTED_BRAM_OUTPUT_we <= EXPECTED_VALUES_BRAM_OUTPUT_we((i+1)*4-1 downto i*4);
+        wait until rising_edge(clk) and BRAM_OUTPUT_en = '1' and BRAM_OUTPUT_we /= "0000";
         assert BRAM_OUTPUT_addr = EXPECTED_BRAM_OUTPUT_addr report "ASSERTION FAILURE";
         if not (BRAM_OUTPUT_addr = EXPECTED_BRAM_OUTPUT_addr) then BRAM_OUTPUT_fail <= 'X'; end if;
         assert BRAM_OUTPUT_din = EXPECTED_BRAM_OUTPUT_din report "ASSERTION FAILURE";
         if not (BRAM_OUTPUT_din = EXPECTED_BRAM_OUTPUT_din) then BRAM_OUTPUT_fail <= 'X'; end if;
+        assert BRAM_OUTPUT_we = EXPECTED_BRAM_OUTPUT_we report "ASSERTION FAILURE";
+        if not (BRAM_OUTPUT_we = EXPECTED_BRAM_OUTPUT_we) then BRAM_OUTPUT_fail <= 'X'; end if;
         i := i + 1;
         if (i = 132) then
-            wait until rising_edge(clk) and BRAM_OUTPUT_en = '1' and BRAM_OUTPUT_we = "1111";
+            wait until rising_edge(clk) and BRAM_OUTPUT_en = '1' and BRAM_OUTPUT_we /= "0000";
             BRAM_OUTPUT_fail <= 'X';
             assert FALSE report "TOO MANY TRANSACTIONS!!!";
         end if;
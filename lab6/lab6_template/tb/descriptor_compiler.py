@@ -0,0 +1,155 @@
+################################################################
+# Pass Descriptor Compiler
+# Compiles tile_planner's passes into the descriptors conv_config runs back to back from its descriptor RAM: per pass
+# the MLP_CTRLB value then MLP_FILTER_W..MLP_Q_ZERO in address order. Writes them as a little-endian blob or a C array
+# for MLP.h's descriptors_queue(), and can write a testbench running network_golden's CNN from the descriptor RAM
+################################################################
+
+import argparse
+import sys
+import numpy as np
+
+from gen_conv_accelerator_tb import OPERAND_WIDTHS, chain_convolve, convolve, write_testbench
+from network_golden import FILTERS_PER_PASS, ConvLayer, fuse_layers, random_network, run_network
+from tile_planner import pass_registers, plan_layer
+
+# Registers 3 to 19 of conv_config, in address order
+DESCRIPTOR_REGISTERS = (
+    'MLP_FILTER_W',
+    'MLP_FILTER_H',
+    'MLP_FILTER_C',
+    'MLP_OUTPUT_W',
+    'MLP_OUTPUT_H',
+    'MLP_INPUT_END_DIFF_FW',
+    'MLP_INPUT_END_DIFF_FH',
+    'MLP_INPUT_END_DIFF_FC',
+    'MLP_INPUT_END_DIFF_OW',
+    'MLP_OUTPUT_ELEMENTS_PER_CHANNEL',
+    'MLP_OUTPUT_INITIAL_OFFSET',
+    'MLP_MAC0_BIAS',
+    'MLP_MAC1_BIAS',
+    'MLP_MAC2_BIAS',
+    'MLP_MAC3_BIAS',
+    'MLP_Q_SCALE',
+    'MLP_Q_ZERO',
+)
+DESCRIPTOR_WORDS = 1 + len(DESCRIPTOR_REGISTERS) # MLP_DESCRIPTOR_WORDS
+DESCRIPTOR_DEPTH = 64 # conv_config's DESCRIPTOR_DEPTH, descriptors one batch can queue
+
+CTRLB_SWAP_FILTERS = 1 << 0
+CTRLB_SWAP_ACTIVATIONS = 1 << 1
+CTRLB_MAX_POOLING = 1 << 2
+CTRLB_RELU = 1 << 3
+
+
+def ctrlb(relu, max_pooling, swap_activations, swap_filters):
+    return (CTRLB_RELU if relu else 0) | (CTRLB_MAX_POOLING if max_pooling else 0) | \
+           (CTRLB_SWAP_ACTIVATIONS if swap_activations else 0) | (CTRLB_SWAP_FILTERS if swap_filters else 0)
+
+def descriptor(registers, control):
+    # Words of one pass from its MLP.h register values
+    return [control] + [registers[name] for name in DESCRIPTOR_REGISTERS]
+
+def compile_layer(schedule, layer, swap_activations=0):
+    # (passes, DESCRIPTOR_WORDS) words of a planned layer. Every pass runs from the filter bank tile_planner loaded it
+    # into, so with more than two filter groups the host refills the idle bank between descriptors_start() and
+    # descriptors_wait(), watching descriptors_done()
+    words = [descriptor(p.registers, ctrlb(layer.relu, layer.max_pooling, swap_activations, p.filter_bank)) for p in schedule.passes]
+    return np.array(words, dtype=np.uint32)
+
+def tile_batches(schedule):
+    # (tile, first pass, passes) of every batch. The host loads each input tile, so a batch never spans two
+    batches = []
+    for i, p in enumerate(schedule.passes):
+        if i == 0 or p.tile != schedule.passes[i - 1].tile:
+            batches.append((p.tile, i, 0))
+        tile, first, count = batches[-1]
+        batches[-1] = (tile, first, count + 1)
+    for tile, _, count in batches:
+        assert count <= DESCRIPTOR_DEPTH, f"Tile {tile} has {count} passes, the descriptor RAM holds {DESCRIPTOR_DEPTH}"
+    return batches
+
+def check_descriptor(words, trace):
+    # The descriptor must program exactly the registers convolve() ran the pass with
+    registers = dict(zip(DESCRIPTOR_REGISTERS, words[1:]))
+    for name, value in registers.items():
+        assert f'{name[4:].lower()} <= x"{int(value):08X}"' in trace.registers, f"{name} disagrees with convolve()"
+    assert f"max_pooling <= '{int(words[0]) >> 2 & 1}'" in trace.registers, "max_pooling disagrees with convolve()"
+    assert f"relu <= '{int(words[0]) >> 3 & 1}'" in trace.registers, "relu disagrees with convolve()"
+
+def network_descriptors(layers, passes, swaps):
+    # Descriptor of every network_golden pass, with the bank swaps chain_convolve() chose
+    fused = fuse_layers(layers)
+    words = []
+    for network_pass, (swap_activations, swap_filters) in zip(passes, swaps):
+        layer = fused[network_pass.layer]
+        _, IH, IW = np.shape(network_pass.case[0])
+        _, _, FH, FW = np.shape(layer.filters)
+        OH, OW = IH - FH + 1, IW - FW + 1
+        elements_per_channel = OH*OW // 4 if layer.max_pooling else OH*OW
+        registers = pass_registers(layer, network_pass.index, IH, OH, OW, elements_per_channel)
+        words.append(descriptor(registers, ctrlb(layer.relu, layer.max_pooling, swap_activations, swap_filters)))
+    return np.array(words, dtype=np.uint32)
+
+def write_header(f, words, name):
+    f.write('// AUTOGENERATED. See descriptor_compiler.py\n')
+    f.write(f'static const ui32 {name}[{len(words)}][MLP_DESCRIPTOR_WORDS] = {{\n')
+    for row in words:
+        f.write('    {' + ', '.join(f'0x{int(word):08X}' for word in row) + '},\n')
+    f.write('};\n')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile a layer plan into conv_config descriptor RAM words')
+    parser.add_argument('--input', type=int, nargs=3, default=[32, 60, 60], metavar=('C', 'H', 'W'), help='Input shape')
+    parser.add_argument('--filters', type=int, nargs=3, default=[32, 5, 5], metavar=('K', 'FH', 'FW'), help='Filter count and size')
+    parser.add_argument('--max-pooling', action='store_true')
+    parser.add_argument('-o', '--output', help='Write the descriptors to this file as little-endian 32 bit words')
+    parser.add_argument('--header', help='Write the descriptors to this file as a C array')
+    parser.add_argument('--name', default='descriptors', help='Name of that C array')
+    parser.add_argument('--check', action='store_true', help='Run every pass through convolve() and compare its registers with the descriptor')
+    parser.add_argument('--network-testbench', metavar='FILE', help='Instead write a testbench running network_golden\'s CNN from the descriptor RAM')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of that CNN')
+    parser.add_argument('--operand-width', type=int, default=8, choices=OPERAND_WIDTHS, help='Bits of every weight and activation of that CNN')
+    args = parser.parse_args()
+
+    if args.network_testbench is not None:
+        input, layers = random_network(np.random.default_rng(args.seed), args.operand_width)
+        passes, _ = run_network(input, layers, FILTERS_PER_PASS, args.operand_width)
+        traces, swaps = chain_convolve([network_pass.case for network_pass in passes], args.operand_width)
+        words = network_descriptors(layers, passes, swaps)
+        assert len(words) <= DESCRIPTOR_DEPTH, f"{len(words)} passes do not fit the {DESCRIPTOR_DEPTH} descriptor RAM"
+        for row, trace in zip(words, traces):
+            check_descriptor(row, trace)
+        with open(args.network_testbench, 'w') as f:
+            write_testbench(f, traces, swaps=swaps, descriptors=words)
+        print(f'{len(words)} passes written as {words.size} words', file=sys.stderr)
+        sys.exit(0)
+
+    rng = np.random.default_rng(0)
+    C, IH, IW = args.input
+    K, FH, FW = args.filters
+    layer = ConvLayer(rng.integers(-128, 128, (K, C, FH, FW)), rng.integers(-2**16, 2**16, K), 0x00100000, 0, True, args.max_pooling)
+    schedule = plan_layer(args.input, layer)
+    words = compile_layer(schedule, layer)
+
+    for tile, first, count in tile_batches(schedule):
+        print(f'tile {tile}: descriptors {first}..{first + count - 1}, {count*DESCRIPTOR_WORDS} words')
+    print(f'{len(words)} passes: per tile one descriptors_queue() CDMA burst, then MLP_DESC_COUNT and MLP_DESC_CTRL writes '
+          f'and one wait, instead of {len(DESCRIPTOR_REGISTERS) + 2} CPU register writes and one busy-wait per pass')
+
+    if args.check:
+        input = rng.integers(-128, 128, (C, IH, IW))
+        for p, row in zip(schedule.passes, words):
+            group = slice(FILTERS_PER_PASS*p.group, FILTERS_PER_PASS*(p.group + 1))
+            filters = np.concatenate([layer.filters, np.zeros((-K % FILTERS_PER_PASS, C, FH, FW), dtype=layer.filters.dtype)])
+            biases = np.concatenate([layer.biases, np.zeros(-K % FILTERS_PER_PASS, dtype=np.int64)])
+            trace = convolve(input[:, p.first_row:p.first_row + p.output_rows + FH - 1], filters[group], biases[group], layer.scale, layer.zero,
+                             layer.max_pooling, layer.relu, p.registers['MLP_OUTPUT_INITIAL_OFFSET'])
+            check_descriptor(row, trace)
+        print('every descriptor matches convolve()', file=sys.stderr)
+
+    if args.output is not None:
+        words.astype('<u4').tofile(args.output)
+    if args.header is not None:
+        with open(args.header, 'w') as f:
+            write_header(f, words, args.name)
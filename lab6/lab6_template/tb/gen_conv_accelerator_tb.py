@@ -1,59 +1,458 @@
 ################################################################
 # Accelerator Testbench Generator
-# See the middle of the file for the convolutions being tested
+# See the bottom of the file for the convolutions being tested
 #
 # Gregory Ling, 2024
 ################################################################
 
+import argparse
+import hashlib
+import multiprocessing
+import os
 import sys
 import numpy as np
 
-BRAM_SIZE_BYTES = 128
-control_process = ''
-
-index_gen_input_addr = []
-index_gen_filter_addr = []
-index_gen_tlast = []
-mac0_in_tdata = []
-mac0_in_tlast = []
-mac1_in_tdata = []
-mac1_in_tlast = []
-mac2_in_tdata = []
-mac2_in_tlast = []
-mac3_in_tdata = []
-mac3_in_tlast = []
-mac0_out_tdata = []
-mac0_out_tlast = []
-mac1_out_tdata = []
-mac1_out_tlast = []
-mac2_out_tdata = []
-mac2_out_tlast = []
-mac3_out_tdata = []
-mac3_out_tlast = []
-combined_out_tdata = []
-combined_out_tlast = []
-combined_out_tid = []
-deq_out_tdata = []
-deq_out_tlast = []
-deq_out_tid = []
-bram_output_write_addr = []
-bram_output_write_data = []
+from perf_model import NUM_MACS, PACK_OUTPUT_WRITES, model_conv
+
+# Widest buffers the block design provides (blk_mem_gen depths in vivado/lab6_template.tcl) and the dimension register width
+MAX_INPUT_ADDR_WIDTH = 17
+MAX_FILTER_ADDR_WIDTH = 11
+MAX_OUTPUT_ADDR_WIDTH = 17
+DIM_WIDTH = 12
+BRAM_WORD_ADDR_BITS = 2 # 32 bit BRAM words
+DEFAULT_CYCLE_SLACK = 2.0 # Cycle budget of each convolution as a multiple of the throughput model's prediction
+DEFAULT_LANES = NUM_MACS # Filters run in parallel, one MAC and one filter BRAM each. The block design has 4
+OPERAND_WIDTHS = (8, 4, 2) # MAC_DATA_WIDTH values the golden model packs, every BRAM holds 8/width operands per byte
+
+
+class ConvTrace:
+    # Everything one convolve() call expects to see, one typed array column per checked stream
+    __slots__ = (
+        'registers',
+        'input_image',
+        'filter_images',
+        'output_extent',
+        'output_image',
+        'index_gen_input_addr',
+        'index_gen_filter_addr',
+        'index_gen_tlast',
+        'mac_in_tdata',
+        'mac_out_tdata',
+        'deq_out_tdata',
+        'bram_output_write_addr',
+        'bram_output_write_data',
+        'bram_output_write_we',
+        'pack_output',
+        'operand_width',
+    )
+
+    def __init__(self, registers, input_image, filter_images, output_extent, output_image, index_gen_input_addr, index_gen_filter_addr, index_gen_tlast,
+                 mac_in_tdata, mac_out_tdata, deq_out_tdata, bram_output_write_addr, bram_output_write_data, bram_output_write_we, pack_output, operand_width):
+        self.registers = registers
+        self.input_image = input_image # flat int8, one operand per element
+        self.filter_images = filter_images # One flat int8 per lane
+        self.output_extent = output_extent # elements of the output BRAM written to, including the initial offset
+        self.output_image = output_image
+        self.index_gen_input_addr = index_gen_input_addr
+        self.index_gen_filter_addr = index_gen_filter_addr
+        self.index_gen_tlast = index_gen_tlast
+        self.mac_in_tdata = mac_in_tdata # (lanes, transactions) uint16
+        self.mac_out_tdata = mac_out_tdata # (outputs, lanes) int32
+        self.deq_out_tdata = deq_out_tdata # (outputs * lanes) operand_width bit values in combiner order
+        self.bram_output_write_addr = bram_output_write_addr
+        self.bram_output_write_data = bram_output_write_data
+        self.bram_output_write_we = bram_output_write_we # Byte enables of each write
+        self.pack_output = pack_output # Written by output_storage built with PACK_OUTPUT_WRITES
+        self.operand_width = operand_width # MAC_DATA_WIDTH, bits of every input, filter and output element
+
+    def save(self, path):
+        # Compressed .npz of every field, written under a temporary name so readers never see a partial file
+        with open(f'{path}.{os.getpid()}.tmp', 'wb') as f:
+            np.savez_compressed(f, **{name: np.asarray(getattr(self, name)) for name in self.__slots__})
+        os.replace(f'{path}.{os.getpid()}.tmp', path)
+
+    @property
+    def lanes(self):
+        return len(self.filter_images)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            fields = {name: f[name] for name in cls.__slots__}
+        fields['registers'] = str(fields['registers'])
+        fields['filter_images'] = tuple(fields['filter_images'])
+        fields['output_extent'] = int(fields['output_extent'])
+        fields['pack_output'] = bool(fields['pack_output'])
+        fields['operand_width'] = int(fields['operand_width'])
+        return cls(**fields)
+
+    def control_process(self):
+        # Load the BRAM images, the words past each image filled with A5, then program the registers and run
+        out = "conv_idle <= '1';\nwait for 10ps;\n"
+        out += f'BRAM_INPUT_data <= {bram_image(pack_operands(self.input_image, self.operand_width))};\n'
+        for i, image in enumerate(self.filter_images):
+            out += f'BRAM_FILTER{i}_data <= {bram_image(pack_operands(image, self.operand_width))};\n'
+        return out + self.registers + "wait for 10ps;\nconv_idle <= '0';\nwait until rising_edge(conv_complete);\nwait for 10ps;\n"
+
+    def chain_control_process(self, index, swaps, next_trace):
+        # Run back to back on banked BRAMs: the first convolution loads the input into the bank the input port
+        # reads and its filters into the filter banks, later ones only flip the banks. The next convolution's filters
+        # are written to the idle filter banks while this one runs, and the gap since the last conv_complete is reported
+        swap_activations, swap_filters = swaps
+        out = f"conv_idle <= '1';\nswap_activations <= '{swap_activations}';\nswap_filters <= '{swap_filters}';\n"
+        if index == 0:
+            out += f"ACT_load <= {bram_image(pack_operands(self.input_image, self.operand_width))};\nACT_load_en <= '1';\n"
+            for i, image in enumerate(self.filter_images):
+                out += f'BRAM_FILTER{i}_BANK{swap_filters}_data <= {bram_image(pack_operands(image, self.operand_width))};\n'
+        out += self.registers + "wait for 10ps;\n"
+        if index == 0:
+            out += "ACT_load_en <= '0';\n"
+        else:
+            out += "gap_cycles := (now - last_complete) / CLK_PERIOD;\n"
+            out += "idle_cycles := idle_cycles + gap_cycles;\n"
+            out += f'report "CONV {index}: " & integer\'image(gap_cycles) & " idle cycles since CONV {index - 1} completed" severity note;\n'
+        out += "conv_idle <= '0';\n"
+        if next_trace is not None:
+            for i, image in enumerate(next_trace.filter_images):
+                out += f'BRAM_FILTER{i}_BANK{1 - swap_filters}_data <= {bram_image(pack_operands(image, self.operand_width))};\n'
+        return out + "wait until rising_edge(conv_complete);\nlast_complete := now;\nwait for 10ps;\n"
+
+    def batch_control_process(self, index, swaps, refill_trace):
+        # Follow conv_config's descriptor batch through this convolution: report the gap the sequencer left since the
+        # last conv_complete, and once this one completes refill its filter banks with refill_trace's filters, as the
+        # host would while the batch runs. The performance counters are checked straight away, conv_idle rises a cycle later
+        out = "wait until conv_idle = '0';\n"
+        if index > 0:
+            out += "gap_cycles := (now - last_complete) / CLK_PERIOD;\n"
+            out += "idle_cycles := idle_cycles + gap_cycles;\n"
+            out += f'report "CONV {index}: " & integer\'image(gap_cycles) & " idle cycles since CONV {index - 1} completed" severity note;\n'
+        out += "wait until rising_edge(conv_complete);\nlast_complete := now;\n"
+        if refill_trace is not None:
+            for i, image in enumerate(refill_trace.filter_images):
+                out += f'BRAM_FILTER{i}_BANK{swaps[1]}_data <= {bram_image(pack_operands(image, self.operand_width))};\n'
+        return out
+
+    def perf_check(self, index, cycle_slack):
+        # Report the performance counters of this convolution once conv_complete rises. With cycle_slack set, check
+        # the cycle count against cycle_slack times the model (only the products FC*FH*FW and OH*OW matter to it),
+        # every interface's transfer count against the golden streams, and its stall cycles against the leftover budget
+        # The DUT's own counters must agree: busy cycles with the testbench's count, BRAM reads with the index_gen
+        # transactions and output writes with the golden BRAM writes, while MAC stalls share the leftover budget
+        transactions = len(self.index_gen_tlast)
+        outputs = len(self.mac_out_tdata)
+        # A pooled output image has a quarter of the pixels the MACs produced
+        _, OH, OW = np.shape(self.output_image)
+        max_pooling = OH*OW != outputs
+        if max_pooling:
+            OH, OW = 2*OH, 2*OW
+        model = model_conv(transactions // outputs, 1, 1, OH, OW, num_macs=self.lanes, pack_output=self.pack_output, max_pooling=max_pooling,
+                           operand_width=self.operand_width)
+        budget = int(np.ceil(cycle_slack * model.cycles)) if cycle_slack else -1
+        streams = self.streams()
+        out = f'check_cycles("CONV {index}", {model.cycles}, {budget});\n'
+        for prefix, stream, _, _ in perf_counters(self.lanes):
+            expected = len(streams[stream])
+            max_stalls = max(budget - expected, 0) if cycle_slack else -1
+            out += f'check_stream("{prefix}", PERF_{prefix}_transfers, PERF_{prefix}_stalls, {expected}, {max_stalls});\n'
+        exact = (lambda expected: expected) if cycle_slack else (lambda expected: -1)
+        out += f'check_counter("perf_busy_cycles", perf_busy_cycles, {exact("PERF_cycles")}, -1);\n'
+        out += f'check_counter("perf_mac_stall_cycles (model {model.mac_stall_cycles})", perf_mac_stall_cycles, -1, {max(budget - transactions, 0) if cycle_slack else -1});\n'
+        out += f'check_counter("perf_bram_read_cycles", perf_bram_read_cycles, {exact(transactions)}, -1);\n'
+        out += f'check_counter("perf_output_writes", perf_output_writes, {exact(len(self.bram_output_write_addr))}, -1);\n'
+        return out
+
+    def streams(self):
+        # Expand to the per-signal streams checked by the testbench, constant columns are generated here rather than stored
+        num_outputs = len(self.mac_out_tdata)
+        tlast = np.ones(num_outputs, dtype=bool)
+        tid = np.tile(np.arange(self.lanes, dtype=np.uint8), num_outputs)
+        streams = {
+            'index_gen_input_addr': self.index_gen_input_addr,
+            'index_gen_filter_addr': self.index_gen_filter_addr,
+            'index_gen_tlast': self.index_gen_tlast,
+        }
+        for i in range(self.lanes):
+            streams[f'mac{i}_in_tdata'] = self.mac_in_tdata[i]
+            streams[f'mac{i}_in_tlast'] = self.index_gen_tlast
+        for i in range(self.lanes):
+            streams[f'mac{i}_out_tdata'] = self.mac_out_tdata[:, i]
+            streams[f'mac{i}_out_tlast'] = tlast
+        streams['combined_out_tdata'] = self.mac_out_tdata.reshape(-1)
+        streams['combined_out_tlast'] = np.ones(num_outputs*self.lanes, dtype=bool)
+        streams['combined_out_tid'] = tid
+        streams['deq_out_tdata'] = self.deq_out_tdata
+        streams['deq_out_tlast'] = np.ones(num_outputs*self.lanes, dtype=bool)
+        streams['deq_out_tid'] = tid
+        streams['bram_output_write_addr'] = self.bram_output_write_addr
+        streams['bram_output_write_data'] = self.bram_output_write_data
+        streams['bram_output_write_we'] = self.bram_output_write_we
+        return streams
+
+
+class BramConfig:
+    # Byte address widths of the three buffers, every BRAM model holds 2^width bytes so any address the DUT can drive is in range.
+    # The DUT addresses elements, operand_width bits each, so its address ports are wider by the bits picking one out of a byte
+    __slots__ = ('input_addr_width', 'filter_addr_width', 'output_addr_width', 'operand_width')
+
+    def __init__(self, input_addr_width, filter_addr_width, output_addr_width, operand_width=8):
+        self.input_addr_width = input_addr_width
+        self.filter_addr_width = filter_addr_width
+        self.output_addr_width = output_addr_width
+        self.operand_width = operand_width
+
+    @property
+    def sub_byte_bits(self):
+        return (8 // self.operand_width).bit_length() - 1
+
+    @property
+    def input_element_width(self):
+        return self.input_addr_width + self.sub_byte_bits
+
+    @property
+    def filter_element_width(self):
+        return self.filter_addr_width + self.sub_byte_bits
+
+    @property
+    def output_element_width(self):
+        return self.output_addr_width + self.sub_byte_bits
+
+    @property
+    def mac_in_width(self):
+        # Input and filter operand side by side
+        return 2 * self.operand_width
+
+    @property
+    def input_bytes(self):
+        return 1 << self.input_addr_width
+
+    @property
+    def filter_bytes(self):
+        return 1 << self.filter_addr_width
+
+    @property
+    def output_bytes(self):
+        return 1 << self.output_addr_width
+
+
+def addr_width(num_bytes):
+    # Byte address bits to reach num_bytes, at least one word address bit
+    return max(int(num_bytes - 1).bit_length(), BRAM_WORD_ADDR_BITS + 1)
+
+def bram_config(traces, banked=False):
+    # Size the buffers to the largest convolution in the testbench, rejecting anything the block design could not hold.
+    # Banked activation BRAMs swap between the input and output ports, so both are sized to the larger of the two
+    operand_width = traces[0].operand_width
+    num_bytes = lambda elements: -(-elements * operand_width // 8)
+    input_addr_width = addr_width(num_bytes(max(len(trace.input_image) for trace in traces)))
+    output_addr_width = addr_width(num_bytes(max(trace.output_extent for trace in traces)))
+    if banked:
+        input_addr_width = output_addr_width = max(input_addr_width, output_addr_width)
+    config = BramConfig(
+        input_addr_width,
+        addr_width(num_bytes(max(len(image) for trace in traces for image in trace.filter_images))),
+        output_addr_width,
+        operand_width,
+    )
+    assert config.input_addr_width <= MAX_INPUT_ADDR_WIDTH, f"Input needs {config.input_bytes} bytes, the input BRAM holds {2**MAX_INPUT_ADDR_WIDTH}"
+    assert config.filter_addr_width <= MAX_FILTER_ADDR_WIDTH, f"Filter needs {config.filter_bytes} bytes, each filter BRAM holds {2**MAX_FILTER_ADDR_WIDTH}"
+    assert config.output_addr_width <= MAX_OUTPUT_ADDR_WIDTH, f"Output needs {config.output_bytes} bytes, the output BRAM holds {2**MAX_OUTPUT_ADDR_WIDTH}"
+    return config
+
+def bram_image(values):
+    # BRAM word array aggregate, byte 0 in the least significant bits of word 0 and unused bytes filled with A5
+    padded = np.concatenate([np.asarray(values, dtype=np.uint8), np.full(-len(values) % 4, 0xA5, dtype=np.uint8)])
+    words = hex_matrix(padded.view('<u4'), 32)
+    literals = np.concatenate([np.full((len(words), 2), [ord('x'), ord('"')], dtype=np.uint8), words,
+                               np.full((len(words), 3), [ord('"'), ord(','), ord(' ')], dtype=np.uint8)], axis=1)
+    return f'({literals.tobytes().decode()}others => x"A5A5A5A5")'
+
+def sign_extend(values, bits):
+    # The value a bits wide two's complement field holds, for any integers
+    half = 1 << (bits - 1)
+    return ((np.asarray(values, dtype=np.int64) + half) & ((1 << bits) - 1)) - half
+
+def pack_operands(values, bits):
+    # Flat elements to BRAM bytes, element 0 in the least significant bits of byte 0 as bram_slice_fetcher indexes them
+    per_byte = 8 // bits
+    fields = np.asarray(values).astype(np.int64) & ((1 << bits) - 1)
+    fields = np.concatenate([fields, np.zeros(-len(fields) % per_byte, dtype=np.int64)]).reshape(-1, per_byte)
+    return (fields << (bits * np.arange(per_byte))).sum(axis=1).astype(np.uint8)
+
+def unpack_operands(data, bits):
+    # BRAM bytes back to their sign extended elements, the inverse of pack_operands
+    per_byte = 8 // bits
+    fields = (np.asarray(data, dtype=np.uint8).astype(np.int64)[:, None] >> (bits * np.arange(per_byte))).reshape(-1)
+    return sign_extend(fields, bits).astype(np.int8)
+
+def join_stream(traces, name):
+    # Concatenate one stream of several convolutions run back to back in one testbench
+    return np.concatenate([trace.streams()[name] for trace in traces])
 
 
 def indent(str, tabs):
     return str.replace('\n', '\n' + ('    ' * tabs))
 
 def u32_v(value):
-    return f'x"{value:08X}"'
+    # Register literal of any integer taken modulo 2^32, so negative values never go through a NumPy unsigned cast
+    return f'x"{int(value) & 0xFFFFFFFF:08X}"'
     
-def convolve(input, filter, biases, scale, zero, max_pooling, relu, output_initial_offset):
-    global control_process
+def input_end_diffs(FC, FH, FW, IH, IW):
+    # input_end_diff_fw/fh/fc/ow register values, how far index_gen jumps when each of its loops wraps
+    fw = 1 - FW + IW
+    fh = fw - (IW*FH) + (IW*IH)
+    fc = fh - (IW*IH*FC) + 1
+    ow = fc + (FW - 1)
+    return fw, fh, fc, ow
+
+def index_gen_stream(FC, FH, FW, IH, IW):
+    # Closed form of the index_gen address walk, broadcast over (OH, OW, FC, FH, FW) in stream order
+    OH = IH - FH + 1
+    OW = IW - FW + 1
+    oh, ow, fc, fh, fw = np.ix_(np.arange(OH), np.arange(OW), np.arange(FC), np.arange(FH), np.arange(FW))
+    input_addr = (fc*IH*IW + (fh+oh)*IW + (fw+ow)).astype(np.uint32).reshape(-1)
+    filter_addr = np.broadcast_to((fc*FH*FW + fh*FW + fw).astype(np.uint32), (OH, OW, FC, FH, FW)).reshape(-1)
+    last = filter_addr == FC*FH*FW - 1
+    return input_addr, filter_addr, last
+
+def check_input_end_diffs(input_addr, shape, input_end_diffs):
+    # index_gen steps by 1 inside a filter row and by the matching input_end_diff register whenever a loop wraps
+    OH, OW, FC, FH, FW = shape
+    oh, ow, fc, fh, fw = np.ix_(np.arange(OH), np.arange(OW), np.arange(FC), np.arange(FH), np.arange(FW))
+    fw_end = fw == FW-1
+    fh_end = fw_end & (fh == FH-1)
+    fc_end = fh_end & (fc == FC-1)
+    ow_end = fc_end & (ow == OW-1)
+    steps = np.select(
+        [np.broadcast_to(c, shape) for c in (ow_end, fc_end, fh_end, fw_end)],
+        [int(d) % 2**32 for d in input_end_diffs[::-1]],
+        1
+    ).reshape(-1)[:-1]
+    actual = np.diff(input_addr.astype(np.int64)) % 2**32
+    bad = np.flatnonzero(actual != steps)
+    assert len(bad) == 0, f"input_end_diff registers disagree with the index_gen walk at transaction {bad[:1]}"
+
+def pack_mac_tdata(input_vals, filter_vals, bits=8):
+    # MAC stream words are input & filter concatenated, MAC_DATA_WIDTH bits each
+    mask = (1 << bits) - 1
+    return ((np.asarray(input_vals).astype(np.uint16) & mask) << bits) | (np.asarray(filter_vals).astype(np.uint16) & mask)
+
+def dequantize(acc, scale, zero, relu, bits=8):
+    # (acc * scale) >> 32, optional relu, + zero, saturated to a signed bits wide output, over any int32 accumulator tensor.
+    # scale and zero are scalars or per-channel arrays broadcast along the last axis. dequantization.vhd multiplies
+    # q_scale as a signed 32 bit register, so scale must be a non-negative fraction below 2^31
+    lo, hi = -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+    scale = np.asarray(scale, dtype=np.int64)
+    zero = np.asarray(zero, dtype=np.int64)
+    assert np.all((scale >= 0) & (scale < 2**31)), "q_scale is a signed 32 bit register, its sign bit must be clear"
+    assert np.all((zero >= lo) & (zero <= hi)), f"q_zero is a signed {bits} bit register"
+    scaled = (np.asarray(acc, dtype=np.int32).astype(np.int64) * scale) >> 32
+    if relu:
+        scaled = np.maximum(scaled, 0)
+    return np.clip(scaled + zero, lo, hi).astype(np.int8)
+
+def golden_conv(input, filter, biases, scale, zero, relu, bits=8):
+    # Batched golden model of every filter's MAC plus dequantization, returns (OH, OW, filters) int32 and int8 arrays
+    # holding bits wide operands and outputs
+    input = np.asarray(input).astype(np.int8)
+    filter = np.asarray(filter).astype(np.int8)
+    assert np.array_equal(sign_extend(input, bits), input) and np.array_equal(sign_extend(filter, bits), filter), f"Operands must be signed {bits} bit values"
+    FC, FH, FW = np.shape(filter)[1:]
+    windows = np.lib.stride_tricks.sliding_window_view(input, (FH, FW), axis=(1, 2))
+    OH, OW = np.shape(windows)[1:3]
+    cols = windows.transpose(1, 2, 0, 3, 4).reshape(OH*OW, FC*FH*FW).astype(np.int64)
+    acc = cols @ filter.reshape(len(filter), FC*FH*FW).astype(np.int64).T
+    # The MACs accumulate in 32 bits, so wrap exactly like the hardware does
+    mac_out = (acc + np.array(biases, dtype=np.int64).astype(np.int32)).astype(np.int32).reshape(OH, OW, len(filter))
+
+    return mac_out, dequantize(mac_out, scale, zero, relu, bits)
+
+def golden_pool(deq_out):
+    # 2x2 max pool of the (OH, OW, channels) dequantized outputs into the (channels, OH/2, OW/2) output image
+    OH, OW, C = np.shape(deq_out)
+    blocks = deq_out[:OH - OH % 2, :OW - OW % 2].reshape(OH//2, 2, OW//2, 2, C)
+    return blocks.max(axis=(1, 3)).transpose(2, 0, 1)
+
+def unpacked_output_writes(deq_out, max_pooling, output_initial_offset, output_elements_per_channel, output_shape):
+    # output_storage built without PACK_OUTPUT_WRITES: one full word write per element
+    OH, OW, lanes = np.shape(deq_out)
+    # Live packed-word view of the output image, each write only touches the one word it lands in. Padded to whole
+    # words for lane counts that leave a partial last word, the padding reads as the zeroed BRAM behind the image
+    output_bytes = np.zeros(-(-int(np.prod(output_shape)) // 4) * 4, dtype=np.int8)
+    output_words = output_bytes.view(np.uint32)
+    output_buffer = output_bytes[:int(np.prod(output_shape))].reshape(output_shape)
+    bram_output_write_addr = np.empty(OH*OW*lanes, dtype=np.uint32)
+    bram_output_write_data = np.empty(OH*OW*lanes, dtype=np.uint32)
+    for oh in range(OH):
+        for ow in range(OW):
+            output_addr = ((int(oh/2)*int(OW/2)) + int(ow/2)) if max_pooling else ((oh * OW) + (ow))
+            for i in range(lanes):
+                byte_addr = output_addr + (output_elements_per_channel*i)
+                saturated = deq_out[oh][ow][i]
+                k = ((oh*OW) + ow)*lanes + i
+                bram_output_write_addr[k] = 4 * int((output_initial_offset + byte_addr)/4)
+                if max_pooling and (oh % 2 == 1 or ow % 2 == 1):
+                    # Read-modify-write of the pooled element
+                    saturated = max(saturated, output_bytes[byte_addr])
+                output_bytes[byte_addr] = saturated
+                bram_output_write_data[k] = output_words[byte_addr // 4]
+    return bram_output_write_addr, bram_output_write_data, output_buffer
+
+def packed_output_writes(deq_out, max_pooling, output_initial_offset, output_elements_per_channel, bits=8, output_bram=None):
+    # output_storage built with PACK_OUTPUT_WRITES: each lane gathers its consecutive elements in a word register and
+    # writes it once the word's last element fills or, pooling, its row ends, enabling only the bytes it holds. Pooling
+    # keeps the larger of each horizontal pair. A write is merged with the word read back first when it is the second
+    # row of a pooling window, keeping the larger of each element, or when it holds part of a byte, keeping the rest
+    # of that byte. Returns the (addr, data, byte enables) writes and the output BRAM elements they leave, starting
+    # from output_bram or, by default, a cleared BRAM
+    OH, OW, lanes = np.shape(deq_out)
+    per_word = 32 // bits
+    per_byte = 8 // bits
+    size = -(-(output_initial_offset + lanes*output_elements_per_channel) // per_word) * per_word
+    if output_bram is None:
+        bram = np.zeros(size, dtype=np.int8)
+    else:
+        assert len(output_bram) >= size, f"Output BRAM of {len(output_bram)} elements is too small for {size}"
+        bram = np.array(output_bram[:size], dtype=np.int8)
+    words = np.zeros((lanes, per_word), dtype=np.int8)
+    masks = np.zeros((lanes, per_word), dtype=bool)
+    pair_max = np.zeros(lanes, dtype=np.int8)
+    writes = []
+    for oh in range(OH):
+        for ow in range(OW):
+            output_addr = ((int(oh/2)*int(OW/2)) + int(ow/2)) if max_pooling else ((oh * OW) + (ow))
+            # Pooled lanes write at every row end, so the second row of the window reads the first one's elements back
+            row_end = ow == OW - 1 and (max_pooling or oh == OH - 1)
+            for i in range(lanes):
+                value = deq_out[oh][ow][i]
+                if max_pooling and ow % 2 == 0:
+                    pair_max[i] = value
+                    continue
+                if max_pooling:
+                    value = max(pair_max[i], value)
+                addr = output_initial_offset + output_elements_per_channel*i + output_addr
+                words[i][addr % per_word] = value
+                masks[i][addr % per_word] = True
+                if addr % per_word == per_word - 1 or row_end:
+                    word = slice(addr - addr % per_word, addr - addr % per_word + per_word)
+                    byte_masks = masks[i].reshape(-1, per_byte)
+                    enables = byte_masks.any(axis=1)
+                    pooled_merge = max_pooling and oh % 2 == 1
+                    if pooled_merge or np.any(enables != byte_masks.all(axis=1)):
+                        held = np.maximum(words[i], bram[word]) if pooled_merge else words[i]
+                        words[i] = np.where(masks[i], held, bram[word])
+                    bram[word] = np.where(masks[i], words[i], bram[word])
+                    data = int(pack_operands(words[i], bits).view(np.uint32)[0])
+                    writes.append((4 * (addr // per_word), data, int(np.packbits(enables, bitorder='little')[0])))
+                    words[i] = 0
+                    masks[i] = False
+    addrs, data, we = zip(*writes)
+    return np.array(addrs, dtype=np.uint32), np.array(data, dtype=np.uint32), np.array(we, dtype=np.uint8), bram
+
+def convolve(input, filter, biases, scale, zero, max_pooling, relu, output_initial_offset, pack_output=PACK_OUTPUT_WRITES, operand_width=8, output_bram=None):
     # Create static BRAM data vectors
     flat_input = np.int8(input).flatten()
-    flat_filter0 = np.int8(filter[0]).flatten()
-    flat_filter1 = np.int8(filter[1]).flatten()
-    flat_filter2 = np.int8(filter[2]).flatten()
-    flat_filter3 = np.int8(filter[3]).flatten()
+    flat_filters = tuple(np.int8(f).flatten() for f in filter)
+    lanes = len(flat_filters)
     IW = np.shape(input)[2]
     IH = np.shape(input)[1]
     FC = np.shape(filter)[1]
@@ -61,20 +460,18 @@ def convolve(input, filter, biases, scale, zero, max_pooling, relu, output_initi
     FW = np.shape(filter)[3]
     OW = IW - FW + 1
     OH = IH - FH + 1
-    input_end_diff_fw = 1 - FW + IW
-    input_end_diff_fh = input_end_diff_fw - (IW*FH) + (IW*IH)
-    input_end_diff_fc = input_end_diff_fh - (IW * IH * FC) + 1
-    input_end_diff_ow = input_end_diff_fc + (FW - 1)
+    assert lanes >= 1 and len(biases) == lanes, f"{lanes} filters need one bias each, got {len(biases)}"
+    assert operand_width in OPERAND_WIDTHS, f"MAC_DATA_WIDTH must be one of {OPERAND_WIDTHS}, not {operand_width}"
+    assert pack_output or operand_width == 8, "Only the packed output_storage writes sub-byte elements"
+    assert pack_output or output_bram is None, "Only the packed output_storage reads the output BRAM back"
+    assert np.shape(input)[0] == FC, f"Filter has {FC} channels but the input has {np.shape(input)[0]}"
+    assert OW > 0 and OH > 0, f"{FH}x{FW} filter does not fit the {IH}x{IW} input"
+    assert max(FC, FH, FW, OH, OW) < 2**DIM_WIDTH, f"Dimensions do not fit the {DIM_WIDTH} bit dimension registers"
+    input_end_diff_fw, input_end_diff_fh, input_end_diff_fc, input_end_diff_ow = input_end_diffs(FC, FH, FW, IH, IW)
     output_elements_per_channel = int((OW * OH)/4) if max_pooling else OW * OH
+    bias_registers = ''.join(f'mac{i}_bias <= {u32_v(bias)};\n' for i, bias in enumerate(biases))
 
-    control_process += f"""\
-conv_idle <= '1';
-wait for 10ps;
-BRAM_INPUT_data <= x"{('A5'*(BRAM_SIZE_BYTES-len(flat_input)))}{''.join(f'{np.uint8(x):02X}' for x in reversed(flat_input))}";
-BRAM_FILTER0_data <= x"{('A5'*(BRAM_SIZE_BYTES-len(flat_filter0)))}{''.join(f'{np.uint8(x):02X}' for x in reversed(flat_filter0))}";
-BRAM_FILTER1_data <= x"{('A5'*(BRAM_SIZE_BYTES-len(flat_filter1)))}{''.join(f'{np.uint8(x):02X}' for x in reversed(flat_filter1))}";
-BRAM_FILTER2_data <= x"{('A5'*(BRAM_SIZE_BYTES-len(flat_filter2)))}{''.join(f'{np.uint8(x):02X}' for x in reversed(flat_filter2))}";
-BRAM_FILTER3_data <= x"{('A5'*(BRAM_SIZE_BYTES-len(flat_filter3)))}{''.join(f'{np.uint8(x):02X}' for x in reversed(flat_filter3))}";
+    registers = f"""\
 max_pooling <= '{int(max_pooling)}';
 relu <= '{int(relu)}';
 filter_w <= x"{np.shape(filter)[3]:08X}";
@@ -82,158 +479,52 @@ filter_h <= x"{np.shape(filter)[2]:08X}";
 filter_c <= x"{np.shape(filter)[1]:08X}";
 output_w <= x"{np.shape(input)[2] - np.shape(filter)[3] + 1:08X}";
 output_h <= x"{np.shape(input)[1] - np.shape(filter)[2] + 1:08X}";
-input_end_diff_fw <= x"{np.uint32(input_end_diff_fw):08X}";
-input_end_diff_fh <= x"{np.uint32(input_end_diff_fh):08X}";
-input_end_diff_fc <= x"{np.uint32(input_end_diff_fc):08X}";
-input_end_diff_ow <= x"{np.uint32(input_end_diff_ow):08X}";
+input_end_diff_fw <= {u32_v(input_end_diff_fw)};
+input_end_diff_fh <= {u32_v(input_end_diff_fh)};
+input_end_diff_fc <= {u32_v(input_end_diff_fc)};
+input_end_diff_ow <= {u32_v(input_end_diff_ow)};
 output_elements_per_channel <= x"{output_elements_per_channel:08X}";
 output_initial_offset <= x"{output_initial_offset:08X}";
-mac0_bias <= x"{np.uint32(biases[0]):08X}";
-mac1_bias <= x"{np.uint32(biases[1]):08X}";
-mac2_bias <= x"{np.uint32(biases[2]):08X}";
-mac3_bias <= x"{np.uint32(biases[3]):08X}";
-q_scale <= x"{scale:08X}";
-q_zero <= x"{np.uint32(zero):08X}";
-wait for 10ps;
-conv_idle <= '0';
-wait until rising_edge(conv_complete);
-wait for 10ps;
+{bias_registers}q_scale <= x"{scale:08X}";
+q_zero <= {u32_v(zero)};
 """
 
-    output_buffer = np.zeros((4, int(OH/2) if max_pooling else OH, int(OW/2) if max_pooling else OW), dtype=np.int8)
-
-    for oh in range(OH):
-        for ow in range(OW):
-            output_addr = ((int(oh/2)*int(OW/2)) + int(ow/2)) if max_pooling else ((oh * OW) + (ow))
-            out0 = np.int32(biases[0])
-            out1 = np.int32(biases[1])
-            out2 = np.int32(biases[2])
-            out3 = np.int32(biases[3])
-            for fc in range(FC):
-                for fh in range(FH):
-                    for fw in range(FW):
-                        input_addr = (fc * IH * IW) + ((fh+oh) * IW) + (fw+ow)
-                        filter_addr = (fc * FH * FW) + ((fh) * FW) + (fw)
-                        last = (fc == FC-1) and (fh == FH-1) and (fw == FW-1)
-                        index_gen_input_addr.append(input_addr)
-                        index_gen_filter_addr.append(filter_addr)
-                        index_gen_tlast.append(last)
-                        input_val = input[fc][fh+oh][fw+ow]
-                        filter0_val = filter[0][fc][fh][fw]
-                        filter1_val = filter[1][fc][fh][fw]
-                        filter2_val = filter[2][fc][fh][fw]
-                        filter3_val = filter[3][fc][fh][fw]
-                        mac0_in_tdata.append((np.uint8(input_val) << 8) | np.uint8(filter0_val))
-                        mac1_in_tdata.append((np.uint8(input_val) << 8) | np.uint8(filter1_val))
-                        mac2_in_tdata.append((np.uint8(input_val) << 8) | np.uint8(filter2_val))
-                        mac3_in_tdata.append((np.uint8(input_val) << 8) | np.uint8(filter3_val))
-                        mac0_in_tlast.append(last)
-                        mac1_in_tlast.append(last)
-                        mac2_in_tlast.append(last)
-                        mac3_in_tlast.append(last)
-                        out0 += input_val * filter0_val
-                        out1 += input_val * filter1_val
-                        out2 += input_val * filter2_val
-                        out3 += input_val * filter3_val
-
-            mac0_out_tdata.append(out0)
-            mac1_out_tdata.append(out1)
-            mac2_out_tdata.append(out2)
-            mac3_out_tdata.append(out3)
-            mac0_out_tlast.append(True)
-            mac1_out_tlast.append(True)
-            mac2_out_tlast.append(True)
-            mac3_out_tlast.append(True)
-            for i, out in enumerate((out0, out1, out2, out3)):
-                combined_out_tdata.append(out)
-                combined_out_tlast.append(True)
-                combined_out_tid.append(i)
-                scaled = (out * scale) >> 32
-                relued = max(scaled, 0) if relu else scaled
-                zeroed = relued + zero
-                saturated = max(min(zeroed, 127), -128)
-                deq_out_tdata.append(saturated)
-                deq_out_tlast.append(True)
-                deq_out_tid.append(i)
-
-                bram_output_write_addr.append(4 * int((output_initial_offset + output_addr + (output_elements_per_channel*i))/4))
-                if max_pooling:
-                    do_max = (oh % 2 == 1 or ow % 2 == 1)
-                    maxed = max(saturated, output_buffer[i][int(oh/2)][int(ow/2)]) if do_max else saturated
-                    output_buffer[i][int(oh/2)][int(ow/2)] = maxed
-                else:
-                    output_buffer[i][oh][ow] = saturated
-                
-                bram_output_write_data.append(output_buffer.flatten().view(np.uint32)[int((output_addr + (output_elements_per_channel*i))/4)])
-    print(output_buffer, file=sys.stderr)
-
-inputs = np.array([
-    [
-        [127, -1, -128, 4],
-        [5, 6, 7, 8],
-        [9, 10, 11, 12],
-    ],
-    [
-        [13, 14, 15, 16],
-        [17, 18, 19, 0],
-        [21, 3, 2, 1],
-    ]
-])
-
-filters = np.array([
-    [
-        [
-            [127, -1, -128],
-            [4, 5, 6],
-        ],
-        [
-            [7, 8, 9],
-            [10, 11, 12],
-        ],
-    ],
-    [
-        [
-            [-13, -14, -15],
-            [-16, -17, -18],
-        ],
-        [
-            [-19, -20, -21],
-            [-22, -23, -24],
-        ],
-    ],
-    [
-        [
-            [25, 26, 27],
-            [28, 29, 30],
-        ],
-        [
-            [31, 32, 33],
-            [34, 35, 36],
-        ],
-    ],
-    [
-        [
-            [37, 38, 39],
-            [40, 41, 42],
-        ],
-        [
-            [43, 44, 45],
-            [46, 47, 48],
-        ],
-    ]
-])
-
-
-convolve(inputs, filters, [0, 1, 2, 3], 0x4000000, 0, False, False, 0)
-convolve(inputs, filters, [0, 1, -2, 0x8A32BC81], 0x7A32BC81, -127, False, False, 0)
-convolve(np.reshape(range(-20, 20), (2, 5, 4)), filters, [0, 1, 2, 3], 0x7A32BC81, -127, True, True, 0)
-convolve(np.reshape(range(-30, 30), (2, 5, 6)), filters, [4, 5, 6, 7], 0x7A32BC81, -100, True, True, 4)
+    mac_out, deq_out = golden_conv(input, filter, biases, scale, zero, relu, operand_width)
 
-inputs = [[[0x40, 0], [0, 0]]]
-filters = [[[[1, 0], [0, 0]]], [[[1, 0], [0, 0]]], [[[1, 0], [0, 0]]], [[[1, 0], [0, 0]]]]
-
-convolve(inputs, filters, [0x100, 0x100, 0x100, 0x100], 0x40000000, 3, False, True, 0)
+    input_addr, filter_addr, last = index_gen_stream(FC, FH, FW, IH, IW)
+    check_input_end_diffs(input_addr, (OH, OW, FC, FH, FW), (input_end_diff_fw, input_end_diff_fh, input_end_diff_fc, input_end_diff_ow))
+    input_vals = flat_input[input_addr]
+    mac_in_tdata = np.stack([pack_mac_tdata(input_vals, flat_filter[filter_addr], operand_width) for flat_filter in flat_filters])
 
+    output_shape = (lanes, int(OH/2) if max_pooling else OH, int(OW/2) if max_pooling else OW)
+    if pack_output:
+        bram_output_write_addr, bram_output_write_data, bram_output_write_we, bram = packed_output_writes(
+            deq_out, max_pooling, output_initial_offset, output_elements_per_channel, operand_width, output_bram)
+        output_buffer = bram[output_initial_offset:output_initial_offset + lanes*output_elements_per_channel].reshape(output_shape)
+    else:
+        bram_output_write_addr, bram_output_write_data, output_buffer = unpacked_output_writes(
+            deq_out, max_pooling, output_initial_offset, output_elements_per_channel, output_shape)
+        bram_output_write_we = np.full(len(bram_output_write_addr), 0xF, dtype=np.uint8)
+    assert np.array_equal(output_buffer, golden_pool(deq_out) if max_pooling else deq_out.transpose(2, 0, 1))
+
+    return ConvTrace(
+        registers,
+        flat_input,
+        flat_filters,
+        output_initial_offset + lanes*output_elements_per_channel,
+        output_buffer,
+        input_addr,
+        filter_addr,
+        last,
+        mac_in_tdata,
+        mac_out.reshape(OH*OW, lanes),
+        deq_out.reshape(-1),
+        bram_output_write_addr,
+        bram_output_write_data,
+        bram_output_write_we,
+        pack_output,
+        operand_width,
+    )
 
 def vhdl_type(bits):
     return "std_logic" if bits == 1 else f"std_logic_vector({bits-1} downto 0)"
@@ -248,14 +539,97 @@ def literal(value, bits):
         return f'"{int(value):0{bits}b}"'
     
 
-def gen_axis_checking_process(prefix, signals):
-    out = "process\n"
-    out += "    variable i : integer := 0;\n"
+HEX_DIGITS = np.frombuffer(b'0123456789ABCDEF', dtype=np.uint8)
+
+def bit_matrix(values, bits):
+    # (len(values), bits) array of 0/1, most significant bit first, values are masked to the field width
+    values = np.asarray(values).astype(np.uint64) & np.uint64((1 << bits) - 1)
+    return ((values[:, None] >> np.arange(bits - 1, -1, -1, dtype=np.uint64)) & np.uint64(1)).astype(np.uint8)
+
+def hex_matrix(values, bits):
+    # (len(values), ceil(bits/4)) array of ASCII hex digits, most significant digit first
+    digits = (bits + 3) // 4
+    values = np.asarray(values).astype(np.uint64) & np.uint64((1 << bits) - 1)
+    return HEX_DIGITS[(values[:, None] >> np.arange(4*(digits - 1), -1, -4, dtype=np.uint64)) & np.uint64(0xF)]
+
+def iter_vector_literal(values, bits, chunk=1 << 16):
+    # VHDL literal of all values packed into one vector with values[0] in the least significant bits, yielded in pieces.
+    # Whole nibbles are emitted as hex, any leading remainder as a binary string concatenated in front.
+    values = np.asarray(values)
+    total = len(values) * bits
+    head = total % 4
+    if total == 0:
+        yield '""'
+        return
+    carry = np.empty(0, dtype=np.uint8)
+    for end in range(len(values), 0, -chunk):
+        flat = np.concatenate([carry, bit_matrix(values[max(end - chunk, 0):end][::-1], bits).reshape(-1)])
+        if end == len(values):
+            if head:
+                yield f'"{(flat[:head] + ord("0")).tobytes().decode()}"' + (' & ' if total > head else '')
+            if total > head:
+                yield 'x"'
+            flat = flat[head:]
+        whole = len(flat) - len(flat) % 4
+        yield HEX_DIGITS[flat[:whole].reshape(-1, 4) @ np.array([8, 4, 2, 1], dtype=np.uint8)].tobytes().decode()
+        carry = flat[whole:]
+    if total > head:
+        yield '"'
+
+def write_stream_file(path, signals, chunk=1 << 16):
+    # One line per transaction, one hex field per signal, padded to whole hex digits for hread
     num_values = len(signals[0][1])
+    with open(path, 'wb') as f:
+        for start in range(0, num_values, chunk):
+            rows = min(chunk, num_values - start)
+            columns = []
+            for name, values, bits in signals:
+                columns += [hex_matrix(values[start:start + rows], bits), np.full((rows, 1), ord(' '), dtype=np.uint8)]
+            columns[-1] = np.full((rows, 1), ord('\n'), dtype=np.uint8)
+            f.write(np.concatenate(columns, axis=1).tobytes())
+
+def gen_file_checking_process(fail, handshake, signals, actual, data_file):
+    # Expected values are read lazily with textio, so the testbench size does not depend on the workload
+    out = "process\n"
+    out += f'    file data : text open read_mode is "{data_file}";\n'
+    out += "    variable l : line;\n"
     for name, values, bits in signals:
-        bitstring = ''.join(f"{np.uint32(v):0{bits}b}"[-bits:] for v in reversed(values))
-        out += f'    constant EXPECTED_VALUES_{name} : std_logic_vector({num_values*bits}-1 downto 0) := "{bitstring}";\n'
+        out += f'    variable v_{name} : std_logic_vector({4*((bits+3)//4)}-1 downto 0);\n'
     out += "begin\n"
+    out += "    if endfile(data) then\n"
+    out += f"        wait until rising_edge(clk) and {handshake};\n"
+    out += f"        {fail} <= 'X';\n"
+    out += f'        assert FALSE report "TOO MANY TRANSACTIONS!!!";\n'
+    out += "    else\n"
+    out += "        readline(data, l);\n"
+    for name, values, bits in signals:
+        out += f'        hread(l, v_{name});\n'
+        if bits == 1:
+            out += f'        EXPECTED_{name} <= v_{name}(0);\n'
+        else:
+            out += f'        EXPECTED_{name} <= v_{name}({bits}-1 downto 0);\n'
+    out += f"        wait until rising_edge(clk) and {handshake};\n"
+    for name, values, bits in signals:
+        out += f'        assert {actual(name)} = EXPECTED_{name} report "ASSERTION FAILURE";\n'
+        out += f"        if not ({actual(name)} = EXPECTED_{name}) then {fail} <= 'X'; end if;\n"
+    out += "    end if;\n"
+    out += "end process;\n"
+    return out
+
+def gen_axis_checking_process(prefix, signals, data_dir=None):
+    if data_dir is not None:
+        data_file = f'{data_dir}/{prefix}.hex'
+        write_stream_file(data_file, signals)
+        yield gen_file_checking_process(f'TEST_{prefix}_fail', f"TEST_{prefix}_tready = '1' and TEST_{prefix}_tvalid = '1'", signals, lambda name: f'TEST_{name}', data_file)
+        return
+    yield "process\n"
+    yield "    variable i : integer := 0;\n"
+    num_values = len(signals[0][1])
+    for name, values, bits in signals:
+        yield f'    constant EXPECTED_VALUES_{name} : std_logic_vector({num_values*bits}-1 downto 0) := '
+        yield from iter_vector_literal(values, bits)
+        yield ';\n'
+    out = "begin\n"
     for name, values, bits in signals:
         if bits == 1:
             out += f'    EXPECTED_{name} <= EXPECTED_VALUES_{name}(i*{bits});\n'
@@ -272,35 +646,476 @@ def gen_axis_checking_process(prefix, signals):
     out += f'        assert FALSE report "TOO MANY TRANSACTIONS!!!";\n'
     out += f'    end if;\n'
     out += "end process;\n"
-    return out
-
-def gen_bram_checking_process(prefix, signals):
-    out = "process\n"
-    out += "    variable i : integer := 0;\n"
+    yield out
+
+def gen_bram_checking_process(prefix, signals, data_dir=None):
+    if data_dir is not None:
+        data_file = f'{data_dir}/{prefix}.hex'
+        write_stream_file(data_file, signals)
+        yield gen_file_checking_process(f'{prefix}_fail', f"{prefix}_en = '1' and {prefix}_we /= \"0000\"", signals, lambda name: name, data_file)
+        return
+    yield "process\n"
+    yield "    variable i : integer := 0;\n"
     num_values = len(signals[0][1])
     for name, values, bits in signals:
-        bitstring = ''.join(f"{np.uint32(v):0{bits}b}"[-bits:] for v in reversed(values))
-        out += f'    constant EXPECTED_VALUES_{name} : std_logic_vector({num_values*bits}-1 downto 0) := "{bitstring}";\n'
-    out += "begin\n"
+        yield f'    constant EXPECTED_VALUES_{name} : std_logic_vector({num_values*bits}-1 downto 0) := '
+        yield from iter_vector_literal(values, bits)
+        yield ';\n'
+    out = "begin\n"
     for name, values, bits in signals:
         if bits == 1:
             out += f'    EXPECTED_{name} <= EXPECTED_VALUES_{name}(i*{bits});\n'
         else:
             out += f'    EXPECTED_{name} <= EXPECTED_VALUES_{name}((i+1)*{bits}-1 downto i*{bits});\n'
-    out += f"    wait until rising_edge(clk) and {prefix}_en = '1' and {prefix}_we = \"1111\";\n"
+    out += f"    wait until rising_edge(clk) and {prefix}_en = '1' and {prefix}_we /= \"0000\";\n"
     for name, values, bits in signals:
         out += f'    assert {name} = EXPECTED_{name} report "ASSERTION FAILURE";\n'
         out += f"    if not ({name} = EXPECTED_{name}) then {prefix}_fail <= 'X'; end if;\n"
     out += "    i := i + 1;\n"
     out += f"    if (i = {num_values}) then\n"
-    out += f"        wait until rising_edge(clk) and {prefix}_en = '1' and {prefix}_we = \"1111\";\n"
+    out += f"        wait until rising_edge(clk) and {prefix}_en = '1' and {prefix}_we /= \"0000\";\n"
     out += f"        {prefix}_fail <= 'X';\n"
     out += f'        assert FALSE report "TOO MANY TRANSACTIONS!!!";\n'
     out += f'    end if;\n'
     out += "end process;\n"
+    yield out
+
+def tid_width(lanes):
+    # Bits of the MAC index the combiner tags each result with, conv_accelerator's MAC_TID_WIDTH
+    return max((lanes - 1).bit_length(), 1)
+
+def checkers(lanes):
+    # Every checked interface: (checker generator, interface prefix, [(signal, ConvTrace stream, bits or BramConfig width)])
+    return [
+        (gen_axis_checking_process, 's_index_gen_m_axis', [
+            ('s_index_gen_m_axis_tdata_input_addr', 'index_gen_input_addr', 'input_element_width'),
+            ('s_index_gen_m_axis_tdata_filter_addr', 'index_gen_filter_addr', 'filter_element_width'),
+            ('s_index_gen_m_axis_tlast', 'index_gen_tlast', 1),
+        ]),
+    ] + [
+        (gen_axis_checking_process, f's_mac{i}_s_axis', [
+            (f's_mac{i}_s_axis_tdata', f'mac{i}_in_tdata', 'mac_in_width'),
+            (f's_mac{i}_s_axis_tlast', f'mac{i}_in_tlast', 1),
+        ])
+        for i in range(lanes)
+    ] + [
+        (gen_axis_checking_process, f's_mac{i}_m_axis', [
+            (f's_mac{i}_m_axis_tdata', f'mac{i}_out_tdata', 32),
+            (f's_mac{i}_m_axis_tlast', f'mac{i}_out_tlast', 1),
+        ])
+        for i in range(lanes)
+    ] + [
+        (gen_axis_checking_process, 's_out_combiner_m_axis', [
+            ('s_out_combiner_m_axis_tdata', 'combined_out_tdata', 32),
+            ('s_out_combiner_m_axis_tlast', 'combined_out_tlast', 1),
+            ('s_out_combiner_m_axis_tid', 'combined_out_tid', tid_width(lanes)),
+        ]),
+        (gen_axis_checking_process, 's_dequantization_m_axis', [
+            ('s_dequantization_m_axis_tdata', 'deq_out_tdata', 'operand_width'),
+            ('s_dequantization_m_axis_tlast', 'deq_out_tlast', 1),
+            ('s_dequantization_m_axis_tid', 'deq_out_tid', tid_width(lanes)),
+        ]),
+        (gen_bram_checking_process, 'BRAM_OUTPUT', [
+            ('BRAM_OUTPUT_addr', 'bram_output_write_addr', 32),
+            ('BRAM_OUTPUT_din', 'bram_output_write_data', 32),
+            ('BRAM_OUTPUT_we', 'bram_output_write_we', 4),
+        ]),
+    ]
+
+def perf_counters(lanes):
+    # Every checked interface as (prefix, ConvTrace stream counted, transfer condition, stall condition or None as the BRAM never stalls)
+    return [
+        (prefix, signals[0][1], f"TEST_{prefix}_tvalid = '1' and TEST_{prefix}_tready = '1'", f"TEST_{prefix}_tvalid = '1' and TEST_{prefix}_tready = '0'")
+        if gen is gen_axis_checking_process else
+        (prefix, signals[0][1], f"{prefix}_en = '1' and {prefix}_we /= \"0000\"", None)
+        for gen, prefix, signals in checkers(lanes)
+    ]
+
+def gen_perf_counter_process(lanes):
+    # Counts clock cycles and handshakes from conv_idle falling until conv_complete rises, cleared while idle
+    out = "process(clk)\n"
+    out += "begin\n"
+    out += "    if rising_edge(clk) then\n"
+    out += "        if conv_idle = '1' then\n"
+    out += "            PERF_cycles <= 0;\n"
+    for prefix, stream, transfer, stall in perf_counters(lanes):
+        out += f"            PERF_{prefix}_transfers <= 0;\n"
+        out += f"            PERF_{prefix}_stalls <= 0;\n"
+    out += "        elsif conv_complete /= '1' then\n"
+    out += "            PERF_cycles <= PERF_cycles + 1;\n"
+    for prefix, stream, transfer, stall in perf_counters(lanes):
+        out += f"            if {transfer} then PERF_{prefix}_transfers <= PERF_{prefix}_transfers + 1; end if;\n"
+        if stall is not None:
+            out += f"            if {stall} then PERF_{prefix}_stalls <= PERF_{prefix}_stalls + 1; end if;\n"
+    out += "        end if;\n"
+    out += "    end if;\n"
+    out += "end process;\n"
     return out
 
-print(f"""\
+def per_lane(template, lanes):
+    # template repeated for every MAC lane with {k} and {k+1} replaced by the lane number and the one after it
+    return ''.join(template.replace('{k}', str(k)).replace('{k+1}', str(k + 1)) for k in range(lanes))
+
+# Input and output BRAM models, the filter BRAM models go between them
+INPUT_BRAM_MODEL = """\
+    BRAM_INPUT_dout <= BRAM_INPUT_dout_delay1; -- BRAM read latency = 2
+    process(BRAM_INPUT_clk)
+    begin
+        if rising_edge(BRAM_INPUT_clk) then
+            if (BRAM_INPUT_rst = '1') then
+                BRAM_INPUT_dout_delay1 <= (others => '0');
+            elsif (BRAM_INPUT_en = '1') then
+                BRAM_INPUT_dout_delay1 <= BRAM_INPUT_data(to_integer(unsigned(BRAM_INPUT_addr(INPUT_BRAM_ADDR_WIDTH+2-1 downto 2))));
+            end if;
+        end if;
+    end process;
+
+"""
+OUTPUT_BRAM_MODEL = """\
+    BRAM_OUTPUT_dout <= BRAM_OUTPUT_dout_delay1; -- BRAM read latency = 2
+    process(BRAM_OUTPUT_clk)
+    begin
+        if rising_edge(BRAM_OUTPUT_clk) then
+            if (BRAM_OUTPUT_rst = '1' or conv_idle = '1') then
+                BRAM_OUTPUT_dout_delay1 <= (others => '0');
+                BRAM_OUTPUT_data <= (others => (others => '0'));
+            elsif (BRAM_OUTPUT_en = '1') then
+                if (BRAM_OUTPUT_we = "0000") then
+                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_data(to_integer(unsigned(BRAM_OUTPUT_addr(OUTPUT_BRAM_ADDR_WIDTH+2-1 downto 2))));
+                else
+                    for b in 0 to 3 loop -- Byte write enables
+                        if (BRAM_OUTPUT_we(b) = '1') then
+                            BRAM_OUTPUT_data(to_integer(unsigned(BRAM_OUTPUT_addr(OUTPUT_BRAM_ADDR_WIDTH+2-1 downto 2))))(8*(b+1)-1 downto 8*b) <= BRAM_OUTPUT_din(8*(b+1)-1 downto 8*b);
+                        end if;
+                    end loop;
+                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_din;
+                end if;
+            end if;
+        end if;
+    end process;
+"""
+BANKED_INPUT_BRAM_MODEL = """\
+    BRAM_INPUT_dout <= BRAM_INPUT_dout_delay1; -- BRAM read latency = 2
+    process(BRAM_INPUT_clk)
+    begin
+        if rising_edge(BRAM_INPUT_clk) then
+            if (BRAM_INPUT_rst = '1') then
+                BRAM_INPUT_dout_delay1 <= (others => '0');
+            elsif (BRAM_INPUT_en = '1') then
+                if (swap_activations = '0') then
+                    BRAM_INPUT_dout_delay1 <= BRAM_ACT0_data(to_integer(unsigned(BRAM_INPUT_addr(INPUT_BRAM_ADDR_WIDTH+2-1 downto 2))));
+                else
+                    BRAM_INPUT_dout_delay1 <= BRAM_ACT1_data(to_integer(unsigned(BRAM_INPUT_addr(INPUT_BRAM_ADDR_WIDTH+2-1 downto 2))));
+                end if;
+            end if;
+        end if;
+    end process;
+
+"""
+BANKED_OUTPUT_BRAM_MODEL = """\
+    BRAM_OUTPUT_dout <= BRAM_OUTPUT_dout_delay1; -- BRAM read latency = 2
+    process(BRAM_OUTPUT_clk, ACT_load_en)
+        variable addr : integer;
+        variable word : std_logic_vector(31 downto 0);
+    begin
+        if rising_edge(ACT_load_en) then
+            -- Host load of the bank the input port reads
+            if (swap_activations = '0') then
+                BRAM_ACT0_data <= ACT_load;
+            else
+                BRAM_ACT1_data <= ACT_load;
+            end if;
+        elsif rising_edge(BRAM_OUTPUT_clk) then
+            if (BRAM_OUTPUT_rst = '1') then
+                BRAM_OUTPUT_dout_delay1 <= (others => '0');
+                BRAM_ACT0_data <= (others => (others => '0'));
+                BRAM_ACT1_data <= (others => (others => '0'));
+            elsif (BRAM_OUTPUT_en = '1') then
+                -- The banks keep their contents across convolutions, the output port uses the one the input port does not
+                addr := to_integer(unsigned(BRAM_OUTPUT_addr(OUTPUT_BRAM_ADDR_WIDTH+2-1 downto 2)));
+                if (swap_activations = '0') then
+                    word := BRAM_ACT1_data(addr);
+                else
+                    word := BRAM_ACT0_data(addr);
+                end if;
+                if (BRAM_OUTPUT_we = "0000") then
+                    BRAM_OUTPUT_dout_delay1 <= word;
+                else
+                    for b in 0 to 3 loop -- Byte write enables
+                        if (BRAM_OUTPUT_we(b) = '1') then
+                            word(8*(b+1)-1 downto 8*b) := BRAM_OUTPUT_din(8*(b+1)-1 downto 8*b);
+                        end if;
+                    end loop;
+                    if (swap_activations = '0') then
+                        BRAM_ACT1_data(addr) <= word;
+                    else
+                        BRAM_ACT0_data(addr) <= word;
+                    end if;
+                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_din;
+                end if;
+            end if;
+        end if;
+    end process;
+"""
+
+# conv_config between the control process and the accelerator, for convolutions run from its descriptor RAM
+CONFIG_UNIT = """
+    AXIL_aresetn <= not rst;
+    config: entity work.conv_config
+        generic map(
+            DIM_WIDTH => DIM_WIDTH,
+            INPUT_ADDR_WIDTH => INPUT_ADDR_WIDTH,
+            FILTER_ADDR_WIDTH => FILTER_ADDR_WIDTH,
+            OUTPUT_ADDR_WIDTH => OUTPUT_ADDR_WIDTH,
+            MAC_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH,
+            MAC_DATA_WIDTH => MAC_DATA_WIDTH,
+            DESCRIPTOR_DEPTH => {depth}
+        )
+        port map(
+            S_AXI_LITE_ACLK => clk,
+            S_AXI_LITE_ARESETN => AXIL_aresetn,
+            S_AXI_LITE_AWVALID => AXIL_awvalid,
+            S_AXI_LITE_AWREADY => AXIL_awready,
+            S_AXI_LITE_AWADDR => AXIL_awaddr,
+            S_AXI_LITE_AWPROT => "000",
+            S_AXI_LITE_WVALID => AXIL_wvalid,
+            S_AXI_LITE_WREADY => open,
+            S_AXI_LITE_WDATA => AXIL_wdata,
+            S_AXI_LITE_WSTRB => "1111",
+            S_AXI_LITE_BVALID => open,
+            S_AXI_LITE_BREADY => '1',
+            S_AXI_LITE_BRESP => open,
+            S_AXI_LITE_ARVALID => AXIL_arvalid,
+            S_AXI_LITE_ARREADY => AXIL_arready,
+            S_AXI_LITE_ARADDR => AXIL_araddr,
+            S_AXI_LITE_ARPROT => "000",
+            S_AXI_LITE_RVALID => AXIL_rvalid,
+            S_AXI_LITE_RREADY => '1',
+            S_AXI_LITE_RDATA => AXIL_rdata,
+            S_AXI_LITE_RRESP => open,
+
+            swap_activations => swap_activations,
+            swap_filters => swap_filters,
+            accelerator_controls_activation_bram => open,
+
+            max_pooling => max_pooling,
+            relu => relu,
+            filter_w => filter_w(DIM_WIDTH-1 downto 0),
+            filter_h => filter_h(DIM_WIDTH-1 downto 0),
+            filter_c => filter_c(DIM_WIDTH-1 downto 0),
+            output_w => output_w(DIM_WIDTH-1 downto 0),
+            output_h => output_h(DIM_WIDTH-1 downto 0),
+            input_end_diff_fw => input_end_diff_fw(INPUT_ADDR_WIDTH-1 downto 0),
+            input_end_diff_fh => input_end_diff_fh(INPUT_ADDR_WIDTH-1 downto 0),
+            input_end_diff_fc => input_end_diff_fc(INPUT_ADDR_WIDTH-1 downto 0),
+            input_end_diff_ow => input_end_diff_ow(INPUT_ADDR_WIDTH-1 downto 0),
+            output_elements_per_channel => output_elements_per_channel(OUTPUT_ADDR_WIDTH-1 downto 0),
+            output_initial_offset => output_initial_offset(OUTPUT_ADDR_WIDTH-1 downto 0),
+            mac0_bias => mac0_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            mac1_bias => mac1_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            mac2_bias => mac2_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            mac3_bias => mac3_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            q_scale => q_scale(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+            q_zero => q_zero(MAC_DATA_WIDTH-1 downto 0),
+
+            perf_busy_cycles => perf_busy_cycles,
+            perf_mac_stall_cycles => perf_mac_stall_cycles,
+            perf_bram_read_cycles => perf_bram_read_cycles,
+            perf_output_writes => perf_output_writes,
+
+            conv_complete => conv_complete,
+            conv_idle => conv_idle
+        );
+"""
+AXIL_SIGNALS = """\
+    -- conv_config's AXI-lite bus, driven by the control process the way the host's Xil_Out32 and Xil_In32 do
+    signal AXIL_aresetn : std_logic;
+    signal AXIL_awaddr : std_logic_vector(13 downto 0) := (others => '0');
+    signal AXIL_awvalid : std_logic := '0';
+    signal AXIL_awready : std_logic;
+    signal AXIL_wdata : std_logic_vector(31 downto 0) := (others => '0');
+    signal AXIL_wvalid : std_logic := '0';
+    signal AXIL_araddr : std_logic_vector(13 downto 0) := (others => '0');
+    signal AXIL_arvalid : std_logic := '0';
+    signal AXIL_arready : std_logic;
+    signal AXIL_rdata : std_logic_vector(31 downto 0);
+    signal AXIL_rvalid : std_logic;
+"""
+AXIL_PROCEDURES = """\
+        -- One AXI-lite write or read, BREADY and RREADY are tied high
+        procedure axil_write(addr : natural; data : std_logic_vector(31 downto 0)) is
+        begin
+            AXIL_awaddr <= std_logic_vector(to_unsigned(addr, 14));
+            AXIL_wdata <= data;
+            AXIL_awvalid <= '1';
+            AXIL_wvalid <= '1';
+            wait until rising_edge(clk) and AXIL_awready = '1';
+            AXIL_awvalid <= '0';
+            AXIL_wvalid <= '0';
+        end procedure;
+        procedure axil_read(addr : natural; data : out std_logic_vector(31 downto 0)) is
+        begin
+            AXIL_araddr <= std_logic_vector(to_unsigned(addr, 14));
+            AXIL_arvalid <= '1';
+            wait until rising_edge(clk) and AXIL_arready = '1';
+            AXIL_arvalid <= '0';
+            wait until rising_edge(clk) and AXIL_rvalid = '1';
+            data := AXIL_rdata;
+        end procedure;
+        variable axil_data : std_logic_vector(31 downto 0);
+"""
+# conv_config register offsets, as in MLP.h
+MLP_CTRLA = 0x00
+MLP_DESC_COUNT = 0x60
+MLP_DESC_CTRL = 0x64
+MLP_DESC_DONE = 0x68
+MLP_DESCRIPTORS = 0x2000
+
+def batch_queue(traces, swaps, descriptors):
+    # Load the first convolution's input and the first two convolutions' filters, write every descriptor into the
+    # descriptor window a word per beat as the CDMA's burst arrives through the AXI-lite converter, and run them
+    out = f"ACT_load <= {bram_image(pack_operands(traces[0].input_image, traces[0].operand_width))};\nACT_load_en <= '1';\n"
+    for trace, (_, swap_filters) in list(zip(traces, swaps))[:2]:
+        for i, image in enumerate(trace.filter_images):
+            out += f'BRAM_FILTER{i}_BANK{swap_filters}_data <= {bram_image(pack_operands(image, trace.operand_width))};\n'
+    out += "wait for 10ps;\nACT_load_en <= '0';\n"
+    blob = np.array(descriptors, dtype=np.uint32).flatten()
+    out += ''.join(f'axil_write(16#{MLP_DESCRIPTORS + 4*i:04X}#, x"{int(word):08X}");\n' for i, word in enumerate(blob))
+    out += f'axil_write(16#{MLP_DESC_COUNT:02X}#, x"{len(descriptors):08X}");\n'
+    return out + f'axil_write(16#{MLP_DESC_CTRL:02X}#, x"00000001");\n'
+
+def batch_complete(num_traces):
+    # One completion for the whole batch: MLP_CTRLA reads idle only after the last pass, with every pass counted
+    return f"""\
+loop
+    axil_read(16#{MLP_CTRLA:02X}#, axil_data);
+    exit when axil_data(0) = '1';
+end loop;
+axil_read(16#{MLP_DESC_DONE:02X}#, axil_data);
+report "descriptor batch ran " & integer'image(to_integer(unsigned(axil_data))) & " passes, " & integer'image(idle_cycles) & " idle cycles between them" severity note;
+assert to_integer(unsigned(axil_data)) = {num_traces} report "DESCRIPTOR BATCH EXPECTED {num_traces} PASSES!!!" severity error;
+"""
+
+def iter_testbench(traces, data_dir=None, entity='conv_accelerator_tb', cycle_slack=DEFAULT_CYCLE_SLACK, swaps=None, descriptors=None):
+    # Yields the testbench in sections so it can be written out without ever holding the whole file.
+    # With data_dir set, expected streams go to <data_dir>/<interface>.hex and are read back with textio.
+    # A cycle_slack of 0 keeps the performance reports but drops their budget assertions.
+    # With swaps set, from chain_convolve(), the convolutions run back to back on banked BRAMs.
+    # With descriptors set as well, one list of conv_config descriptor words per convolution, conv_config runs them from its descriptor RAM
+    banked = swaps is not None
+    batched = descriptors is not None
+    bram = bram_config(traces, banked)
+    lanes = traces[0].lanes
+    assert all(trace.lanes == lanes for trace in traces), "Every convolution in one testbench must use the same number of lanes"
+    pack_output = traces[0].pack_output
+    assert all(trace.pack_output == pack_output for trace in traces), "Every convolution in one testbench must expect the same output write mode"
+    assert all(trace.operand_width == bram.operand_width for trace in traces), "Every convolution in one testbench must use the same operand width"
+    assert not banked or (pack_output and len(swaps) == len(traces)), "Banked convolutions need packed output writes and one swap setting each"
+    assert not batched or (banked and len(descriptors) == len(traces)), "Queued convolutions run on banked BRAMs with one descriptor each"
+    assert not batched or lanes == 4, "conv_config has bias registers for 4 MACs"
+    textio = '\nuse STD.TEXTIO.ALL;\nuse IEEE.STD_LOGIC_TEXTIO.ALL;' if data_dir is not None else ''
+    perf_signals = ''.join(f'    signal PERF_{prefix}_transfers : natural := 0;\n    signal PERF_{prefix}_stalls : natural := 0;\n' for prefix, _, _, _ in perf_counters(lanes))
+    bias_signals = per_lane('    signal mac{k}_bias : std_logic_vector(31 downto 0);\n', lanes)
+    filter_bram_signals = per_lane("""\
+    signal BRAM_FILTER{k}_addr : std_logic_vector(32-1 downto 0);
+    signal BRAM_FILTER{k}_din : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
+    signal BRAM_FILTER{k}_dout : std_logic_vector(31 downto 0);
+    signal BRAM_FILTER{k}_dout_delay1 : std_logic_vector(31 downto 0);
+    signal BRAM_FILTER{k}_en : std_logic;
+    signal BRAM_FILTER{k}_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
+    signal BRAM_FILTER{k}_rst : std_logic;
+    signal BRAM_FILTER{k}_clk : std_logic;
+
+""", lanes)
+    if banked:
+        filter_data_signals = per_lane('    signal BRAM_FILTER{k}_BANK0_data : bram_t(0 to 2**FILTER_BRAM_ADDR_WIDTH-1);\n'
+                                       '    signal BRAM_FILTER{k}_BANK1_data : bram_t(0 to 2**FILTER_BRAM_ADDR_WIDTH-1);\n', lanes)
+        filter_read = """\
+                if (swap_filters = '0') then
+                    BRAM_FILTER{k}_dout_delay1 <= BRAM_FILTER{k}_BANK0_data(to_integer(unsigned(BRAM_FILTER{k}_addr(FILTER_BRAM_ADDR_WIDTH+2-1 downto 2))));
+                else
+                    BRAM_FILTER{k}_dout_delay1 <= BRAM_FILTER{k}_BANK1_data(to_integer(unsigned(BRAM_FILTER{k}_addr(FILTER_BRAM_ADDR_WIDTH+2-1 downto 2))));
+                end if;"""
+    else:
+        filter_data_signals = per_lane('    signal BRAM_FILTER{k}_data : bram_t(0 to 2**FILTER_BRAM_ADDR_WIDTH-1);\n', lanes)
+        filter_read = """\
+                BRAM_FILTER{k}_dout_delay1 <= BRAM_FILTER{k}_data(to_integer(unsigned(BRAM_FILTER{k}_addr(FILTER_BRAM_ADDR_WIDTH+2-1 downto 2))));"""
+    mac_signals = ''.join(per_lane(f"""\
+    signal TEST_s_mac{{k}}_{axis}_tready : std_logic;
+    signal TEST_s_mac{{k}}_{axis}_tdata : std_logic_vector({width}-1 downto 0);
+    signal EXPECTED_s_mac{{k}}_{axis}_tdata : std_logic_vector({width}-1 downto 0);
+    signal TEST_s_mac{{k}}_{axis}_tlast : std_logic;
+    signal EXPECTED_s_mac{{k}}_{axis}_tlast : std_logic;
+    signal TEST_s_mac{{k}}_{axis}_tvalid : std_logic;
+    signal TEST_s_mac{{k}}_{axis}_fail : std_logic := '0';
+""", lanes) + '\n' for axis, width in (('s_axis', 'MAC_DATA_WIDTH*2'), ('m_axis', 'MAC_OUTPUT_DATA_WIDTH')))
+    filter_bram_models = per_lane(f"""\
+    BRAM_FILTER{{k}}_dout <= BRAM_FILTER{{k}}_dout_delay1; -- BRAM read latency = 2
+    process(BRAM_FILTER{{k}}_clk)
+    begin
+        if rising_edge(BRAM_FILTER{{k}}_clk) then
+            if (BRAM_FILTER{{k}}_rst = '1') then
+                BRAM_FILTER{{k}}_dout_delay1 <= (others => '0');
+            elsif (BRAM_FILTER{{k}}_en = '1') then
+{filter_read}
+            end if;
+        end if;
+    end process;
+
+""", lanes)
+    if banked:
+        bram_models = BANKED_INPUT_BRAM_MODEL + filter_bram_models + BANKED_OUTPUT_BRAM_MODEL
+    else:
+        bram_models = INPUT_BRAM_MODEL + filter_bram_models + OUTPUT_BRAM_MODEL
+    if banked:
+        activation_data_signals = """\
+    -- Activation banks behind bram_switch: the input port reads bank swap_activations, the output port the other.
+    -- The host loads ACT_load into the input port's bank on ACT_load_en. The accelerator reads filter bank swap_filters
+    -- while the host fills the other one
+    signal BRAM_ACT0_data : bram_t(0 to 2**INPUT_BRAM_ADDR_WIDTH-1);
+    signal BRAM_ACT1_data : bram_t(0 to 2**INPUT_BRAM_ADDR_WIDTH-1);
+    signal ACT_load : bram_t(0 to 2**INPUT_BRAM_ADDR_WIDTH-1);
+    signal ACT_load_en : std_logic := '0';
+    signal swap_activations : std_logic := '0';
+    signal swap_filters : std_logic := '0';
+""" + filter_data_signals
+        control_variables = """\
+        constant CLK_PERIOD : time := 2 ps;
+        variable last_complete : time := 0 ps;
+        variable gap_cycles : natural := 0;
+        variable idle_cycles : natural := 0;
+"""
+        if batched:
+            activation_data_signals += AXIL_SIGNALS
+            control_variables += AXIL_PROCEDURES
+    else:
+        activation_data_signals = """\
+    signal BRAM_INPUT_data : bram_t(0 to 2**INPUT_BRAM_ADDR_WIDTH-1);
+""" + filter_data_signals + """\
+    signal BRAM_OUTPUT_data : bram_t(0 to 2**OUTPUT_BRAM_ADDR_WIDTH-1);
+"""
+        control_variables = ''
+    # conv_config drives conv_idle when it runs the descriptor queue
+    idle_reset = '' if batched else "conv_idle <= '1';\n        "
+    config_unit = CONFIG_UNIT.format(depth=len(traces)) if batched else ''
+    # Packed lane ports are associated one slice per lane, and VHDL wants every slice of a port listed together
+    bias_port_map = per_lane('            mac_bias(MAC_OUTPUT_DATA_WIDTH*{k+1}-1 downto MAC_OUTPUT_DATA_WIDTH*{k}) => mac{k}_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),\n', lanes)
+    filter_port_map = ''.join(per_lane(f'            BRAM_FILTER_{port}{slice} => BRAM_FILTER{{k}}_{port}{actual_slice},\n', lanes) for port, slice, actual_slice in (
+        ('addr', '(32*{k+1}-1 downto 32*{k})', ''),
+        ('din', '(BRAM_DATA_WIDTH*{k+1}-1 downto BRAM_DATA_WIDTH*{k})', ''),
+        ('dout', '(BRAM_DATA_WIDTH*{k+1}-1 downto BRAM_DATA_WIDTH*{k})', '(BRAM_DATA_WIDTH-1 downto 0)'),
+        ('en', '({k})', ''),
+        ('we', '((BRAM_DATA_WIDTH/8)*{k+1}-1 downto (BRAM_DATA_WIDTH/8)*{k})', ''),
+        ('rst', '({k})', ''),
+        ('clk', '({k})', ''),
+    ))
+    mac_port_map = '\n'.join(''.join(per_lane(f'            TEST_s_mac_{axis}_{port}{slice} => TEST_s_mac{{k}}_{axis}_{port},\n', lanes) for port, slice in (
+        ('tready', '({k})'),
+        ('tdata', f'({width}*{{k+1}}-1 downto {width}*{{k}})'),
+        ('tlast', '({k})'),
+        ('tvalid', '({k})'),
+    )) for axis, width in (('s_axis', 'MAC_DATA_WIDTH*2'), ('m_axis', 'MAC_OUTPUT_DATA_WIDTH')))
+    yield f"""\
 ----------------------------------------------------------------------------------
 -- AUTOGENERATED. See gen_conv_accelerator_tb.py
 --
@@ -310,23 +1125,26 @@ print(f"""\
 library work;
 library IEEE;
 use IEEE.STD_LOGIC_1164.ALL;
-use IEEE.NUMERIC_STD.ALL;
+use IEEE.NUMERIC_STD.ALL;{textio}
 
-entity conv_accelerator_tb is
-end conv_accelerator_tb;
+entity {entity} is
+end {entity};
 
-architecture Behavioral of conv_accelerator_tb is
+architecture Behavioral of {entity} is
 
-    constant DIM_WIDTH : integer := 12; -- Max dim size is 2048 in a dense layer
-    constant INPUT_ADDR_WIDTH : integer := 7; -- Max input size is 60*60*32 < 2^17
-    constant FILTER_ADDR_WIDTH : integer := 7; -- Max filter size is 5*5*32 < 2^10
-    constant OUTPUT_ADDR_WIDTH : integer := 7; -- Max size of output channel is 60x60, 4 channels < 2^14
-    constant INPUT_BRAM_ADDR_WIDTH : integer := 5; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
-    constant FILTER_BRAM_ADDR_WIDTH : integer := 5; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
-    constant OUTPUT_BRAM_ADDR_WIDTH : integer := 5; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
+    constant DIM_WIDTH : integer := {DIM_WIDTH}; -- Max dim size is 2048 in a dense layer
+    constant INPUT_ADDR_WIDTH : integer := {bram.input_element_width}; -- Sized to the largest input in this testbench
+    constant FILTER_ADDR_WIDTH : integer := {bram.filter_element_width}; -- Sized to the largest filter in this testbench
+    constant OUTPUT_ADDR_WIDTH : integer := {bram.output_element_width}; -- Sized to the largest output (plus initial offset) in this testbench
+    constant INPUT_BRAM_ADDR_WIDTH : integer := {bram.input_addr_width - BRAM_WORD_ADDR_BITS}; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
+    constant FILTER_BRAM_ADDR_WIDTH : integer := {bram.filter_addr_width - BRAM_WORD_ADDR_BITS}; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
+    constant OUTPUT_BRAM_ADDR_WIDTH : integer := {bram.output_addr_width - BRAM_WORD_ADDR_BITS}; -- Word address width to the BRAM interfaces, must be kept in sync with ADDR_WIDTH, BRAM_DATA_WIDTH, and MAC_DATA_WIDTH!!!
     constant BRAM_DATA_WIDTH : integer := 32; -- Data width of raw BRAM interface
-    constant MAC_DATA_WIDTH : integer := 8; -- Data width of each MAC input operand, defaults to int8. Supports sub-byte indexing, must be power of 2 and less than BRAM_DATA_WIDTH
+    constant MAC_DATA_WIDTH : integer := {bram.operand_width}; -- Data width of each MAC input operand, defaults to int8. Supports sub-byte indexing, must be power of 2 and less than BRAM_DATA_WIDTH
     constant MAC_OUTPUT_DATA_WIDTH : integer := 32; -- Data width of the raw output of the MAC unit
+    constant NUM_MACS : integer := {lanes}; -- Filters processed in parallel, each with its own MAC unit and filter BRAM
+    constant MAC_TID_WIDTH : integer := {tid_width(lanes)}; -- Width of the MAC index carried with each result
+    constant PACK_OUTPUT_WRITES : boolean := {str(pack_output).lower()}; -- One output BRAM write per word of a channel rather than one per element
 
     -- Configuration values from conv_config unit
     signal max_pooling : std_logic;
@@ -342,11 +1160,7 @@ architecture Behavioral of conv_accelerator_tb is
     signal input_end_diff_ow : std_logic_vector(31 downto 0);
     signal output_elements_per_channel : std_logic_vector(31 downto 0);
     signal output_initial_offset : std_logic_vector(31 downto 0);
-    signal mac0_bias : std_logic_vector(31 downto 0);
-    signal mac1_bias : std_logic_vector(31 downto 0);
-    signal mac2_bias : std_logic_vector(31 downto 0);
-    signal mac3_bias : std_logic_vector(31 downto 0);
-    signal q_scale : std_logic_vector(31 downto 0);
+{bias_signals}    signal q_scale : std_logic_vector(31 downto 0);
     signal q_zero : std_logic_vector(31 downto 0);
 
     -- BRAM blocks for high speed memory access
@@ -359,43 +1173,7 @@ architecture Behavioral of conv_accelerator_tb is
     signal BRAM_INPUT_rst : std_logic;
     signal BRAM_INPUT_clk : std_logic;
 
-    signal BRAM_FILTER0_addr : std_logic_vector(32-1 downto 0);
-    signal BRAM_FILTER0_din : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-    signal BRAM_FILTER0_dout : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER0_dout_delay1 : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER0_en : std_logic;
-    signal BRAM_FILTER0_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-    signal BRAM_FILTER0_rst : std_logic;
-    signal BRAM_FILTER0_clk : std_logic;
-
-    signal BRAM_FILTER1_addr : std_logic_vector(32-1 downto 0);
-    signal BRAM_FILTER1_din : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-    signal BRAM_FILTER1_dout : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER1_dout_delay1 : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER1_en : std_logic;
-    signal BRAM_FILTER1_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-    signal BRAM_FILTER1_rst : std_logic;
-    signal BRAM_FILTER1_clk : std_logic;
-
-    signal BRAM_FILTER2_addr : std_logic_vector(32-1 downto 0);
-    signal BRAM_FILTER2_din : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-    signal BRAM_FILTER2_dout : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER2_dout_delay1 : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER2_en : std_logic;
-    signal BRAM_FILTER2_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-    signal BRAM_FILTER2_rst : std_logic;
-    signal BRAM_FILTER2_clk : std_logic;
-
-    signal BRAM_FILTER3_addr : std_logic_vector(32-1 downto 0);
-    signal BRAM_FILTER3_din : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
-    signal BRAM_FILTER3_dout : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER3_dout_delay1 : std_logic_vector(31 downto 0);
-    signal BRAM_FILTER3_en : std_logic;
-    signal BRAM_FILTER3_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
-    signal BRAM_FILTER3_rst : std_logic;
-    signal BRAM_FILTER3_clk : std_logic;
-
-    signal BRAM_OUTPUT_addr : std_logic_vector(32-1 downto 0);
+{filter_bram_signals}    signal BRAM_OUTPUT_addr : std_logic_vector(32-1 downto 0);
     signal EXPECTED_BRAM_OUTPUT_addr : std_logic_vector(32-1 downto 0);
     signal BRAM_OUTPUT_din : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
     signal EXPECTED_BRAM_OUTPUT_din : std_logic_vector(BRAM_DATA_WIDTH-1 downto 0);
@@ -403,17 +1181,18 @@ architecture Behavioral of conv_accelerator_tb is
     signal BRAM_OUTPUT_dout_delay1 : std_logic_vector(31 downto 0);
     signal BRAM_OUTPUT_en : std_logic;
     signal BRAM_OUTPUT_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
+    signal EXPECTED_BRAM_OUTPUT_we : std_logic_vector((BRAM_DATA_WIDTH/8)-1 downto 0);
     signal BRAM_OUTPUT_rst : std_logic;
     signal BRAM_OUTPUT_clk : std_logic;
     signal BRAM_OUTPUT_fail : std_logic := '0';
 
-    signal BRAM_INPUT_data : std_logic_vector(8*{BRAM_SIZE_BYTES}-1 downto 0);
-    signal BRAM_FILTER0_data : std_logic_vector(8*{BRAM_SIZE_BYTES}-1 downto 0);
-    signal BRAM_FILTER1_data : std_logic_vector(8*{BRAM_SIZE_BYTES}-1 downto 0);
-    signal BRAM_FILTER2_data : std_logic_vector(8*{BRAM_SIZE_BYTES}-1 downto 0);
-    signal BRAM_FILTER3_data : std_logic_vector(8*{BRAM_SIZE_BYTES}-1 downto 0);
-    signal BRAM_OUTPUT_data : std_logic_vector(8*{BRAM_SIZE_BYTES}-1 downto 0);
-    
+    -- BRAM contents as arrays of 32 bit words, so every access indexes one word whatever the BRAM size
+    type bram_t is array(natural range <>) of std_logic_vector(31 downto 0);
+{activation_data_signals}    
+    signal perf_busy_cycles : std_logic_vector(31 downto 0);
+    signal perf_mac_stall_cycles : std_logic_vector(31 downto 0);
+    signal perf_bram_read_cycles : std_logic_vector(31 downto 0);
+    signal perf_output_writes : std_logic_vector(31 downto 0);
     signal conv_complete : std_logic; -- Reset the convolutional logic, must be set between each convolutional operation
     signal conv_idle : std_logic; -- Reset the convolutional logic, must be set between each convolutional operation
     signal rst : std_logic; -- Reset everything, including BRAM contents
@@ -429,71 +1208,13 @@ architecture Behavioral of conv_accelerator_tb is
     signal TEST_s_index_gen_m_axis_tvalid : std_logic;    
     signal TEST_s_index_gen_m_axis_fail : std_logic := '0';
 
-    signal TEST_s_mac0_s_axis_tready : std_logic;
-    signal TEST_s_mac0_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal EXPECTED_s_mac0_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal TEST_s_mac0_s_axis_tlast : std_logic;
-    signal EXPECTED_s_mac0_s_axis_tlast : std_logic;
-    signal TEST_s_mac0_s_axis_tvalid : std_logic;
-    signal TEST_s_mac0_s_axis_fail : std_logic := '0';
-    signal TEST_s_mac1_s_axis_tready : std_logic;
-    signal TEST_s_mac1_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal EXPECTED_s_mac1_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal TEST_s_mac1_s_axis_tlast : std_logic;
-    signal EXPECTED_s_mac1_s_axis_tlast : std_logic;
-    signal TEST_s_mac1_s_axis_tvalid : std_logic;
-    signal TEST_s_mac1_s_axis_fail : std_logic := '0';
-    signal TEST_s_mac2_s_axis_tready : std_logic;
-    signal TEST_s_mac2_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal EXPECTED_s_mac2_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal TEST_s_mac2_s_axis_tlast : std_logic;
-    signal EXPECTED_s_mac2_s_axis_tlast : std_logic;
-    signal TEST_s_mac2_s_axis_tvalid : std_logic;
-    signal TEST_s_mac2_s_axis_fail : std_logic := '0';
-    signal TEST_s_mac3_s_axis_tready : std_logic;
-    signal TEST_s_mac3_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal EXPECTED_s_mac3_s_axis_tdata : std_logic_vector(MAC_DATA_WIDTH*2-1 downto 0);
-    signal TEST_s_mac3_s_axis_tlast : std_logic;
-    signal EXPECTED_s_mac3_s_axis_tlast : std_logic;
-    signal TEST_s_mac3_s_axis_tvalid : std_logic;
-    signal TEST_s_mac3_s_axis_fail : std_logic := '0';
-
-    signal TEST_s_mac0_m_axis_tready : std_logic;
-    signal TEST_s_mac0_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal EXPECTED_s_mac0_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal TEST_s_mac0_m_axis_tlast : std_logic;
-    signal EXPECTED_s_mac0_m_axis_tlast : std_logic;
-    signal TEST_s_mac0_m_axis_tvalid : std_logic;
-    signal TEST_s_mac0_m_axis_fail : std_logic := '0';
-    signal TEST_s_mac1_m_axis_tready : std_logic;
-    signal TEST_s_mac1_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal EXPECTED_s_mac1_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal TEST_s_mac1_m_axis_tlast : std_logic;
-    signal EXPECTED_s_mac1_m_axis_tlast : std_logic;
-    signal TEST_s_mac1_m_axis_tvalid : std_logic;
-    signal TEST_s_mac1_m_axis_fail : std_logic := '0';
-    signal TEST_s_mac2_m_axis_tready : std_logic;
-    signal TEST_s_mac2_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal EXPECTED_s_mac2_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal TEST_s_mac2_m_axis_tlast : std_logic;
-    signal EXPECTED_s_mac2_m_axis_tlast : std_logic;
-    signal TEST_s_mac2_m_axis_tvalid : std_logic;
-    signal TEST_s_mac2_m_axis_fail : std_logic := '0';
-    signal TEST_s_mac3_m_axis_tready : std_logic;
-    signal TEST_s_mac3_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal EXPECTED_s_mac3_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
-    signal TEST_s_mac3_m_axis_tlast : std_logic;
-    signal EXPECTED_s_mac3_m_axis_tlast : std_logic;
-    signal TEST_s_mac3_m_axis_tvalid : std_logic;
-    signal TEST_s_mac3_m_axis_fail : std_logic := '0';
-
-    signal TEST_s_out_combiner_m_axis_tready : std_logic;
+{mac_signals}    signal TEST_s_out_combiner_m_axis_tready : std_logic;
     signal TEST_s_out_combiner_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
     signal EXPECTED_s_out_combiner_m_axis_tdata : std_logic_vector(MAC_OUTPUT_DATA_WIDTH-1 downto 0);
     signal TEST_s_out_combiner_m_axis_tlast : std_logic;
     signal EXPECTED_s_out_combiner_m_axis_tlast : std_logic;
-    signal TEST_s_out_combiner_m_axis_tid : std_logic_vector(1 downto 0);
-    signal EXPECTED_s_out_combiner_m_axis_tid : std_logic_vector(1 downto 0);
+    signal TEST_s_out_combiner_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
+    signal EXPECTED_s_out_combiner_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
     signal TEST_s_out_combiner_m_axis_tvalid : std_logic;
     signal TEST_s_out_combiner_m_axis_fail : std_logic := '0';
 
@@ -502,95 +1223,24 @@ architecture Behavioral of conv_accelerator_tb is
     signal EXPECTED_s_dequantization_m_axis_tdata : std_logic_vector(MAC_DATA_WIDTH-1 downto 0);
     signal TEST_s_dequantization_m_axis_tlast : std_logic;
     signal EXPECTED_s_dequantization_m_axis_tlast : std_logic;
-    signal TEST_s_dequantization_m_axis_tid : std_logic_vector(1 downto 0);
-    signal EXPECTED_s_dequantization_m_axis_tid : std_logic_vector(1 downto 0);
+    signal TEST_s_dequantization_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
+    signal EXPECTED_s_dequantization_m_axis_tid : std_logic_vector(MAC_TID_WIDTH-1 downto 0);
     signal TEST_s_dequantization_m_axis_tvalid : std_logic;
     signal TEST_s_dequantization_m_axis_fail : std_logic := '0';
-begin
-        
-    BRAM_INPUT_dout <= BRAM_INPUT_dout_delay1; -- BRAM read latency = 2
-    process(BRAM_INPUT_clk)
-    begin
-        if rising_edge(BRAM_INPUT_clk) then
-            if (BRAM_INPUT_rst = '1') then
-                BRAM_INPUT_dout_delay1 <= (others => '0');
-            elsif (BRAM_INPUT_en = '1') then
-                BRAM_INPUT_dout_delay1 <= BRAM_INPUT_data((32*(to_integer(unsigned(BRAM_INPUT_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_INPUT_addr(32-1 downto 2))))));
-            end if;
-        end if;
-    end process;
-
-    BRAM_FILTER0_dout <= BRAM_FILTER0_dout_delay1; -- BRAM read latency = 2
-    process(BRAM_FILTER0_clk)
-    begin
-        if rising_edge(BRAM_FILTER0_clk) then
-            if (BRAM_FILTER0_rst = '1') then
-                BRAM_FILTER0_dout_delay1 <= (others => '0');
-            elsif (BRAM_FILTER0_en = '1') then
-                BRAM_FILTER0_dout_delay1 <= BRAM_FILTER0_data((32*(to_integer(unsigned(BRAM_FILTER0_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER0_addr(32-1 downto 2))))));
-            end if;
-        end if;
-    end process;
-
-    BRAM_FILTER1_dout <= BRAM_FILTER1_dout_delay1; -- BRAM read latency = 2
-    process(BRAM_FILTER1_clk)
-    begin
-        if rising_edge(BRAM_FILTER1_clk) then
-            if (BRAM_FILTER1_rst = '1') then
-                BRAM_FILTER1_dout_delay1 <= (others => '0');
-            elsif (BRAM_FILTER1_en = '1') then
-                BRAM_FILTER1_dout_delay1 <= BRAM_FILTER1_data((32*(to_integer(unsigned(BRAM_FILTER1_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER1_addr(32-1 downto 2))))));
-            end if;
-        end if;
-    end process;
-
-    BRAM_FILTER2_dout <= BRAM_FILTER2_dout_delay1; -- BRAM read latency = 2
-    process(BRAM_FILTER2_clk)
-    begin
-        if rising_edge(BRAM_FILTER2_clk) then
-            if (BRAM_FILTER2_rst = '1') then
-                BRAM_FILTER2_dout_delay1 <= (others => '0');
-            elsif (BRAM_FILTER2_en = '1') then
-                BRAM_FILTER2_dout_delay1 <= BRAM_FILTER2_data((32*(to_integer(unsigned(BRAM_FILTER2_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER2_addr(32-1 downto 2))))));
-            end if;
-        end if;
-    end process;
 
-    BRAM_FILTER3_dout <= BRAM_FILTER3_dout_delay1; -- BRAM read latency = 2
-    process(BRAM_FILTER3_clk)
-    begin
-        if rising_edge(BRAM_FILTER3_clk) then
-            if (BRAM_FILTER3_rst = '1') then
-                BRAM_FILTER3_dout_delay1 <= (others => '0');
-            elsif (BRAM_FILTER3_en = '1') then
-                BRAM_FILTER3_dout_delay1 <= BRAM_FILTER3_data((32*(to_integer(unsigned(BRAM_FILTER3_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_FILTER3_addr(32-1 downto 2))))));
-            end if;
-        end if;
-    end process;
-       
-    BRAM_OUTPUT_dout <= BRAM_OUTPUT_dout_delay1; -- BRAM read latency = 2
-    process(BRAM_OUTPUT_clk)
-    begin
-        if rising_edge(BRAM_OUTPUT_clk) then
-            if (BRAM_OUTPUT_rst = '1' or conv_idle = '1') then
-                BRAM_OUTPUT_dout_delay1 <= (others => '0');
-                BRAM_OUTPUT_data <= (others => '0');
-            elsif (BRAM_OUTPUT_en = '1') then
-                if (BRAM_OUTPUT_we = "1111") then
-                    BRAM_OUTPUT_data((32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2)))))) <= BRAM_OUTPUT_din;
-                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_din;
-                else
-                    BRAM_OUTPUT_dout_delay1 <= BRAM_OUTPUT_data((32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2)))+1))-1 downto (32*(to_integer(unsigned(BRAM_OUTPUT_addr(32-1 downto 2))))));
-                end if;
-            end if;
-        end if;
-    end process;
- 
+    -- Performance counters, cleared while conv_idle and frozen once conv_complete rises
+    signal PERF_cycles : natural := 0;
+    signal PERF_fail : std_logic := '0';
+{perf_signals}begin
+        
+{bram_models} 
 
     clk <= not clk after 1ps;
 
     dut: entity work.conv_accelerator
         generic map(
+            NUM_MACS => NUM_MACS,
+            MAC_TID_WIDTH => MAC_TID_WIDTH,
             DIM_WIDTH => DIM_WIDTH,
             INPUT_ADDR_WIDTH => INPUT_ADDR_WIDTH,
             FILTER_ADDR_WIDTH => FILTER_ADDR_WIDTH,
@@ -600,7 +1250,8 @@ begin
             OUTPUT_BRAM_ADDR_WIDTH => OUTPUT_BRAM_ADDR_WIDTH,
             BRAM_DATA_WIDTH => BRAM_DATA_WIDTH,
             MAC_DATA_WIDTH => MAC_DATA_WIDTH,
-            MAC_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH
+            MAC_OUTPUT_DATA_WIDTH => MAC_OUTPUT_DATA_WIDTH,
+            PACK_OUTPUT_WRITES => PACK_OUTPUT_WRITES
         )
         port map(
             -- Configuration values from conv_config unit
@@ -617,11 +1268,7 @@ begin
             input_end_diff_ow => input_end_diff_ow(INPUT_ADDR_WIDTH-1 downto 0),
             output_elements_per_channel => output_elements_per_channel(OUTPUT_ADDR_WIDTH-1 downto 0),
             output_initial_offset => output_initial_offset(OUTPUT_ADDR_WIDTH-1 downto 0),
-            mac0_bias => mac0_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
-            mac1_bias => mac1_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
-            mac2_bias => mac2_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
-            mac3_bias => mac3_bias(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
-            q_scale => q_scale(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
+{bias_port_map}            q_scale => q_scale(MAC_OUTPUT_DATA_WIDTH-1 downto 0),
             q_zero => q_zero(MAC_DATA_WIDTH-1 downto 0),
 
             -- BRAM blocks for high speed memory access
@@ -633,38 +1280,7 @@ begin
             BRAM_INPUT_rst => BRAM_INPUT_rst,
             BRAM_INPUT_clk => BRAM_INPUT_clk,
 
-            BRAM_FILTER0_addr => BRAM_FILTER0_addr,
-            BRAM_FILTER0_din => BRAM_FILTER0_din,
-            BRAM_FILTER0_dout => BRAM_FILTER0_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER0_en => BRAM_FILTER0_en,
-            BRAM_FILTER0_we => BRAM_FILTER0_we,
-            BRAM_FILTER0_rst => BRAM_FILTER0_rst,
-            BRAM_FILTER0_clk => BRAM_FILTER0_clk,
-
-            BRAM_FILTER1_addr => BRAM_FILTER1_addr,
-            BRAM_FILTER1_din => BRAM_FILTER1_din,
-            BRAM_FILTER1_dout => BRAM_FILTER1_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER1_en => BRAM_FILTER1_en,
-            BRAM_FILTER1_we => BRAM_FILTER1_we,
-            BRAM_FILTER1_rst => BRAM_FILTER1_rst,
-            BRAM_FILTER1_clk => BRAM_FILTER1_clk,
-
-            BRAM_FILTER2_addr => BRAM_FILTER2_addr,
-            BRAM_FILTER2_din => BRAM_FILTER2_din,
-            BRAM_FILTER2_dout => BRAM_FILTER2_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER2_en => BRAM_FILTER2_en,
-            BRAM_FILTER2_we => BRAM_FILTER2_we,
-            BRAM_FILTER2_rst => BRAM_FILTER2_rst,
-            BRAM_FILTER2_clk => BRAM_FILTER2_clk,
-
-            BRAM_FILTER3_addr => BRAM_FILTER3_addr,
-            BRAM_FILTER3_din => BRAM_FILTER3_din,
-            BRAM_FILTER3_dout => BRAM_FILTER3_dout(BRAM_DATA_WIDTH-1 downto 0),
-            BRAM_FILTER3_en => BRAM_FILTER3_en,
-            BRAM_FILTER3_we => BRAM_FILTER3_we,
-            BRAM_FILTER3_rst => BRAM_FILTER3_rst,
-            BRAM_FILTER3_clk => BRAM_FILTER3_clk,
-
+{filter_port_map}
             BRAM_OUTPUT_addr => BRAM_OUTPUT_addr,
             BRAM_OUTPUT_din => BRAM_OUTPUT_din,
             BRAM_OUTPUT_dout => BRAM_OUTPUT_dout(BRAM_DATA_WIDTH-1 downto 0),
@@ -679,40 +1295,7 @@ begin
             TEST_s_index_gen_m_axis_tlast => TEST_s_index_gen_m_axis_tlast,
             TEST_s_index_gen_m_axis_tvalid => TEST_s_index_gen_m_axis_tvalid,
 
-            TEST_s_mac0_s_axis_tready => TEST_s_mac0_s_axis_tready,
-            TEST_s_mac0_s_axis_tdata => TEST_s_mac0_s_axis_tdata,
-            TEST_s_mac0_s_axis_tlast => TEST_s_mac0_s_axis_tlast,
-            TEST_s_mac0_s_axis_tvalid => TEST_s_mac0_s_axis_tvalid,
-            TEST_s_mac1_s_axis_tready => TEST_s_mac1_s_axis_tready,
-            TEST_s_mac1_s_axis_tdata => TEST_s_mac1_s_axis_tdata,
-            TEST_s_mac1_s_axis_tlast => TEST_s_mac1_s_axis_tlast,
-            TEST_s_mac1_s_axis_tvalid => TEST_s_mac1_s_axis_tvalid,
-            TEST_s_mac2_s_axis_tready => TEST_s_mac2_s_axis_tready,
-            TEST_s_mac2_s_axis_tdata => TEST_s_mac2_s_axis_tdata,
-            TEST_s_mac2_s_axis_tlast => TEST_s_mac2_s_axis_tlast,
-            TEST_s_mac2_s_axis_tvalid => TEST_s_mac2_s_axis_tvalid,
-            TEST_s_mac3_s_axis_tready => TEST_s_mac3_s_axis_tready,
-            TEST_s_mac3_s_axis_tdata => TEST_s_mac3_s_axis_tdata,
-            TEST_s_mac3_s_axis_tlast => TEST_s_mac3_s_axis_tlast,
-            TEST_s_mac3_s_axis_tvalid => TEST_s_mac3_s_axis_tvalid,
-
-            TEST_s_mac0_m_axis_tready => TEST_s_mac0_m_axis_tready,
-            TEST_s_mac0_m_axis_tdata => TEST_s_mac0_m_axis_tdata,
-            TEST_s_mac0_m_axis_tlast => TEST_s_mac0_m_axis_tlast,
-            TEST_s_mac0_m_axis_tvalid => TEST_s_mac0_m_axis_tvalid,
-            TEST_s_mac1_m_axis_tready => TEST_s_mac1_m_axis_tready,
-            TEST_s_mac1_m_axis_tdata => TEST_s_mac1_m_axis_tdata,
-            TEST_s_mac1_m_axis_tlast => TEST_s_mac1_m_axis_tlast,
-            TEST_s_mac1_m_axis_tvalid => TEST_s_mac1_m_axis_tvalid,
-            TEST_s_mac2_m_axis_tready => TEST_s_mac2_m_axis_tready,
-            TEST_s_mac2_m_axis_tdata => TEST_s_mac2_m_axis_tdata,
-            TEST_s_mac2_m_axis_tlast => TEST_s_mac2_m_axis_tlast,
-            TEST_s_mac2_m_axis_tvalid => TEST_s_mac2_m_axis_tvalid,
-            TEST_s_mac3_m_axis_tready => TEST_s_mac3_m_axis_tready,
-            TEST_s_mac3_m_axis_tdata => TEST_s_mac3_m_axis_tdata,
-            TEST_s_mac3_m_axis_tlast => TEST_s_mac3_m_axis_tlast,
-            TEST_s_mac3_m_axis_tvalid => TEST_s_mac3_m_axis_tvalid,
-
+{mac_port_map}
             TEST_s_out_combiner_m_axis_tready => TEST_s_out_combiner_m_axis_tready,
             TEST_s_out_combiner_m_axis_tdata => TEST_s_out_combiner_m_axis_tdata,
             TEST_s_out_combiner_m_axis_tlast => TEST_s_out_combiner_m_axis_tlast,
@@ -725,108 +1308,364 @@ begin
             TEST_s_dequantization_m_axis_tid => TEST_s_dequantization_m_axis_tid,
             TEST_s_dequantization_m_axis_tvalid => TEST_s_dequantization_m_axis_tvalid,
 
+            perf_busy_cycles => perf_busy_cycles,
+            perf_mac_stall_cycles => perf_mac_stall_cycles,
+            perf_bram_read_cycles => perf_bram_read_cycles,
+            perf_output_writes => perf_output_writes,
+
             conv_complete => conv_complete,
             conv_idle => conv_idle,
             rst => rst,
             clk => clk
         );
-
-    process begin
+{config_unit}
+    process
+        -- Performance reports after each convolution, a negative budget only reports
+        procedure check_cycles(name : string; predicted, budget : integer) is
+        begin
+            report name & ": " & integer'image(PERF_cycles) & " cycles, model " & integer'image(predicted) severity note;
+            if budget >= 0 and PERF_cycles > budget then
+                PERF_fail <= 'X';
+                assert FALSE report name & " EXCEEDED ITS BUDGET OF " & integer'image(budget) & " CYCLES!!!";
+            end if;
+        end procedure;
+        procedure check_stream(name : string; transfers, stalls, expected, max_stalls : integer) is
+        begin
+            report "    " & name & ": " & integer'image(transfers) & " transfers, " & integer'image(stalls) & " stall cycles, "
+                & integer'image(100 * transfers / maximum(PERF_cycles, 1)) & "% utilisation" severity note;
+            if max_stalls >= 0 and not (transfers = expected and stalls <= max_stalls) then
+                PERF_fail <= 'X';
+                assert FALSE report name & " EXPECTED " & integer'image(expected) & " TRANSFERS AND AT MOST " & integer'image(max_stalls) & " STALL CYCLES!!!";
+            end if;
+        end procedure;
+        procedure check_counter(name : string; counter : std_logic_vector; expected, max_value : integer) is
+            variable value : integer;
+        begin
+            value := to_integer(unsigned(counter));
+            report "    " & name & ": " & integer'image(value) severity note;
+            if (expected >= 0 and value /= expected) or (max_value >= 0 and value > max_value) then
+                PERF_fail <= 'X';
+                assert FALSE report name & " EXPECTED " & integer'image(expected) & " AND AT MOST " & integer'image(max_value) & "!!!";
+            end if;
+        end procedure;
+{control_variables}    begin
         rst <= '1';
         wait for 2ps;
-        conv_idle <= '1';
-        rst <= '0';
-        {indent(control_process, 2)}
+        {idle_reset}rst <= '0';
+        """
+    if batched:
+        yield indent(batch_queue(traces, swaps, descriptors), 2)
+    for index, trace in enumerate(traces):
+        if batched:
+            yield indent(trace.batch_control_process(index, swaps[index], traces[index + 2] if index + 2 < len(traces) else None), 2)
+        elif banked:
+            yield indent(trace.chain_control_process(index, swaps[index], traces[index + 1] if index + 1 < len(traces) else None), 2)
+        else:
+            yield indent(trace.control_process(), 2)
+        yield indent(trace.perf_check(index, cycle_slack), 2)
+    if batched:
+        yield indent(batch_complete(len(traces)), 2)
+    elif banked:
+        yield indent(f'report "{len(traces)} convolutions back to back, " & integer\'image(idle_cycles) & " idle cycles between them" severity note;\n', 2)
+    yield """
 
         assert FALSE Report "Simulation Complete!" severity FAILURE;
     end process;
 
-    {indent(gen_axis_checking_process(
-        's_index_gen_m_axis', 
-        [
-            ('s_index_gen_m_axis_tdata_input_addr', index_gen_input_addr, 7), 
-            ('s_index_gen_m_axis_tdata_filter_addr', index_gen_filter_addr, 7), 
-            ('s_index_gen_m_axis_tlast', index_gen_tlast, 1)
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_mac0_s_axis', 
-        [
-            ('s_mac0_s_axis_tdata', mac0_in_tdata, 16), 
-            ('s_mac0_s_axis_tlast', mac0_in_tlast, 1), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_mac1_s_axis', 
-        [
-            ('s_mac1_s_axis_tdata', mac1_in_tdata, 16), 
-            ('s_mac1_s_axis_tlast', mac1_in_tlast, 1), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_mac2_s_axis', 
-        [
-            ('s_mac2_s_axis_tdata', mac2_in_tdata, 16), 
-            ('s_mac2_s_axis_tlast', mac2_in_tlast, 1), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_mac3_s_axis', 
-        [
-            ('s_mac3_s_axis_tdata', mac3_in_tdata, 16), 
-            ('s_mac3_s_axis_tlast', mac3_in_tlast, 1), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_mac0_m_axis', 
-        [
-            ('s_mac0_m_axis_tdata', mac0_out_tdata, 32), 
-            ('s_mac0_m_axis_tlast', mac0_out_tlast, 1), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_mac1_m_axis', 
+    """
+    yield indent(gen_perf_counter_process(lanes), 1)
+    yield "\n"
+    for gen, prefix, signals in checkers(lanes):
+        yield "\n    "
+        signals = [(name, join_stream(traces, stream), getattr(bram, bits) if isinstance(bits, str) else bits) for name, stream, bits in signals]
+        for section in gen(prefix, signals, data_dir):
+            yield indent(section, 1)
+        yield "\n"
+    yield "\nend Behavioral;\n\n"
+
+def gen_testbench(traces, data_dir=None, entity='conv_accelerator_tb', cycle_slack=DEFAULT_CYCLE_SLACK, swaps=None, descriptors=None):
+    return ''.join(iter_testbench(traces, data_dir, entity, cycle_slack, swaps, descriptors))
+
+def write_testbench(f, traces, data_dir=None, entity='conv_accelerator_tb', cycle_slack=DEFAULT_CYCLE_SLACK, swaps=None, descriptors=None):
+    for section in iter_testbench(traces, data_dir, entity, cycle_slack, swaps, descriptors):
+        f.write(section)
+
+# Any edit to the generator invalidates every cached trace
+with open(__file__, 'rb') as f:
+    GENERATOR_VERSION = hashlib.sha256(f.read()).hexdigest()
+
+def case_key(case):
+    # Hash of the generator version and every convolve() argument, values and shapes
+    h = hashlib.sha256(GENERATOR_VERSION.encode())
+    for arg in case:
+        arg = np.asarray(arg, dtype=np.int64)
+        h.update(repr(arg.shape).encode())
+        h.update(arg.tobytes())
+    return h.hexdigest()
+
+def cached_convolve(case, cache_dir=None, pack_output=PACK_OUTPUT_WRITES, operand_width=8):
+    # convolve(*case), reusing the trace stored in <cache_dir>/<case_key>.npz when there is one
+    if cache_dir is None:
+        return convolve(*case, pack_output=pack_output, operand_width=operand_width)
+    path = os.path.join(cache_dir, f'{case_key((*case, pack_output, operand_width))}.npz')
+    if os.path.exists(path):
+        os.utime(path) # Mark as recently used for evict_cache
+        return ConvTrace.load(path)
+    trace = convolve(*case, pack_output=pack_output, operand_width=operand_width)
+    trace.save(path)
+    return trace
+
+def evict_cache(cache_dir, max_bytes):
+    # Delete least recently used traces until the cache fits in max_bytes
+    entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.npz')]
+    entries.sort(key=lambda entry: entry.stat().st_mtime)
+    total = sum(entry.stat().st_size for entry in entries)
+    for entry in entries:
+        if total <= max_bytes:
+            break
+        total -= entry.stat().st_size
+        os.remove(entry.path)
+
+def run_cases(cases, jobs=None, cache_dir=None, pack_output=PACK_OUTPUT_WRITES, operand_width=8):
+    # Golden traces of every case, across a process pool once there are enough cases to pay for starting one
+    if jobs == 1 or len(cases) < 64:
+        return [cached_convolve(case, cache_dir, pack_output, operand_width) for case in cases]
+    with multiprocessing.Pool(jobs) as pool:
+        return pool.starmap(cached_convolve, [(case, cache_dir, pack_output, operand_width) for case in cases], chunksize=16)
+
+def chain_convolve(cases, operand_width=8):
+    # Golden traces of cases run back to back on banked BRAMs, as production overlaps layers. A case whose input differs
+    # from the one before starts a new layer: the activation banks swap so its input port reads the bank the previous
+    # case wrote, which must hold its input, so the traces expect PACK_OUTPUT_WRITES: only packed writes lay an output
+    # out as the next input. The filter banks swap before every case after the first. Both activation
+    # banks are tracked byte by byte, since merged writes read stale bytes back. Returns the traces and every case's
+    # (swap_activations, swap_filters)
+    num_bytes = lambda elements: -(-elements * operand_width // 8)
+    def output_extent(case):
+        input, filter, _, _, _, max_pooling, _, output_initial_offset = case
+        OH, OW = np.shape(input)[1] - np.shape(filter)[2] + 1, np.shape(input)[2] - np.shape(filter)[3] + 1
+        return output_initial_offset + len(filter) * (OH*OW // 4 if max_pooling else OH*OW)
+    size = 4 * -(-max(num_bytes(max(np.size(case[0]), output_extent(case))) for case in cases) // 4)
+    first = pack_operands(np.int8(cases[0][0]).reshape(-1), operand_width)
+    banks = [np.concatenate([first, np.full(size - len(first), 0xA5, dtype=np.uint8)]), np.zeros(size, dtype=np.uint8)]
+    traces = []
+    swaps = []
+    active = 0 # Bank the input port reads
+    for index, case in enumerate(cases):
+        input = np.int8(case[0]).reshape(-1)
+        if index > 0 and not np.array_equal(input, np.int8(cases[index - 1][0]).reshape(-1)):
+            active ^= 1
+            assert np.array_equal(unpack_operands(banks[active], operand_width)[:len(input)], input), f"Case {index} does not read the output of case {index - 1}"
+        output_bank = banks[1 - active]
+        trace = convolve(*case, pack_output=True, operand_width=operand_width, output_bram=unpack_operands(output_bank, operand_width))
+        for addr, data, we in zip(trace.bram_output_write_addr, trace.bram_output_write_data, trace.bram_output_write_we):
+            for b in range(4):
+                if int(we) >> b & 1:
+                    output_bank[int(addr) + b] = int(data) >> 8*b & 0xFF
+        offset = case[-1]
+        written = unpack_operands(output_bank, operand_width)[offset:offset + trace.output_image.size]
+        assert np.array_equal(written, trace.output_image.reshape(-1)), f"Case {index} writes disagree with its output image"
+        traces.append(trace)
+        swaps.append((active, index % 2))
+    return traces, swaps
+
+# Values the hand written cases found bugs with, mixed into the random ones
+BIAS_EXTREMES = [0, -1, 0x7FFFFFFF, -0x80000000, 0x8A32BC81, 0xFFFFFFFF]
+SCALE_EXTREMES = [0, 1, 0x4000000, 0x40000000, 0x7A32BC81, 0x7FFFFFFF] # q_scale is signed, 0x7FFFFFFF is the largest scale
+
+def random_operands(rng, shape, bits=8):
+    # Uniform signed bits wide values with a quarter of the elements replaced by the extremes of that range
+    half = 1 << (bits - 1)
+    values = rng.integers(-half, half, shape)
+    return np.where(rng.random(shape) < 0.25, rng.choice([-half, -1, 0, 1, half - 1], shape), values)
+
+def random_case(rng, lanes=DEFAULT_LANES, operand_width=8):
+    # One valid convolve() case, small enough that thousands share a testbench's BRAMs
+    FC = int(rng.integers(1, 9))
+    FH, FW = (int(d) for d in rng.integers(1, 6, 2))
+    OH, OW = (int(d) for d in rng.integers(1, 13, 2))
+    max_pooling = bool(rng.integers(2))
+    if max_pooling:
+        # Pooling windows must tile the output
+        OH, OW = OH + OH % 2, OW + OW % 2
+    input = random_operands(rng, (FC, OH + FH - 1, OW + FW - 1), operand_width)
+    filter = random_operands(rng, (lanes, FC, FH, FW), operand_width)
+    biases = np.where(rng.random(lanes) < 0.5, rng.choice(BIAS_EXTREMES, lanes), rng.integers(-2**31, 2**31, lanes))
+    scale = int(rng.choice(SCALE_EXTREMES)) if rng.random() < 0.25 else int(rng.integers(0, 2**31))
+    zero = int(rng.integers(-(1 << (operand_width - 1)), 1 << (operand_width - 1)))
+    relu = bool(rng.integers(2))
+    output_initial_offset = 4 * int(rng.integers(0, 16))
+    return (input, filter, biases, scale, zero, max_pooling, relu, output_initial_offset)
+
+def fuzz_cases(seed, count, lanes=DEFAULT_LANES, operand_width=8):
+    # The same seed always gives the same cases
+    rng = np.random.default_rng(seed)
+    return [random_case(rng, lanes, operand_width) for _ in range(count)]
+
+def widen_case(case, lanes):
+    # A hand written 4 filter case cycled or cut down to one filter and bias per lane
+    input, filter, biases, *rest = case
+    filter = np.asarray(filter)
+    return (input, np.resize(filter, (lanes,) + filter.shape[1:]), np.resize(biases, lanes), *rest)
+
+def narrow_case(case, operand_width):
+    # A hand written int8 case with its operands and zero point cut to their low operand_width bits, as the hardware reads them
+    input, filter, biases, scale, zero, *rest = case
+    return (sign_extend(input, operand_width), sign_extend(filter, operand_width), biases, scale, int(sign_extend(zero, operand_width)), *rest)
+
+def case_cost(case):
+    # index_gen transactions of one convolve() case, which is what its simulation time scales with
+    input, filter = np.shape(case[0]), np.shape(case[1])
+    return (input[1] - filter[2] + 1) * (input[2] - filter[3] + 1) * int(np.prod(filter[1:]))
+
+def shard_cases(cases, num_shards):
+    # Longest case first onto the least loaded shard, each shard keeps its cases in their original order
+    load = [0] * num_shards
+    shards = [[] for _ in range(num_shards)]
+    for index in sorted(range(len(cases)), key=lambda i: -case_cost(cases[i])):
+        k = load.index(min(load))
+        shards[k].append(index)
+        load[k] += case_cost(cases[index])
+    return [[cases[i] for i in sorted(shard)] for shard in shards if shard]
+
+def write_shard(job):
+    # Pool worker: run one shard's convolutions and write its self-contained testbench, returns the output images
+    cases, path, entity, data_dir, cache_dir, cycle_slack, pack_output, operand_width = job
+    traces = [cached_convolve(case, cache_dir, pack_output, operand_width) for case in cases]
+    if data_dir is not None:
+        os.makedirs(data_dir, exist_ok=True)
+    with open(path, 'w') as f:
+        write_testbench(f, traces, data_dir, entity, cycle_slack)
+    return [trace.output_image for trace in traces]
+
+def write_shards(cases, num_shards, shard_dir, data_dir=None, jobs=None, cache_dir=None, cycle_slack=DEFAULT_CYCLE_SLACK, pack_output=PACK_OUTPUT_WRITES, operand_width=8):
+    # Split the cases into testbench entities conv_accelerator_tb_shard<k> that can be simulated side by side,
+    # each generated in its own worker process. Stream files go to <data_dir>/shard<k>
+    work = []
+    for k, shard in enumerate(shard_cases(cases, num_shards)):
+        entity = f'conv_accelerator_tb_shard{k}'
+        work.append((shard, os.path.join(shard_dir, f'{entity}.vhd'), entity, None if data_dir is None else os.path.join(data_dir, f'shard{k}'), cache_dir, cycle_slack, pack_output, operand_width))
+    with multiprocessing.Pool(jobs) as pool:
+        return pool.map(write_shard, work)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate conv_accelerator_tb.vhd')
+    parser.add_argument('-o', '--output', help='Write the testbench to this file instead of stdout')
+    parser.add_argument('--production-layer', action='store_true', help='Also run a 60x60x32 layer with 5x5x32 filters, sizing the BRAMs to match')
+    parser.add_argument('--fuzz', type=int, default=0, help='Also run this many random valid cases')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for --fuzz')
+    parser.add_argument('--shards', type=int, help='Split the cases into this many independent testbenches written to --shard-dir')
+    parser.add_argument('--shard-dir', default='.', help='Directory for the sharded testbenches')
+    parser.add_argument('-j', '--jobs', type=int, help='Worker processes generating shards or golden traces, defaults to the CPU count')
+    parser.add_argument('--cache-dir', help='Reuse golden traces of unchanged cases stored in this directory')
+    parser.add_argument('--cache-size', type=float, default=1024, help='Evict least recently used cached traces beyond this many MiB')
+    parser.add_argument('--data-dir', help='Write expected streams to hex files in this directory and read them with textio instead of inlining constants')
+    parser.add_argument('--lanes', type=int, default=DEFAULT_LANES, help='Filters run in parallel, the hand written cases cycle their 4 filters to fill them')
+    parser.add_argument('--packed-output', action='store_true', help='Expect one output BRAM write per word with byte enables, for output_storage built with PACK_OUTPUT_WRITES true')
+    parser.add_argument('--operand-width', type=int, default=8, choices=OPERAND_WIDTHS, help='MAC_DATA_WIDTH, the hand written cases keep the low bits of their operands')
+    parser.add_argument('--cycle-slack', type=float, default=DEFAULT_CYCLE_SLACK, help='Fail any convolution slower than this multiple of the throughput model, 0 only reports the counters')
+    args = parser.parse_args()
+    if args.operand_width != 8 and not args.packed_output:
+        parser.error('--operand-width below 8 needs --packed-output, only the packed output_storage writes sub-byte elements')
+    if args.data_dir is not None:
+        os.makedirs(args.data_dir, exist_ok=True)
+    if args.cache_dir is not None:
+        os.makedirs(args.cache_dir, exist_ok=True)
+
+    cases = []
+
+    inputs = np.array([
         [
-            ('s_mac1_m_axis_tdata', mac1_out_tdata, 32), 
-            ('s_mac1_m_axis_tlast', mac1_out_tlast, 1), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_mac2_m_axis', 
+            [127, -1, -128, 4],
+            [5, 6, 7, 8],
+            [9, 10, 11, 12],
+        ],
         [
-            ('s_mac2_m_axis_tdata', mac2_out_tdata, 32), 
-            ('s_mac2_m_axis_tlast', mac2_out_tlast, 1), 
-        ]), 1)}
+            [13, 14, 15, 16],
+            [17, 18, 19, 0],
+            [21, 3, 2, 1],
+        ]
+    ])
 
-    {indent(gen_axis_checking_process(
-        's_mac3_m_axis', 
+    filters = np.array([
         [
-            ('s_mac3_m_axis_tdata', mac3_out_tdata, 32), 
-            ('s_mac3_m_axis_tlast', mac3_out_tlast, 1), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_out_combiner_m_axis', 
+            [
+                [127, -1, -128],
+                [4, 5, 6],
+            ],
+            [
+                [7, 8, 9],
+                [10, 11, 12],
+            ],
+        ],
         [
-            ('s_out_combiner_m_axis_tdata', combined_out_tdata, 32), 
-            ('s_out_combiner_m_axis_tlast', combined_out_tlast, 1), 
-            ('s_out_combiner_m_axis_tid', combined_out_tid, 2), 
-        ]), 1)}
-
-    {indent(gen_axis_checking_process(
-        's_dequantization_m_axis',
+            [
+                [-13, -14, -15],
+                [-16, -17, -18],
+            ],
+            [
+                [-19, -20, -21],
+                [-22, -23, -24],
+            ],
+        ],
         [
-            ('s_dequantization_m_axis_tdata', deq_out_tdata, 8),
-            ('s_dequantization_m_axis_tlast', deq_out_tlast, 1),
-            ('s_dequantization_m_axis_tid', deq_out_tid, 2),
-        ]), 1)}
-
-    {indent(gen_bram_checking_process(
-        'BRAM_OUTPUT',
+            [
+                [25, 26, 27],
+                [28, 29, 30],
+            ],
+            [
+                [31, 32, 33],
+                [34, 35, 36],
+            ],
+        ],
         [
-            ('BRAM_OUTPUT_addr', bram_output_write_addr, 32),
-            ('BRAM_OUTPUT_din', bram_output_write_data, 32),
-        ]), 1)}
+            [
+                [37, 38, 39],
+                [40, 41, 42],
+            ],
+            [
+                [43, 44, 45],
+                [46, 47, 48],
+            ],
+        ]
+    ])
+
+    cases.append((inputs, filters, [0, 1, 2, 3], 0x4000000, 0, False, False, 0))
+    cases.append((inputs, filters, [0, 1, -2, 0x8A32BC81], 0x7A32BC81, -127, False, False, 0))
+    cases.append((np.reshape(range(-20, 20), (2, 5, 4)), filters, [0, 1, 2, 3], 0x7A32BC81, -127, True, True, 0))
+    cases.append((np.reshape(range(-30, 30), (2, 5, 6)), filters, [4, 5, 6, 7], 0x7A32BC81, -100, True, True, 4))
+
+    inputs = [[[0x40, 0], [0, 0]]]
+    filters = [[[[1, 0], [0, 0]]], [[[1, 0], [0, 0]]], [[[1, 0], [0, 0]]], [[[1, 0], [0, 0]]]]
+
+    cases.append((inputs, filters, [0x100, 0x100, 0x100, 0x100], 0x40000000, 3, False, True, 0))
+
+    if args.production_layer:
+        # Largest layer the accelerator targets: 60x60x32 input, one 5x5x32 filter per lane, pooled
+        rng = np.random.default_rng(0)
+        half = 1 << (args.operand_width - 1)
+        inputs = rng.integers(-half, half, (32, 60, 60))
+        filters = rng.integers(-half, half, (args.lanes, 32, 5, 5))
+        cases.append((inputs, filters, rng.integers(-2**20, 2**20, args.lanes), 0x00200000, -3, True, True, 0))
+
+    cases = [narrow_case(widen_case(case, args.lanes), args.operand_width) for case in cases]
+    cases += fuzz_cases(args.seed, args.fuzz, args.lanes, args.operand_width)
+
+    if args.shards is not None:
+        os.makedirs(args.shard_dir, exist_ok=True)
+        for k, output_images in enumerate(write_shards(cases, args.shards, args.shard_dir, args.data_dir, args.jobs, args.cache_dir, args.cycle_slack, args.packed_output, args.operand_width)):
+            for output_image in output_images:
+                print(f'shard{k}', output_image, file=sys.stderr)
+    else:
+        traces = run_cases(cases, args.jobs, args.cache_dir, args.packed_output, args.operand_width)
+        for trace in traces:
+            print(trace.output_image, file=sys.stderr)
+        if args.output is None:
+            write_testbench(sys.stdout, traces, args.data_dir, cycle_slack=args.cycle_slack)
+        else:
+            with open(args.output, 'w') as f:
+                write_testbench(f, traces, args.data_dir, cycle_slack=args.cycle_slack)
 
-end Behavioral;
-""")
\ No newline at end of file
+    if args.cache_dir is not None:
+        # Only the parent evicts, so no worker ever loses a trace it is about to load
+        evict_cache(args.cache_dir, int(args.cache_size * 2**20))
@@ -0,0 +1,167 @@
+################################################################
+# Host Driver Timing Model
+# Times a layer driven the way MLP.h drives the accelerator: blocking memcpy_dma() copies through the AXI CDMA,
+# one Xil_Out32 per config register and a busy-wait on conv_idle around every pass. Splits the layer time into
+# register programming, DMA and compute, and shows what each batching or overlap change would save
+################################################################
+
+import argparse
+import numpy as np
+
+from network_golden import FILTERS_PER_PASS, ConvLayer, fuse_layers, random_network
+from perf_model import model_conv
+from tile_planner import CDMA_BYTES_PER_CYCLE, CLOCK_HZ, FILTER_BANK_BYTES, plan_layer
+
+# AXI-lite and CDMA costs in FCLK_CLK0 cycles. A memcpy_dma() is three register writes, the CDMA's start latency,
+# the transfer and one last status read to see it idle, which adds up to tile_planner's CDMA_SETUP_CYCLES
+AXIL_WRITE_CYCLES = 16 # One Xil_Out32 from the PS to the PL, posted through the GP port
+AXIL_READ_CYCLES = 24 # One Xil_In32, a busy-wait notices completion one read after it happens
+CDMA_START_CYCLES = 16 # BTT written to the first beat on the bus
+CONTROL_REGISTERS = 2 # MLP_CTRLB (swaps, pooling, relu) and MLP_CTRLA (clear conv_idle to start)
+
+
+class HostTiming:
+    # Interconnect costs the model is run with
+    __slots__ = ('axil_write_cycles', 'axil_read_cycles', 'cdma_bytes_per_cycle', 'cdma_start_cycles')
+
+    def __init__(self, axil_write_cycles=AXIL_WRITE_CYCLES, axil_read_cycles=AXIL_READ_CYCLES, cdma_bytes_per_cycle=CDMA_BYTES_PER_CYCLE, cdma_start_cycles=CDMA_START_CYCLES):
+        self.axil_write_cycles = axil_write_cycles
+        self.axil_read_cycles = axil_read_cycles
+        self.cdma_bytes_per_cycle = cdma_bytes_per_cycle
+        self.cdma_start_cycles = cdma_start_cycles
+
+    def memcpy_dma(self, num_bytes):
+        # memcpy_dma_start() then while (!memcpy_dma_idle())
+        return 3*self.axil_write_cycles + self.cdma_start_cycles + -(-num_bytes // self.cdma_bytes_per_cycle) + self.axil_read_cycles
+
+
+class HostReport:
+    # Cycles of one layer by what the host was waiting on. Overlapped DMA only counts the part compute did not hide
+    __slots__ = ('passes', 'register_writes', 'register_cycles', 'dma_transfers', 'dma_bytes', 'dma_cycles', 'compute_cycles')
+
+    def __init__(self):
+        self.passes = 0
+        self.register_writes = 0
+        self.register_cycles = 0
+        self.dma_transfers = 0
+        self.dma_bytes = 0
+        self.dma_cycles = 0
+        self.compute_cycles = 0
+
+    @property
+    def total_cycles(self):
+        return self.register_cycles + self.dma_cycles + self.compute_cycles
+
+    def share(self, cycles):
+        return cycles / max(self.total_cycles, 1)
+
+    def add(self, other):
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+# What-if changes to the driver, each alone and then all together
+VARIANTS = (
+    ('MLP.h as is', {}),
+    ('skip unchanged registers', {'skip_unchanged': True}),
+    ('one DMA for all filter banks', {'batch_filters': True}),
+    ('preload filters during compute', {'overlap_filters': True}),
+    ('all of the above', {'skip_unchanged': True, 'batch_filters': True, 'overlap_filters': True}),
+)
+
+def host_layer(input_shape, layer, timing, skip_unchanged=False, batch_filters=False, overlap_filters=False):
+    # Walk tile_planner's passes the way a blocking driver runs them: copy in the input tile, copy each pass's
+    # filters into the MLP_FILTER0..3 banks, write every register, start, busy-wait, and copy each output tile back.
+    #  - skip_unchanged only writes registers whose value differs from the pass before
+    #  - batch_filters copies all four filter banks in one transfer, from a host buffer laid out with the bank stride
+    #  - overlap_filters copies the next pass's filters into the idle bank while the accelerator runs, as swap_filters allows
+    C, IH, IW = input_shape
+    K, FC, FH, FW = np.shape(layer.filters)
+    OW = IW - FW + 1
+    filter_bytes = FC*FH*FW
+    schedule = plan_layer(input_shape, layer)
+    report = HostReport()
+
+    def dma(num_bytes):
+        report.dma_transfers += 1
+        report.dma_bytes += num_bytes
+        return timing.memcpy_dma(num_bytes)
+
+    def filter_dma():
+        if batch_filters:
+            return dma((FILTERS_PER_PASS - 1)*FILTER_BANK_BYTES + filter_bytes)
+        return sum(dma(filter_bytes) for _ in range(FILTERS_PER_PASS))
+
+    written = {}
+    preloaded = False
+    passes = schedule.passes
+    for i, p in enumerate(passes):
+        if i == 0 or p.tile != passes[i - 1].tile:
+            report.dma_cycles += dma(C*(p.output_rows + FH - 1)*IW)
+        if not preloaded:
+            report.dma_cycles += filter_dma()
+
+        writes = CONTROL_REGISTERS + sum(1 for name, value in p.registers.items() if not skip_unchanged or written.get(name) != value)
+        written.update(p.registers)
+        report.register_writes += writes
+        report.register_cycles += writes*timing.axil_write_cycles
+
+        compute = model_conv(FC, FH, FW, p.output_rows, OW, max_pooling=layer.max_pooling).cycles + timing.axil_read_cycles
+        preloaded = overlap_filters and i + 1 < len(passes)
+        if preloaded:
+            # The copy runs between starting the pass and the busy-wait on conv_idle
+            hidden = filter_dma()
+            report.compute_cycles += compute
+            report.dma_cycles += max(hidden - compute, 0)
+        else:
+            report.compute_cycles += compute
+        report.passes += 1
+
+        if i + 1 == len(passes) or passes[i + 1].tile != p.tile:
+            report.dma_cycles += dma(p.registers['MLP_OUTPUT_INITIAL_OFFSET'] + FILTERS_PER_PASS*p.registers['MLP_OUTPUT_ELEMENTS_PER_CHANNEL'])
+    return report
+
+def network_layers(input, layers):
+    # (input shape, fused layer) of every convolution in a network
+    shape = np.shape(input)
+    for layer in fuse_layers(layers):
+        K, _, FH, FW = np.shape(layer.filters)
+        yield shape, layer
+        OH, OW = shape[1] - FH + 1, shape[2] - FW + 1
+        shape = (K, OH // 2, OW // 2) if layer.max_pooling else (K, OH, OW)
+
+def print_report(name, report):
+    ms = lambda cycles: cycles / CLOCK_HZ * 1e3
+    print(f'{name:<32} {ms(report.total_cycles):9.3f} ms = '
+          f'registers {ms(report.register_cycles):7.3f} ms ({100 * report.share(report.register_cycles):4.1f}%, {report.register_writes} writes), '
+          f'DMA {ms(report.dma_cycles):7.3f} ms ({100 * report.share(report.dma_cycles):4.1f}%, {report.dma_transfers} copies of {report.dma_bytes} bytes), '
+          f'compute {ms(report.compute_cycles):7.3f} ms ({100 * report.share(report.compute_cycles):4.1f}%)')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Predict the host side time of a layer driven through MLP.h')
+    parser.add_argument('--input', type=int, nargs=3, default=[32, 60, 60], metavar=('C', 'H', 'W'), help='Input shape')
+    parser.add_argument('--filters', type=int, nargs=3, default=[32, 5, 5], metavar=('K', 'FH', 'FW'), help='Filter count and size')
+    parser.add_argument('--max-pooling', action='store_true')
+    parser.add_argument('--network', action='store_true', help='Time every layer of network_golden\'s seeded CNN instead')
+    parser.add_argument('--axil-write-cycles', type=int, default=AXIL_WRITE_CYCLES, help='Cycles of one Xil_Out32')
+    parser.add_argument('--axil-read-cycles', type=int, default=AXIL_READ_CYCLES, help='Cycles of one Xil_In32')
+    parser.add_argument('--cdma-bytes-per-cycle', type=float, default=CDMA_BYTES_PER_CYCLE, help='CDMA bandwidth once a transfer runs')
+    parser.add_argument('--cdma-start-cycles', type=int, default=CDMA_START_CYCLES, help='CDMA latency from BTT to the first beat')
+    args = parser.parse_args()
+
+    timing = HostTiming(args.axil_write_cycles, args.axil_read_cycles, args.cdma_bytes_per_cycle, args.cdma_start_cycles)
+    rng = np.random.default_rng(0)
+    if args.network:
+        input, layers = random_network(rng)
+        layers = list(network_layers(input, layers))
+    else:
+        C, IH, IW = args.input
+        K, FH, FW = args.filters
+        layers = [(tuple(args.input), ConvLayer(rng.integers(-128, 128, (K, C, FH, FW)), rng.integers(-2**16, 2**16, K), 0x00100000, 0, True, args.max_pooling))]
+
+    print(f'{len(layers)} layer(s) at {CLOCK_HZ / 1e6:.0f} MHz')
+    for name, options in VARIANTS:
+        total = HostReport()
+        for shape, layer in layers:
+            total.add(host_layer(shape, layer, timing, **options))
+        print_report(name, total)
@@ -0,0 +1,152 @@
+################################################################
+# Whole Network Golden Model
+# Splits every layer of a network into one-filter-per-lane accelerator passes and gives the expected
+# output BRAM image after each pass. Run directly to check a seeded CNN against convolve()
+################################################################
+
+import argparse
+import sys
+import time
+import numpy as np
+
+from gen_conv_accelerator_tb import (
+    DEFAULT_LANES, MAX_INPUT_ADDR_WIDTH, MAX_FILTER_ADDR_WIDTH, MAX_OUTPUT_ADDR_WIDTH, OPERAND_WIDTHS,
+    chain_convolve, convolve, golden_conv, golden_pool, run_cases, write_testbench,
+)
+
+FILTERS_PER_PASS = DEFAULT_LANES
+
+
+class ConvLayer:
+    # One convolution, filters are (K, C, FH, FW) int8 and biases (K,) int32
+    __slots__ = ('filters', 'biases', 'scale', 'zero', 'relu', 'max_pooling')
+
+    def __init__(self, filters, biases, scale, zero, relu=False, max_pooling=False):
+        self.filters = np.asarray(filters)
+        self.biases = np.asarray(biases, dtype=np.int64)
+        self.scale = scale
+        self.zero = zero
+        self.relu = relu
+        self.max_pooling = max_pooling
+
+
+class NetworkPass:
+    # One accelerator run: the convolve() arguments it is programmed with and the output BRAM it leaves behind
+    __slots__ = ('layer', 'index', 'case', 'bram_image')
+
+    def __init__(self, layer, index, case, bram_image):
+        self.layer = layer
+        self.index = index
+        self.case = case
+        self.bram_image = bram_image # int8 elements, every channel group written so far by this layer
+
+
+def dense_layer(weights, biases, scale, zero, input_shape, relu=False):
+    # Dense layer as a convolution whose filter covers the whole (C, H, W) input, giving a 1x1 output per neuron
+    return ConvLayer(np.reshape(weights, (len(weights),) + tuple(input_shape)), biases, scale, zero, relu)
+
+def fuse_layers(layers):
+    # Fold 'relu' and 'max_pool' entries into the convolution before them, the accelerator applies both on the way out
+    fused = []
+    for layer in layers:
+        if layer == 'relu':
+            fused[-1].relu = True
+        elif layer == 'max_pool':
+            fused[-1].max_pooling = True
+        else:
+            fused.append(layer)
+    return fused
+
+def layer_passes(layer_index, input, layer, lanes=FILTERS_PER_PASS, bits=8):
+    # Every pass of one layer plus the layer's (K, OH, OW) output. With 4 lanes pass p runs filters 4p..4p+3 and writes
+    # its channels at output_initial_offset = 4p * output_elements_per_channel, so the image stays channel-major.
+    # Operands and outputs are bits wide, so every buffer holds 8/bits elements per byte
+    K, C, FH, FW = np.shape(layer.filters)
+    OH = np.shape(input)[1] - FH + 1
+    OW = np.shape(input)[2] - FW + 1
+    assert C == np.shape(input)[0], f"Layer {layer_index} filters have {C} channels but its input has {np.shape(input)[0]}"
+    assert not layer.max_pooling or (OH % 2 == 0 and OW % 2 == 0), f"Layer {layer_index} pools an odd {OH}x{OW} output"
+    assert np.size(input)*bits <= 8 * 2**MAX_INPUT_ADDR_WIDTH, f"Layer {layer_index} input does not fit the input BRAM"
+    assert C*FH*FW*bits <= 8 * 2**MAX_FILTER_ADDR_WIDTH, f"Layer {layer_index} filters do not fit the filter BRAMs"
+
+    # Pad to whole passes, the padding channels land after the real ones and the next layer never reads them
+    num_passes = -(-K // lanes)
+    padding = num_passes*lanes - K
+    filters = np.concatenate([layer.filters, np.zeros((padding, C, FH, FW), dtype=layer.filters.dtype)])
+    biases = np.concatenate([layer.biases, np.zeros(padding, dtype=np.int64)])
+
+    _, deq_out = golden_conv(input, filters, biases, layer.scale, layer.zero, layer.relu, bits)
+    output = golden_pool(deq_out) if layer.max_pooling else deq_out.transpose(2, 0, 1)
+    elements_per_channel = output[0].size
+    assert output.size*bits <= 8 * 2**MAX_OUTPUT_ADDR_WIDTH, f"Layer {layer_index} output does not fit the output BRAM"
+
+    # Image after pass p is the first lanes*(p+1) channels of the final one
+    flat = output.reshape(-1)
+    written = np.arange(num_passes)[:, None] >= (np.arange(flat.size) // (lanes*elements_per_channel))[None, :]
+    images = np.where(written, flat, 0).astype(np.int8)
+
+    passes = []
+    for p in range(num_passes):
+        group = slice(lanes*p, lanes*(p + 1))
+        case = (input, filters[group], biases[group], layer.scale, layer.zero, layer.max_pooling, layer.relu, lanes*p*elements_per_channel)
+        passes.append(NetworkPass(layer_index, p, case, images[p]))
+    return passes, output[:K]
+
+def run_network(input, layers, lanes=FILTERS_PER_PASS, bits=8):
+    # Golden passes of a whole inference, returns ([NetworkPass], final activations)
+    passes = []
+    activations = np.asarray(input).astype(np.int8)
+    for layer_index, layer in enumerate(fuse_layers(layers)):
+        new_passes, activations = layer_passes(layer_index, activations, layer, lanes, bits)
+        passes += new_passes
+    return passes, activations
+
+def random_network(rng, bits=8):
+    # Small LeNet style CNN on a 3x28x28 input with seeded bits wide weights
+    half = 1 << (bits - 1)
+    def conv(K, C, F):
+        return ConvLayer(rng.integers(-half, half, (K, C, F, F)), rng.integers(-2**12, 2**12, K), 0x00200000, -min(3, half))
+    layers = [
+        conv(8, 3, 5), 'relu', 'max_pool',
+        conv(16, 8, 5), 'relu', 'max_pool',
+    ]
+    layers.append(dense_layer(rng.integers(-half, half, (32, 16*4*4)), rng.integers(-2**12, 2**12, 32), 0x00400000, 0, (16, 4, 4), relu=True))
+    layers.append(dense_layer(rng.integers(-half, half, (10, 32)), rng.integers(-2**12, 2**12, 10), 0x01000000, 0, (32, 1, 1)))
+    return rng.integers(-half, half, (3, 28, 28)), layers
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run a seeded CNN through the network golden model')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the input and weights')
+    parser.add_argument('-o', '--output', help='Also write a testbench running every pass back to back to this file')
+    parser.add_argument('--chain', action='store_true', help='Chain the passes in that testbench through the BRAM banks instead of reloading every BRAM')
+    parser.add_argument('--lanes', type=int, default=FILTERS_PER_PASS, help='Filters the accelerator runs per pass')
+    parser.add_argument('--operand-width', type=int, default=8, choices=OPERAND_WIDTHS, help='Bits of every weight and activation')
+    parser.add_argument('--packed-output', action='store_true', help='Expect output_storage built with PACK_OUTPUT_WRITES true, --chain always does')
+    parser.add_argument('--check', action='store_true', help='Also replay every pass through convolve() and compare output images')
+    args = parser.parse_args()
+    pack_output = args.packed_output or args.chain
+    if args.operand_width != 8 and not pack_output:
+        parser.error('--operand-width below 8 needs --packed-output, only the packed output_storage writes sub-byte elements')
+
+    input, layers = random_network(np.random.default_rng(args.seed), args.operand_width)
+    start = time.perf_counter()
+    passes, output = run_network(input, layers, args.lanes, args.operand_width)
+    print(f'{len(passes)} passes in {time.perf_counter() - start:.3f}s, output {output.reshape(-1)}', file=sys.stderr)
+
+    if args.check:
+        for network_pass in passes:
+            trace = convolve(*network_pass.case, pack_output=pack_output, operand_width=args.operand_width)
+            offset = network_pass.case[-1]
+            written = network_pass.bram_image[offset:offset + trace.output_image.size]
+            assert np.array_equal(written, trace.output_image.reshape(-1)), f"Layer {network_pass.layer} pass {network_pass.index} disagrees with convolve()"
+        print('every pass matches convolve()', file=sys.stderr)
+
+    if args.output is not None:
+        cases = [network_pass.case for network_pass in passes]
+        if args.chain:
+            # Each layer reads the previous one's output bank after swap_activations, filters are preloaded into the idle bank
+            traces, swaps = chain_convolve(cases, args.operand_width)
+        else:
+            traces, swaps = run_cases(cases, pack_output=pack_output, operand_width=args.operand_width), None
+        with open(args.output, 'w') as f:
+            write_testbench(f, traces, swaps=swaps)
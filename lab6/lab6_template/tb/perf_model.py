@@ -0,0 +1,122 @@
+################################################################
+# Cycle Approximate Throughput Model
+# Transaction level model of index_gen -> mac_stream_provider (register slice, registered address + 1-cycle
+# BRAM read, register slice) -> NUM_MACS conv_mac -> buffered round robin combiner -> dequantization -> output_storage.
+# Every stage is stepped once per output element rather than once per cycle, so a layer of millions
+# of cycles models in milliseconds
+################################################################
+
+import argparse
+import time
+
+# Latencies and intervals in clock cycles, from the RTL in hdl/
+INDEX_GEN_LATENCY = 1 # Registered address outputs
+PROVIDER_LATENCY = 1 + 2 + 1 # g_register0, registered address + 1-cycle BRAM read on the accelerator's PORT1, g_register1
+MAC_LATENCY = 1 # Result registered on the tlast transaction
+COMBINER_LATENCY = 1 # One axis_register_slice per MAC in front of the round robin
+DEQUANTIZATION_LATENCY = 3 # Scale, zero point and output registers
+OUTPUT_STORAGE_INTERVAL = 4 # Read-modify-write of the output word: read, registered address + 1-cycle BRAM read, write
+OUTPUT_STORAGE_LATENCY = 4
+PACKED_STORAGE_INTERVAL = 1 # Packed writes: each element lands in its lane's word register
+PACKED_MERGE_CYCLES = 2 # Second row of a pooling window: reading a packed word back holds the input for the registered address + 1-cycle BRAM read
+NUM_MACS = 4 # Default lane count, conv_accelerator's NUM_MACS generic
+PACK_OUTPUT_WRITES = False # conv_accelerator's PACK_OUTPUT_WRITES generic
+
+STAGES = ('mac', 'combiner', 'dequantization', 'output_storage')
+
+
+class PerfReport:
+    # Predicted cycles of one pass and how busy each stage was over them
+    __slots__ = ('cycles', 'transactions', 'outputs', 'output_writes', 'busy', 'mac_stall_cycles')
+
+    def __init__(self, cycles, transactions, outputs, output_writes, busy, mac_stall_cycles):
+        self.cycles = cycles
+        self.transactions = transactions # index_gen transactions, each one MAC operation on every MAC
+        self.outputs = outputs
+        self.output_writes = output_writes # Output BRAM writes issued by output_storage
+        self.busy = busy # Stage name to cycles spent doing work
+        self.mac_stall_cycles = mac_stall_cycles # Cycles the MACs were held by a full combiner slice
+
+    @property
+    def mac_utilisation(self):
+        return self.transactions / self.cycles
+
+    @property
+    def bottleneck(self):
+        return max(STAGES, key=lambda stage: self.busy[stage])
+
+    def utilisation(self, stage):
+        return self.busy[stage] / self.cycles
+
+
+def packed_write(oh, ow, OH, OW, max_pooling, per_word=4):
+    # Whether output_storage's packed path writes a word on pixel (oh, ow), assuming word aligned channels: a lane
+    # writes once the last of its per_word elements fills or, pooling, at the end of each row. None when the pixel writes nothing
+    if max_pooling:
+        if ow % 2 == 0:
+            return None
+        return ((oh // 2)*(OW // 2) + ow // 2) % per_word == per_word - 1 or ow == OW - 1 or None
+    return (oh*OW + ow) % per_word == per_word - 1 or (oh == OH - 1 and ow == OW - 1) or None
+
+def model_conv(FC, FH, FW, OH, OW, storage_interval=None, mac_stalls_on_output=True, num_macs=NUM_MACS, pack_output=PACK_OUTPUT_WRITES, max_pooling=False, operand_width=8):
+    # Steps the pipeline one output pixel (num_macs results) at a time:
+    #  - The MACs take one transaction per cycle in lock step, FC*FH*FW of them per pixel
+    #  - Each MAC's result waits in its combiner slice, conv_mac holds its input while M_AXIS_TREADY is low,
+    #    and mac_stream_provider only transfers when all MACs are ready, so all MACs stall until the last slice drains
+    #  - The combiner takes one result per cycle round robin, dequantization passes it on after its latency and
+    #    output_storage accepts one element every storage_interval cycles, back-pressuring the combiner
+    #  - With pack_output every element writes through a word register, and only a word read back for the second
+    #    row of a pooling window holds output_storage for PACKED_MERGE_CYCLES more
+    if storage_interval is None:
+        storage_interval = PACKED_STORAGE_INTERVAL if pack_output else OUTPUT_STORAGE_INTERVAL
+    K = FC*FH*FW
+    pixels = OH*OW
+    mac_free = INDEX_GEN_LATENCY + PROVIDER_LATENCY
+    combined = -1 # Cycle the combiner last produced a result
+    stored = -storage_interval # Cycle output_storage last accepted an element
+    mac_stalls = 0
+    writes = 0 if pack_output else pixels*num_macs
+    merge_cycles = 0
+    for oh in range(OH):
+        for ow in range(OW):
+            result = mac_free + K - 1 + MAC_LATENCY
+            write = pack_output and packed_write(oh, ow, OH, OW, max_pooling, 32 // operand_width)
+            merge = PACKED_MERGE_CYCLES if write and max_pooling and oh % 2 == 1 else 0
+            for i in range(num_macs):
+                combined = max(result + COMBINER_LATENCY, combined + 1, stored + storage_interval - DEQUANTIZATION_LATENCY)
+                stored = combined + DEQUANTIZATION_LATENCY + merge
+            if write:
+                writes += num_macs
+                merge_cycles += merge*num_macs
+            stall = max(0, combined - result - 1) if mac_stalls_on_output else 0
+            mac_stalls += stall
+            mac_free += K + stall
+    busy = {
+        'mac': pixels*K,
+        'combiner': pixels*num_macs,
+        'dequantization': pixels*num_macs,
+        'output_storage': pixels*num_macs*storage_interval + merge_cycles,
+    }
+    return PerfReport(stored + OUTPUT_STORAGE_LATENCY, pixels*K, pixels*num_macs, writes, busy, mac_stalls)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Predict the cycles of one accelerator pass')
+    parser.add_argument('--filter', type=int, nargs=3, default=[32, 5, 5], metavar=('C', 'H', 'W'), help='Filter shape')
+    parser.add_argument('--output', type=int, nargs=2, default=[56, 56], metavar=('H', 'W'), help='Output shape before pooling')
+    parser.add_argument('--lanes', type=int, default=NUM_MACS, help='MACs running in parallel')
+    parser.add_argument('--storage-interval', type=int, help='Cycles output_storage spends per element, defaults to the write mode\'s')
+    parser.add_argument('--packed-output', action='store_true', help='Model output_storage built with PACK_OUTPUT_WRITES true')
+    parser.add_argument('--max-pooling', action='store_true', help='Pool the output 2x2')
+    parser.add_argument('--operand-width', type=int, default=8, help='MAC_DATA_WIDTH, bits of every output element')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = model_conv(*args.filter, *args.output, storage_interval=args.storage_interval, num_macs=args.lanes,
+                        pack_output=args.packed_output, max_pooling=args.max_pooling, operand_width=args.operand_width)
+    elapsed = time.perf_counter() - start
+    print(f'{report.cycles} cycles for {report.transactions} transactions, MAC utilisation {100 * report.mac_utilisation:.1f}%, '
+          f'{report.mac_stall_cycles} MAC stall cycles, bottleneck {report.bottleneck}')
+    print(f'{report.output_writes} output BRAM writes for {report.outputs} outputs')
+    for stage in STAGES:
+        print(f'    {stage:<16} {100 * report.utilisation(stage):5.1f}% busy')
+    print(f'modelled at {report.cycles / elapsed / 1e6:.0f}M cycles/s')
@@ -0,0 +1,212 @@
+################################################################
+# Layer Tiling and Double Buffer Planner
+# Splits a layer into row tiles and 4-filter groups that fit the ping-pong BRAM banks, computes the
+# MLP.h register values of every pass and schedules CDMA loads against compute on the accelerator
+################################################################
+
+import argparse
+import sys
+import numpy as np
+
+from gen_conv_accelerator_tb import DIM_WIDTH, MAX_INPUT_ADDR_WIDTH, MAX_FILTER_ADDR_WIDTH, convolve, golden_conv, golden_pool, input_end_diffs
+from network_golden import FILTERS_PER_PASS, ConvLayer
+from perf_model import PACK_OUTPUT_WRITES, model_conv
+
+# One activation bank (INPUTS or OUTPUTS) and one filter bank per MAC, see MLP.h and diagram.md
+ACTIVATION_BANK_BYTES = 1 << MAX_INPUT_ADDR_WIDTH
+FILTER_BANK_BYTES = 1 << MAX_FILTER_ADDR_WIDTH
+
+# Timing estimates at FCLK_CLK0 (50 MHz), the CDMA moves one 32 bit beat per cycle once a transfer is running
+CLOCK_HZ = 50e6
+CDMA_BYTES_PER_CYCLE = 4
+CDMA_SETUP_CYCLES = 64 # Programming the CDMA registers and polling for idle
+PASS_SETUP_CYCLES = 40 # Writing the config registers and toggling conv_idle
+
+
+class PlannedPass:
+    # One accelerator run of a filter group over a row tile, scheduled between start and end cycles
+    __slots__ = ('tile', 'group', 'first_row', 'output_rows', 'filter_bank', 'registers', 'start', 'end')
+
+    def __init__(self, tile, group, first_row, output_rows, filter_bank, registers):
+        self.tile = tile
+        self.group = group
+        self.first_row = first_row # First output row (before pooling) of the tile
+        self.output_rows = output_rows
+        self.filter_bank = filter_bank # Bank the filters were loaded into, the pass runs after swapping to it
+        self.registers = registers # MLP.h register name to 32 bit value
+        self.start = 0
+        self.end = 0
+
+
+class Schedule:
+    # Every pass plus every CDMA transfer as (start, end, description), all in accelerator clock cycles
+    __slots__ = ('passes', 'transfers', 'total_cycles', 'compute_cycles', 'stall_cycles')
+
+    def __init__(self, passes, transfers):
+        self.passes = passes
+        self.transfers = transfers
+        self.total_cycles = max([p.end for p in passes] + [end for _, end, _ in transfers])
+        self.compute_cycles = sum(p.end - p.start for p in passes)
+        self.stall_cycles = self.total_cycles - self.compute_cycles # Cycles the accelerator sits waiting on the CDMA
+
+
+def cdma_cycles(num_bytes):
+    return CDMA_SETUP_CYCLES + -(-num_bytes // CDMA_BYTES_PER_CYCLE)
+
+def pass_cycles(output_rows, output_w, FC, FH, FW, max_pooling=False, pack_output=PACK_OUTPUT_WRITES):
+    # Pipeline latency, combiner drain stalls and output_storage back-pressure come from the throughput model
+    return PASS_SETUP_CYCLES + model_conv(FC, FH, FW, output_rows, output_w, pack_output=pack_output, max_pooling=max_pooling).cycles
+
+def tile_rows(input_shape, layer):
+    # Most output rows per tile whose input rows and every channel of its output fit one activation bank
+    C, IH, IW = input_shape
+    K, FC, FH, FW = np.shape(layer.filters)
+    OH, OW = IH - FH + 1, IW - FW + 1
+    channels = -(-K // FILTERS_PER_PASS) * FILTERS_PER_PASS
+    step = 2 if layer.max_pooling else 1
+    assert FC == C, f"Filters have {FC} channels but the input has {C}"
+    assert OH > 0 and OW > 0, f"{FH}x{FW} filter does not fit the {IH}x{IW} input"
+    assert FC*FH*FW <= FILTER_BANK_BYTES, f"A {FC}x{FH}x{FW} filter needs {FC*FH*FW} bytes, a filter bank holds {FILTER_BANK_BYTES}"
+    assert max(FC, FH, FW, OW) < 2**DIM_WIDTH, f"Dimensions do not fit the {DIM_WIDTH} bit dimension registers"
+    assert not layer.max_pooling or (OH % 2 == 0 and OW % 2 == 0), f"Pooling needs an even output, not {OH}x{OW}"
+    rows = min(OH, 2**DIM_WIDTH - 1) // step * step
+    while rows > 0:
+        output_bytes = channels * (rows*OW // 4 if layer.max_pooling else rows*OW)
+        if C*(rows + FH - 1)*IW <= ACTIVATION_BANK_BYTES and output_bytes <= ACTIVATION_BANK_BYTES:
+            return rows
+        rows -= step
+    assert False, f"Not even {step} output row(s) of a {C}x{IH}x{IW} input fit the {ACTIVATION_BANK_BYTES} byte activation banks"
+
+def pass_registers(layer, group, tile_input_rows, output_rows, output_w, elements_per_channel):
+    # Register values of one pass, in MLP.h order
+    K, FC, FH, FW = np.shape(layer.filters)
+    IW = output_w + FW - 1
+    diffs = input_end_diffs(FC, FH, FW, tile_input_rows, IW)
+    biases = [int(layer.biases[i]) if i < K else 0 for i in range(FILTERS_PER_PASS*group, FILTERS_PER_PASS*(group + 1))]
+    values = [
+        ('MLP_FILTER_W', FW),
+        ('MLP_FILTER_H', FH),
+        ('MLP_FILTER_C', FC),
+        ('MLP_OUTPUT_W', output_w),
+        ('MLP_OUTPUT_H', output_rows),
+        ('MLP_INPUT_END_DIFF_FW', diffs[0]),
+        ('MLP_INPUT_END_DIFF_FH', diffs[1]),
+        ('MLP_INPUT_END_DIFF_FC', diffs[2]),
+        ('MLP_INPUT_END_DIFF_OW', diffs[3]),
+        ('MLP_OUTPUT_ELEMENTS_PER_CHANNEL', elements_per_channel),
+        ('MLP_OUTPUT_INITIAL_OFFSET', FILTERS_PER_PASS*group*elements_per_channel),
+    ] + [(f'MLP_MAC{i}_BIAS', bias) for i, bias in enumerate(biases)] + [
+        ('MLP_Q_SCALE', layer.scale),
+        ('MLP_Q_ZERO', layer.zero),
+    ]
+    return {name: int(value) & 0xFFFFFFFF for name, value in values}
+
+def plan_layer(input_shape, layer, pack_output=PACK_OUTPUT_WRITES):
+    # Tile the layer, then list-schedule it on one CDMA engine and the accelerator. Passes run tile by tile,
+    # group by group. While pass i computes, the CDMA fills the other filter bank with pass i+1's filters.
+    # Loading a new input tile or reading back an output tile has to wait for the tile before it to finish
+    C, IH, IW = input_shape
+    K, FC, FH, FW = np.shape(layer.filters)
+    OH, OW = IH - FH + 1, IW - FW + 1
+    rows = tile_rows(input_shape, layer)
+    num_groups = -(-K // FILTERS_PER_PASS)
+    filter_bytes = FC*FH*FW
+    single_tile = rows >= OH
+    bank_groups = [0, None] # Filter group each bank holds
+    bank_loaded = [0, 0] # Cycle its last load finished
+
+    passes = []
+    for tile, first_row in enumerate(range(0, OH, rows)):
+        output_rows = min(rows, OH - first_row)
+        elements_per_channel = output_rows*OW // 4 if layer.max_pooling else output_rows*OW
+        for group in range(num_groups):
+            registers = pass_registers(layer, group, output_rows + FH - 1, output_rows, OW, elements_per_channel)
+            passes.append(PlannedPass(tile, group, first_row, output_rows, len(passes) % 2 if num_groups > 1 else 0, registers))
+
+    transfers = []
+    cdma_free = 0
+    accelerator_free = 0
+    def transfer(ready, num_bytes, description):
+        nonlocal cdma_free
+        start = max(cdma_free, ready)
+        cdma_free = start + cdma_cycles(num_bytes)
+        transfers.append((start, cdma_free, description))
+        return cdma_free
+
+    input_loaded = transfer(0, C*(passes[0].output_rows + FH - 1)*IW, 'input tile 0')
+    bank_loaded[0] = transfer(0, FILTERS_PER_PASS*filter_bytes, f'filters group 0 -> bank 0')
+    for i, p in enumerate(passes):
+        if i > 0 and p.tile != passes[i - 1].tile:
+            # Both activation banks belong to the previous tile until its last pass ends
+            previous = passes[i - 1]
+            output_bytes = previous.registers['MLP_OUTPUT_INITIAL_OFFSET'] + FILTERS_PER_PASS*previous.registers['MLP_OUTPUT_ELEMENTS_PER_CHANNEL']
+            transfer(previous.end, output_bytes, f'read back output tile {previous.tile}')
+            input_loaded = transfer(previous.end, C*(p.output_rows + FH - 1)*IW, f'input tile {p.tile}')
+        p.start = max(accelerator_free, input_loaded, bank_loaded[p.filter_bank])
+        p.end = p.start + pass_cycles(p.output_rows, OW, FC, FH, FW, layer.max_pooling, pack_output)
+        accelerator_free = p.end
+        if i + 1 < len(passes):
+            following = passes[i + 1]
+            # With one or two groups the filters stay in their banks for the whole layer
+            if bank_groups[following.filter_bank] != following.group:
+                bank_groups[following.filter_bank] = following.group
+                # The other bank is free once the pass before this one has finished with it
+                bank_free = passes[i - 1].end if i > 0 else 0
+                bank_loaded[following.filter_bank] = transfer(bank_free, FILTERS_PER_PASS*filter_bytes, f'filters group {following.group} -> bank {following.filter_bank}')
+    if not single_tile:
+        last = passes[-1]
+        output_bytes = last.registers['MLP_OUTPUT_INITIAL_OFFSET'] + FILTERS_PER_PASS*last.registers['MLP_OUTPUT_ELEMENTS_PER_CHANNEL']
+        transfer(last.end, output_bytes, f'read back output tile {last.tile}')
+    return Schedule(passes, transfers)
+
+def check_plan(input, layer, schedule, pack_output=PACK_OUTPUT_WRITES):
+    # Run every planned pass through convolve() with its tile of the input and rebuild the layer output from the
+    # output BRAM images, it must match the untiled golden model
+    K, FC, FH, FW = np.shape(layer.filters)
+    num_groups = -(-K // FILTERS_PER_PASS)
+    padding = num_groups*FILTERS_PER_PASS - K
+    filters = np.concatenate([layer.filters, np.zeros((padding, FC, FH, FW), dtype=layer.filters.dtype)])
+    biases = np.concatenate([layer.biases, np.zeros(padding, dtype=np.int64)])
+    _, deq_out = golden_conv(input, filters, biases, layer.scale, layer.zero, layer.relu)
+    expected = golden_pool(deq_out) if layer.max_pooling else deq_out.transpose(2, 0, 1)
+    actual = np.zeros_like(expected)
+    pool = 2 if layer.max_pooling else 1
+    for p in schedule.passes:
+        group = slice(FILTERS_PER_PASS*p.group, FILTERS_PER_PASS*(p.group + 1))
+        tile_input = input[:, p.first_row:p.first_row + p.output_rows + FH - 1]
+        trace = convolve(tile_input, filters[group], biases[group], layer.scale, layer.zero, layer.max_pooling, layer.relu,
+                         p.registers['MLP_OUTPUT_INITIAL_OFFSET'], pack_output)
+        for name in ('fw', 'fh', 'fc', 'ow'):
+            assert f'input_end_diff_{name} <= x"{p.registers[f"MLP_INPUT_END_DIFF_{name.upper()}"]:08X}"' in trace.registers, f"input_end_diff_{name} disagrees with convolve()"
+        actual[group, p.first_row//pool:(p.first_row + p.output_rows)//pool] = trace.output_image
+    assert np.array_equal(actual, expected), "Tiled output disagrees with the untiled golden model"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Plan the tiles and CDMA schedule of one convolution layer')
+    parser.add_argument('--input', type=int, nargs=3, default=[32, 60, 60], metavar=('C', 'H', 'W'), help='Input shape')
+    parser.add_argument('--filters', type=int, nargs=3, default=[32, 5, 5], metavar=('K', 'FH', 'FW'), help='Filter count and size')
+    parser.add_argument('--max-pooling', action='store_true')
+    parser.add_argument('--packed-output', action='store_true', help='Time output_storage built with PACK_OUTPUT_WRITES true')
+    parser.add_argument('--check', action='store_true', help='Run every pass through convolve() on random data and compare with the untiled layer')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Print every pass and transfer')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    C, IH, IW = args.input
+    K, FH, FW = args.filters
+    layer = ConvLayer(rng.integers(-128, 128, (K, C, FH, FW)), rng.integers(-2**16, 2**16, K), 0x00100000, 0, True, args.max_pooling)
+    schedule = plan_layer(args.input, layer, args.packed_output)
+
+    if args.verbose:
+        for p in schedule.passes:
+            print(f'{p.start:>10} {p.end:>10} pass tile {p.tile} group {p.group} bank {p.filter_bank} {p.registers}')
+        for start, end, description in schedule.transfers:
+            print(f'{start:>10} {end:>10} cdma {description}')
+    num_tiles = schedule.passes[-1].tile + 1
+    print(f'{num_tiles} tile(s) x {len(schedule.passes) // num_tiles} group(s), '
+          f'{schedule.total_cycles} cycles ({schedule.total_cycles / CLOCK_HZ * 1e3:.3f} ms), '
+          f'{schedule.stall_cycles} stalled ({100 * schedule.stall_cycles / schedule.total_cycles:.1f}%)')
+
+    if args.check:
+        check_plan(rng.integers(-128, 128, (C, IH, IW)), layer, schedule, args.packed_output)
+        print('tiled output matches the golden model', file=sys.stderr)
@@ -1467,11 +1467,15 @@ pagesize -pg 1 -db -bbox -sgen -250 0 3070 1200
   set axi_crossbar_0 [ create_bd_cell -type ip -vlnv xilinx.com:ip:axi_crossbar:2.1 axi_crossbar_0 ]
   set_property -dict [ list \
    CONFIG.CONNECTIVITY_MODE {SASD} \
+   CONFIG.NUM_SI {2} \
    CONFIG.STRATEGY {1} \
  ] $axi_crossbar_0
 
   # Create instance: axi_crossbar_1, and set properties
   set axi_crossbar_1 [ create_bd_cell -type ip -vlnv xilinx.com:ip:axi_crossbar:2.1 axi_crossbar_1 ]
+  set_property -dict [ list \
+   CONFIG.NUM_MI {3} \
+ ] $axi_crossbar_1
 
   # Create instance: axi_protocol_convert_0, and set properties
   set axi_protocol_convert_0 [ create_bd_cell -type ip -vlnv xilinx.com:ip:axi_protocol_converter:2.1 axi_protocol_convert_0 ]
@@ -1484,6 +1488,14 @@ pagesize -pg 1 -db -bbox -sgen -250 0 3070 1200
   # Create instance: axi_protocol_convert_3, and set properties
   set axi_protocol_convert_3 [ create_bd_cell -type ip -vlnv xilinx.com:ip:axi_protocol_converter:2.1 axi_protocol_convert_3 ]
 
+  # Create instance: axi_protocol_convert_4, and set properties
+  set axi_protocol_convert_4 [ create_bd_cell -type ip -vlnv xilinx.com:ip:axi_protocol_converter:2.1 axi_protocol_convert_4 ]
+  set_property -dict [ list \
+   CONFIG.DATA_WIDTH {32} \
+   CONFIG.MI_PROTOCOL {AXI4LITE} \
+   CONFIG.TRANSLATION_MODE {2} \
+ ] $axi_protocol_convert_4
+
   # Create instance: bram
   create_hier_cell_bram [current_bd_instance .] bram
 
@@ -2306,8 +2318,10 @@ pagesize -pg 1 -db -bbox -sgen -250 0 3070 1200
   connect_bd_intf_net -intf_net axi_crossbar_0_M01_AXI [get_bd_intf_pins axi_cdma_0/S_AXI_LITE] [get_bd_intf_pins axi_crossbar_0/M01_AXI]
   connect_bd_intf_net -intf_net axi_crossbar_1_M00_AXI [get_bd_intf_pins axi_crossbar_1/M00_AXI] [get_bd_intf_pins axi_protocol_convert_3/S_AXI]
   connect_bd_intf_net -intf_net axi_crossbar_1_M01_AXI [get_bd_intf_pins axi_crossbar_1/M01_AXI] [get_bd_intf_pins bram/S_AXI_BRAM]
+  connect_bd_intf_net -intf_net axi_crossbar_1_M02_AXI [get_bd_intf_pins axi_crossbar_1/M02_AXI] [get_bd_intf_pins axi_protocol_convert_4/S_AXI]
   connect_bd_intf_net -intf_net axi_protocol_convert_0_M_AXI [get_bd_intf_pins axi_crossbar_0/S00_AXI] [get_bd_intf_pins axi_protocol_convert_0/M_AXI]
   connect_bd_intf_net -intf_net axi_protocol_convert_3_M_AXI [get_bd_intf_pins axi_protocol_convert_3/M_AXI] [get_bd_intf_pins processing_system7_0/S_AXI_HP0]
+  connect_bd_intf_net -intf_net axi_protocol_convert_4_M_AXI [get_bd_intf_pins axi_crossbar_0/S01_AXI] [get_bd_intf_pins axi_protocol_convert_4/M_AXI]
   connect_bd_intf_net -intf_net conv_accelerator_wra_0_BRAM_FILTER0 [get_bd_intf_pins bram/BRAM_PORT_FILTER_0] [get_bd_intf_pins conv_accelerator_wra_0/BRAM_FILTER0]
   connect_bd_intf_net -intf_net conv_accelerator_wra_0_BRAM_FILTER1 [get_bd_intf_pins bram/BRAM_PORT_FILTER_1] [get_bd_intf_pins conv_accelerator_wra_0/BRAM_FILTER1]
   connect_bd_intf_net -intf_net conv_accelerator_wra_0_BRAM_FILTER2 [get_bd_intf_pins bram/BRAM_PORT_FILTER_2] [get_bd_intf_pins conv_accelerator_wra_0/BRAM_FILTER2]
@@ -2321,16 +2335,20 @@ pagesize -pg 1 -db -bbox -sgen -250 0 3070 1200
   connect_bd_net -net conv_accelerator_0_swap_banks [get_bd_pins bram/invert_filters] [get_bd_pins conv_accelerator_wra_0/swap_filters]
   connect_bd_net -net conv_accelerator_wra_0_ps_controls_activation_bram [get_bd_pins bram/sel] [get_bd_pins conv_accelerator_wra_0/accelerator_controls_activation_bram]
   connect_bd_net -net conv_accelerator_wra_0_swap_activations [get_bd_pins bram/invert_activations] [get_bd_pins conv_accelerator_wra_0/swap_activations]
-  connect_bd_net -net processing_system7_0_FCLK_CLK0 [get_bd_pins axi_cdma_0/m_axi_aclk] [get_bd_pins axi_cdma_0/s_axi_lite_aclk] [get_bd_pins axi_crossbar_0/aclk] [get_bd_pins axi_crossbar_1/aclk] [get_bd_pins axi_protocol_convert_0/aclk] [get_bd_pins axi_protocol_convert_3/aclk] [get_bd_pins bram/aclk_0] [get_bd_pins conv_accelerator_wra_0/S_AXI_LITE_ACLK] [get_bd_pins processing_system7_0/FCLK_CLK0] [get_bd_pins processing_system7_0/M_AXI_GP0_ACLK] [get_bd_pins processing_system7_0/S_AXI_HP0_ACLK] [get_bd_pins rst_ps7_0_200M/slowest_sync_clk]
+  connect_bd_net -net processing_system7_0_FCLK_CLK0 [get_bd_pins axi_cdma_0/m_axi_aclk] [get_bd_pins axi_cdma_0/s_axi_lite_aclk] [get_bd_pins axi_crossbar_0/aclk] [get_bd_pins axi_crossbar_1/aclk] [get_bd_pins axi_protocol_convert_0/aclk] [get_bd_pins axi_protocol_convert_3/aclk] [get_bd_pins axi_protocol_convert_4/aclk] [get_bd_pins bram/aclk_0] [get_bd_pins conv_accelerator_wra_0/S_AXI_LITE_ACLK] [get_bd_pins processing_system7_0/FCLK_CLK0] [get_bd_pins processing_system7_0/M_AXI_GP0_ACLK] [get_bd_pins processing_system7_0/S_AXI_HP0_ACLK] [get_bd_pins rst_ps7_0_200M/slowest_sync_clk]
   connect_bd_net -net processing_system7_0_FCLK_RESET0_N [get_bd_pins processing_system7_0/FCLK_RESET0_N] [get_bd_pins rst_ps7_0_200M/ext_reset_in]
-  connect_bd_net -net rst_ps7_0_100M_peripheral_aresetn [get_bd_pins axi_cdma_0/s_axi_lite_aresetn] [get_bd_pins axi_crossbar_0/aresetn] [get_bd_pins axi_crossbar_1/aresetn] [get_bd_pins axi_protocol_convert_0/aresetn] [get_bd_pins axi_protocol_convert_3/aresetn] [get_bd_pins bram/aresetn_0] [get_bd_pins conv_accelerator_wra_0/S_AXI_LITE_ARESETN] [get_bd_pins rst_ps7_0_200M/peripheral_aresetn]
+  connect_bd_net -net rst_ps7_0_100M_peripheral_aresetn [get_bd_pins axi_cdma_0/s_axi_lite_aresetn] [get_bd_pins axi_crossbar_0/aresetn] [get_bd_pins axi_crossbar_1/aresetn] [get_bd_pins axi_protocol_convert_0/aresetn] [get_bd_pins axi_protocol_convert_3/aresetn] [get_bd_pins axi_protocol_convert_4/aresetn] [get_bd_pins bram/aresetn_0] [get_bd_pins conv_accelerator_wra_0/S_AXI_LITE_ARESETN] [get_bd_pins rst_ps7_0_200M/peripheral_aresetn]
 
   # Create address segments
   assign_bd_address -offset 0x40000000 -range 0x00080000 -target_address_space [get_bd_addr_spaces axi_cdma_0/Data] [get_bd_addr_segs bram/axi_bram_ctrl/S_AXI/Mem0] -force
   assign_bd_address -offset 0x00000000 -range 0x20000000 -target_address_space [get_bd_addr_spaces axi_cdma_0/Data] [get_bd_addr_segs processing_system7_0/S_AXI_HP0/HP0_DDR_LOWOCM] -force
+  assign_bd_address -offset 0x4C000000 -range 0x00010000 -target_address_space [get_bd_addr_spaces axi_cdma_0/Data] [get_bd_addr_segs conv_accelerator_wra_0/S_AXI_LITE/reg0] -force
   assign_bd_address -offset 0x7E200000 -range 0x00010000 -target_address_space [get_bd_addr_spaces processing_system7_0/Data] [get_bd_addr_segs axi_cdma_0/S_AXI_LITE/Reg] -force
   assign_bd_address -offset 0x4C000000 -range 0x00010000 -target_address_space [get_bd_addr_spaces processing_system7_0/Data] [get_bd_addr_segs conv_accelerator_wra_0/S_AXI_LITE/reg0] -force
 
+  # Exclude Address Segments
+  exclude_bd_addr_seg -offset 0x7E200000 -range 0x00010000 -target_address_space [get_bd_addr_spaces axi_cdma_0/Data] [get_bd_addr_segs axi_cdma_0/S_AXI_LITE/Reg]
+
   # Perform GUI Layout
   regenerate_bd_layout -layout_string {
    "ActiveEmotionalView":"Default View",